@@ -0,0 +1,346 @@
+# isort: skip_file
+# Needs to be first to set up django environment
+from .helpers import *
+import argparse
+import datetime as dt
+import json
+import os
+import re
+import statistics
+from time import monotonic, sleep
+from typing import Any, Dict, List, Optional
+from posthog.client import sync_execute
+from posthog.demo.matrix.manager import MatrixManager
+from posthog.demo.products.hedgebox import HedgeboxMatrix
+from posthog.hogql_queries.events_query_runner import EventsQueryRunner
+from posthog.hogql_queries.hogql_query_runner import HogQLQueryRunner
+from posthog.hogql_queries.insights.funnels.funnels_query_runner import FunnelsQueryRunner
+from posthog.hogql_queries.insights.lifecycle_query_runner import LifecycleQueryRunner
+from posthog.hogql_queries.insights.paths_query_runner import PathsQueryRunner
+from posthog.hogql_queries.insights.retention_query_runner import RetentionQueryRunner
+from posthog.hogql_queries.insights.stickiness_query_runner import StickinessQueryRunner
+from posthog.hogql_queries.insights.trends.trends_query_runner import TrendsQueryRunner
+from posthog.hogql_queries.web_analytics.stats_table import WebStatsTableQueryRunner
+from posthog.hogql_queries.web_analytics.web_overview import WebOverviewQueryRunner
+from posthog.models import Team, User
+from posthog.models.filters.filter import Filter
+from posthog.queries.funnels import ClickhouseFunnel
+from posthog.queries.trends.trends import Trends
+
+"""
+Benchmarks that seed their own data, so that they can run against any ClickHouse, e.g. the one of a local dev setup.
+
+The data is simulated by the demo data matrix from a fixed seed and a fixed point in time, so every run (and every
+commit) queries the same dataset. It's seeded into a project of its own the first time, which takes a while.
+
+Run with asv like the other benchmarks (these are skipped unless BENCHMARK_SYNTHETIC_DATA=1 is set), or on their own:
+
+    python -m ee.benchmarks.synthetic --output before.json
+    python -m ee.benchmarks.synthetic --compare before.json
+"""
+
+SEED = "benchmarks"
+NOW = dt.datetime(2023, 11, 1, tzinfo=dt.timezone.utc)
+DAYS_PAST = 90
+# Number of clusters of simulated persons. More clusters make for more data, and a longer seeding.
+N_CLUSTERS = int(os.environ.get("BENCHMARK_N_CLUSTERS", 50))
+# How long to wait for the seeded events to be ingested into ClickHouse
+INGESTION_TIMEOUT_SECONDS = int(os.environ.get("BENCHMARK_INGESTION_TIMEOUT_SECONDS", 600))
+
+LEGACY_DATE_RANGE = {"date_from": "2023-08-03", "date_to": "2023-11-01", "interval": "week"}
+DATE_RANGE = {"date_from": "2023-08-03", "date_to": "2023-11-01"}
+SHORT_DATE_RANGE = {"date_from": "2023-10-01", "date_to": "2023-11-01"}
+
+
+def get_or_create_synthetic_team() -> Team:
+    # The account is specific to the dataset, so changing its size seeds a new project rather than reusing one
+    email = f"benchmarks+{SEED}-{N_CLUSTERS}@posthog.com"
+    existing_user = User.objects.filter(email=email).first()
+    if existing_user is not None:
+        assert existing_user.team is not None
+        return existing_user.team
+
+    matrix = HedgeboxMatrix(SEED, now=NOW, days_past=DAYS_PAST, days_future=0, n_clusters=N_CLUSTERS)
+    _, team, _ = MatrixManager(matrix, print_steps=True).ensure_account_and_save(
+        email, "Benchmarker", "Synthetic benchmarks", disallow_collision=True
+    )
+    _sleep_until_events_in_clickhouse(team, sum(len(person.past_events) for person in matrix.people))
+    return team
+
+
+def _sleep_until_events_in_clickhouse(team: Team, expected_count: int):
+    # Events are ingested through Kafka, so they show up in ClickHouse a little after being saved
+    deadline = monotonic() + INGESTION_TIMEOUT_SECONDS
+    while True:
+        event_count = sync_execute("SELECT count() FROM events WHERE team_id = %(team_id)s", {"team_id": team.pk})[0][0]
+        if event_count >= expected_count:
+            break
+        if monotonic() > deadline:
+            raise TimeoutError(
+                f"Only {event_count}/{expected_count} seeded events landed in ClickHouse after "
+                f"{INGESTION_TIMEOUT_SECONDS}s. Is ClickHouse consuming the events topic from Kafka? "
+                "Raise BENCHMARK_INGESTION_TIMEOUT_SECONDS if it's just slow."
+            )
+        print(f"Waiting for events to land in ClickHouse... {event_count}/{expected_count}")  # noqa: T201
+        sleep(1)
+
+
+class SyntheticQuerySuite:
+    timeout = 3000.0  # Timeout for the whole suite
+    version = "v001"  # Version. Incrementing this will invalidate previous results
+
+    team: Team
+
+    @benchmark_clickhouse
+    def track_legacy_trends(self):
+        filter = Filter(data={"events": [{"id": "$pageview"}], **LEGACY_DATE_RANGE})
+        Trends().run(filter, self.team)
+
+    @benchmark_clickhouse
+    def track_legacy_trends_dau(self):
+        filter = Filter(data={"events": [{"id": "$pageview", "math": "dau"}], **LEGACY_DATE_RANGE})
+        Trends().run(filter, self.team)
+
+    @benchmark_clickhouse
+    def track_legacy_funnel(self):
+        filter = Filter(
+            data={
+                "insight": "FUNNELS",
+                "events": [
+                    {"id": "$pageview", "order": 0},
+                    {"id": "signed_up", "order": 1},
+                    {"id": "uploaded_file", "order": 2},
+                ],
+                **LEGACY_DATE_RANGE,
+            }
+        )
+        ClickhouseFunnel(filter, self.team).run()
+
+    @benchmark_clickhouse
+    def track_trends(self):
+        TrendsQueryRunner(
+            query={
+                "kind": "TrendsQuery",
+                "series": [{"kind": "EventsNode", "event": "$pageview"}],
+                "interval": "week",
+                "dateRange": DATE_RANGE,
+            },
+            team=self.team,
+        ).calculate()
+
+    @benchmark_clickhouse
+    def track_trends_dau(self):
+        TrendsQueryRunner(
+            query={
+                "kind": "TrendsQuery",
+                "series": [{"kind": "EventsNode", "event": "$pageview", "math": "dau"}],
+                "interval": "week",
+                "dateRange": DATE_RANGE,
+            },
+            team=self.team,
+        ).calculate()
+
+    @benchmark_clickhouse
+    def track_trends_event_property_breakdown(self):
+        TrendsQueryRunner(
+            query={
+                "kind": "TrendsQuery",
+                "series": [{"kind": "EventsNode", "event": "$pageview"}],
+                "interval": "week",
+                "dateRange": DATE_RANGE,
+                "breakdownFilter": {"breakdown": "$browser", "breakdown_type": "event"},
+            },
+            team=self.team,
+        ).calculate()
+
+    @benchmark_clickhouse
+    def track_trends_person_property_filter(self):
+        TrendsQueryRunner(
+            query={
+                "kind": "TrendsQuery",
+                "series": [{"kind": "EventsNode", "event": "$pageview"}],
+                "interval": "week",
+                "dateRange": DATE_RANGE,
+                "properties": [{"key": "email", "operator": "icontains", "value": ".com", "type": "person"}],
+            },
+            team=self.team,
+        ).calculate()
+
+    @benchmark_clickhouse
+    def track_funnel(self):
+        FunnelsQueryRunner(
+            query={
+                "kind": "FunnelsQuery",
+                "series": [
+                    {"kind": "EventsNode", "event": "$pageview"},
+                    {"kind": "EventsNode", "event": "signed_up"},
+                    {"kind": "EventsNode", "event": "uploaded_file"},
+                ],
+                "dateRange": DATE_RANGE,
+            },
+            team=self.team,
+        ).calculate()
+
+    @benchmark_clickhouse
+    def track_retention(self):
+        RetentionQueryRunner(
+            query={
+                "kind": "RetentionQuery",
+                "dateRange": DATE_RANGE,
+                "retentionFilter": {
+                    "period": "Week",
+                    "totalIntervals": 8,
+                    "targetEntity": {"id": "signed_up", "type": "events"},
+                    "returningEntity": {"id": "uploaded_file", "type": "events"},
+                },
+            },
+            team=self.team,
+        ).calculate()
+
+    @benchmark_clickhouse
+    def track_lifecycle(self):
+        LifecycleQueryRunner(
+            query={
+                "kind": "LifecycleQuery",
+                "series": [{"kind": "EventsNode", "event": "$pageview"}],
+                "interval": "week",
+                "dateRange": DATE_RANGE,
+            },
+            team=self.team,
+        ).calculate()
+
+    @benchmark_clickhouse
+    def track_stickiness(self):
+        StickinessQueryRunner(
+            query={
+                "kind": "StickinessQuery",
+                "series": [{"kind": "EventsNode", "event": "$pageview"}],
+                "interval": "day",
+                "dateRange": SHORT_DATE_RANGE,
+            },
+            team=self.team,
+        ).calculate()
+
+    @benchmark_clickhouse
+    def track_paths(self):
+        PathsQueryRunner(
+            query={
+                "kind": "PathsQuery",
+                "dateRange": SHORT_DATE_RANGE,
+                "pathsFilter": {"includeEventTypes": ["$pageview"]},
+            },
+            team=self.team,
+        ).calculate()
+
+    @benchmark_clickhouse
+    def track_events_query(self):
+        EventsQueryRunner(
+            query={
+                "kind": "EventsQuery",
+                "select": ["*", "event", "person", "timestamp"],
+                "after": DATE_RANGE["date_from"],
+                "before": DATE_RANGE["date_to"],
+                "orderBy": ["timestamp DESC"],
+            },
+            team=self.team,
+        ).calculate()
+
+    @benchmark_clickhouse
+    def track_hogql_query(self):
+        HogQLQueryRunner(
+            query={
+                "kind": "HogQLQuery",
+                "query": "SELECT properties.$browser, count() FROM events GROUP BY properties.$browser",
+            },
+            team=self.team,
+        ).calculate()
+
+    @benchmark_clickhouse
+    def track_web_overview(self):
+        WebOverviewQueryRunner(
+            query={"kind": "WebOverviewQuery", "dateRange": SHORT_DATE_RANGE, "properties": []},
+            team=self.team,
+        ).calculate()
+
+    @benchmark_clickhouse
+    def track_web_stats_table_pages(self):
+        WebStatsTableQueryRunner(
+            query={
+                "kind": "WebStatsTableQuery",
+                "breakdownBy": "Page",
+                "dateRange": SHORT_DATE_RANGE,
+                "properties": [],
+            },
+            team=self.team,
+        ).calculate()
+
+    def setup(self):
+        # asv skips benchmarks whose setup raises NotImplementedError. These would otherwise seed their data into
+        # the ClickHouse that the other benchmarks run against.
+        if not os.environ.get("BENCHMARK_SYNTHETIC_DATA"):
+            raise NotImplementedError("Set BENCHMARK_SYNTHETIC_DATA=1 to run the synthetic data benchmarks")
+        self.team = get_or_create_synthetic_team()
+
+
+def run_benchmarks(pattern: Optional[str], runs: int) -> Dict[str, Dict[str, Any]]:
+    suite = SyntheticQuerySuite()
+    suite.team = get_or_create_synthetic_team()
+
+    results: Dict[str, Dict[str, Any]] = {}
+    for name in sorted(dir(suite)):
+        if not name.startswith("track_") or (pattern and not re.search(pattern, name)):
+            continue
+        # Run the benchmark itself rather than the asv wrapper, which only returns query times
+        benchmark = getattr(SyntheticQuerySuite, name).__wrapped__
+        samples = [run_query(benchmark, suite) for _ in range(runs)]
+        results[name] = {
+            "query_count": samples[-1]["query_count"],
+            "ch_query_time": statistics.median(sample["ch_query_time"] for sample in samples),
+            "read_rows": samples[-1]["read_rows"],
+            "read_bytes": samples[-1]["read_bytes"],
+        }
+    return results
+
+
+def print_results(results: Dict[str, Dict[str, Any]], baseline: Optional[Dict[str, Dict[str, Any]]] = None):
+    def change(name: str, metric: str) -> str:
+        if baseline is None or name not in baseline or not baseline[name][metric]:
+            return ""
+        return f" ({results[name][metric] / baseline[name][metric]:.2f}x)"
+
+    columns: List[str] = ["benchmark", "queries", "ch_query_time (ms)", "read_bytes"]
+    rows = [
+        [
+            name,
+            str(result["query_count"]),
+            f"{result['ch_query_time']:.0f}{change(name, 'ch_query_time')}",
+            f"{result['read_bytes']}{change(name, 'read_bytes')}",
+        ]
+        for name, result in results.items()
+    ]
+    widths = [max(len(row[index]) for row in [columns, *rows]) for index in range(len(columns))]
+    for row in [columns, *rows]:
+        print("  ".join(value.ljust(width) for value, width in zip(row, widths)))  # noqa: T201
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark queries against synthetic data in the local ClickHouse")
+    parser.add_argument("--bench", help="Only run benchmarks matching this regular expression")
+    parser.add_argument("--runs", type=int, default=4, help="How many times to run each benchmark")
+    parser.add_argument("--output", help="Save the results as JSON to this file, e.g. to --compare against later")
+    parser.add_argument("--compare", help="Show the change from the results saved in this file")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.bench, args.runs)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+    print_results(results, baseline)
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
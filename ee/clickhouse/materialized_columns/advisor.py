@@ -0,0 +1,279 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+import structlog
+
+from ee.clickhouse.materialized_columns.columns import (
+    SHORT_TABLE_COLUMN_NAME,
+    get_materialized_columns,
+)
+from ee.settings import (
+    MATERIALIZE_COLUMNS_ANALYSIS_PERIOD_HOURS,
+    MATERIALIZE_COLUMNS_MAX_AT_ONCE,
+)
+from posthog.client import sync_execute
+from posthog.models.property import PropertyName, TableColumn, TableWithProperties
+from posthog.settings import CLICKHOUSE_DATABASE
+
+logger = structlog.get_logger(__name__)
+
+"""
+Plans which properties to materialize, and which materialized columns to drop, based on what queries cost.
+
+HogQL tags every query with the properties it read out of JSON columns (`json_property_reads` in `log_comment`). The
+bytes read and time taken by a query are split evenly between those properties, and materializing a property is
+estimated to save the share of that which came from reading the rest of the JSON column. This is weighed against
+the disk space a column for the property would take up.
+
+Materialized columns that no query selected during the analysis period are suggested for dropping.
+"""
+
+# Rows of each table sampled to estimate how much space properties take up
+SIZE_SAMPLE_ROWS = 100_000
+# Only suggest properties that would save at least this many bytes read over the analysis period per byte stored
+MIN_SAVINGS_PER_BYTE_STORED = 1
+
+PropertyKey = Tuple[TableWithProperties, TableColumn, PropertyName]
+
+
+@dataclass
+class MaterializationCandidate:
+    table: TableWithProperties
+    table_column: TableColumn
+    property_name: PropertyName
+    queries: int
+    failed_queries: int
+    teams: List[int]
+    attributed_read_bytes: float
+    attributed_duration_ms: float
+    estimated_saved_read_bytes: float = 0
+    estimated_saved_duration_ms: float = 0
+    estimated_storage_bytes: float = 0
+
+    @property
+    def suggestion(self) -> PropertyKey:
+        return self.table, self.table_column, self.property_name
+
+
+@dataclass
+class DematerializationCandidate:
+    table: TableWithProperties
+    table_column: TableColumn
+    property_name: PropertyName
+    column_name: str
+    storage_bytes: int
+
+
+@dataclass
+class MaterializationPlan:
+    since_hours_ago: int
+    to_materialize: List[MaterializationCandidate] = field(default_factory=list)
+    to_dematerialize: List[DematerializationCandidate] = field(default_factory=list)
+
+    def report(self) -> str:
+        lines = [f"Materialized columns plan, based on queries from the last {self.since_hours_ago} hours", ""]
+
+        lines.append(f"Materialize ({len(self.to_materialize)}):")
+        for candidate in self.to_materialize:
+            lines.append(
+                f"  {candidate.table}.{candidate.table_column}['{candidate.property_name}']: "
+                f"saves ~{_readable_size(candidate.estimated_saved_read_bytes)} read "
+                f"and ~{candidate.estimated_saved_duration_ms / 1000:.0f}s of query time, "
+                f"stores ~{_readable_size(candidate.estimated_storage_bytes)}. "
+                f"queries={candidate.queries}, failed={candidate.failed_queries}, teams={len(candidate.teams)}"
+            )
+
+        lines.append("")
+        lines.append(f"Dematerialize ({len(self.to_dematerialize)}):")
+        for unused in self.to_dematerialize:
+            lines.append(
+                f"  {unused.table}.{unused.column_name} ({unused.table_column}['{unused.property_name}']): "
+                f"unused, frees {_readable_size(unused.storage_bytes)}"
+            )
+
+        return "\n".join(lines)
+
+
+def plan_materialized_columns(
+    since_hours_ago: int = MATERIALIZE_COLUMNS_ANALYSIS_PERIOD_HOURS,
+    maximum: int = MATERIALIZE_COLUMNS_MAX_AT_ONCE,
+) -> MaterializationPlan:
+    "Ranks properties to materialize by the bytes they'd save being read, and finds materialized columns nobody reads"
+
+    candidates = [
+        candidate
+        for candidate in _get_json_property_reads(since_hours_ago)
+        if (candidate.property_name, candidate.table_column) not in get_materialized_columns(candidate.table)
+    ]
+
+    for (table, table_column), table_candidates in _group_by_column(candidates).items():
+        _estimate_savings(table, table_column, table_candidates)
+
+    to_materialize = [
+        candidate
+        for candidate in candidates
+        if candidate.estimated_saved_read_bytes >= candidate.estimated_storage_bytes * MIN_SAVINGS_PER_BYTE_STORED
+    ]
+    to_materialize.sort(
+        key=lambda candidate: (candidate.estimated_saved_read_bytes, candidate.estimated_saved_duration_ms),
+        reverse=True,
+    )
+
+    return MaterializationPlan(
+        since_hours_ago=since_hours_ago,
+        to_materialize=to_materialize[:maximum],
+        to_dematerialize=_get_unused_materialized_columns(since_hours_ago),
+    )
+
+
+def _get_json_property_reads(since_hours_ago: int) -> List[MaterializationCandidate]:
+    rows = sync_execute(
+        """
+        WITH JSONExtract(log_comment, 'json_property_reads', 'Array(Tuple(String, String, String))') AS property_reads
+        SELECT
+            property_read.1 AS property_table,
+            property_read.2 AS table_column,
+            property_read.3 AS property_name,
+            count() AS queries,
+            countIf(exception_code != 0) AS failed_queries,
+            groupUniqArray(100)(JSONExtractInt(log_comment, 'team_id')) AS teams,
+            sum(read_bytes / length(property_reads)) AS attributed_read_bytes,
+            sum(query_duration_ms / length(property_reads)) AS attributed_duration_ms
+        FROM clusterAllReplicas(posthog, system, query_log)
+        ARRAY JOIN property_reads AS property_read
+        WHERE
+            query_start_time > now() - toIntervalHour(%(since_hours_ago)s)
+            AND type > 1
+            AND is_initial_query
+            AND JSONHas(log_comment, 'json_property_reads')
+            AND property_table IN ('events', 'person')
+            AND table_column IN %(table_columns)s
+        GROUP BY property_table, table_column, property_name
+        ORDER BY attributed_read_bytes DESC
+        LIMIT 1000
+        """,
+        {"since_hours_ago": since_hours_ago, "table_columns": list(SHORT_TABLE_COLUMN_NAME.keys())},
+    )
+
+    return [MaterializationCandidate(*row) for row in rows]
+
+
+def _group_by_column(
+    candidates: List[MaterializationCandidate],
+) -> Dict[Tuple[TableWithProperties, TableColumn], List[MaterializationCandidate]]:
+    groups: Dict[Tuple[TableWithProperties, TableColumn], List[MaterializationCandidate]] = {}
+    for candidate in candidates:
+        groups.setdefault((candidate.table, candidate.table_column), []).append(candidate)
+    return groups
+
+
+def _estimate_savings(
+    table: TableWithProperties, table_column: TableColumn, candidates: List[MaterializationCandidate]
+) -> None:
+    properties = [candidate.property_name for candidate in candidates]
+    json_length, property_lengths = _sample_lengths(table, table_column, properties)
+    rows, compression_ratio = _get_column_storage(table, table_column)
+
+    for candidate, property_length in zip(candidates, property_lengths):
+        # reading the materialized column instead only reads this property's share of the JSON column
+        unread_share = 1 - property_length / json_length if json_length else 0
+        candidate.estimated_saved_read_bytes = candidate.attributed_read_bytes * unread_share
+        candidate.estimated_saved_duration_ms = candidate.attributed_duration_ms * unread_share
+        candidate.estimated_storage_bytes = rows * property_length * compression_ratio
+
+
+def _sample_lengths(
+    table: TableWithProperties, table_column: TableColumn, properties: List[PropertyName]
+) -> Tuple[float, List[float]]:
+    "Average length of the JSON column and of each property in it, across recent rows"
+
+    recent = "WHERE timestamp > now() - INTERVAL 1 DAY" if table == "events" else ""
+    rows = sync_execute(
+        f"""
+        SELECT
+            avg(length({table_column})),
+            avgForEach(arrayMap(property -> length(JSONExtractRaw({table_column}, property)), %(properties)s))
+        FROM (SELECT {table_column} FROM {table} {recent} LIMIT %(sample_rows)s)
+        """,
+        {"properties": properties, "sample_rows": SIZE_SAMPLE_ROWS},
+    )
+    json_length, property_lengths = rows[0]
+    return json_length or 0, property_lengths or [0] * len(properties)
+
+
+def _get_column_storage(table: TableWithProperties, table_column: TableColumn) -> Tuple[int, float]:
+    "Rows in the table across the cluster, and how well the JSON column compresses"
+
+    rows = sync_execute(
+        """
+        SELECT sum(rows), sum(column_data_compressed_bytes) / greatest(sum(column_data_uncompressed_bytes), 1)
+        FROM clusterAllReplicas(posthog, system, parts_columns)
+        WHERE active AND database = %(database)s AND table = %(table)s AND column = %(column)s
+        """,
+        {"database": CLICKHOUSE_DATABASE, "table": _data_table(table), "column": table_column},
+    )
+    return rows[0][0] or 0, rows[0][1] or 0
+
+
+def _get_unused_materialized_columns(since_hours_ago: int) -> List[DematerializationCandidate]:
+    unused: List[DematerializationCandidate] = []
+    for table in ("events", "person"):
+        materialized_columns = get_materialized_columns(table, use_cache=False)
+        if not materialized_columns:
+            continue
+
+        # materialized columns are selected by name, both by HogQL and by older queries
+        used_columns = set(
+            column_name
+            for (column_name,) in sync_execute(
+                """
+                SELECT DISTINCT column_name
+                FROM clusterAllReplicas(posthog, system, query_log)
+                ARRAY JOIN %(column_names)s AS column_name
+                WHERE
+                    query_start_time > now() - toIntervalHour(%(since_hours_ago)s)
+                    AND type > 1
+                    AND is_initial_query
+                    AND position(query, column_name) > 0
+                """,
+                {"column_names": list(materialized_columns.values()), "since_hours_ago": since_hours_ago},
+            )
+        )
+        storage_bytes = dict(
+            sync_execute(
+                """
+                SELECT column, sum(column_data_compressed_bytes)
+                FROM clusterAllReplicas(posthog, system, parts_columns)
+                WHERE active AND database = %(database)s AND table = %(table)s
+                GROUP BY column
+                """,
+                {"database": CLICKHOUSE_DATABASE, "table": _data_table(table)},
+            )
+        )
+
+        for (property_name, table_column), column_name in materialized_columns.items():
+            if column_name not in used_columns:
+                unused.append(
+                    DematerializationCandidate(
+                        table=table,
+                        table_column=table_column,
+                        property_name=property_name,
+                        column_name=column_name,
+                        storage_bytes=storage_bytes.get(column_name, 0),
+                    )
+                )
+
+    unused.sort(key=lambda candidate: candidate.storage_bytes, reverse=True)
+    return unused
+
+
+def _data_table(table: TableWithProperties) -> str:
+    return "sharded_events" if table == "events" else table
+
+
+def _readable_size(size: float) -> str:
+    for unit in ("B", "KiB", "MiB", "GiB", "TiB"):
+        if abs(size) < 1024:
+            return f"{size:.1f}{unit}"
+        size /= 1024
+    return f"{size:.1f}PiB"
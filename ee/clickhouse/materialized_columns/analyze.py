@@ -4,6 +4,7 @@ from typing import Dict, Generator, List, Optional, Set, Tuple
 
 import structlog
 
+from ee.clickhouse.materialized_columns.backfill import start_partition_backfills
 from ee.clickhouse.materialized_columns.columns import (
     DEFAULT_TABLE_COLUMN,
     backfill_materialized_columns,
@@ -12,6 +13,7 @@ from ee.clickhouse.materialized_columns.columns import (
 )
 from ee.settings import (
     MATERIALIZE_COLUMNS_ANALYSIS_PERIOD_HOURS,
+    MATERIALIZE_COLUMNS_BACKFILL_BY_PARTITION,
     MATERIALIZE_COLUMNS_BACKFILL_PERIOD_DAYS,
     MATERIALIZE_COLUMNS_MAX_AT_ONCE,
     MATERIALIZE_COLUMNS_MINIMUM_QUERY_TIME,
@@ -216,5 +218,9 @@ def materialize_properties_task(
 
     if backfill_period_days > 0 and not dry_run:
         logger.info(f"Starting backfill for new materialized columns. period_days={backfill_period_days}")
-        backfill_materialized_columns("events", properties["events"], timedelta(days=backfill_period_days))
-        backfill_materialized_columns("person", properties["person"], timedelta(days=backfill_period_days))
+        backfill = backfill_materialized_columns
+        if MATERIALIZE_COLUMNS_BACKFILL_BY_PARTITION:
+            # backfilled by the periodic `clickhouse_backfill_materialized_columns` task instead
+            backfill = start_partition_backfills
+        backfill("events", properties["events"], timedelta(days=backfill_period_days))
+        backfill("person", properties["person"], timedelta(days=backfill_period_days))
@@ -0,0 +1,233 @@
+import json
+from dataclasses import asdict, dataclass
+from datetime import timedelta
+from typing import List, Tuple
+
+import structlog
+from django.utils.timezone import now
+
+from ee.clickhouse.materialized_columns.columns import (
+    TRIM_AND_EXTRACT_PROPERTY,
+    ColumnName,
+    get_materialized_columns,
+)
+from ee.settings import (
+    MATERIALIZE_COLUMNS_BACKFILL_MAX_RUNNING_MERGES,
+    MATERIALIZE_COLUMNS_BACKFILL_MAX_RUNNING_MUTATIONS,
+)
+from posthog.client import sync_execute
+from posthog.models.property import PropertyName, TableColumn, TableWithProperties
+from posthog.redis import get_client
+from posthog.settings import CLICKHOUSE_CLUSTER, CLICKHOUSE_DATABASE
+
+logger = structlog.get_logger(__name__)
+
+"""
+Backfills materialized columns one partition at a time, rather than with a single mutation over the whole period.
+
+Each run starts a mutation for the next partition of every backfill, unless the previous one is still running or the
+cluster is busy with other mutations and merges. Backfills are kept in redis, while which partitions are done is read
+from ClickHouse: a partition is backfilled once all of its parts have the column written to disk. So a backfill picks
+up where it left off after a failure, and re-running a partition is harmless.
+"""
+
+BACKFILLS_KEY = "materialized_columns_backfills"
+BACKFILLS_LOCK_KEY = "materialized_columns_backfills_lock"
+BACKFILLS_LOCK_TIMEOUT_SECONDS = 10 * 60
+
+
+@dataclass
+class PartitionBackfill:
+    table: TableWithProperties
+    property_name: PropertyName
+    table_column: TableColumn
+    column_name: ColumnName
+    # partitions still to be backfilled, newest first
+    partitions: List[str]
+
+    @property
+    def key(self) -> str:
+        return f"{self.table}:{self.column_name}"
+
+
+def start_partition_backfills(
+    table: TableWithProperties,
+    properties: List[Tuple[PropertyName, TableColumn]],
+    backfill_period: timedelta,
+) -> None:
+    if len(properties) == 0:
+        return
+
+    materialized_columns = get_materialized_columns(table, use_cache=False)
+    partitions = _get_partitions(table, backfill_period)
+
+    for property_name, table_column in properties:
+        backfill = PartitionBackfill(
+            table=table,
+            property_name=property_name,
+            table_column=table_column,
+            column_name=materialized_columns[(property_name, table_column)],
+            partitions=partitions,
+        )
+        _save(backfill)
+        logger.info("materialized_column_backfill_started", column=backfill.key, partitions=len(partitions))
+
+
+def get_partition_backfills() -> List[PartitionBackfill]:
+    return [PartitionBackfill(**json.loads(value)) for value in get_client().hvals(BACKFILLS_KEY)]
+
+
+def run_partition_backfills() -> bool:
+    """
+    Moves every backfill on by at most one partition. Returns whether any backfills are left to run.
+    """
+    lock = get_client().lock(BACKFILLS_LOCK_KEY, timeout=BACKFILLS_LOCK_TIMEOUT_SECONDS)
+    if not lock.acquire(blocking=False):
+        logger.info("materialized_column_backfills_already_running")
+        return True
+
+    try:
+        remaining = 0
+        for backfill in get_partition_backfills():
+            if _is_mutating(backfill):
+                remaining += 1
+                continue
+
+            unfinished = _get_unfinished_partitions(backfill)
+            backfill.partitions = [partition for partition in backfill.partitions if partition in unfinished]
+            if len(backfill.partitions) == 0:
+                get_client().hdel(BACKFILLS_KEY, backfill.key)
+                logger.info("materialized_column_backfill_finished", column=backfill.key)
+                continue
+
+            remaining += 1
+            _save(backfill)
+            if _is_cluster_busy():
+                continue
+
+            _backfill_partition(backfill, backfill.partitions[0])
+            logger.info(
+                "materialized_column_backfill_partition_started",
+                column=backfill.key,
+                partition=backfill.partitions[0],
+                partitions_left=len(backfill.partitions),
+            )
+
+        return remaining > 0
+    finally:
+        lock.release()
+
+
+def _save(backfill: PartitionBackfill) -> None:
+    get_client().hset(BACKFILLS_KEY, backfill.key, json.dumps(asdict(backfill)))
+
+
+def _get_partitions(table: TableWithProperties, backfill_period: timedelta) -> List[str]:
+    # events are partitioned by month, other tables aren't partitioned by time
+    cutoff = (now() - backfill_period).strftime("%Y%m") if table == "events" else ""
+    rows = sync_execute(
+        """
+        SELECT DISTINCT partition_id
+        FROM clusterAllReplicas(posthog, system, parts)
+        WHERE active AND database = %(database)s AND table = %(table)s AND partition_id >= %(cutoff)s
+        ORDER BY partition_id DESC
+        """,
+        {"database": CLICKHOUSE_DATABASE, "table": _data_table(table), "cutoff": cutoff},
+    )
+    return [partition_id for (partition_id,) in rows]
+
+
+def _get_unfinished_partitions(backfill: PartitionBackfill) -> List[str]:
+    "Partitions with parts that were written before the column existed and haven't been backfilled since"
+
+    rows = sync_execute(
+        """
+        SELECT DISTINCT partition_id
+        FROM (
+            SELECT partition_id
+            FROM clusterAllReplicas(posthog, system, parts_columns)
+            WHERE active AND database = %(database)s AND table = %(table)s AND partition_id IN %(partitions)s
+            GROUP BY hostName(), partition_id, name
+            HAVING countIf(column = %(column_name)s) = 0
+        )
+        """,
+        {
+            "database": CLICKHOUSE_DATABASE,
+            "table": _data_table(backfill.table),
+            "partitions": backfill.partitions,
+            "column_name": backfill.column_name,
+        },
+    )
+    return [partition_id for (partition_id,) in rows]
+
+
+def _is_mutating(backfill: PartitionBackfill) -> bool:
+    rows = sync_execute(
+        """
+        SELECT mutation_id, latest_fail_reason
+        FROM clusterAllReplicas(posthog, system, mutations)
+        WHERE is_done = 0 AND database = %(database)s AND table = %(table)s AND position(command, %(column_name)s) > 0
+        """,
+        {"database": CLICKHOUSE_DATABASE, "table": _data_table(backfill.table), "column_name": backfill.column_name},
+    )
+    for mutation_id, latest_fail_reason in rows:
+        if latest_fail_reason:
+            # ClickHouse keeps retrying failed mutations, so just wait for them like any other
+            logger.warning(
+                "materialized_column_backfill_mutation_failing",
+                column=backfill.key,
+                mutation_id=mutation_id,
+                reason=latest_fail_reason,
+            )
+    return len(rows) > 0
+
+
+def _is_cluster_busy() -> bool:
+    running_mutations, running_merges = sync_execute(
+        """
+        SELECT
+            (SELECT count() FROM clusterAllReplicas(posthog, system, mutations) WHERE is_done = 0),
+            (SELECT count() FROM clusterAllReplicas(posthog, system, merges))
+        """
+    )[0]
+    if (
+        running_mutations >= MATERIALIZE_COLUMNS_BACKFILL_MAX_RUNNING_MUTATIONS
+        or running_merges >= MATERIALIZE_COLUMNS_BACKFILL_MAX_RUNNING_MERGES
+    ):
+        logger.info("materialized_column_backfills_paused", mutations=running_mutations, merges=running_merges)
+        return True
+    return False
+
+
+def _backfill_partition(backfill: PartitionBackfill, partition_id: str) -> None:
+    updated_table = _data_table(backfill.table)
+    # :TRICKY: On cloud, we ON CLUSTER updates to events/sharded_events but not to persons. Why? ¯\_(ツ)_/¯
+    execute_on_cluster = f"ON CLUSTER '{CLICKHOUSE_CLUSTER}'" if backfill.table == "events" else ""
+
+    # Materialized columns can't be updated, so the column is made a DEFAULT column until the backfill is done, the
+    # same as in `backfill_materialized_columns`. This is repeated for every partition in case the column was since
+    # made MATERIALIZED again.
+    sync_execute(
+        f"""
+        ALTER TABLE {updated_table}
+        {execute_on_cluster}
+        MODIFY COLUMN
+        {backfill.column_name} VARCHAR DEFAULT {TRIM_AND_EXTRACT_PROPERTY.format(table_column=backfill.table_column)}
+        """,
+        {"property": backfill.property_name},
+    )
+    # This will return immediately, the mutation runs in the background
+    sync_execute(
+        f"""
+        ALTER TABLE {updated_table}
+        {execute_on_cluster}
+        UPDATE {backfill.column_name} = {backfill.column_name}
+        IN PARTITION ID %(partition_id)s
+        WHERE 1 = 1
+        """,
+        {"partition_id": partition_id},
+    )
+
+
+def _data_table(table: TableWithProperties) -> str:
+    return "sharded_events" if table == "events" else table
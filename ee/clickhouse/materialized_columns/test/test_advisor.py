@@ -0,0 +1,76 @@
+import json
+from unittest.mock import patch
+
+from ee.clickhouse.materialized_columns.advisor import plan_materialized_columns
+from ee.clickhouse.materialized_columns.columns import materialize
+from posthog.client import sync_execute
+from posthog.test.base import BaseTest, ClickhouseTestMixin
+
+
+class TestMaterializedColumnsAdvisor(ClickhouseTestMixin, BaseTest):
+    def setUp(self):
+        super().setUp()
+        sync_execute("SYSTEM FLUSH LOGS")
+        sync_execute("TRUNCATE TABLE system.query_log")
+
+    def _log_query(self, query: str, read_bytes: int, query_duration_ms: int, json_property_reads=None):
+        log_comment = {"team_id": self.team.pk}
+        if json_property_reads is not None:
+            log_comment["json_property_reads"] = json_property_reads
+        sync_execute(
+            """
+            INSERT INTO system.query_log (
+                query, query_start_time, type, is_initial_query, log_comment, read_bytes, query_duration_ms
+            ) VALUES (%(query)s, now(), 2, 1, %(log_comment)s, %(read_bytes)s, %(query_duration_ms)s)
+            """,
+            {
+                "query": query,
+                "log_comment": json.dumps(log_comment),
+                "read_bytes": read_bytes,
+                "query_duration_ms": query_duration_ms,
+            },
+        )
+
+    @patch("ee.clickhouse.materialized_columns.advisor._get_column_storage", return_value=(1000, 0.5))
+    @patch("ee.clickhouse.materialized_columns.advisor._sample_lengths")
+    def test_ranks_properties_by_estimated_savings(self, patch_sample_lengths, _patch_column_storage):
+        patch_sample_lengths.side_effect = lambda table, table_column, properties: (
+            100,
+            [{"$browser": 10, "$os": 10, "huge": 90}[property] for property in properties],
+        )
+        browser_and_os = [["events", "properties", "$browser"], ["events", "properties", "$os"]]
+        self._log_query("SELECT 1", 1_000_000, 2000, browser_and_os)
+        self._log_query("SELECT 2", 1_000_000, 2000, browser_and_os)
+        self._log_query("SELECT 3", 1_000_000, 2000, [["events", "properties", "$os"]])
+        self._log_query("SELECT 4", 10_000, 100, [["events", "properties", "huge"]])
+        self._log_query("SELECT 5", 1_000_000, 2000, [["groups", "properties", "industry"]])
+
+        plan = plan_materialized_columns(since_hours_ago=1, maximum=10)
+
+        self.assertEqual(
+            [candidate.suggestion for candidate in plan.to_materialize],
+            [("events", "properties", "$os"), ("events", "properties", "$browser")],
+        )
+        os_candidate = plan.to_materialize[0]
+        self.assertEqual(os_candidate.queries, 3)
+        self.assertEqual(os_candidate.teams, [self.team.pk])
+        self.assertAlmostEqual(os_candidate.estimated_saved_read_bytes, 2_000_000 * 0.9)
+        self.assertAlmostEqual(os_candidate.estimated_saved_duration_ms, 4000 * 0.9)
+        self.assertAlmostEqual(os_candidate.estimated_storage_bytes, 1000 * 10 * 0.5)
+        self.assertIn("events.properties['$os']", plan.report())
+
+    @patch("ee.clickhouse.materialized_columns.advisor._get_column_storage", return_value=(1000, 0.5))
+    @patch("ee.clickhouse.materialized_columns.advisor._sample_lengths", return_value=(100, [10]))
+    def test_skips_materialized_properties_and_suggests_dropping_unused_columns(self, *args):
+        materialize("events", "used_prop")
+        materialize("events", "unused_prop")
+        self._log_query("SELECT mat_used_prop FROM events", 1_000_000, 2000)
+        self._log_query("SELECT 1", 1_000_000, 2000, [["events", "properties", "used_prop"]])
+
+        plan = plan_materialized_columns(since_hours_ago=1, maximum=10)
+
+        self.assertEqual(plan.to_materialize, [])
+        unused_columns = [unused.column_name for unused in plan.to_dematerialize]
+        self.assertIn("mat_unused_prop", unused_columns)
+        self.assertNotIn("mat_used_prop", unused_columns)
+        self.assertIn("events.mat_unused_prop", plan.report())
@@ -0,0 +1,73 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from ee.clickhouse.materialized_columns.backfill import (
+    BACKFILLS_KEY,
+    get_partition_backfills,
+    run_partition_backfills,
+    start_partition_backfills,
+)
+from posthog.redis import get_client
+from posthog.test.base import BaseTest
+
+BACKFILL_MODULE = "ee.clickhouse.materialized_columns.backfill"
+
+
+@patch(f"{BACKFILL_MODULE}._backfill_partition")
+@patch(f"{BACKFILL_MODULE}._is_cluster_busy", return_value=False)
+@patch(f"{BACKFILL_MODULE}._is_mutating", return_value=False)
+@patch(f"{BACKFILL_MODULE}._get_unfinished_partitions")
+@patch(f"{BACKFILL_MODULE}._get_partitions", return_value=["202303", "202302", "202301"])
+@patch(f"{BACKFILL_MODULE}.get_materialized_columns", return_value={("$browser", "properties"): "mat_$browser"})
+class TestPartitionBackfills(BaseTest):
+    def setUp(self):
+        super().setUp()
+        get_client().delete(BACKFILLS_KEY)
+
+    def _start(self):
+        start_partition_backfills("events", [("$browser", "properties")], timedelta(days=90))
+
+    def test_backfills_one_partition_per_run_newest_first(
+        self, _columns, _partitions, patch_unfinished, _mutating, _busy, patch_backfill_partition
+    ):
+        self._start()
+
+        patch_unfinished.return_value = ["202303", "202302", "202301"]
+        assert run_partition_backfills()
+        patch_unfinished.return_value = ["202302", "202301"]
+        assert run_partition_backfills()
+
+        assert [call.args[1] for call in patch_backfill_partition.call_args_list] == ["202303", "202302"]
+        [backfill] = get_partition_backfills()
+        assert backfill.column_name == "mat_$browser"
+        assert backfill.partitions == ["202302", "202301"]
+
+    def test_waits_for_running_mutations_and_busy_cluster(
+        self, _columns, _partitions, patch_unfinished, patch_mutating, patch_busy, patch_backfill_partition
+    ):
+        self._start()
+        patch_unfinished.return_value = ["202303", "202302", "202301"]
+
+        patch_mutating.return_value = True
+        assert run_partition_backfills()
+        patch_mutating.return_value = False
+        patch_busy.return_value = True
+        assert run_partition_backfills()
+
+        patch_backfill_partition.assert_not_called()
+        assert len(get_partition_backfills()) == 1
+
+    def test_resumes_from_unfinished_partitions_and_finishes(
+        self, _columns, _partitions, patch_unfinished, _mutating, _busy, patch_backfill_partition
+    ):
+        self._start()
+
+        # the mutation for 202303 failed part way through a previous run, so it is backfilled again
+        patch_unfinished.return_value = ["202303", "202301"]
+        assert run_partition_backfills()
+        assert patch_backfill_partition.call_args.args[1] == "202303"
+
+        patch_unfinished.return_value = []
+        assert not run_partition_backfills()
+        assert get_partition_backfills() == []
+        assert patch_backfill_partition.call_count == 1
@@ -1,5 +1,6 @@
 from datetime import datetime, timedelta
 
+from django.test import override_settings
 from django.utils import timezone
 from freezegun import freeze_time
 
@@ -9,7 +10,13 @@ from posthog.models.action import Action
 from posthog.models.action_step import ActionStep
 from posthog.models.cohort import Cohort
 from posthog.models.cohort.sql import GET_COHORTPEOPLE_BY_COHORT_ID
-from posthog.models.cohort.util import format_filter_query, get_person_ids_by_cohort_id
+from posthog.models.cohort.util import (
+    format_filter_query,
+    get_changed_person_ids,
+    get_person_ids_by_cohort_id,
+    recalculate_cohortpeople_incrementally,
+    supports_incremental_recalculation,
+)
 from posthog.models.filters import Filter
 from posthog.models.organization import Organization
 from posthog.models.person import Person
@@ -1358,3 +1365,184 @@ class TestCohort(ClickhouseTestMixin, BaseTest):
         # Should have p1 in this cohort even if version is different
         results = self._get_cohortpeople(cohort1)
         self.assertEqual(len(results), 1)
+
+    def test_cohortpeople_incremental_prop_changed(self):
+        with freeze_time((datetime.now() - timedelta(days=3)).strftime("%Y-%m-%d")):
+            p1 = Person.objects.create(
+                team_id=self.team.pk,
+                distinct_ids=["1"],
+                properties={"$some_prop": "something"},
+            )
+            p2 = Person.objects.create(
+                team_id=self.team.pk,
+                distinct_ids=["2"],
+                properties={"$some_prop": "something"},
+            )
+
+            cohort1 = Cohort.objects.create(
+                team=self.team,
+                groups=[{"properties": [{"key": "$some_prop", "value": "something", "type": "person"}]}],
+                name="cohort1",
+            )
+            cohort1.calculate_people_ch(pending_version=0)
+
+        p2.version = 1
+        p2.properties = {"$some_prop": "another"}
+        p2.save()
+        p3 = Person.objects.create(
+            team_id=self.team.pk,
+            distinct_ids=["3"],
+            properties={"$some_prop": "something"},
+        )
+
+        self.assertEqual(recalculate_cohortpeople_incrementally(cohort1), 2)
+        cohort1.calculate_people_ch(pending_version=1, incremental=True)
+
+        # the changes are applied to the current version
+        results = self._get_cohortpeople(cohort1)
+        self.assertCountEqual([row[0] for row in results], [p1.uuid, p3.uuid])
+        self.assertEqual(cohort1.version, 0)
+        self.assertEqual(cohort1.count, 2)
+
+        # and a full recalculation cancels the persons that are left
+        cohort1.calculate_people_ch(pending_version=2)
+        results = sync_execute(
+            "SELECT person_id, sum(sign) FROM cohortpeople WHERE team_id = %(team_id)s AND cohort_id = %(cohort_id)s "
+            "GROUP BY person_id HAVING sum(sign) != 0",
+            {"team_id": self.team.pk, "cohort_id": cohort1.pk},
+        )
+        self.assertCountEqual(results, [(p1.uuid, 1), (p3.uuid, 1)])
+        self.assertEqual(cohort1.version, 2)
+
+    def test_cohortpeople_incremental_event_performed(self):
+        p1 = _create_person(team_id=self.team.pk, distinct_ids=["1"])
+        p2 = _create_person(team_id=self.team.pk, distinct_ids=["2"])
+        _create_event(
+            event="$pageview",
+            team=self.team,
+            distinct_id="1",
+            timestamp=datetime.now() - timedelta(days=2),
+        )
+        flush_persons_and_events()
+
+        cohort1 = Cohort.objects.create(
+            team=self.team,
+            groups=[{"event_id": "$pageview", "days": 7}],
+            name="cohort1",
+        )
+        cohort1.calculate_people_ch(pending_version=0)
+        self.assertEqual([row[0] for row in self._get_cohortpeople(cohort1)], [p1.uuid])
+
+        _create_event(
+            event="$pageview",
+            team=self.team,
+            distinct_id="2",
+            timestamp=datetime.now() - timedelta(hours=1),
+        )
+        flush_persons_and_events()
+
+        self.assertEqual(recalculate_cohortpeople_incrementally(cohort1), 2)
+        cohort1.calculate_people_ch(pending_version=1, incremental=True)
+
+        results = self._get_cohortpeople(cohort1)
+        self.assertCountEqual([row[0] for row in results], [p1.uuid, p2.uuid])
+
+    def test_cohortpeople_incremental_not_supported(self):
+        Person.objects.create(
+            team_id=self.team.pk,
+            distinct_ids=["1"],
+            properties={"$some_prop": "something"},
+        )
+        cohort1 = Cohort.objects.create(
+            team=self.team,
+            groups=[{"properties": [{"key": "$some_prop", "value": "something", "type": "person"}]}],
+            name="cohort1",
+        )
+        cohort2 = Cohort.objects.create(
+            team=self.team,
+            groups=[{"properties": [{"key": "id", "value": cohort1.pk, "type": "cohort"}]}],
+            name="cohort2",
+        )
+
+        # never calculated, so there's nothing to apply changes to
+        self.assertFalse(supports_incremental_recalculation(cohort1))
+
+        cohort1.calculate_people_ch(pending_version=0)
+        cohort2.calculate_people_ch(pending_version=0)
+
+        self.assertTrue(supports_incremental_recalculation(cohort1))
+        self.assertFalse(supports_incremental_recalculation(cohort2))
+        self.assertIsNone(recalculate_cohortpeople_incrementally(cohort2))
+
+    @override_settings(COHORT_INCREMENTAL_MAX_CHANGED_PERSONS=1)
+    def test_cohortpeople_incremental_too_many_changes(self):
+        cohort1 = Cohort.objects.create(
+            team=self.team,
+            groups=[{"properties": [{"key": "$some_prop", "value": "something", "type": "person"}]}],
+            name="cohort1",
+        )
+        cohort1.calculate_people_ch(pending_version=0)
+
+        for distinct_id in ["1", "2"]:
+            Person.objects.create(
+                team_id=self.team.pk,
+                distinct_ids=[distinct_id],
+                properties={"$some_prop": "something"},
+            )
+
+        self.assertIsNone(get_changed_person_ids(cohort1, cohort1.last_calculation - timedelta(hours=1)))
+        self.assertIsNone(recalculate_cohortpeople_incrementally(cohort1))
+        self.assertEqual(self._get_cohortpeople(cohort1), [])
+
+        # falls back to a full recalculation
+        cohort1.calculate_people_ch(pending_version=2, incremental=True)
+        self.assertEqual(len(self._get_cohortpeople(cohort1)), 2)
+
+    @override_settings(CALCULATE_COHORTS_IN_DEPENDENCY_ORDER=True, USE_PRECALCULATED_CH_COHORT_PEOPLE=True)
+    def test_cohortpeople_reads_calculated_dependencies(self):
+        Person.objects.create(
+            team_id=self.team.pk,
+            distinct_ids=["1"],
+            properties={"$some_prop": "something", "$another_prop": "something"},
+        )
+        p2 = Person.objects.create(
+            team_id=self.team.pk,
+            distinct_ids=["2"],
+            properties={"$some_prop": "something"},
+        )
+        Person.objects.create(
+            team_id=self.team.pk,
+            distinct_ids=["3"],
+            properties={"$another_prop": "something"},
+        )
+
+        cohort1 = Cohort.objects.create(
+            team=self.team,
+            groups=[{"properties": [{"key": "$some_prop", "value": "something", "type": "person"}]}],
+            name="cohort1",
+        )
+        cohort2 = Cohort.objects.create(
+            team=self.team,
+            filters={
+                "properties": {
+                    "type": "AND",
+                    "values": [
+                        {"key": "id", "value": cohort1.pk, "type": "cohort"},
+                        {"key": "$another_prop", "value": "something", "type": "person", "negation": True},
+                    ],
+                }
+            },
+            name="cohort2",
+        )
+
+        # not calculated yet, so its filters are evaluated in place
+        query, _ = format_filter_query(cohort2, 0, HogQLContext(team_id=self.team.pk))
+        self.assertNotIn("cohortpeople", query)
+
+        cohort1.calculate_people_ch(pending_version=0)
+
+        query, _ = format_filter_query(cohort2, 0, HogQLContext(team_id=self.team.pk))
+        self.assertIn("FROM cohortpeople", query)
+
+        cohort2.calculate_people_ch(pending_version=0)
+        self.assertEqual([row[0] for row in self._get_cohortpeople(cohort2)], [p2.uuid])
@@ -112,6 +112,8 @@ class EnterpriseCohortQuery(FOSSCohortQuery):
             prop.type == "static-cohort"
         ):  # "cohort" and "precalculated-cohort" are handled by flattening during initialization
             res, params = self.get_static_cohort_condition(prop, prepend, idx)
+        elif prop.type == "precalculated-cohort":  # unless the cohort was already calculated, see `unwrap_cohort`
+            res, params = self.get_precalculated_cohort_condition(prop, prepend, idx)
         else:
             raise ValueError(f"Invalid property type for Cohort queries: {prop.type}")
 
@@ -317,6 +319,9 @@ class EnterpriseCohortQuery(FOSSCohortQuery):
         date_condition, date_params = self._get_date_condition()
         params.update(date_params)
 
+        restrict_to_persons_condition, restrict_to_persons_params = self._get_restrict_to_persons_condition()
+        params.update(restrict_to_persons_params)
+
         event_param_name = f"{self._cohort_pk}_event_ids"
 
         if self.should_pushdown_persons and self._person_on_events_mode != PersonOnEventsMode.DISABLED:
@@ -331,7 +336,7 @@ class EnterpriseCohortQuery(FOSSCohortQuery):
         {self._get_person_ids_query()}
         WHERE team_id = %(team_id)s
         AND event IN %({event_param_name})s
-        {date_condition}
+        {date_condition}{restrict_to_persons_condition}
         {person_prop_query}
         """
 
@@ -0,0 +1,65 @@
+import logging
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ee.clickhouse.materialized_columns.analyze import logger
+from ee.clickhouse.materialized_columns.backfill import (
+    get_partition_backfills,
+    run_partition_backfills,
+    start_partition_backfills,
+)
+from ee.clickhouse.materialized_columns.columns import (
+    DEFAULT_TABLE_COLUMN,
+    get_materialized_columns,
+)
+from posthog.settings import MATERIALIZE_COLUMNS_BACKFILL_PERIOD_DAYS
+
+
+class Command(BaseCommand):
+    help = "Backfill materialized columns one partition at a time, pausing while the cluster is busy"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--property", help="Materialized property to start backfilling")
+        parser.add_argument(
+            "--property-table",
+            type=str,
+            default="events",
+            choices=["events", "person"],
+            help="Table of --property",
+        )
+        parser.add_argument(
+            "--table-column",
+            help="The column --property is materialized from",
+            default=DEFAULT_TABLE_COLUMN,
+        )
+        parser.add_argument(
+            "--backfill-period",
+            type=int,
+            default=MATERIALIZE_COLUMNS_BACKFILL_PERIOD_DAYS,
+            help="How many days worth of data to backfill --property for",
+        )
+        parser.add_argument(
+            "--until-done",
+            action="store_true",
+            help="Keep running until all backfills are done, rather than starting the next partition of each once",
+        )
+        parser.add_argument("--poll-seconds", type=int, default=60, help="How long to wait between runs")
+
+    def handle(self, *args, **options):
+        logger.setLevel(logging.INFO)
+
+        if options.get("property"):
+            table, table_column = options["property_table"], options["table_column"]
+            if (options["property"], table_column) not in get_materialized_columns(table, use_cache=False):
+                raise CommandError(f"Property {options['property']!r} is not materialized from {table}.{table_column}")
+
+            start_partition_backfills(
+                table, [(options["property"], table_column)], timedelta(days=options["backfill_period"])
+            )
+
+        while run_partition_backfills() and options["until_done"]:
+            for backfill in get_partition_backfills():
+                logger.info("Backfill in progress", column=backfill.key, partitions_left=len(backfill.partitions))
+            time.sleep(options["poll_seconds"])
@@ -0,0 +1,57 @@
+import time
+from statistics import mean, median, quantiles
+
+from django.core.management.base import BaseCommand
+
+from ee.session_recordings.ai.similar_recordings import closest_embeddings
+from posthog.clickhouse.client import sync_execute
+
+
+class Command(BaseCommand):
+    help = "Compare the recall and latency of finding similar recordings by signature against comparing all embeddings"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--team-id", type=int, required=True, help="Team whose recordings to look up")
+        parser.add_argument("--sample-size", type=int, default=50, help="How many recordings to look up")
+        parser.add_argument("--limit", type=int, default=10, help="How many similar recordings to find for each")
+
+    def handle(self, *args, **options):
+        team_id = options["team_id"]
+        limit = options["limit"]
+
+        session_ids = [
+            row[0]
+            for row in sync_execute(
+                """
+                SELECT DISTINCT session_id
+                FROM session_replay_embeddings
+                WHERE team_id = %(team_id)s AND generation_timestamp > now() - INTERVAL 7 DAY
+                ORDER BY rand()
+                LIMIT %(sample_size)s
+                """,
+                {"team_id": team_id, "sample_size": options["sample_size"]},
+            )
+        ]
+        if not session_ids:
+            self.stdout.write(f"No recordings with embeddings in the last 7 days for team {team_id}")
+            return
+
+        exact_timings, approximate_timings, recalls = [], [], []
+        for session_id in session_ids:
+            start = time.perf_counter()
+            exact = closest_embeddings(session_id=session_id, team_id=team_id, limit=limit, exact=True)
+            exact_timings.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            approximate = closest_embeddings(session_id=session_id, team_id=team_id, limit=limit)
+            approximate_timings.append(time.perf_counter() - start)
+
+            if exact:
+                found = {row[0] for row in approximate}
+                recalls.append(sum(1 for row in exact if row[0] in found) / len(exact))
+
+        self.stdout.write(f"Looked up {len(session_ids)} recordings, {limit} similar recordings each")
+        self.stdout.write(f"Recall: mean {mean(recalls or [0]):.3f}, min {min(recalls or [0]):.3f}")
+        for name, timings in (("All embeddings", exact_timings), ("By signature", approximate_timings)):
+            p95 = quantiles(timings, n=20)[-1] if len(timings) > 1 else timings[0]
+            self.stdout.write(f"{name}: median {median(timings) * 1000:.0f}ms, p95 {p95 * 1000:.0f}ms")
@@ -0,0 +1,56 @@
+import logging
+
+from django.core.management.base import BaseCommand
+
+from ee.clickhouse.materialized_columns.advisor import plan_materialized_columns
+from ee.clickhouse.materialized_columns.analyze import (
+    logger,
+    materialize_properties_task,
+)
+from posthog.settings import (
+    MATERIALIZE_COLUMNS_ANALYSIS_PERIOD_HOURS,
+    MATERIALIZE_COLUMNS_BACKFILL_PERIOD_DAYS,
+    MATERIALIZE_COLUMNS_MAX_AT_ONCE,
+)
+
+
+class Command(BaseCommand):
+    help = "Plan materialized columns from the cost of HogQL queries: properties to materialize and unused columns"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--live-run",
+            action="store_true",
+            help="Materialize the planned columns (default only prints the plan). Unused columns are never dropped.",
+        )
+        parser.add_argument(
+            "--analyze-period",
+            type=int,
+            default=MATERIALIZE_COLUMNS_ANALYSIS_PERIOD_HOURS,
+            help="How many hours of queries to analyze. Same as MATERIALIZE_COLUMNS_ANALYSIS_PERIOD_HOURS env variable.",
+        )
+        parser.add_argument(
+            "--max-columns",
+            type=int,
+            default=MATERIALIZE_COLUMNS_MAX_AT_ONCE,
+            help="Max number of columns to plan for materializing. Same as MATERIALIZE_COLUMNS_MAX_AT_ONCE env variable.",
+        )
+        parser.add_argument(
+            "--backfill-period",
+            type=int,
+            default=MATERIALIZE_COLUMNS_BACKFILL_PERIOD_DAYS,
+            help="How many days worth of data to backfill on a live run. 0 to disable. Same as MATERIALIZE_COLUMNS_BACKFILL_PERIOD_DAYS env variable.",
+        )
+
+    def handle(self, *, live_run: bool, analyze_period: int, max_columns: int, backfill_period: int, **options):
+        logger.setLevel(logging.INFO)
+
+        plan = plan_materialized_columns(since_hours_ago=analyze_period, maximum=max_columns)
+        self.stdout.write(plan.report())
+
+        if live_run and plan.to_materialize:
+            materialize_properties_task(
+                columns_to_materialize=[candidate.suggestion for candidate in plan.to_materialize],
+                maximum=max_columns,
+                backfill_period_days=backfill_period,
+            )
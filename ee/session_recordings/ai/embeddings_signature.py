@@ -0,0 +1,31 @@
+from functools import lru_cache
+from typing import List
+
+import numpy as np
+
+"""
+Random hyperplane locality sensitive hashing for recording embeddings.
+
+Each bit of a signature records which side of a random hyperplane the embeddings are on. The chance of two
+embeddings ending up on different sides of a hyperplane is proportional to the angle between them, so the number of
+bits two signatures differ in (their hamming distance) approximates their cosine distance.
+
+Finding similar recordings then takes a cheap scan of the 8 byte signatures to pick candidates, and only the
+candidates' embeddings are read to rank them exactly.
+"""
+
+SIGNATURE_BITS = 64
+
+# Changing the seed changes every hyperplane, which would make all stored signatures meaningless
+HYPERPLANES_SEED = 1_536
+
+
+@lru_cache(maxsize=4)
+def _hyperplanes(dimensions: int) -> np.ndarray:
+    return np.random.default_rng(HYPERPLANES_SEED).standard_normal((SIGNATURE_BITS, dimensions))
+
+
+def embeddings_signature(embeddings: List[float]) -> int:
+    """Returns the signature of the embeddings, as an unsigned 64 bit int"""
+    above = _hyperplanes(len(embeddings)) @ np.asarray(embeddings, dtype=np.float64) > 0
+    return int.from_bytes(np.packbits(above).tobytes(), "big")
@@ -1,14 +1,21 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+
 from django.conf import settings
 from openai import OpenAI
 import tiktoken
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 
 from prometheus_client import Histogram, Counter
 
 from posthog.models import Team
 
+from posthog.session_recordings.models.metadata import RecordingMetadata
 from posthog.session_recordings.queries.session_replay_events import SessionReplayEvents
+from ee.session_recordings.ai.embeddings_signature import embeddings_signature
 from ee.session_recordings.ai.utils import (
     SessionSummaryPromptData,
     reduce_elements_chain,
@@ -21,12 +28,6 @@ from posthog.clickhouse.client import sync_execute
 import datetime
 import pytz
 
-GENERATE_RECORDING_EMBEDDING_TIMING = Histogram(
-    "posthog_session_recordings_generate_recording_embedding",
-    "Time spent generating recording embeddings for a single session",
-    buckets=[0.1, 0.2, 0.3, 0.4, 0.5, 1, 1.5, 2, 2.5, 3, 3.5, 4, 5, 6, 7, 8, 9, 10, 12, 14, 16, 18, 20],
-)
-
 RECORDING_EMBEDDING_TOKEN_COUNT = Histogram(
     "posthog_session_recordings_recording_embedding_token_count",
     "Token count for individual recordings generated during embedding",
@@ -58,6 +59,17 @@ SESSION_EMBEDDINGS_FAILED_TO_CLICKHOUSE = Counter(
     "Number of session embeddings failed to Clickhouse",
 )
 
+EMBEDDINGS_REQUEST_TIMING = Histogram(
+    "posthog_session_recordings_embeddings_request",
+    "Time spent on a single request to the embeddings model, which can embed several sessions",
+    buckets=[0.1, 0.2, 0.5, 1, 2, 3, 4, 5, 7.5, 10, 15, 20, 30],
+)
+
+EMBEDDINGS_TOKENS_EMBEDDED = Counter(
+    "posthog_session_recordings_embeddings_tokens_embedded",
+    "Number of input tokens sent to the embeddings model",
+)
+
 logger = get_logger(__name__)
 
 # tiktoken.encoding_for_model(model_name) specifies encoder
@@ -67,6 +79,36 @@ encoding = tiktoken.get_encoding("cl100k_base")
 BATCH_FLUSH_SIZE = settings.REPLAY_EMBEDDINGS_BATCH_SIZE
 MIN_DURATION_INCLUDE_SECONDS = settings.REPLAY_EMBEDDINGS_MIN_DURATION_SECONDS
 MAX_TOKENS_FOR_MODEL = 8191
+# the model accepts at most this many inputs in a single request
+MAX_INPUTS_PER_REQUEST = 2048
+# the same number of events a single session's query returns
+MAX_EVENTS_PER_SESSION = 100
+EMBEDDINGS_MODEL = "text-embedding-3-small"
+EVENTS_TO_IGNORE = ["$feature_flag_called"]
+
+
+@dataclass
+class EmbeddingInput:
+    session_id: str
+    input: str
+    token_count: int
+
+
+class RequestRateLimiter:
+    """Spaces out the start of requests across threads, so that no more than `per_minute` start each minute"""
+
+    def __init__(self, per_minute: int):
+        self.interval = 60 / per_minute if per_minute > 0 else 0
+        self._next_start = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self.interval
+        if start > now:
+            time.sleep(start - now)
 
 
 def fetch_recordings_without_embeddings(team: Team | int, offset=0) -> List[str]:
@@ -134,6 +176,11 @@ def fetch_recordings_without_embeddings(team: Team | int, offset=0) -> List[str]
 
 
 def embed_batch_of_recordings(recordings: List[str], team: Team | int) -> None:
+    """
+    Embeds the recordings with as few queries and model requests as possible: the events of all of them are loaded
+    at once, inputs are packed into requests up to `REPLAY_EMBEDDINGS_REQUEST_TOKEN_BUDGET` tokens, and the requests
+    run concurrently. The embeddings of each request are written to ClickHouse as soon as it completes.
+    """
     try:
         if isinstance(team, int):
             team = Team.objects.get(id=team)
@@ -141,34 +188,110 @@ def embed_batch_of_recordings(recordings: List[str], team: Team | int) -> None:
         logger.info(
             f"processing {len(recordings)} recordings to embed for team {team.pk}", flow="embeddings", team_id=team.pk
         )
-
-        while len(recordings) > 0:
-            batched_embeddings = []
-            for session_id in recordings:
-                with GENERATE_RECORDING_EMBEDDING_TIMING.time():
-                    embeddings = generate_recording_embeddings(session_id=session_id, team=team)
-
-                if embeddings:
-                    SESSION_EMBEDDINGS_GENERATED.inc()
-                    batched_embeddings.append(
-                        {
-                            "session_id": session_id,
-                            "team_id": team.pk,
-                            "embeddings": embeddings,
-                        }
-                    )
-
-            if len(batched_embeddings) > 0:
+        start_time = time.monotonic()
+
+        inputs = prepare_embedding_inputs(recordings, team)
+        requests = pack_embedding_inputs(inputs, settings.REPLAY_EMBEDDINGS_REQUEST_TOKEN_BUDGET)
+
+        client = OpenAI()
+        rate_limiter = RequestRateLimiter(settings.REPLAY_EMBEDDINGS_REQUESTS_PER_MINUTE)
+        embedded_count = 0
+        with ThreadPoolExecutor(max_workers=settings.REPLAY_EMBEDDINGS_CONCURRENCY) as executor:
+            futures = [executor.submit(embed_inputs, client, rate_limiter, request) for request in requests]
+            for future in as_completed(futures):
+                batched_embeddings = [
+                    {
+                        "session_id": embedding_input.session_id,
+                        "team_id": team.pk,
+                        "embeddings": embeddings,
+                        "embeddings_signature": embeddings_signature(embeddings),
+                    }
+                    for embedding_input, embeddings in future.result()
+                ]
+                SESSION_EMBEDDINGS_GENERATED.inc(len(batched_embeddings))
                 flush_embeddings_to_clickhouse(embeddings=batched_embeddings)
+                embedded_count += len(batched_embeddings)
+
+        duration = time.monotonic() - start_time
+        logger.info(
+            f"embedded {embedded_count} recordings for team {team.pk}",
+            flow="embeddings",
+            team_id=team.pk,
+            requests=len(requests),
+            duration_seconds=duration,
+            recordings_per_second=embedded_count / duration if duration else None,
+        )
     except Exception as e:
         SESSION_EMBEDDINGS_FAILED.inc()
         logger.error(f"embed recordings error", flow="embeddings", error=e)
         raise e
 
 
+def prepare_embedding_inputs(recordings: List[str], team: Team) -> List[EmbeddingInput]:
+    metadata_by_session = SessionReplayEvents().get_metadata_for_sessions(
+        session_ids=recordings, team=team, recording_start_time=_embeddings_lookback_start()
+    )
+    columns, events_by_session = SessionReplayEvents().get_events_for_sessions(
+        metadata_by_session=metadata_by_session,
+        team=team,
+        events_to_ignore=EVENTS_TO_IGNORE,
+        events_per_session=MAX_EVENTS_PER_SESSION,
+    )
+
+    inputs = []
+    for session_id in recordings:
+        session_metadata = metadata_by_session.get(session_id)
+        if not session_metadata:
+            logger.error(f"no session metadata found for session", flow="embeddings", session_id=session_id)
+            SESSION_SKIPPED_WHEN_GENERATING_EMBEDDINGS.inc()
+            continue
+
+        embedding_input = build_embedding_input(
+            session_id, session_metadata, columns, events_by_session.get(session_id)
+        )
+        if embedding_input:
+            inputs.append(embedding_input)
+    return inputs
+
+
+def pack_embedding_inputs(inputs: List[EmbeddingInput], token_budget: int) -> List[List[EmbeddingInput]]:
+    """Groups the inputs into as few requests as fit in the token budget"""
+    requests: List[List[EmbeddingInput]] = []
+    request_tokens = 0
+    for embedding_input in inputs:
+        if (
+            not requests
+            or request_tokens + embedding_input.token_count > token_budget
+            or len(requests[-1]) >= MAX_INPUTS_PER_REQUEST
+        ):
+            requests.append([])
+            request_tokens = 0
+        requests[-1].append(embedding_input)
+        request_tokens += embedding_input.token_count
+    return requests
+
+
+def embed_inputs(
+    client: OpenAI, rate_limiter: RequestRateLimiter, inputs: List[EmbeddingInput]
+) -> List[Tuple[EmbeddingInput, List[float]]]:
+    rate_limiter.wait()
+    with EMBEDDINGS_REQUEST_TIMING.time():
+        response = client.embeddings.create(
+            input=[embedding_input.input for embedding_input in inputs],
+            model=EMBEDDINGS_MODEL,
+        )
+    EMBEDDINGS_TOKENS_EMBEDDED.inc(sum(embedding_input.token_count for embedding_input in inputs))
+
+    # each embedding has the index of the input it's for
+    return [(inputs[embedding.index], embedding.embedding) for embedding in response.data]
+
+
 def flush_embeddings_to_clickhouse(embeddings: List[Dict[str, Any]]) -> None:
     try:
-        sync_execute("INSERT INTO session_replay_embeddings (session_id, team_id, embeddings) VALUES", embeddings)
+        sync_execute(
+            "INSERT INTO session_replay_embeddings (session_id, team_id, embeddings, embeddings_signature) VALUES",
+            embeddings,
+        )
         SESSION_EMBEDDINGS_WRITTEN_TO_CLICKHOUSE.inc(len(embeddings))
     except Exception as e:
         logger.error(f"flush embeddings error", flow="embeddings", error=e)
@@ -176,17 +299,23 @@ def flush_embeddings_to_clickhouse(embeddings: List[Dict[str, Any]]) -> None:
         raise e
 
 
-def generate_recording_embeddings(session_id: str, team: Team | int) -> List[float] | None:
+def _embeddings_lookback_start() -> datetime.datetime:
+    return datetime.datetime.now(pytz.UTC) - datetime.timedelta(days=8)
+
+
+def generate_recording_embeddings(
+    session_id: str, team: Team | int, session_metadata: Optional[RecordingMetadata] = None
+) -> List[float] | None:
     logger.info(f"generating embedding for session", flow="embeddings", session_id=session_id)
     if isinstance(team, int):
         team = Team.objects.get(id=team)
 
     client = OpenAI()
 
-    eight_days_ago = datetime.datetime.now(pytz.UTC) - datetime.timedelta(days=8)
-    session_metadata = SessionReplayEvents().get_metadata(
-        session_id=str(session_id), team=team, recording_start_time=eight_days_ago
-    )
+    if session_metadata is None:
+        session_metadata = SessionReplayEvents().get_metadata(
+            session_id=str(session_id), team=team, recording_start_time=_embeddings_lookback_start()
+        )
     if not session_metadata:
         logger.error(f"no session metadata found for session", flow="embeddings", session_id=session_id)
         SESSION_SKIPPED_WHEN_GENERATING_EMBEDDINGS.inc()
@@ -196,21 +325,38 @@ def generate_recording_embeddings(session_id: str, team: Team | int) -> List[flo
         session_id=str(session_id),
         team=team,
         metadata=session_metadata,
-        events_to_ignore=[
-            "$feature_flag_called",
-        ],
+        events_to_ignore=EVENTS_TO_IGNORE,
+    )
+
+    embedding_input = build_embedding_input(session_id, session_metadata, session_events[0], session_events[1])
+    if not embedding_input:
+        return None
+
+    embeddings = (
+        client.embeddings.create(
+            input=embedding_input.input,
+            model=EMBEDDINGS_MODEL,
+        )
+        .data[0]
+        .embedding
     )
 
-    if not session_events or not session_events[0] or not session_events[1]:
+    logger.info(f"generated embedding input for session", flow="embeddings", session_id=session_id)
+
+    return embeddings
+
+
+def build_embedding_input(
+    session_id: str, session_metadata: RecordingMetadata, columns: Optional[List], results: Optional[List]
+) -> Optional[EmbeddingInput]:
+    if not columns or not results:
         logger.error(f"no events found for session", flow="embeddings", session_id=session_id)
         SESSION_SKIPPED_WHEN_GENERATING_EMBEDDINGS.inc()
         return None
 
     processed_sessions = collapse_sequence_of_events(
         format_dates(
-            reduce_elements_chain(
-                simplify_window_id(SessionSummaryPromptData(columns=session_events[0], results=session_events[1]))
-            ),
+            reduce_elements_chain(simplify_window_id(SessionSummaryPromptData(columns=columns, results=results))),
             start=datetime.datetime(1970, 1, 1, tzinfo=pytz.UTC),  # epoch timestamp
         )
     )
@@ -245,18 +391,7 @@ def generate_recording_embeddings(session_id: str, team: Team | int) -> List[flo
         SESSION_SKIPPED_WHEN_GENERATING_EMBEDDINGS.inc()
         return None
 
-    embeddings = (
-        client.embeddings.create(
-            input=input,
-            model="text-embedding-3-small",
-        )
-        .data[0]
-        .embedding
-    )
-
-    logger.info(f"generated embedding input for session", flow="embeddings", session_id=session_id)
-
-    return embeddings
+    return EmbeddingInput(session_id=session_id, input=input, token_count=token_count)
 
 
 def num_tokens_for_input(string: str) -> int:
@@ -1,3 +1,6 @@
+from typing import List, Tuple
+
+from django.conf import settings
 from prometheus_client import Histogram
 
 from posthog.clickhouse.client import sync_execute
@@ -9,21 +12,10 @@ FIND_RECORDING_NEIGHBOURS_TIMING = Histogram(
     "Time spent finding the most similar recording embeddings for a single session",
 )
 
-
-def similar_recordings(recording: SessionRecording, team: Team):
-    with FIND_RECORDING_NEIGHBOURS_TIMING.time():
-        similar_embeddings = closest_embeddings(session_id=recording.session_id, team_id=team.pk)
-
-    # TODO: join session recording context (person, duration, etc) to show in frontend
-
-    return similar_embeddings
-
-
-def closest_embeddings(session_id: str, team_id: int):
-    query = """
+TARGET_EMBEDDINGS_CTE = """
             WITH (
                 SELECT
-                    argMax(embeddings, generation_timestamp) as target_embeddings
+                    tuple(argMax(embeddings, generation_timestamp), argMax(embeddings_signature, generation_timestamp))
                 FROM
                     session_replay_embeddings
                 WHERE
@@ -33,7 +25,50 @@ def closest_embeddings(session_id: str, team_id: int):
                     AND session_id = %(session_id)s
                 group by session_id
                 LIMIT 1
-            ) as target_embeddings
+            ) as target,
+            tupleElement(target, 1) as target_embeddings,
+            tupleElement(target, 2) as target_signature
+"""
+
+
+def similar_recordings(recording: SessionRecording, team: Team):
+    with FIND_RECORDING_NEIGHBOURS_TIMING.time():
+        similar_embeddings = closest_embeddings(session_id=recording.session_id, team_id=team.pk)
+
+    # TODO: join session recording context (person, duration, etc) to show in frontend
+
+    return similar_embeddings
+
+
+def closest_embeddings(session_id: str, team_id: int, limit: int = 3, exact: bool = False) -> List[Tuple[str, float]]:
+    """
+    Returns the sessions with the most similar embeddings, closest first.
+
+    Unless `exact`, only the embeddings of the sessions whose signatures are closest to the target's are compared,
+    which finds nearly all of the same sessions without reading every embedding of the team.
+    """
+    candidates_filter = ""
+    if not exact:
+        candidates_filter = """
+                AND (
+                    session_id IN (
+                        SELECT session_id
+                        FROM session_replay_embeddings
+                        WHERE
+                            team_id = %(team_id)s
+                            AND generation_timestamp > now() - INTERVAL 7 DAY
+                            AND session_id != %(session_id)s
+                            AND embeddings_signature != 0
+                        ORDER BY bitCount(bitXor(embeddings_signature, target_signature)) ASC
+                        LIMIT %(candidates)s
+                    )
+                    -- embeddings from before signatures were added can't be filtered, so are always compared
+                    OR embeddings_signature = 0
+                )
+        """
+
+    query = f"""
+            {TARGET_EMBEDDINGS_CTE}
             SELECT
                 session_id,
                 -- distance function choice based on https://help.openai.com/en/articles/6824809-embeddings-frequently-asked-questions
@@ -46,12 +81,19 @@ def closest_embeddings(session_id: str, team_id: int):
                 AND generation_timestamp > now() - INTERVAL 7 DAY
                 -- skip the target recording
                 AND session_id != %(session_id)s
-            ORDER BY similarity_score DESC
+                {candidates_filter}
+            -- the smaller the distance the more similar the recordings
+            ORDER BY similarity_score ASC
             -- only return a max number of results
             LIMIT %(limit)s;
         """
 
     return sync_execute(
         query,
-        {"team_id": team_id, "session_id": session_id, "limit": 3},
+        {
+            "team_id": team_id,
+            "session_id": session_id,
+            "limit": limit,
+            "candidates": max(limit, settings.REPLAY_EMBEDDINGS_SIMILARITY_CANDIDATES),
+        },
     )
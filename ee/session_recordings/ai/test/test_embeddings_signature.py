@@ -0,0 +1,29 @@
+import numpy as np
+
+from ee.session_recordings.ai.embeddings_signature import embeddings_signature
+
+
+def _hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def test_signature_fits_in_an_unsigned_64_bit_int():
+    signature = embeddings_signature(list(np.random.default_rng(1).standard_normal(1536)))
+    assert 0 <= signature < 2**64
+
+
+def test_signature_is_stable():
+    embeddings = list(np.random.default_rng(2).standard_normal(1536))
+    assert embeddings_signature(embeddings) == embeddings_signature(embeddings)
+
+
+def test_similar_embeddings_have_closer_signatures():
+    rng = np.random.default_rng(3)
+    target = rng.standard_normal(1536)
+    similar = target + 0.3 * rng.standard_normal(1536)
+    unrelated = rng.standard_normal(1536)
+
+    target_signature = embeddings_signature(list(target))
+    assert _hamming_distance(target_signature, embeddings_signature(list(similar))) < _hamming_distance(
+        target_signature, embeddings_signature(list(unrelated))
+    )
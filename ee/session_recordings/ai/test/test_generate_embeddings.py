@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from ee.session_recordings.ai.generate_embeddings import (
+    EmbeddingInput,
+    embed_batch_of_recordings,
+    pack_embedding_inputs,
+)
+from posthog.session_recordings.queries.test.session_replay_sql import produce_replay_summary
+from posthog.test.base import BaseTest, ClickhouseTestMixin, _create_event, flush_persons_and_events
+
+
+class StubEmbeddingsClient:
+    """Stands in for the OpenAI client, embedding each input as its length"""
+
+    def __init__(self):
+        self.requests = []
+        self.embeddings = SimpleNamespace(create=self.create)
+
+    def create(self, input, model):
+        self.requests.append(input)
+        return SimpleNamespace(
+            data=[SimpleNamespace(index=index, embedding=[float(len(text)), 1.0]) for index, text in enumerate(input)]
+        )
+
+
+class TestGenerateEmbeddings(ClickhouseTestMixin, BaseTest):
+    def test_packs_inputs_up_to_the_token_budget(self):
+        inputs = [
+            EmbeddingInput(session_id=str(index), input="", token_count=tokens)
+            for index, tokens in enumerate([4, 5, 2, 9])
+        ]
+
+        requests = pack_embedding_inputs(inputs, token_budget=10)
+
+        assert [[i.session_id for i in request] for request in requests] == [["0", "1"], ["2"], ["3"]]
+
+    @patch("ee.session_recordings.ai.generate_embeddings.flush_embeddings_to_clickhouse")
+    @patch("ee.session_recordings.ai.generate_embeddings.OpenAI")
+    def test_embeds_a_batch_of_recordings_in_one_request(self, mock_openai: MagicMock, mock_flush: MagicMock):
+        stub_client = StubEmbeddingsClient()
+        mock_openai.return_value = stub_client
+
+        start = datetime.now(timezone.utc) - timedelta(days=2)
+        for session_id in ["s1", "s2", "no-events"]:
+            produce_replay_summary(
+                team_id=self.team.pk,
+                session_id=session_id,
+                distinct_id="user",
+                first_timestamp=start,
+                last_timestamp=start + timedelta(minutes=5),
+            )
+        for session_id, event_count in [("s1", 2), ("s2", 3)]:
+            for i in range(event_count):
+                _create_event(
+                    team=self.team,
+                    event=f"event {i}",
+                    distinct_id="user",
+                    timestamp=start + timedelta(minutes=i),
+                    properties={"$session_id": session_id, "$current_url": "https://example.com"},
+                )
+        flush_persons_and_events()
+
+        embed_batch_of_recordings(["s1", "s2", "no-events", "unknown"], self.team.pk)
+
+        assert len(stub_client.requests) == 1
+        assert len(stub_client.requests[0]) == 2
+        flushed = [row for call in mock_flush.call_args_list for row in call.kwargs["embeddings"]]
+        assert sorted(row["session_id"] for row in flushed) == ["s1", "s2"]
+        assert all(row["team_id"] == self.team.pk and row["embeddings_signature"] >= 0 for row in flushed)
@@ -1,8 +1,9 @@
 # EE extended functions for SessionRecording model
 import gzip
 import json
+import re
 from datetime import timedelta, datetime
-from typing import Optional, cast
+from typing import List, Optional, cast
 
 import structlog
 from django.utils import timezone
@@ -25,6 +26,9 @@ SNAPSHOT_PERSIST_TIME_HISTOGRAM = Histogram(
 
 MINIMUM_AGE_FOR_RECORDING = timedelta(hours=24)
 
+# blob files are named after the first and last timestamps they contain
+BLOB_KEY_REGEX = re.compile(r"^(\d+)-(\d+)$")
+
 
 # TODO rename this...
 def save_recording_with_new_content(recording: SessionRecording, content: str) -> str:
@@ -61,6 +65,51 @@ class InvalidRecordingForPersisting(Exception):
     pass
 
 
+def compact_recording_blobs(source_prefix: str, target_prefix: str) -> int:
+    """
+    Merges the blob files of a recording into as few files of around `REPLAY_COMPACTED_FILE_TARGET_BYTES` as possible,
+    named after the first and last timestamps they contain just like the files they're made from.
+    Returns the number of files written, or 0 if the blob files can't be compacted.
+    """
+    source_objects = object_storage.list_objects(source_prefix) or []
+    time_ranges = [BLOB_KEY_REGEX.match(key.split("/")[-1]) for key in source_objects]
+    if not source_objects or not all(time_ranges):
+        return 0
+
+    blobs = sorted(zip(source_objects, cast(List[re.Match], time_ranges)), key=lambda blob: int(blob[1].group(1)))
+    blob_keys = [key for key, _ in blobs]
+
+    written_count = 0
+    content: List[bytes] = []
+    content_size = 0
+    first_timestamp = None
+
+    blob_contents = object_storage.read_bytes_concurrently(blob_keys)
+    for index, ((key, time_range), blob) in enumerate(zip(blobs, blob_contents)):
+        if blob is None:
+            raise InvalidRecordingForPersisting(f"Could not read blob file {key}")
+
+        if blob.startswith(object_storage.GZIP_MAGIC_NUMBER):
+            blob = gzip.decompress(blob)
+        if blob and not blob.endswith(b"\n"):
+            blob += b"\n"
+
+        first_timestamp = first_timestamp or time_range.group(1)
+        content.append(blob)
+        content_size += len(blob)
+
+        if content_size >= settings.REPLAY_COMPACTED_FILE_TARGET_BYTES or index == len(blobs) - 1:
+            object_storage.write(
+                f"{target_prefix}/{first_timestamp}-{time_range.group(2)}",
+                gzip.compress(b"".join(content)),
+                extras={"ContentType": "application/json", "ContentEncoding": "gzip"},
+            )
+            written_count += 1
+            content, content_size, first_timestamp = [], 0, None
+
+    return written_count
+
+
 def persist_recording(recording_id: str, team_id: int) -> None:
     """Persist a recording to the S3"""
 
@@ -105,7 +154,11 @@ def persist_recording(recording_id: str, team_id: int) -> None:
     source_prefix = recording.build_blob_ingestion_storage_path()
     # if snapshots are already in blob storage, then we can just copy the files between buckets
     with SNAPSHOT_PERSIST_TIME_HISTOGRAM.labels(source="S3").time():
-        copied_count = object_storage.copy_objects(source_prefix, target_prefix)
+        copied_count = 0
+        if settings.REPLAY_COMPACT_PERSISTED_RECORDINGS:
+            copied_count = compact_recording_blobs(source_prefix, target_prefix)
+        if not copied_count:
+            copied_count = object_storage.copy_objects(source_prefix, target_prefix)
 
     if copied_count > 0:
         recording.storage_version = "2023-08-01"
@@ -9,6 +9,7 @@ from botocore.config import Config
 from freezegun import freeze_time
 
 from ee.session_recordings.session_recording_extensions import (
+    compact_recording_blobs,
     load_persisted_recording,
     persist_recording,
     save_recording_with_new_content,
@@ -24,7 +25,7 @@ from posthog.settings import (
     OBJECT_STORAGE_SECRET_ACCESS_KEY,
     OBJECT_STORAGE_BUCKET,
 )
-from posthog.storage.object_storage import write, list_objects
+from posthog.storage.object_storage import write, list_objects, read_bytes
 from posthog.test.base import APIBaseTest, ClickhouseTestMixin
 
 long_url = f"https://app.posthog.com/my-url?token={token_urlsafe(600)}"
@@ -170,3 +171,28 @@ class TestSessionRecordingExtensions(ClickhouseTestMixin, APIBaseTest):
                     "ContentType": "application/json",
                 },
             )
+
+    @patch("ee.session_recordings.session_recording_extensions.settings.REPLAY_COMPACTED_FILE_TARGET_BYTES", 20)
+    def test_can_compact_blob_files(self):
+        source_prefix = f"{TEST_BUCKET}/{uuid4()}/source"
+        target_prefix = f"{TEST_BUCKET}/{uuid4()}/target"
+
+        # listed out of order, some gzipped and some without a trailing newline
+        write(f"{source_prefix}/10-20", b'{"line": 1}\n{"line": 2}\n')
+        write(f"{source_prefix}/5-9", gzip.compress(b'{"line": 0}'))
+        write(f"{source_prefix}/21-30", b'{"line": 3}\n')
+
+        assert compact_recording_blobs(source_prefix, target_prefix) == 2
+
+        assert list_objects(target_prefix) == [f"{target_prefix}/21-30", f"{target_prefix}/5-20"]
+        assert gzip.decompress(read_bytes(f"{target_prefix}/5-20") or b"") == (
+            b'{"line": 0}\n{"line": 1}\n{"line": 2}\n'
+        )
+        assert gzip.decompress(read_bytes(f"{target_prefix}/21-30") or b"") == b'{"line": 3}\n'
+
+    def test_does_not_compact_unexpected_blob_files(self):
+        source_prefix = f"{TEST_BUCKET}/{uuid4()}/source"
+        write(f"{source_prefix}/10-20", b'{"line": 1}\n')
+        write(f"{source_prefix}/not-a-time-range", b'{"line": 2}\n')
+
+        assert compact_recording_blobs(source_prefix, f"{TEST_BUCKET}/{uuid4()}/target") == 0
@@ -62,6 +62,19 @@ MATERIALIZE_COLUMNS_ANALYSIS_PERIOD_HOURS = get_from_env(
 MATERIALIZE_COLUMNS_BACKFILL_PERIOD_DAYS = get_from_env("MATERIALIZE_COLUMNS_BACKFILL_PERIOD_DAYS", 90, type_cast=int)
 # Maximum number of columns to materialize at once. Avoids running into resource bottlenecks (storage + ingest + backfilling).
 MATERIALIZE_COLUMNS_MAX_AT_ONCE = get_from_env("MATERIALIZE_COLUMNS_MAX_AT_ONCE", 100, type_cast=int)
+# Backfill new materialized columns one partition at a time, pausing while the cluster is busy, instead of with one
+# mutation over the whole backfill period
+MATERIALIZE_COLUMNS_BACKFILL_BY_PARTITION = get_from_env(
+    "MATERIALIZE_COLUMNS_BACKFILL_BY_PARTITION", False, type_cast=str_to_bool
+)
+# Partitions aren't backfilled while at least this many mutations are running on the cluster
+MATERIALIZE_COLUMNS_BACKFILL_MAX_RUNNING_MUTATIONS = get_from_env(
+    "MATERIALIZE_COLUMNS_BACKFILL_MAX_RUNNING_MUTATIONS", 2, type_cast=int
+)
+# Partitions aren't backfilled while at least this many merges are running on the cluster
+MATERIALIZE_COLUMNS_BACKFILL_MAX_RUNNING_MERGES = get_from_env(
+    "MATERIALIZE_COLUMNS_BACKFILL_MAX_RUNNING_MERGES", 50, type_cast=int
+)
 
 BILLING_SERVICE_URL = get_from_env("BILLING_SERVICE_URL", "https://billing.posthog.com")
 
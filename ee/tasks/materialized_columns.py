@@ -1,5 +1,6 @@
 from celery.utils.log import get_task_logger
 
+from ee.clickhouse.materialized_columns.backfill import get_partition_backfills
 from ee.clickhouse.materialized_columns.columns import (
     TRIM_AND_EXTRACT_PROPERTY,
     ColumnName,
@@ -16,12 +17,18 @@ def mark_all_materialized() -> None:
         logger.info("There are running mutations, skipping marking as materialized")
         return
 
+    # columns being backfilled a partition at a time need to stay DEFAULT columns until they're done
+    backfilling = set((backfill.table, backfill.column_name) for backfill in get_partition_backfills())
+
     for (
         table,
         property_name,
         table_column,
         column_name,
     ) in get_materialized_columns_with_default_expression():
+        if (table, column_name) in backfilling:
+            continue
+
         updated_table = "sharded_events" if table == "events" else table
 
         # :TRICKY: On cloud, we ON CLUSTER updates to events/sharded_events but not to persons. Why? ¯\_(ツ)_/¯
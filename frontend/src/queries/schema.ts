@@ -396,6 +396,8 @@ export interface EventsQueryResponse {
     timings?: QueryTiming[]
     limit?: integer
     offset?: integer
+    /** Opaque cursor to pass as `cursor` to fetch the next page, if there are more results */
+    nextCursor?: string
 }
 export interface EventsQueryPersonColumn {
     uuid: string
@@ -428,6 +430,8 @@ export interface EventsQuery extends DataNode {
      * Number of rows to skip before returning rows
      */
     offset?: integer
+    /** Cursor returned as `nextCursor` by the previous page, or an empty string to start paginating by cursor. Takes precedence over `offset` */
+    cursor?: string
     /**
      * Show events matching a given action
      */
@@ -914,6 +918,8 @@ export interface ActorsQueryResponse {
     hasMore?: boolean
     limit: integer
     offset: integer
+    /** Opaque cursor to pass as `cursor` to fetch the next page, if there are more results */
+    nextCursor?: string
     missing_actors_count?: integer
 }
 
@@ -927,6 +933,8 @@ export interface ActorsQuery extends DataNode {
     orderBy?: string[]
     limit?: integer
     offset?: integer
+    /** Cursor returned as `nextCursor` by the previous page, or an empty string to start paginating by cursor. Takes precedence over `offset` */
+    cursor?: string
     response?: ActorsQueryResponse
 }
 
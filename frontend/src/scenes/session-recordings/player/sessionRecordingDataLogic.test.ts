@@ -419,6 +419,62 @@ describe('sessionRecordingDataLogic', () => {
         })
     })
 
+    describe('loading many blobs', () => {
+        const manyBlobSources: SessionRecordingSnapshotSource[] = Array.from({ length: 150 }, (_, i) => ({
+            ...BLOB_SOURCE,
+            blob_key: `${i}-${i + 1}`,
+        }))
+        let requestedBlobKeys: string[][]
+
+        beforeEach(async () => {
+            requestedBlobKeys = []
+            useMocks({
+                get: {
+                    '/api/projects/:team/session_recordings/:id/snapshots': async (req, res, ctx) => {
+                        if (req.url.searchParams.get('source') === 'blob') {
+                            const blobKeys =
+                                req.url.searchParams.get('blob_keys') ?? req.url.searchParams.get('blob_key') ?? ''
+                            requestedBlobKeys.push(blobKeys.split(','))
+                            return res(ctx.text(snapshotsAsJSONLines()))
+                        }
+                        return [200, { sources: manyBlobSources }]
+                    },
+                    '/api/projects/:team/session_recordings/:id': recordingMetaJson,
+                },
+                post: {
+                    '/api/projects/:team/query': recordingEventsJson,
+                },
+            })
+            logic = sessionRecordingDataLogic({
+                sessionRecordingId: 'has-many-blobs',
+                realTimePollingIntervalMilliseconds: 10,
+            })
+            logic.mount()
+            logic.actions.loadRecordingMeta()
+        })
+
+        it('loads the blobs in batches that the API accepts', async () => {
+            await expectLogic(logic, () => {
+                logic.actions.loadRecordingSnapshots()
+            })
+                .toDispatchActions([
+                    // the sources
+                    'loadRecordingSnapshotsSuccess',
+                    // the first blob on its own
+                    'loadRecordingSnapshotsSuccess',
+                    // then the remaining ones, at most 100 at once
+                    'loadRecordingSnapshotsSuccess',
+                    'loadRecordingSnapshotsSuccess',
+                    'reportUsageIfFullyLoaded',
+                ])
+                .toFinishAllListeners()
+
+            expect(requestedBlobKeys.map((keys) => keys.length)).toEqual([1, 100, 49])
+            expect(requestedBlobKeys.flat()).toEqual(manyBlobSources.map((s) => s.blob_key))
+            expect(logic.values.sessionPlayerSnapshotData?.sources?.every((s) => s.loaded)).toBe(true)
+        })
+    })
+
     describe('empty realtime loading', () => {
         beforeEach(async () => {
             logic = sessionRecordingDataLogic({
@@ -53,6 +53,8 @@ import { createSegments, mapSnapshotsToWindowId } from './utils/segmenter'
 const IS_TEST_MODE = process.env.NODE_ENV === 'test'
 const BUFFER_MS = 60000 // +- before and after start and end of a recording to query for.
 const DEFAULT_REALTIME_POLLING_MILLIS = 3000
+// KEEP IN SYNC WITH posthog/session_recordings/session_recording_api.py
+const MAX_BLOB_KEYS_PER_REQUEST = 100
 const REALTIME_POLLING_PARAMS = {
     source: SnapshotSourceType.realtime,
     version: '2',
@@ -497,20 +499,36 @@ export const sessionRecordingDataLogic = kea<sessionRecordingDataLogicType>([
 
                     await breakpoint(1)
 
+                    // the first blob is loaded on its own so playback can start,
+                    // after that the remaining blobs are loaded in as few requests as the API accepts,
+                    // each success loading the next batch
+                    let blobSources = source ? [source] : []
+                    if (source?.source === SnapshotSourceType.blob && data.sources?.some((s) => s.loaded)) {
+                        blobSources = data.sources
+                            .filter((s) => s.source === SnapshotSourceType.blob && !s.loaded)
+                            .slice(0, MAX_BLOB_KEYS_PER_REQUEST)
+                    }
+
                     if (source?.source === SnapshotSourceType.blob) {
-                        const params = {
+                        const blobKeys = blobSources.map((s) => s.blob_key)
+                        if (blobKeys.some((key) => !key)) {
+                            throw new Error('Missing key')
+                        }
+
+                        const params: Record<string, any> = {
                             source: source.source,
-                            blob_key: source.blob_key,
                             version: '2',
                         }
+                        if (blobKeys.length > 1) {
+                            params.blob_keys = blobKeys.join(',')
+                        } else {
+                            params.blob_key = source.blob_key
+                        }
 
                         if (values.featureFlags[FEATURE_FLAGS.SESSION_REPLAY_V3_INGESTION_PLAYBACK]) {
                             params.version = '3'
                         }
 
-                        if (!source.blob_key) {
-                            throw new Error('Missing key')
-                        }
                         const encodedResponse = await api.recordings.getBlobSnapshots(props.sessionRecordingId, params)
 
                         const { transformed, untransformed } = await processEncodedResponse(
@@ -549,10 +567,12 @@ export const sessionRecordingDataLogic = kea<sessionRecordingDataLogicType>([
                     }
 
                     if (source) {
+                        blobSources.forEach((s) => (s.loaded = true))
                         source.loaded = true
 
                         posthog.capture('recording_snapshot_loaded', {
                             source: source.source,
+                            sources_count: blobSources.length,
                             duration: Math.round(performance.now() - snapshotLoadingStartTime),
                         })
                     }
@@ -109,6 +109,7 @@ export function getDefaultConfig(): PluginsServerConfig {
         CONVERSION_BUFFER_TOPIC_ENABLED_TEAMS: '',
         BUFFER_CONVERSION_SECONDS: isDevEnv() ? 2 : 60, // KEEP IN SYNC WITH posthog/settings/ingestion.py
         PERSON_INFO_CACHE_TTL: 5 * 60, // 5 min
+        PERSON_PROJECTION_CACHE_TTL_SECONDS: 60, // KEEP IN SYNC WITH posthog/settings/__init__.py, 0 disables it
         KAFKA_HEALTHCHECK_SECONDS: 20,
         OBJECT_STORAGE_ENABLED: true,
         OBJECT_STORAGE_ENDPOINT: 'http://localhost:19000',
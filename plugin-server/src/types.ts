@@ -178,6 +178,7 @@ export interface PluginsServerConfig {
     CONVERSION_BUFFER_TOPIC_ENABLED_TEAMS: string
     BUFFER_CONVERSION_SECONDS: number
     PERSON_INFO_CACHE_TTL: number
+    PERSON_PROJECTION_CACHE_TTL_SECONDS: number
     KAFKA_HEALTHCHECK_SECONDS: number
     OBJECT_STORAGE_ENABLED: boolean // Disables or enables the use of object storage. It will become mandatory to use object storage
     OBJECT_STORAGE_REGION: string // s3 region
@@ -166,13 +166,17 @@ export class DB {
     /** How many seconds to keep person info in Redis cache */
     PERSONS_AND_GROUPS_CACHE_TTL: number
 
+    /** How many seconds the Django app caches person projections for, 0 if it doesn't cache them */
+    PERSON_PROJECTION_CACHE_TTL: number
+
     constructor(
         postgres: PostgresRouter,
         redisPool: GenericPool<Redis.Redis>,
         kafkaProducer: KafkaProducerWrapper,
         clickhouse: ClickHouse,
         pluginsDefaultLogLevel: PluginLogLevel,
-        personAndGroupsCacheTtl = 1
+        personAndGroupsCacheTtl = 1,
+        personProjectionCacheTtl = 0
     ) {
         this.postgres = postgres
         this.redisPool = redisPool
@@ -180,6 +184,7 @@ export class DB {
         this.clickhouse = clickhouse
         this.pluginsDefaultLogLevel = pluginsDefaultLogLevel
         this.PERSONS_AND_GROUPS_CACHE_TTL = personAndGroupsCacheTtl
+        this.PERSON_PROJECTION_CACHE_TTL = personProjectionCacheTtl
     }
 
     // ClickHouse
@@ -428,6 +433,19 @@ export class DB {
         })
     }
 
+    public redisDel(key: string): Promise<number> {
+        return instrumentQuery('query.redisDel', undefined, async () => {
+            const client = await this.redisPool.acquire()
+            const timeout = timeoutGuard('Deleting redis key delayed. Waiting over 30 sec to delete key', { key })
+            try {
+                return await client.del(key)
+            } finally {
+                clearTimeout(timeout)
+                await this.redisPool.release(client)
+            }
+        })
+    }
+
     /** Calls Celery task. Works similarly to Task.apply_async in Python. */
     async celeryApplyAsync(taskName: string, args: any[] = [], kwargs: Record<string, any> = {}): Promise<void> {
         const taskId = new UUIDT().toString()
@@ -762,6 +780,11 @@ export class DB {
             await this.kafkaProducer.queueMessage(message)
         }
 
+        if (!tx) {
+            // within a transaction it's up to the caller, see `invalidatePersonProjection`
+            await this.invalidatePersonProjection(updatedPerson)
+        }
+
         status.debug(
             '🧑‍🦰',
             `Updated person ${updatedPerson.uuid} of team ${updatedPerson.team_id} to version ${updatedPerson.version}.`
@@ -784,9 +807,31 @@ export class DB {
             const [row] = rows
             kafkaMessages = [generateKafkaPersonUpdateMessage({ ...person, version: Number(row.version || 0) }, true)]
         }
+        if (!tx) {
+            await this.invalidatePersonProjection(person)
+        }
         return kafkaMessages
     }
 
+    /**
+     * Drops the person from the short lived cache that the Django app renders events and persons lists from
+     * (see posthog/caching/person_projection.py). Failing to do so isn't worth failing ingestion over, as the
+     * cache expires by itself soon enough.
+     *
+     * Person changes made within a transaction have to be invalidated by the caller once it has committed,
+     * as otherwise a concurrent lookup could cache the person from before the transaction again.
+     */
+    public async invalidatePersonProjection(person: Person): Promise<void> {
+        if (this.PERSON_PROJECTION_CACHE_TTL <= 0) {
+            return
+        }
+        try {
+            await this.redisDel(`person_projection:${person.team_id}:${person.uuid}`)
+        } catch (error) {
+            status.warn('⚠️', 'Failed to invalidate the cached person projection', { error, uuid: person.uuid })
+        }
+    }
+
     // PersonDistinctId
     // testutil
     public async fetchDistinctIds(person: Person, database?: Database.Postgres): Promise<PersonDistinctId[]>
@@ -905,6 +950,9 @@ export class DB {
                 `Failed trying to move distinct IDs because the source person no longer exists.`
             )
         }
+        if (!tx) {
+            await this.invalidatePersonProjection(source)
+        }
 
         const kafkaMessages = []
         for (const row of movedDistinctIdResult.rows) {
@@ -138,7 +138,8 @@ export async function createHub(
         kafkaProducer,
         clickhouse,
         serverConfig.PLUGINS_DEFAULT_LOG_LEVEL,
-        serverConfig.PERSON_INFO_CACHE_TTL
+        serverConfig.PERSON_INFO_CACHE_TTL,
+        serverConfig.PERSON_PROJECTION_CACHE_TTL_SECONDS
     )
     const teamManager = new TeamManager(postgres, serverConfig)
     const organizationManager = new OrganizationManager(postgres, teamManager)
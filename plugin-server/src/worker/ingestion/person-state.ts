@@ -507,6 +507,12 @@ export class PersonState {
             }
         )
 
+        // Only now that the merge is committed, so that no lookup can cache either person from before it again
+        await Promise.all([
+            this.db.invalidatePersonProjection(mergeInto),
+            this.db.invalidatePersonProjection(otherPerson),
+        ])
+
         mergeTxnSuccessCounter
             .labels({
                 call: this.event.event, // $identify, $create_alias or $merge_dangerously
@@ -457,6 +457,41 @@ describe('DB', () => {
         })
     })
 
+    describe('invalidatePersonProjection', () => {
+        let person: Person
+        let key: string
+
+        beforeEach(async () => {
+            const team = await getFirstTeam(hub)
+            person = await db.createPerson(TIMESTAMP, {}, {}, {}, team.id, null, false, new UUIDT().toString(), [])
+            key = `person_projection:${team.id}:${person.uuid}`
+            await db.redisSet(key, { uuid: person.uuid }, 'testPersonProjection')
+        })
+
+        it('drops the projection of an updated person', async () => {
+            await db.updatePersonDeprecated(person, { properties: { foo: 'bar' } })
+
+            expect(await db.redisGet(key, null, 'testPersonProjection')).toEqual(null)
+        })
+
+        it('leaves invalidating changes made within a transaction to the caller', async () => {
+            await db.postgres.transaction(PostgresUse.COMMON_WRITE, 'testPersonProjection', async (tx) => {
+                await db.updatePersonDeprecated(person, { properties: { foo: 'bar' } }, tx)
+                await db.deletePerson(person, tx)
+            })
+
+            expect(await db.redisGet(key, null, 'testPersonProjection')).toEqual({ uuid: person.uuid })
+        })
+
+        it('does nothing when the Django app does not cache projections', async () => {
+            db.PERSON_PROJECTION_CACHE_TTL = 0
+
+            await db.updatePersonDeprecated(person, { properties: { foo: 'bar' } })
+
+            expect(await db.redisGet(key, null, 'testPersonProjection')).toEqual({ uuid: person.uuid })
+        })
+    })
+
     describe('fetchPerson()', () => {
         it('returns undefined if person does not exist', async () => {
             const team = await getFirstTeam(hub)
@@ -1489,6 +1489,7 @@ describe('PersonState.update()', () => {
 
                 const state: PersonState = personState({}, hub)
                 jest.spyOn(hub.db.kafkaProducer, 'queueMessages')
+                jest.spyOn(hub.db, 'invalidatePersonProjection')
                 const person = await state.mergePeople({
                     mergeInto: first,
                     mergeIntoDistinctId: 'first',
@@ -1510,6 +1511,10 @@ describe('PersonState.update()', () => {
 
                 expect(hub.db.updatePersonDeprecated).toHaveBeenCalledTimes(1)
                 expect(hub.db.kafkaProducer.queueMessages).toHaveBeenCalledTimes(1)
+                // only once the merge is committed
+                expect(hub.db.invalidatePersonProjection).toHaveBeenCalledTimes(2)
+                expect(hub.db.invalidatePersonProjection).toHaveBeenCalledWith(first)
+                expect(hub.db.invalidatePersonProjection).toHaveBeenCalledWith(second)
                 // verify Postgres persons
                 const persons = await fetchPostgresPersonsH()
                 expect(persons.length).toEqual(1)
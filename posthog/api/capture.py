@@ -1,5 +1,4 @@
 import hashlib
-import json
 import re
 import time
 from datetime import datetime
@@ -35,6 +34,7 @@ from posthog.logging.timing import timed
 from posthog.metrics import LABEL_RESOURCE_TYPE, KLUDGES_COUNTER
 from posthog.models.utils import UUIDT
 from posthog.session_recordings.session_recording_helpers import (
+    json_dumps_event,
     preprocess_replay_events_for_blob_ingestion,
     split_replay_events,
 )
@@ -130,7 +130,7 @@ def build_kafka_event_data(
         "distinct_id": safe_clickhouse_string(distinct_id),
         "ip": safe_clickhouse_string(ip) if ip else ip,
         "site_url": safe_clickhouse_string(site_url),
-        "data": json.dumps(data),
+        "data": json_dumps_event(data),
         "now": now.isoformat(),
         "sent_at": sent_at.isoformat() if sent_at else "",
         "token": token,
@@ -497,9 +497,11 @@ def insert_cohort_actors_into_ch(cohort: Cohort, filter_data: Dict):
     if from_existing_cohort_id:
         existing_cohort = Cohort.objects.get(pk=from_existing_cohort_id)
         query = """
-            SELECT DISTINCT person_id as actor_id
+            SELECT person_id as actor_id
             FROM cohortpeople
             WHERE team_id = %(team_id)s AND cohort_id = %(from_cohort_id)s AND version = %(version)s
+            GROUP BY person_id
+            HAVING sum(sign) > 0
             ORDER BY person_id
         """
         params = {
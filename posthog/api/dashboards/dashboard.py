@@ -3,6 +3,7 @@ from typing import Any, Dict, List, Optional, Type, cast
 from rest_framework.serializers import BaseSerializer
 
 import structlog
+from django.conf import settings
 from django.db.models import Prefetch, QuerySet
 from django.shortcuts import get_object_or_404
 from django.utils.timezone import now
@@ -22,6 +23,7 @@ from posthog.api.insight import InsightSerializer, InsightViewSet
 from posthog.api.routing import TeamAndOrgViewSetMixin
 from posthog.api.shared import UserBasicSerializer
 from posthog.api.tagged_item import TaggedItemSerializerMixin, TaggedItemViewSetMixin
+from posthog.caching.dashboard_refresh import refresh_dashboard_tiles
 from posthog.constants import AvailableFeature
 from posthog.event_usage import report_user_action
 from posthog.helpers import create_dashboard_from_template
@@ -32,6 +34,7 @@ from posthog.models.tagged_item import TaggedItem
 from posthog.models.team.team import check_is_feature_available_for_team
 from posthog.models.user import User
 from posthog.user_permissions import UserPermissionsSerializerMixin
+from posthog.utils import refresh_requested_by_client
 
 logger = structlog.get_logger(__name__)
 
@@ -376,6 +379,11 @@ class DashboardSerializer(DashboardBasicSerializer):
         )
         self.user_permissions.set_preloaded_dashboard_tiles(list(tiles))
 
+        request = self.context.get("request")
+        if request is not None and settings.DASHBOARD_REFRESH_PARALLELISM > 1 and refresh_requested_by_client(request):
+            # Calculate all tiles up front, the tile serializers then read the results from the cache
+            refresh_dashboard_tiles(dashboard, tiles, request=request, is_shared=self.context.get("is_shared", False))
+
         for tile in tiles:
             self.context.update({"dashboard_tile": tile})
 
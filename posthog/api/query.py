@@ -2,7 +2,7 @@ import json
 import re
 import uuid
 
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from drf_spectacular.utils import OpenApiResponse
 from rest_framework import viewsets
 from rest_framework.decorators import action
@@ -25,13 +25,16 @@ from posthog.clickhouse.query_tagging import tag_queries
 from posthog.errors import ExposedCHQueryError
 from posthog.hogql.ai import PromptUnclear, write_sql_from_prompt
 from posthog.hogql.errors import HogQLException
+from posthog.hogql_queries.hogql_query_runner import HogQLQueryRunner
 from posthog.models.user import User
 from posthog.rate_limit import (
     AIBurstRateThrottle,
     AISustainedRateThrottle,
     TeamRateThrottle,
 )
-from posthog.schema import QueryRequest, QueryResponseAlternative
+from posthog.renderers import SafeJSONRenderer
+from posthog.schema import HogQLQuery, QueryRequest, QueryResponseAlternative
+from posthog.utils import stream_requested_by_client
 
 
 class QueryThrottle(TeamRateThrottle):
@@ -75,7 +78,11 @@ class QueryViewSet(TeamAndOrgViewSetMixin, PydanticModelMixin, viewsets.ViewSet)
 
         tag_queries(query=request.data["query"])
         try:
-            result = process_query_model(self.team, data.query, refresh_requested=data.refresh)
+            if isinstance(data.query, HogQLQuery) and stream_requested_by_client(request):
+                return self._stream_hogql_query(data.query)
+            result = process_query_model(
+                self.team, data.query, refresh_requested=data.refresh, stale_while_revalidate=True
+            )
             return Response(result)
         except (HogQLException, ExposedCHQueryError) as e:
             raise ValidationError(str(e), getattr(e, "code_name", None))
@@ -130,6 +137,27 @@ class QueryViewSet(TeamAndOrgViewSetMixin, PydanticModelMixin, viewsets.ViewSet)
                 )
         return
 
+    def _stream_hogql_query(self, query: HogQLQuery) -> StreamingHttpResponse:
+        """
+        Streams the results as newline-delimited JSON: first a header line with the columns and types,
+        then one line per block of results, so that large results are never held in memory as a whole.
+        """
+        response = HogQLQueryRunner(query=query, team=self.team).stream()
+        renderer = SafeJSONRenderer()
+
+        def render_lines():
+            yield (
+                renderer.render({"columns": response.columns, "types": response.types, "hogql": response.hogql}) + b"\n"
+            )
+            try:
+                for block in response.blocks:
+                    yield renderer.render({"results": block}) + b"\n"
+            except (HogQLException, ExposedCHQueryError) as e:
+                # The status code has already been sent, so report the error in the stream instead
+                yield renderer.render({"error": str(e)}) + b"\n"
+
+        return StreamingHttpResponse(render_lines(), content_type="application/x-ndjson")
+
     def _tag_client_query_id(self, query_id: str | None):
         if query_id is None:
             return
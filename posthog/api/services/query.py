@@ -58,6 +58,7 @@ def process_query(
     query_json: dict,
     limit_context: Optional[LimitContext] = None,
     refresh_requested: Optional[bool] = False,
+    stale_while_revalidate: Optional[bool] = False,
 ) -> dict:
     model = QuerySchemaRoot.model_validate(query_json)
     tag_queries(query=query_json)
@@ -66,6 +67,7 @@ def process_query(
         model.root,
         limit_context=limit_context,
         refresh_requested=refresh_requested,
+        stale_while_revalidate=stale_while_revalidate,
     )
 
 
@@ -74,12 +76,13 @@ def process_query_model(
     query: BaseModel,  # mypy has problems with unions and isinstance
     limit_context: Optional[LimitContext] = None,
     refresh_requested: Optional[bool] = False,
+    stale_while_revalidate: Optional[bool] = False,
 ) -> dict:
     result: dict | BaseModel
 
     if isinstance(query, QUERY_WITH_RUNNER):  # type: ignore
         query_runner = get_query_runner(query, team, limit_context=limit_context)
-        result = query_runner.run(refresh_requested=refresh_requested)
+        result = query_runner.run(refresh_requested=refresh_requested, stale_while_revalidate=stale_while_revalidate)
     elif isinstance(query, QUERY_WITH_RUNNER_NO_CACHE):  # type: ignore
         query_runner = get_query_runner(query, team, limit_context=limit_context)
         result = query_runner.calculate()
@@ -203,6 +203,26 @@ class TestQuery(ClickhouseTestMixin, APIBaseTest):
             response = self.client.post(f"/api/projects/{self.team.id}/query/", {"query": query.dict()}).json()
             self.assertEqual(len(response["results"]), 2)
 
+    def test_hogql_query_streaming(self):
+        with freeze_time("2020-01-10 12:00:00"):
+            for index in range(3):
+                _create_event(team=self.team, event="sign up", distinct_id=str(index))
+        flush_persons_and_events()
+
+        response = self.client.post(
+            f"/api/projects/{self.team.id}/query/?stream=true",
+            {"query": {"kind": "HogQLQuery", "query": "select event, distinct_id from events order by distinct_id"}},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        lines = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+        self.assertEqual(lines[0]["columns"], ["event", "distinct_id"])
+        self.assertEqual(
+            [row for line in lines[1:] for row in line["results"]],
+            [["sign up", "0"], ["sign up", "1"], ["sign up", "2"]],
+        )
+
     @also_test_with_materialized_columns(event_properties=["key", "path"])
     @snapshot_clickhouse_queries
     def test_event_property_filter(self):
@@ -0,0 +1,137 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import timedelta
+from time import perf_counter
+from typing import Dict, Iterable, List, Optional, Set
+
+import structlog
+from django.conf import settings
+from django.db import connection
+from rest_framework import request
+from sentry_sdk.api import capture_exception
+from statshog.defaults.django import statsd
+
+from posthog.caching.calculate_results import calculate_cache_key
+from posthog.caching.fetch_from_cache import synchronously_update_cache
+from posthog.caching.insights_api import should_refresh_insight
+from posthog.clickhouse.query_tagging import get_query_tags, reset_query_tags, tag_queries
+from posthog.hogql_queries.legacy_compatibility.feature_flag import hogql_insights_enabled
+from posthog.hogql_queries.legacy_compatibility.process_insight import is_insight_with_hogql_support
+from posthog.models import Dashboard, DashboardTile
+
+logger = structlog.get_logger(__name__)
+
+"""
+Refreshes all tiles of a dashboard in one go, before the tiles get serialized.
+
+Tiles that end up with the same cache key (e.g. the same insight on a dashboard twice, or insights that
+only differ in ways that the dashboard filters override) are calculated once and the result is written to
+every caching state sharing that key. The remaining calculations run in parallel, so that the dashboard
+load is bound by the slowest tile rather than by the sum of all tiles.
+"""
+
+
+@dataclass
+class TileRefreshGroup:
+    cache_key: str
+    refresh_frequency: timedelta
+    tiles: List[DashboardTile] = field(default_factory=list)
+
+
+def plan_dashboard_refresh(
+    tiles: Iterable[DashboardTile], *, request: request.Request, is_shared: bool = False
+) -> List[TileRefreshGroup]:
+    """Groups the tiles in need of a refresh by their cache key."""
+    groups: Dict[str, TileRefreshGroup] = {}
+    up_to_date_cache_keys: Set[str] = set()
+    use_hogql_insights = hogql_insights_enabled(request.user)
+
+    for tile in tiles:
+        if tile.insight is None or tile.insight.deleted or tile.deleted:
+            continue
+        if use_hogql_insights and is_insight_with_hogql_support(tile):
+            # These are calculated through the query runners, which handle caching themselves
+            continue
+
+        cache_key = calculate_cache_key(tile)
+        if cache_key is None or cache_key in up_to_date_cache_keys:
+            continue
+        if cache_key in groups:
+            groups[cache_key].tiles.append(tile)
+            continue
+
+        refresh_insight_now, refresh_frequency = should_refresh_insight(
+            tile.insight, tile, request=request, is_shared=is_shared
+        )
+        if refresh_insight_now:
+            groups[cache_key] = TileRefreshGroup(cache_key=cache_key, refresh_frequency=refresh_frequency, tiles=[tile])
+        else:
+            up_to_date_cache_keys.add(cache_key)
+
+    return list(groups.values())
+
+
+def execute_dashboard_refresh(
+    dashboard: Dashboard, groups: List[TileRefreshGroup], parallelism: Optional[int] = None
+) -> Dict[str, Optional[Exception]]:
+    """
+    Calculates every group once and writes the result to its cache key.
+    Returns the error per cache key, failed tiles are left for the insight serializer to retry.
+    """
+    parallelism = parallelism or settings.DASHBOARD_REFRESH_PARALLELISM
+    query_tags = {**get_query_tags(), "dashboard_id": dashboard.pk}
+    start_time = perf_counter()
+
+    if parallelism <= 1 or len(groups) <= 1:
+        errors = {group.cache_key: _refresh_group(dashboard, group) for group in groups}
+    else:
+        with ThreadPoolExecutor(max_workers=min(parallelism, len(groups))) as executor:
+            results = executor.map(
+                lambda group: _refresh_group_in_thread(dashboard, group, query_tags),
+                groups,
+            )
+            errors = {group.cache_key: error for group, error in zip(groups, results)}
+
+    duration = perf_counter() - start_time
+    statsd.timing("dashboard_refresh_timing", duration)
+    logger.info(
+        "dashboard_refreshed",
+        dashboard_id=dashboard.pk,
+        team_id=dashboard.team_id,
+        groups=len(groups),
+        tiles=sum(len(group.tiles) for group in groups),
+        errors=sum(1 for error in errors.values() if error is not None),
+        duration=duration,
+    )
+    return errors
+
+
+def refresh_dashboard_tiles(
+    dashboard: Dashboard, tiles: Iterable[DashboardTile], *, request: request.Request, is_shared: bool = False
+) -> None:
+    groups = plan_dashboard_refresh(tiles, request=request, is_shared=is_shared)
+    if groups:
+        execute_dashboard_refresh(dashboard, groups)
+
+
+def _refresh_group(dashboard: Dashboard, group: TileRefreshGroup) -> Optional[Exception]:
+    insight = group.tiles[0].insight
+    assert insight is not None
+
+    try:
+        synchronously_update_cache(insight, dashboard, group.refresh_frequency)
+        return None
+    except Exception as err:
+        capture_exception(err, {"dashboard_id": dashboard.pk, "insight_id": insight.pk})
+        return err
+
+
+def _refresh_group_in_thread(dashboard: Dashboard, group: TileRefreshGroup, query_tags: Dict) -> Optional[Exception]:
+    # :TRICKY: Query tags are thread-local and each thread gets its own database connection,
+    #   so carry the tags over and make sure the connection doesn't outlive the thread
+    tag_queries(**query_tags)
+    try:
+        return _refresh_group(dashboard, group)
+    finally:
+        reset_query_tags()
+        connection.close()
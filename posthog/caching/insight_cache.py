@@ -1,12 +1,14 @@
+from collections import defaultdict
 from datetime import datetime, timedelta
 from time import perf_counter
-from typing import Any, List, Optional, Tuple, cast
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple, cast
 from uuid import UUID
 
 import structlog
 from django.conf import settings
 from django.core.cache import cache
 from django.db import connection
+from django.db.models import Count, F, Q
 from django.utils.timezone import now
 from prometheus_client import Counter
 from sentry_sdk.api import capture_exception
@@ -21,23 +23,48 @@ logger = structlog.get_logger(__name__)
 
 REQUEUE_DELAY = timedelta(hours=2)
 MAX_ATTEMPTS = 3
+# How many more candidates than can be scheduled are fetched, so that they can be prioritized against each other
+CANDIDATE_POOL_MULTIPLIER = 10
+# Window used to measure how often an insight is viewed
+RECENT_VIEWS_PERIOD = timedelta(weeks=2)
+# Predicted duration (in seconds) for insights that were never refreshed successfully
+DEFAULT_PREDICTED_DURATION = 5.0
 
 insight_cache_write_counter = Counter("posthog_cloud_insight_cache_write", "A write to the redis insight cache")
 
 
+class CacheUpdateCandidate(NamedTuple):
+    team_id: int
+    cache_key: str
+    id: UUID
+    last_refresh: Optional[datetime]
+    target_cache_age_seconds: int
+    last_refresh_duration: Optional[float]
+    recent_views: int
+
+
 def schedule_cache_updates():
     # :TODO: Separate celery queue for updates rather than limiting via this method
     PARALLEL_INSIGHT_CACHE = get_instance_setting("PARALLEL_DASHBOARD_ITEM_CACHE")
+    PARALLEL_INSIGHT_CACHE_PER_TEAM = get_instance_setting("PARALLEL_DASHBOARD_ITEM_CACHE_PER_TEAM")
 
-    to_update = fetch_states_in_need_of_updating(limit=PARALLEL_INSIGHT_CACHE)
+    candidates = fetch_states_in_need_of_updating(limit=PARALLEL_INSIGHT_CACHE * CANDIDATE_POOL_MULTIPLIER)
+    to_update = prioritize_states(
+        candidates,
+        limit=PARALLEL_INSIGHT_CACHE,
+        per_team_limit=PARALLEL_INSIGHT_CACHE_PER_TEAM,
+        in_flight_by_team=fetch_in_flight_counts_by_team({candidate.team_id for candidate in candidates}),
+    )
     # :TRICKY: Schedule tasks and deduplicate by ID to avoid clashes
     representative_by_cache_key = set()
-    for team_id, cache_key, caching_state_id in to_update:
-        if (team_id, cache_key) not in representative_by_cache_key:
-            representative_by_cache_key.add((team_id, cache_key))
-            update_cache_task.delay(caching_state_id)
+    for candidate in to_update:
+        if (candidate.team_id, candidate.cache_key) not in representative_by_cache_key:
+            representative_by_cache_key.add((candidate.team_id, candidate.cache_key))
+            update_cache_task.delay(candidate.id)
 
-    InsightCachingState.objects.filter(pk__in=(id for _, _, id in to_update)).update(last_refresh_queued_at=now())
+    InsightCachingState.objects.filter(pk__in=(candidate.id for candidate in to_update)).update(
+        last_refresh_queued_at=now()
+    )
 
     if len(representative_by_cache_key) > 0:
         logger.warn(
@@ -49,12 +76,87 @@ def schedule_cache_updates():
         logger.warn("No caches were found to be updated")
 
 
-def fetch_states_in_need_of_updating(limit: int) -> List[Tuple[int, str, UUID]]:
+def prioritize_states(
+    candidates: Iterable[CacheUpdateCandidate],
+    limit: int,
+    per_team_limit: int,
+    in_flight_by_team: Optional[Dict[int, int]] = None,
+) -> List[CacheUpdateCandidate]:
+    """
+    Picks the candidates most worth refreshing, while keeping each team within its concurrency budget.
+    States that share a cache key are refreshed by a single task, so they only use up the budget once.
+    """
+    current_time = now()
+    scheduled_by_team: Dict[int, int] = defaultdict(int, in_flight_by_team or {})
+    scheduled_cache_keys = set()
+    result = []
+
+    # :TRICKY: sorted is stable, so ties keep the least recently refreshed first
+    for candidate in sorted(candidates, key=lambda candidate: -score_state(candidate, current_time)):
+        representative = (candidate.team_id, candidate.cache_key)
+        if representative in scheduled_cache_keys:
+            result.append(candidate)
+            continue
+        if len(scheduled_cache_keys) >= limit:
+            continue
+        if scheduled_by_team[candidate.team_id] >= per_team_limit:
+            continue
+
+        scheduled_cache_keys.add(representative)
+        scheduled_by_team[candidate.team_id] += 1
+        result.append(candidate)
+
+    return result
+
+
+def score_state(candidate: CacheUpdateCandidate, current_time: datetime) -> float:
+    """
+    Higher scores get refreshed first. Insights that are viewed often and are far past their target age are
+    preferred, and expensive insights need proportionally more views or staleness to be picked.
+    """
+    if candidate.last_refresh is None:
+        # Nothing to show to the user at all, this always goes first
+        return float("inf")
+
+    staleness = (current_time - candidate.last_refresh).total_seconds() / max(candidate.target_cache_age_seconds, 1)
+    predicted_duration = (
+        candidate.last_refresh_duration if candidate.last_refresh_duration is not None else DEFAULT_PREDICTED_DURATION
+    )
+    return (1 + candidate.recent_views) * staleness / (1 + predicted_duration)
+
+
+def fetch_in_flight_counts_by_team(team_ids: Iterable[int]) -> Dict[int, int]:
+    """Counts states that were queued for a refresh recently, but haven't been refreshed since."""
+    in_flight = (
+        InsightCachingState.objects.filter(
+            team_id__in=team_ids,
+            last_refresh_queued_at__gte=now() - REQUEUE_DELAY,
+        )
+        .filter(Q(last_refresh__isnull=True) | Q(last_refresh__lt=F("last_refresh_queued_at")))
+        .values("team_id")
+        .annotate(count=Count("cache_key", distinct=True))
+    )
+    return {row["team_id"]: row["count"] for row in in_flight}
+
+
+def fetch_states_in_need_of_updating(limit: int) -> List[CacheUpdateCandidate]:
     current_time = now()
     with connection.cursor() as cursor:
         cursor.execute(
             """
-            SELECT team_id, cache_key, id
+            SELECT
+                team_id,
+                cache_key,
+                id,
+                last_refresh,
+                target_cache_age_seconds,
+                last_refresh_duration,
+                (
+                    SELECT count(*)
+                    FROM posthog_insightviewed
+                    WHERE posthog_insightviewed.insight_id = posthog_insightcachingstate.insight_id
+                    AND posthog_insightviewed.last_viewed_at > %(recent_views_threshold)s
+                ) AS recent_views
             FROM posthog_insightcachingstate
             WHERE target_cache_age_seconds IS NOT NULL
             AND refresh_attempt < %(max_attempts)s
@@ -73,10 +175,11 @@ def fetch_states_in_need_of_updating(limit: int) -> List[Tuple[int, str, UUID]]:
                 "max_attempts": MAX_ATTEMPTS,
                 "current_time": current_time,
                 "last_refresh_queued_at_threshold": current_time - REQUEUE_DELAY,
+                "recent_views_threshold": current_time - RECENT_VIEWS_PERIOD,
                 "limit": limit,
             },
         )
-        return cursor.fetchall()
+        return [CacheUpdateCandidate(*row) for row in cursor.fetchall()]
 
 
 def update_cache(caching_state_id: UUID):
@@ -101,6 +204,7 @@ def update_cache(caching_state_id: UUID):
         "dashboard_id": dashboard.pk if dashboard else None,
         "last_refresh": caching_state.last_refresh,
         "last_refresh_queued_at": caching_state.last_refresh_queued_at,
+        "predicted_duration": caching_state.last_refresh_duration,
     }
 
     try:
@@ -117,10 +221,15 @@ def update_cache(caching_state_id: UUID):
             cast(str, cache_key),
             timestamp,
             {"result": result, "type": cache_type, "last_refresh": timestamp},
+            duration=duration,
         )
         statsd.incr("caching_state_update_success")
         statsd.incr("caching_state_update_rows_updated", rows_updated)
         statsd.timing("caching_state_update_success_timing", duration)
+        if caching_state.last_refresh_duration is not None:
+            statsd.timing(
+                "caching_state_update_prediction_error_timing", abs(duration - caching_state.last_refresh_duration)
+            )
         logger.warn(
             "Re-calculated insight cache",
             rows_updated=rows_updated,
@@ -152,15 +261,18 @@ def update_cached_state(
     timestamp: datetime,
     result: Any,
     ttl: Optional[int] = None,
+    duration: Optional[float] = None,
 ):
     cache.set(cache_key, result, ttl if ttl is not None else settings.CACHED_RESULTS_TTL)
     insight_cache_write_counter.inc()
 
+    updates: Dict[str, Any] = {"last_refresh": timestamp, "refresh_attempt": 0}
+    if duration is not None:
+        updates["last_refresh_duration"] = duration
+
     # :TRICKY: We update _all_ states with same cache_key to avoid needless re-calculations and
     #   handle race conditions around cache_key changing.
-    return InsightCachingState.objects.filter(team_id=team_id, cache_key=cache_key).update(
-        last_refresh=timestamp, refresh_attempt=0
-    )
+    return InsightCachingState.objects.filter(team_id=team_id, cache_key=cache_key).update(**updates)
 
 
 def _extract_insight_dashboard(caching_state: InsightCachingState) -> Tuple[Insight, Optional[Dashboard]]:
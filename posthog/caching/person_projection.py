@@ -0,0 +1,170 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+from uuid import UUID
+
+import orjson
+from django.conf import settings
+from django.db.models import Prefetch
+from statshog.defaults.django import statsd
+
+from posthog.models.person import Person
+from posthog.models.person.util import get_persons_by_distinct_ids
+from posthog.redis import get_client
+
+"""
+A short lived cache of the few person fields that list views render, so that paging through events or persons
+doesn't query Postgres for the same persons over and over.
+
+Projections are stored by person uuid, with a separate key per distinct id pointing to the uuid. They're invalidated
+by uuid once a person is saved or deleted here (after the transaction commits, so that a concurrent lookup can't cache
+the old version again) or updated by the plugin server, which only knows the uuid. A distinct id that points to an
+invalidated person, or to a person that no longer has it, is simply looked up again.
+"""
+
+PERSON_PROJECTION_KEY_PREFIX = "person_projection"
+PERSON_PROJECTION_DISTINCT_ID_KEY_PREFIX = "person_projection_distinct_id"
+
+# Persons with huge property bags or lots of distinct ids aren't worth keeping in redis
+MAX_CACHED_PROJECTION_BYTES = 64 * 1024
+
+
+@dataclass
+class PersonProjection:
+    uuid: UUID
+    distinct_ids: List[str]
+    properties: Dict[str, Any]
+    created_at: datetime
+    is_identified: bool
+
+    @classmethod
+    def from_person(cls, person: Person) -> "PersonProjection":
+        return cls(
+            uuid=person.uuid,
+            distinct_ids=person.distinct_ids,
+            properties=person.properties or {},
+            created_at=person.created_at,
+            is_identified=person.is_identified,
+        )
+
+    @classmethod
+    def loads(cls, value: bytes) -> "PersonProjection":
+        data = orjson.loads(value)
+        return cls(
+            uuid=UUID(data["uuid"]),
+            distinct_ids=data["distinct_ids"],
+            properties=data["properties"],
+            created_at=datetime.fromisoformat(data["created_at"]),
+            is_identified=data["is_identified"],
+        )
+
+    def dumps(self) -> bytes:
+        return orjson.dumps(
+            {
+                "uuid": str(self.uuid),
+                "distinct_ids": self.distinct_ids,
+                "properties": self.properties,
+                "created_at": self.created_at.isoformat(),
+                "is_identified": self.is_identified,
+            }
+        )
+
+
+def person_projection_key(team_id: int, uuid: UUID | str) -> str:
+    return f"{PERSON_PROJECTION_KEY_PREFIX}:{team_id}:{uuid}"
+
+
+def person_projection_distinct_id_key(team_id: int, distinct_id: str) -> str:
+    return f"{PERSON_PROJECTION_DISTINCT_ID_KEY_PREFIX}:{team_id}:{distinct_id}"
+
+
+def get_person_projections_by_distinct_ids(team_id: int, distinct_ids: Iterable[str]) -> Dict[str, PersonProjection]:
+    """Returns the persons by each of the given distinct ids that has one."""
+    distinct_ids = list(set(distinct_ids))
+    if not distinct_ids:
+        return {}
+
+    found: Dict[str, PersonProjection] = {}
+    if _is_enabled():
+        uuids = get_client().mget([person_projection_distinct_id_key(team_id, d) for d in distinct_ids])
+        cached = _get_cached(team_id, {uuid.decode() for uuid in uuids if uuid})
+        for distinct_id, uuid in zip(distinct_ids, uuids):
+            projection = cached.get(uuid.decode()) if uuid else None
+            if projection is not None and distinct_id in projection.distinct_ids:
+                found[distinct_id] = projection
+
+    missing = [distinct_id for distinct_id in distinct_ids if distinct_id not in found]
+    _count_hits(len(found), len(missing))
+    if missing:
+        persons = get_persons_by_distinct_ids(team_id, missing).prefetch_related(
+            Prefetch("persondistinctid_set", to_attr="distinct_ids_cache")
+        )
+        projections = [PersonProjection.from_person(person) for person in persons]
+        _set_cached(team_id, projections)
+        missing_set = set(missing)
+        for projection in projections:
+            for distinct_id in projection.distinct_ids:
+                if distinct_id in missing_set:
+                    found[distinct_id] = projection
+
+    return found
+
+
+def get_person_projections_by_uuids(team_id: int, uuids: Iterable[UUID | str]) -> Dict[str, PersonProjection]:
+    """Returns the persons by the string version of each of the given uuids that exists."""
+    uuids = {str(uuid) for uuid in uuids}
+    if not uuids:
+        return {}
+
+    found = _get_cached(team_id, uuids) if _is_enabled() else {}
+
+    missing = [uuid for uuid in uuids if uuid not in found]
+    _count_hits(len(found), len(missing))
+    if missing:
+        persons = Person.objects.filter(
+            team_id=team_id, persondistinctid__team_id=team_id, uuid__in=missing
+        ).prefetch_related(Prefetch("persondistinctid_set", to_attr="distinct_ids_cache"))
+        projections = [PersonProjection.from_person(person) for person in persons]
+        _set_cached(team_id, projections)
+        found.update({str(projection.uuid): projection for projection in projections})
+
+    return found
+
+
+def invalidate_person_projection(team_id: int, uuid: UUID | str, distinct_ids: Optional[List[str]] = None) -> None:
+    keys = [person_projection_key(team_id, uuid)]
+    keys.extend(person_projection_distinct_id_key(team_id, distinct_id) for distinct_id in distinct_ids or [])
+    get_client().delete(*keys)
+
+
+def _is_enabled() -> bool:
+    return settings.PERSON_PROJECTION_CACHE_TTL_SECONDS > 0
+
+
+def _get_cached(team_id: int, uuids: Iterable[str]) -> Dict[str, PersonProjection]:
+    uuids = list(uuids)
+    if not uuids:
+        return {}
+    values = get_client().mget([person_projection_key(team_id, uuid) for uuid in uuids])
+    return {uuid: PersonProjection.loads(value) for uuid, value in zip(uuids, values) if value}
+
+
+def _set_cached(team_id: int, projections: List[PersonProjection]) -> None:
+    if not _is_enabled() or not projections:
+        return
+
+    ttl = settings.PERSON_PROJECTION_CACHE_TTL_SECONDS
+    pipeline = get_client().pipeline(transaction=False)
+    for projection in projections:
+        value = projection.dumps()
+        if len(value) > MAX_CACHED_PROJECTION_BYTES:
+            continue
+        pipeline.set(person_projection_key(team_id, projection.uuid), value, ex=ttl)
+        for distinct_id in projection.distinct_ids:
+            pipeline.set(person_projection_distinct_id_key(team_id, distinct_id), str(projection.uuid), ex=ttl)
+    pipeline.execute()
+
+
+def _count_hits(hits: int, misses: int) -> None:
+    statsd.incr("person_projection_cache_hits", hits)
+    statsd.incr("person_projection_cache_misses", misses)
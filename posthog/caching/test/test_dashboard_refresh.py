@@ -0,0 +1,77 @@
+from unittest.mock import MagicMock, patch
+
+from django.utils.timezone import now
+from freezegun import freeze_time
+
+from posthog.caching.calculate_results import calculate_cache_key
+from posthog.caching.dashboard_refresh import execute_dashboard_refresh, plan_dashboard_refresh
+from posthog.models import Dashboard, DashboardTile, Insight
+from posthog.test.base import BaseTest, ClickhouseTestMixin, _create_event, flush_persons_and_events
+from posthog.utils import get_safe_cache
+
+
+@freeze_time("2012-01-14T03:21:34.000Z")
+class TestDashboardRefresh(ClickhouseTestMixin, BaseTest):
+    def setUp(self):
+        super().setUp()
+
+        _create_event(team=self.team, event="$pageview", distinct_id="1")
+        _create_event(team=self.team, event="$pageleave", distinct_id="1")
+        flush_persons_and_events()
+
+        self.dashboard = Dashboard.objects.create(team=self.team)
+        self.pageview_tile = self._create_tile({"events": [{"id": "$pageview"}]})
+        self.same_pageview_tile = self._create_tile({"events": [{"id": "$pageview"}]})
+        self.pageleave_tile = self._create_tile({"events": [{"id": "$pageleave"}]})
+
+        self.request = MagicMock(query_params={"refresh": "true"}, data={}, user=self.user)
+
+    def _create_tile(self, filters) -> DashboardTile:
+        insight = Insight.objects.create(team=self.team, filters=filters)
+        return DashboardTile.objects.create(dashboard=self.dashboard, insight=insight)
+
+    def _tiles(self):
+        return list(DashboardTile.dashboard_queryset(self.dashboard.tiles))
+
+    def test_plan_groups_tiles_by_cache_key(self):
+        groups = plan_dashboard_refresh(self._tiles(), request=self.request)
+
+        assert sorted(len(group.tiles) for group in groups) == [1, 2]
+        assert {group.cache_key for group in groups} == {
+            calculate_cache_key(self.pageview_tile),
+            calculate_cache_key(self.pageleave_tile),
+        }
+
+    def test_plan_skips_tiles_without_refresh(self):
+        request = MagicMock(query_params={}, data={}, user=self.user)
+
+        assert plan_dashboard_refresh(self._tiles(), request=request) == []
+
+    @patch("posthog.caching.dashboard_refresh.synchronously_update_cache")
+    def test_execute_calculates_each_group_once(self, spy_synchronously_update_cache):
+        groups = plan_dashboard_refresh(self._tiles(), request=self.request)
+
+        errors = execute_dashboard_refresh(self.dashboard, groups, parallelism=1)
+
+        assert spy_synchronously_update_cache.call_count == 2
+        assert errors == {group.cache_key: None for group in groups}
+
+    def test_execute_writes_results_to_cache(self):
+        groups = plan_dashboard_refresh(self._tiles(), request=self.request)
+
+        execute_dashboard_refresh(self.dashboard, groups, parallelism=1)
+
+        for tile in (self.pageview_tile, self.same_pageview_tile, self.pageleave_tile):
+            cached_result = get_safe_cache(calculate_cache_key(tile))
+            assert cached_result["result"] is not None
+            assert cached_result["last_refresh"] == now()
+
+    @patch("posthog.caching.dashboard_refresh.synchronously_update_cache")
+    def test_execute_returns_errors_per_group(self, spy_synchronously_update_cache):
+        error = Exception("boom")
+        spy_synchronously_update_cache.side_effect = error
+        groups = plan_dashboard_refresh(self._tiles(), request=self.request)
+
+        errors = execute_dashboard_refresh(self.dashboard, groups, parallelism=1)
+
+        assert list(errors.values()) == [error, error]
@@ -1,5 +1,6 @@
 from datetime import timedelta
 from typing import Callable, Optional
+from uuid import uuid4
 from unittest.mock import call, patch
 
 import pytest
@@ -8,7 +9,9 @@ from freezegun import freeze_time
 
 from posthog.caching.calculate_results import get_cache_type
 from posthog.caching.insight_cache import (
+    CacheUpdateCandidate,
     fetch_states_in_need_of_updating,
+    prioritize_states,
     schedule_cache_updates,
     update_cache,
 )
@@ -126,6 +129,46 @@ def test_fetch_states_in_need_of_updating(team: Team, user: User, params, expect
     assert len(results) == expected_matches
 
 
+def create_candidate(team_id=1, cache_key=None, last_refresh=timedelta(days=2), duration=None, views=0):  # noqa
+    return CacheUpdateCandidate(
+        team_id=team_id,
+        cache_key=cache_key or uuid4().hex,
+        id=uuid4(),
+        last_refresh=now() - last_refresh if last_refresh is not None else None,
+        target_cache_age_seconds=int(timedelta(days=1).total_seconds()),
+        last_refresh_duration=duration,
+        recent_views=views,
+    )
+
+
+@freeze_time("2020-01-04T13:01:01Z")
+def test_prioritize_states_prefers_viewed_stale_and_cheap_insights():
+    rarely_viewed = create_candidate(views=0)
+    often_viewed = create_candidate(views=10)
+    very_stale = create_candidate(last_refresh=timedelta(days=20))
+    expensive = create_candidate(views=10, duration=120)
+    never_refreshed = create_candidate(last_refresh=None, duration=120)
+
+    result = prioritize_states(
+        [rarely_viewed, often_viewed, very_stale, expensive, never_refreshed], limit=3, per_team_limit=10
+    )
+
+    assert result == [never_refreshed, often_viewed, very_stale]
+
+
+@freeze_time("2020-01-04T13:01:01Z")
+def test_prioritize_states_enforces_per_team_budget():
+    team1_states = [create_candidate(team_id=1, views=10) for _ in range(3)]
+    team2_state = create_candidate(team_id=2)
+    shared_cache_key = create_candidate(team_id=1, cache_key=team1_states[0].cache_key, views=10)
+
+    result = prioritize_states(
+        [*team1_states, shared_cache_key, team2_state], limit=10, per_team_limit=3, in_flight_by_team={1: 1}
+    )
+
+    assert result == [team1_states[0], team1_states[1], shared_cache_key, team2_state]
+
+
 @pytest.mark.django_db
 @freeze_time("2020-01-04T13:01:01Z")
 def test_update_cache(team: Team, user: User, cache):
@@ -142,6 +185,7 @@ def test_update_cache(team: Team, user: User, cache):
     updated_caching_state = InsightCachingState.objects.get(team=team)
     assert updated_caching_state.last_refresh == now()
     assert updated_caching_state.refresh_attempt == 0
+    assert updated_caching_state.last_refresh_duration is not None
 
 
 @pytest.mark.django_db
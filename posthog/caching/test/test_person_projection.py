@@ -0,0 +1,92 @@
+from django.test import override_settings
+
+from posthog.caching.person_projection import (
+    get_person_projections_by_distinct_ids,
+    get_person_projections_by_uuids,
+    person_projection_key,
+)
+from posthog.models import Person, PersonDistinctId
+from posthog.redis import get_client
+from posthog.test.base import BaseTest
+
+
+@override_settings(PERSON_PROJECTION_CACHE_TTL_SECONDS=60)
+class TestPersonProjection(BaseTest):
+    def setUp(self):
+        super().setUp()
+        self.person = Person.objects.create(
+            team=self.team, distinct_ids=["a", "b"], properties={"email": "a@example.com"}, is_identified=True
+        )
+
+    def test_lookup_by_distinct_ids_is_cached(self):
+        projections = get_person_projections_by_distinct_ids(self.team.pk, ["a", "unknown"])
+        assert list(projections.keys()) == ["a"]
+        assert projections["a"].uuid == self.person.uuid
+        assert projections["a"].properties == {"email": "a@example.com"}
+        assert sorted(projections["a"].distinct_ids) == ["a", "b"]
+
+        with self.assertNumQueries(0):
+            projections = get_person_projections_by_distinct_ids(self.team.pk, ["a", "b"])
+        assert {projection.uuid for projection in projections.values()} == {self.person.uuid}
+        assert projections["b"].created_at == self.person.created_at
+
+    def test_lookup_by_uuids_is_cached(self):
+        get_person_projections_by_uuids(self.team.pk, [self.person.uuid])
+
+        with self.assertNumQueries(0):
+            projections = get_person_projections_by_uuids(self.team.pk, [self.person.uuid])
+        assert projections[str(self.person.uuid)].is_identified
+
+    def test_saving_a_person_invalidates_it(self):
+        get_person_projections_by_distinct_ids(self.team.pk, ["a"])
+
+        self.person.properties = {"email": "new@example.com"}
+        with self.captureOnCommitCallbacks(execute=True):
+            self.person.save()
+
+        assert get_client().get(person_projection_key(self.team.pk, self.person.uuid)) is None
+        projections = get_person_projections_by_distinct_ids(self.team.pk, ["a"])
+        assert projections["a"].properties == {"email": "new@example.com"}
+
+    def test_moved_distinct_id_is_looked_up_again(self):
+        get_person_projections_by_distinct_ids(self.team.pk, ["a", "b"])
+        other_person = Person.objects.create(team=self.team, distinct_ids=["c"])
+
+        PersonDistinctId.objects.filter(team=self.team, distinct_id="b").update(person=other_person)
+        # Bulk updates don't send signals, just like updates from the plugin server
+        get_client().delete(person_projection_key(self.team.pk, self.person.uuid))
+
+        projections = get_person_projections_by_distinct_ids(self.team.pk, ["a", "b"])
+        assert projections["a"].uuid == self.person.uuid
+        assert projections["b"].uuid == other_person.uuid
+
+    def test_person_without_distinct_ids_in_the_team_is_not_found(self):
+        other_person = Person.objects.create(team=self.team)
+
+        assert get_person_projections_by_uuids(self.team.pk, [other_person.uuid]) == {}
+
+    def test_invalidates_only_once_the_transaction_commits(self):
+        get_person_projections_by_distinct_ids(self.team.pk, ["a"])
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.person.save()
+            assert get_client().get(person_projection_key(self.team.pk, self.person.uuid)) is not None
+
+        for callback in callbacks:
+            callback()
+        assert get_client().get(person_projection_key(self.team.pk, self.person.uuid)) is None
+
+    @override_settings(PERSON_PROJECTION_CACHE_TTL_SECONDS=0)
+    def test_disabled_cache_always_queries(self):
+        get_person_projections_by_distinct_ids(self.team.pk, ["a"])
+
+        with self.assertNumQueries(2):
+            get_person_projections_by_distinct_ids(self.team.pk, ["a"])
+
+    @override_settings(PERSON_PROJECTION_CACHE_TTL_SECONDS=0)
+    def test_disabled_cache_doesnt_invalidate(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.person.save()
+            PersonDistinctId.objects.get(team=self.team, distinct_id="a").save()
+
+        assert callbacks == []
@@ -4,7 +4,7 @@ import types
 from contextlib import contextmanager
 from functools import lru_cache
 from time import perf_counter
-from typing import Any, Dict, List, Optional, Sequence, Union
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Union
 
 import sqlparse
 from clickhouse_driver import Client as SyncClient
@@ -24,6 +24,9 @@ QueryArgs = Optional[Union[InsertParams, NonInsertParams]]
 
 thread_local_storage = threading.local()
 
+# Number of rows per block yielded by sync_execute_iter
+DEFAULT_STREAMING_BLOCK_SIZE = 1000
+
 # As of CH 22.8 - more algorithms have been added on newer versions
 CLICKHOUSE_SUPPORTED_JOIN_ALGORITHMS = [
     "default",
@@ -127,6 +130,84 @@ def sync_execute(
     return result
 
 
+def sync_execute_iter(
+    query,
+    args=None,
+    settings=None,
+    with_column_types=False,
+    block_size: int = DEFAULT_STREAMING_BLOCK_SIZE,
+    *,
+    workload: Workload = Workload.DEFAULT,
+    team_id: Optional[int] = None,
+    readonly=False,
+) -> Iterator[Any]:
+    """
+    Like sync_execute, but yields the results in blocks of up to `block_size` rows instead of returning them all
+    at once, so that large results never need to be held in memory. If `with_column_types` is set, the first
+    item yielded is the list of column types, same as with `clickhouse_driver.Client.execute_iter`.
+
+    The ClickHouse connection is held until the generator is exhausted or closed.
+    """
+    if TEST:
+        try:
+            from posthog.test.base import flush_persons_and_events
+
+            flush_persons_and_events()
+        except ModuleNotFoundError:  # when we run plugin server tests it tries to run above, ignore
+            pass
+
+    with get_pool(workload, team_id, readonly).get_client() as client:
+        start_time = perf_counter()
+
+        prepared_sql, prepared_args, tags = _prepare_query(client=client, query=query, args=args, workload=workload)
+        query_id = validated_client_query_id()
+        core_settings = {**default_settings(), **(settings or {})}
+        tags["query_settings"] = core_settings
+        settings = {
+            **core_settings,
+            "max_block_size": block_size,
+            "log_comment": json.dumps(tags, separators=(",", ":")),
+        }
+        rows_iter = client.execute_iter(
+            prepared_sql,
+            params=prepared_args,
+            settings=settings,
+            with_column_types=with_column_types,
+            query_id=query_id,
+        )
+        try:
+            if with_column_types:
+                yield next(rows_iter)
+
+            block: List[Any] = []
+            for row in rows_iter:
+                block.append(row)
+                if len(block) >= block_size:
+                    yield block
+                    block = []
+            if block:
+                yield block
+        except GeneratorExit:
+            # The rest of the result is still being sent, so the connection can't be reused as is
+            client.disconnect()
+            raise
+        except Exception as err:
+            err = wrap_query_error(err)
+            statsd.incr(
+                "clickhouse_sync_execution_failure",
+                tags={"failed": True, "reason": type(err).__name__},
+            )
+
+            raise err
+        finally:
+            execution_time = perf_counter() - start_time
+
+            statsd.timing("clickhouse_sync_streaming_execution_time", execution_time * 1000.0)
+
+            if query_counter := getattr(thread_local_storage, "query_counter", None):
+                query_counter.total_query_time += execution_time
+
+
 def query_with_columns(
     query: str,
     args: Optional[QueryArgs] = None,
@@ -119,9 +119,12 @@ def enqueue_process_query_task(
     refresh_requested=False,
     bypass_celery=False,
     force=False,
+    limit_context=None,
 ) -> QueryStatus:
     if not query_id:
         query_id = uuid.uuid4().hex
+    if not limit_context:
+        limit_context = LimitContext.QUERY_ASYNC
 
     manager = QueryStatusManager(query_id, team_id)
 
@@ -139,11 +142,11 @@ def enqueue_process_query_task(
     if bypass_celery:
         # Call directly ( for testing )
         process_query_task(
-            team_id, query_id, query_json, limit_context=LimitContext.QUERY_ASYNC, refresh_requested=refresh_requested
+            team_id, query_id, query_json, limit_context=limit_context, refresh_requested=refresh_requested
         )
     else:
         task = process_query_task.delay(
-            team_id, query_id, query_json, limit_context=LimitContext.QUERY_ASYNC, refresh_requested=refresh_requested
+            team_id, query_id, query_json, limit_context=limit_context, refresh_requested=refresh_requested
         )
         query_status.task_id = task.id
         manager.store_query_status(query_status)
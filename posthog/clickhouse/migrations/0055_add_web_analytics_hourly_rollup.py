@@ -0,0 +1,10 @@
+from posthog.clickhouse.client.migration_tools import run_sql_with_exceptions
+from posthog.models.web_analytics.sql import (
+    DISTRIBUTED_WEB_ANALYTICS_HOURLY_TABLE_SQL,
+    WEB_ANALYTICS_HOURLY_TABLE_SQL,
+)
+
+operations = [
+    run_sql_with_exceptions(WEB_ANALYTICS_HOURLY_TABLE_SQL()),
+    run_sql_with_exceptions(DISTRIBUTED_WEB_ANALYTICS_HOURLY_TABLE_SQL()),
+]
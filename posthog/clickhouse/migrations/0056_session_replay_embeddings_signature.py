@@ -0,0 +1,12 @@
+from posthog.clickhouse.client.migration_tools import run_sql_with_exceptions
+from posthog.session_recordings.sql.session_replay_embeddings_sql import (
+    ADD_SIGNATURE_DISTRIBUTED_SESSION_REPLAY_EMBEDDINGS_TABLE_SQL,
+    ADD_SIGNATURE_SESSION_REPLAY_EMBEDDINGS_TABLE_SQL,
+    ADD_SIGNATURE_WRITABLE_SESSION_REPLAY_EMBEDDINGS_TABLE_SQL,
+)
+
+operations = [
+    run_sql_with_exceptions(ADD_SIGNATURE_WRITABLE_SESSION_REPLAY_EMBEDDINGS_TABLE_SQL()),
+    run_sql_with_exceptions(ADD_SIGNATURE_DISTRIBUTED_SESSION_REPLAY_EMBEDDINGS_TABLE_SQL()),
+    run_sql_with_exceptions(ADD_SIGNATURE_SESSION_REPLAY_EMBEDDINGS_TABLE_SQL()),
+]
@@ -0,0 +1,10 @@
+from posthog.clickhouse.client.migration_tools import run_sql_with_exceptions
+from posthog.models.team_daily_event_counts.sql import (
+    DISTRIBUTED_TEAM_DAILY_EVENT_COUNTS_TABLE_SQL,
+    TEAM_DAILY_EVENT_COUNTS_TABLE_SQL,
+)
+
+operations = [
+    run_sql_with_exceptions(TEAM_DAILY_EVENT_COUNTS_TABLE_SQL()),
+    run_sql_with_exceptions(DISTRIBUTED_TEAM_DAILY_EVENT_COUNTS_TABLE_SQL()),
+]
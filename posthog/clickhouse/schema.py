@@ -38,12 +38,25 @@ from posthog.models.person_overrides.sql import (
     PERSON_OVERRIDES_CREATE_TABLE_SQL,
 )
 from posthog.session_recordings.sql.session_recording_event_sql import *
+from posthog.session_recordings.sql.session_replay_event_summaries_sql import (
+    DISTRIBUTED_SESSION_REPLAY_EVENT_SUMMARIES_TABLE_SQL,
+    SESSION_REPLAY_EVENT_SUMMARIES_TABLE_MV_SQL,
+    SESSION_REPLAY_EVENT_SUMMARIES_TABLE_SQL,
+)
 from posthog.session_recordings.sql.session_replay_event_sql import (
     DISTRIBUTED_SESSION_REPLAY_EVENTS_TABLE_SQL,
     KAFKA_SESSION_REPLAY_EVENTS_TABLE_SQL,
     SESSION_REPLAY_EVENTS_TABLE_MV_SQL,
     SESSION_REPLAY_EVENTS_TABLE_SQL,
 )
+from posthog.models.web_analytics.sql import (
+    DISTRIBUTED_WEB_ANALYTICS_HOURLY_TABLE_SQL,
+    WEB_ANALYTICS_HOURLY_TABLE_SQL,
+)
+from posthog.models.team_daily_event_counts.sql import (
+    DISTRIBUTED_TEAM_DAILY_EVENT_COUNTS_TABLE_SQL,
+    TEAM_DAILY_EVENT_COUNTS_TABLE_SQL,
+)
 
 CREATE_MERGETREE_TABLE_QUERIES = (
     LOG_ENTRIES_TABLE_SQL,
@@ -63,7 +76,10 @@ CREATE_MERGETREE_TABLE_QUERIES = (
     APP_METRICS_DATA_TABLE_SQL,
     PERFORMANCE_EVENTS_TABLE_SQL,
     SESSION_REPLAY_EVENTS_TABLE_SQL,
+    SESSION_REPLAY_EVENT_SUMMARIES_TABLE_SQL,
     CHANNEL_DEFINITION_TABLE_SQL,
+    WEB_ANALYTICS_HOURLY_TABLE_SQL,
+    TEAM_DAILY_EVENT_COUNTS_TABLE_SQL,
 )
 CREATE_DISTRIBUTED_TABLE_QUERIES = (
     WRITABLE_EVENTS_TABLE_SQL,
@@ -75,6 +91,9 @@ CREATE_DISTRIBUTED_TABLE_QUERIES = (
     WRITABLE_PERFORMANCE_EVENTS_TABLE_SQL,
     DISTRIBUTED_PERFORMANCE_EVENTS_TABLE_SQL,
     DISTRIBUTED_SESSION_REPLAY_EVENTS_TABLE_SQL,
+    DISTRIBUTED_SESSION_REPLAY_EVENT_SUMMARIES_TABLE_SQL,
+    DISTRIBUTED_WEB_ANALYTICS_HOURLY_TABLE_SQL,
+    DISTRIBUTED_TEAM_DAILY_EVENT_COUNTS_TABLE_SQL,
 )
 CREATE_KAFKA_TABLE_QUERIES = (
     KAFKA_LOG_ENTRIES_TABLE_SQL,
@@ -109,6 +128,7 @@ CREATE_MV_TABLE_QUERIES = (
     APP_METRICS_MV_TABLE_SQL,
     PERFORMANCE_EVENTS_TABLE_MV_SQL,
     SESSION_REPLAY_EVENTS_TABLE_MV_SQL,
+    SESSION_REPLAY_EVENT_SUMMARIES_TABLE_MV_SQL,
 )
 
 CREATE_TABLE_QUERIES = (
@@ -60,6 +60,11 @@ def reset_clickhouse_tables():
         TRUNCATE_SESSION_RECORDING_EVENTS_TABLE_SQL,
     )
     from posthog.models.channel_type.sql import TRUNCATE_CHANNEL_DEFINITION_TABLE_SQL
+    from posthog.models.web_analytics.sql import TRUNCATE_WEB_ANALYTICS_HOURLY_TABLE_SQL
+    from posthog.models.team_daily_event_counts.sql import TRUNCATE_TEAM_DAILY_EVENT_COUNTS_TABLE_SQL
+    from posthog.session_recordings.sql.session_replay_event_summaries_sql import (
+        TRUNCATE_SESSION_REPLAY_EVENT_SUMMARIES_TABLE_SQL,
+    )
 
     # REMEMBER TO ADD ANY NEW CLICKHOUSE TABLES TO THIS ARRAY!
     TABLES_TO_CREATE_DROP = [
@@ -76,6 +81,9 @@ def reset_clickhouse_tables():
         TRUNCATE_APP_METRICS_TABLE_SQL,
         TRUNCATE_PERFORMANCE_EVENTS_TABLE_SQL,
         TRUNCATE_CHANNEL_DEFINITION_TABLE_SQL,
+        TRUNCATE_WEB_ANALYTICS_HOURLY_TABLE_SQL(),
+        TRUNCATE_SESSION_REPLAY_EVENT_SUMMARIES_TABLE_SQL(),
+        TRUNCATE_TEAM_DAILY_EVENT_COUNTS_TABLE_SQL(),
     ]
 
     run_clickhouse_statement_in_parallel(TABLES_TO_CREATE_DROP)
@@ -33,6 +33,8 @@ RESERVED_KEYWORDS = KEYWORDS + ["team_id"]
 DEFAULT_RETURNED_ROWS = 100
 # Max limit for all SELECT queries, and the default for CSV exports.
 MAX_SELECT_RETURNED_ROWS = 10000  # sync with CSV_EXPORT_LIMIT
+# Max limit for streamed SELECT queries, which don't hold their results in memory
+MAX_SELECT_STREAMED_ROWS = 1000000  # 1m
 # Max limit for all cohort calculations
 MAX_SELECT_COHORT_CALCULATION_LIMIT = 1000000000  # 1b persons
 
@@ -1,5 +1,5 @@
 from dataclasses import dataclass, field
-from typing import TYPE_CHECKING, Dict, List, Literal, Optional, Any
+from typing import TYPE_CHECKING, Dict, List, Literal, Optional, Any, Set, Tuple
 
 from posthog.hogql.timings import HogQLTimings
 from posthog.schema import HogQLNotice, HogQLQueryModifiers
@@ -48,6 +48,8 @@ class HogQLContext:
     modifiers: HogQLQueryModifiers = field(default_factory=HogQLQueryModifiers)
     # Enables more verbose output for debugging
     debug: bool = False
+    # Properties read out of JSON columns rather than materialized columns, as (table, table column, property)
+    json_property_reads: Set[Tuple[str, str, str]] = field(default_factory=set)
 
     def add_value(self, value: Any) -> str:
         key = f"hogql_val_{len(self.values)}"
@@ -44,6 +44,7 @@ from posthog.hogql.database.schema.session_replay_events import (
     SessionReplayEventsTable,
 )
 from posthog.hogql.database.schema.static_cohort_people import StaticCohortPeople
+from posthog.hogql.database.schema.web_analytics_hourly import WebAnalyticsHourlyTable
 from posthog.hogql.errors import HogQLException
 from posthog.hogql.parser import parse_expr
 from posthog.models.group_type_mapping import GroupTypeMapping
@@ -71,6 +72,7 @@ class Database(BaseModel):
     log_entries: LogEntriesTable = LogEntriesTable()
     console_logs_log_entries: ReplayConsoleLogsLogEntriesTable = ReplayConsoleLogsLogEntriesTable()
     batch_export_log_entries: BatchExportLogEntriesTable = BatchExportLogEntriesTable()
+    web_analytics_hourly: WebAnalyticsHourlyTable = WebAnalyticsHourlyTable()
 
     raw_session_replay_events: RawSessionReplayEventsTable = RawSessionReplayEventsTable()
     raw_person_distinct_ids: RawPersonDistinctIdsTable = RawPersonDistinctIdsTable()
@@ -93,6 +95,7 @@ class Database(BaseModel):
         "cohortpeople",
         "person_static_cohort",
         "log_entries",
+        "web_analytics_hourly",
     ]
 
     _warehouse_table_names: List[str] = []
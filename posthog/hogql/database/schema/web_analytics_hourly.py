@@ -0,0 +1,32 @@
+from typing import Dict
+
+from posthog.hogql.database.models import (
+    Table,
+    IntegerDatabaseField,
+    StringDatabaseField,
+    DateTimeDatabaseField,
+    DatabaseField,
+    FieldOrTable,
+)
+
+WEB_ANALYTICS_HOURLY_FIELDS: Dict[str, FieldOrTable] = {
+    "team_id": IntegerDatabaseField(name="team_id"),
+    "hour": DateTimeDatabaseField(name="hour"),
+    "pathname": StringDatabaseField(name="pathname"),
+    "device_type": StringDatabaseField(name="device_type"),
+    "country_code": StringDatabaseField(name="country_code"),
+    "pageviews": IntegerDatabaseField(name="pageviews"),
+    # uniq states, read these with uniqMerge()
+    "visitors": DatabaseField(name="visitors"),
+    "sessions": DatabaseField(name="sessions"),
+}
+
+
+class WebAnalyticsHourlyTable(Table):
+    fields: Dict[str, FieldOrTable] = WEB_ANALYTICS_HOURLY_FIELDS
+
+    def to_printed_clickhouse(self, context):
+        return "web_analytics_hourly"
+
+    def to_printed_hogql(self):
+        return "web_analytics_hourly"
@@ -664,6 +664,9 @@ HOGQL_AGGREGATIONS: Dict[str, HogQLFunctionMeta] = {
     "kurtPopIf": HogQLFunctionMeta("kurtPopIf", 2, 2, aggregate=True),
     "uniq": HogQLFunctionMeta("uniq", 1, None, aggregate=True),
     "uniqIf": HogQLFunctionMeta("uniqIf", 2, None, aggregate=True),
+    "uniqState": HogQLFunctionMeta("uniqState", 1, None, aggregate=True),
+    "uniqMerge": HogQLFunctionMeta("uniqMerge", 1, 1, aggregate=True),
+    "uniqMergeIf": HogQLFunctionMeta("uniqMergeIf", 2, 2, aggregate=True),
     "uniqExact": HogQLFunctionMeta("uniqExact", 1, None, aggregate=True),
     "uniqExactIf": HogQLFunctionMeta("uniqExactIf", 2, None, aggregate=True),
     # "uniqCombined": HogQLFunctionMeta("uniqCombined", 1, 1, aggregate=True),
@@ -1029,6 +1029,11 @@ class _Printer(Visitor):
                         args.append(self.context.add_value(name))
                     return self._unsafe_json_extract_trim_quotes(materialized_property_sql, args)
 
+        if self.dialect == "clickhouse" and isinstance(table, ast.TableType) and field is not None:
+            self.context.json_property_reads.add(
+                (table.table.to_printed_clickhouse(self.context), field.name, str(type.chain[0]))
+            )
+
         for name in type.chain:
             args.append(self.context.add_value(name))
         return self._unsafe_json_extract_trim_quotes(self.visit(field_type), args)
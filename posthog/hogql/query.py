@@ -1,9 +1,15 @@
-from typing import Dict, Optional, Union, cast
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union, cast
 
 from posthog.clickhouse.client.connection import Workload
 from posthog.errors import ExposedCHQueryError
 from posthog.hogql import ast
-from posthog.hogql.constants import HogQLGlobalSettings, LimitContext, get_default_limit_for_context
+from posthog.hogql.constants import (
+    MAX_SELECT_STREAMED_ROWS,
+    HogQLGlobalSettings,
+    LimitContext,
+    get_default_limit_for_context,
+)
 from posthog.hogql.errors import HogQLException
 from posthog.hogql.hogql import HogQLContext
 from posthog.hogql.modifiers import create_default_modifiers_for_team
@@ -19,26 +25,50 @@ from posthog.hogql.timings import HogQLTimings
 from posthog.hogql.visitor import clone_expr
 from posthog.models.team import Team
 from posthog.clickhouse.query_tagging import tag_queries
-from posthog.client import sync_execute
+from posthog.client import sync_execute, sync_execute_iter
 from posthog.schema import HogQLQueryResponse, HogQLFilters, HogQLQueryModifiers, HogQLMetadata, HogQLMetadataResponse
 
 INCREASED_MAX_EXECUTION_TIME = 600
 
 
-def execute_hogql_query(
+@dataclass
+class PreparedHogQLQuery:
+    query: Optional[str]
+    hogql: str
+    clickhouse_sql: str
+    clickhouse_context: HogQLContext
+    columns: List[str]
+    modifiers: HogQLQueryModifiers
+
+
+@dataclass
+class HogQLStreamingResponse:
+    query: Optional[str]
+    hogql: str
+    clickhouse: str
+    columns: List[str]
+    types: List[Tuple[str, str]]
+    # Blocks of result rows, read lazily from ClickHouse
+    blocks: Iterator[List[Any]]
+
+
+def prepare_hogql_query(
     query: Union[str, ast.SelectQuery, ast.SelectUnionQuery],
     team: Team,
-    query_type: str = "hogql_query",
     filters: Optional[HogQLFilters] = None,
     placeholders: Optional[Dict[str, ast.Expr]] = None,
-    workload: Workload = Workload.ONLINE,
     settings: Optional[HogQLGlobalSettings] = None,
     modifiers: Optional[HogQLQueryModifiers] = None,
     limit_context: Optional[LimitContext] = LimitContext.QUERY,
     timings: Optional[HogQLTimings] = None,
-    explain: Optional[bool] = False,
     pretty: Optional[bool] = True,
-) -> HogQLQueryResponse:
+    default_limit: Optional[int] = None,
+    max_limit: Optional[int] = None,
+) -> PreparedHogQLQuery:
+    """
+    Parses and prints a HogQL query for ClickHouse. By default the printer caps the limit of the topmost select
+    at MAX_SELECT_RETURNED_ROWS, pass `max_limit` to cap it at a different value instead.
+    """
     if timings is None:
         timings = HogQLTimings()
 
@@ -76,7 +106,12 @@ def execute_hogql_query(
         )
         for one_query in select_queries:
             if one_query.limit is None:
-                one_query.limit = ast.Constant(value=get_default_limit_for_context(limit_context))
+                one_query.limit = ast.Constant(value=default_limit or get_default_limit_for_context(limit_context))
+            if max_limit is not None:
+                if isinstance(one_query.limit, ast.Constant) and isinstance(one_query.limit.value, int):
+                    one_query.limit = ast.Constant(value=min(one_query.limit.value, max_limit))
+                else:
+                    one_query.limit = ast.Call(name="min2", args=[ast.Constant(value=max_limit), one_query.limit])
 
     # Get printed HogQL query, and returned columns. Using a cloned query.
     with timings.measure("hogql"):
@@ -130,6 +165,7 @@ def execute_hogql_query(
             enable_select_queries=True,
             timings=timings,
             modifiers=query_modifiers,
+            limit_top_select=max_limit is None,
         )
         clickhouse_sql = print_ast(
             select_query,
@@ -139,6 +175,51 @@ def execute_hogql_query(
             pretty=pretty if pretty is not None else True,
         )
 
+    return PreparedHogQLQuery(
+        query=query,
+        hogql=hogql,
+        clickhouse_sql=clickhouse_sql,
+        clickhouse_context=clickhouse_context,
+        columns=print_columns,
+        modifiers=query_modifiers,
+    )
+
+
+def execute_hogql_query(
+    query: Union[str, ast.SelectQuery, ast.SelectUnionQuery],
+    team: Team,
+    query_type: str = "hogql_query",
+    filters: Optional[HogQLFilters] = None,
+    placeholders: Optional[Dict[str, ast.Expr]] = None,
+    workload: Workload = Workload.ONLINE,
+    settings: Optional[HogQLGlobalSettings] = None,
+    modifiers: Optional[HogQLQueryModifiers] = None,
+    limit_context: Optional[LimitContext] = LimitContext.QUERY,
+    timings: Optional[HogQLTimings] = None,
+    explain: Optional[bool] = False,
+    pretty: Optional[bool] = True,
+) -> HogQLQueryResponse:
+    if timings is None:
+        timings = HogQLTimings()
+
+    prepared = prepare_hogql_query(
+        query=query,
+        team=team,
+        filters=filters,
+        placeholders=placeholders,
+        settings=settings,
+        modifiers=modifiers,
+        limit_context=limit_context,
+        timings=timings,
+        pretty=pretty,
+    )
+    query = prepared.query
+    hogql = prepared.hogql
+    clickhouse_sql = prepared.clickhouse_sql
+    clickhouse_context = prepared.clickhouse_context
+    print_columns = prepared.columns
+    query_modifiers = prepared.modifiers
+
     timings_dict = timings.to_dict()
     with timings.measure("clickhouse_execute"):
         tag_queries(
@@ -146,6 +227,7 @@ def execute_hogql_query(
             query_type=query_type,
             has_joins="JOIN" in clickhouse_sql,
             has_json_operations="JSONExtract" in clickhouse_sql or "JSONHas" in clickhouse_sql,
+            json_property_reads=sorted(clickhouse_context.json_property_reads) or None,
             timings=timings_dict,
         )
 
@@ -201,3 +283,68 @@ def execute_hogql_query(
         explain=explain_output,
         metadata=metadata,
     )
+
+
+def stream_hogql_query(
+    query: Union[str, ast.SelectQuery, ast.SelectUnionQuery],
+    team: Team,
+    query_type: str = "hogql_query",
+    filters: Optional[HogQLFilters] = None,
+    placeholders: Optional[Dict[str, ast.Expr]] = None,
+    workload: Workload = Workload.ONLINE,
+    settings: Optional[HogQLGlobalSettings] = None,
+    modifiers: Optional[HogQLQueryModifiers] = None,
+    timings: Optional[HogQLTimings] = None,
+    pretty: Optional[bool] = True,
+) -> HogQLStreamingResponse:
+    """
+    Executes a HogQL query, returning the results as an iterator of row blocks instead of a list, so that results
+    too large to be held in memory can be passed on as they arrive. Queries without a LIMIT return up to
+    MAX_SELECT_STREAMED_ROWS rows.
+    """
+    if timings is None:
+        timings = HogQLTimings()
+
+    prepared = prepare_hogql_query(
+        query=query,
+        team=team,
+        filters=filters,
+        placeholders=placeholders,
+        settings=settings,
+        modifiers=modifiers,
+        limit_context=LimitContext.EXPORT,
+        timings=timings,
+        pretty=pretty,
+        default_limit=MAX_SELECT_STREAMED_ROWS,
+        max_limit=MAX_SELECT_STREAMED_ROWS,
+    )
+
+    tag_queries(
+        team_id=team.pk,
+        query_type=query_type,
+        has_joins="JOIN" in prepared.clickhouse_sql,
+        has_json_operations="JSONExtract" in prepared.clickhouse_sql or "JSONHas" in prepared.clickhouse_sql,
+        json_property_reads=sorted(prepared.clickhouse_context.json_property_reads) or None,
+        timings=timings.to_dict(),
+    )
+
+    with timings.measure("clickhouse_execute"):
+        rows_iter = sync_execute_iter(
+            prepared.clickhouse_sql,
+            prepared.clickhouse_context.values,
+            with_column_types=True,
+            workload=workload,
+            team_id=team.pk,
+            readonly=True,
+        )
+        # Starts the query, so errors are raised here rather than when reading the first block
+        types = next(rows_iter)
+
+    return HogQLStreamingResponse(
+        query=prepared.query,
+        hogql=prepared.hogql,
+        clickhouse=prepared.clickhouse_sql,
+        columns=prepared.columns,
+        types=types,
+        blocks=rows_iter,
+    )
@@ -254,6 +254,20 @@ class TestPrinter(BaseTest):
             context.values,
             {"hogql_val_0": "nomat", "hogql_val_1": "json", "hogql_val_2": "yet"},
         )
+        self.assertEqual(context.json_property_reads, {("events", "properties", "nomat")})
+
+    def test_hogql_properties_json_reads_are_recorded(self):
+        context = HogQLContext(team_id=self.team.pk, enable_select_queries=True)
+        self._select("SELECT properties.$browser FROM events WHERE properties.$os = 'Mac'", context)
+        self._select("SELECT properties.email FROM persons", context)
+        self.assertEqual(
+            context.json_property_reads,
+            {
+                ("events", "properties", "$browser"),
+                ("events", "properties", "$os"),
+                ("person", "properties", "email"),
+            },
+        )
 
     def test_hogql_properties_materialized_json_access(self):
         try:
@@ -270,6 +284,7 @@ class TestPrinter(BaseTest):
             "replaceRegexpAll(nullIf(nullIf(JSONExtractRaw(nullIf(nullIf(events.mat_withmat, ''), 'null'), %(hogql_val_0)s, %(hogql_val_1)s), ''), 'null'), '^\"|\"$', '')",
         )
         self.assertEqual(context.values, {"hogql_val_0": "json", "hogql_val_1": "yet"})
+        self.assertEqual(context.json_property_reads, set())
 
     def test_materialized_fields_and_properties(self):
         try:
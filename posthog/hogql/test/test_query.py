@@ -10,7 +10,7 @@ from posthog import datetime
 from posthog.hogql import ast
 from posthog.hogql.errors import SyntaxException, HogQLException
 from posthog.hogql.property import property_to_expr
-from posthog.hogql.query import execute_hogql_query
+from posthog.hogql.query import execute_hogql_query, stream_hogql_query
 from posthog.hogql.test.utils import pretty_print_in_tests, pretty_print_response_in_tests
 from posthog.models import Cohort
 from posthog.models.cohort.util import recalculate_cohortpeople
@@ -69,6 +69,25 @@ class TestQuery(ClickhouseTestMixin, APIBaseTest):
             assert pretty_print_response_in_tests(response, self.team.pk) == self.snapshot
             self.assertEqual(response.results, [(2, "random event")])
 
+    def test_stream_query(self):
+        with freeze_time("2020-01-10"):
+            random_uuid = self._create_random_events()
+
+            response = stream_hogql_query(
+                "select event, properties.index from events where properties.random_uuid = {random_uuid} order by properties.index",
+                placeholders={"random_uuid": ast.Constant(value=random_uuid)},
+                team=self.team,
+            )
+            self.assertEqual(response.columns, ["event", "index"])
+            self.assertEqual([name for name, _ in response.types], ["event", "index"])
+            self.assertIn("LIMIT 1000000", response.clickhouse)
+            self.assertEqual(list(response.blocks), [[("random event", "0"), ("random event", "1")]])
+
+    def test_stream_query_caps_limit(self):
+        response = stream_hogql_query("select event from events limit 5000000", team=self.team)
+        self.assertIn("LIMIT 1000000", response.clickhouse)
+        self.assertEqual(list(response.blocks), [])
+
     @pytest.mark.usefixtures("unittest_snapshot")
     def test_subquery(self):
         with freeze_time("2020-01-10"):
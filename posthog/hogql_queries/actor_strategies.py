@@ -1,13 +1,12 @@
 from typing import Dict, List, cast, Literal, Optional
 
-from django.db.models import Prefetch
-
+from posthog.caching.person_projection import get_person_projections_by_uuids
 from posthog.hogql import ast
 from posthog.hogql.property import property_to_expr
 from posthog.hogql.parser import parse_expr
 from posthog.hogql_queries.insights.paginators import HogQLHasMorePaginator
 from posthog.hogql_queries.utils.recordings import RecordingsHelper
-from posthog.models import Team, Person, Group
+from posthog.models import Team, Group
 from posthog.schema import ActorsQuery
 
 
@@ -44,15 +43,11 @@ class PersonStrategy(ActorStrategy):
 
     def get_actors(self, actor_ids) -> Dict[str, Dict]:
         return {
-            str(p.uuid): {
+            uuid: {
                 "id": p.uuid,
                 **{field: getattr(p, field) for field in ("distinct_ids", "properties", "created_at", "is_identified")},
             }
-            for p in Person.objects.filter(
-                team_id=self.team.pk, persondistinctid__team_id=self.team.pk, uuid__in=actor_ids
-            )
-            .prefetch_related(Prefetch("persondistinctid_set", to_attr="distinct_ids_cache"))
-            .iterator(chunk_size=self.paginator.limit)
+            for uuid, p in get_person_projections_by_uuids(self.team.pk, actor_ids).items()
         }
 
     def get_recordings(self, matching_events) -> dict[str, list[dict]]:
@@ -18,7 +18,7 @@ class ActorsQueryRunner(QueryRunner):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.paginator = HogQLHasMorePaginator.from_limit_context(
-            limit_context=self.limit_context, limit=self.query.limit, offset=self.query.offset
+            limit_context=self.limit_context, limit=self.query.limit, offset=self.query.offset, cursor=self.query.cursor
         )
         self.source_query_runner: Optional[QueryRunner] = None
 
@@ -26,6 +26,7 @@ class ActorsQueryRunner(QueryRunner):
             self.source_query_runner = get_query_runner(self.query.source, self.team, self.timings, self.limit_context)
 
         self.strategy = self.determine_strategy()
+        self.paginator.cursor_tiebreaker = ast.Field(chain=[self.strategy.origin_id])
 
     @property
     def group_type_index(self) -> int | None:
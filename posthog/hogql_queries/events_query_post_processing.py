@@ -0,0 +1,109 @@
+from typing import Any, Dict, List, Optional, Sequence
+
+import orjson
+
+from posthog.api.element import ElementSerializer
+from posthog.caching.person_projection import PersonProjection, get_person_projections_by_distinct_ids
+from posthog.hogql.timings import HogQLTimings
+from posthog.models.element import chain_to_elements
+
+"""
+Turns the raw rows of an EventsQuery into what the events table renders.
+
+Instead of handling one row at a time, each stage runs over a whole column: the `*` tuples are unzipped once, the
+properties of all rows are decoded in one go, and elements chains and persons are only looked up once per distinct
+value. Live events pages tend to repeat the same few elements chains and persons over and over.
+"""
+
+# Allow-listed fields returned when you select "*" from events. Person and group fields will be nested later.
+SELECT_STAR_FROM_EVENTS_FIELDS = [
+    "uuid",
+    "event",
+    "properties",
+    "timestamp",
+    "team_id",
+    "distinct_id",
+    "elements_chain",
+    "created_at",
+]
+
+
+def is_person_column(column: str) -> bool:
+    return column.split("--")[0].strip() == "person"
+
+
+def serialize_elements_chain(elements_chain: str) -> List[Dict[str, Any]]:
+    return ElementSerializer(chain_to_elements(elements_chain), many=True).data
+
+
+class EventsQueryPostProcessor:
+    def __init__(self, team_id: int, timings: HogQLTimings):
+        self.team_id = team_id
+        self.timings = timings
+
+    def process(self, results: Sequence[Sequence[Any]], columns: List[str]) -> List[List[Any]]:
+        rows = [list(row) for row in results]
+        if not rows:
+            return rows
+
+        if "*" in columns:
+            with self.timings.measure("expand_asterisk"):
+                self._expand_star_column(rows, columns.index("*"))
+
+        person_indices = [index for index, column in enumerate(columns) if is_person_column(column)]
+        if person_indices:
+            with self.timings.measure("person_column_extra_query"):
+                self._expand_person_columns(rows, person_indices)
+
+        return rows
+
+    def _expand_star_column(self, rows: List[List[Any]], star_idx: int) -> None:
+        with self.timings.measure("unzip"):
+            events = [dict(zip(SELECT_STAR_FROM_EVENTS_FIELDS, row[star_idx])) for row in rows]
+
+        with self.timings.measure("properties"):
+            for event in events:
+                event["properties"] = orjson.loads(event["properties"])
+
+        with self.timings.measure("elements"):
+            # Memoized per query only, so that nothing outside of this response shares the serialized elements
+            serialized: Dict[str, List[Dict[str, Any]]] = {}
+            for event in events:
+                elements_chain = event["elements_chain"]
+                if elements_chain:
+                    elements = serialized.get(elements_chain)
+                    if elements is None:
+                        elements = serialized[elements_chain] = serialize_elements_chain(elements_chain)
+                    event["elements"] = elements
+
+        for row, event in zip(rows, events):
+            row[star_idx] = event
+
+    def _expand_person_columns(self, rows: List[List[Any]], person_indices: List[int]) -> None:
+        # Persons are looked up by the distinct ids in the first person column, which all person columns contain
+        distinct_ids = {row[person_indices[0]] for row in rows}
+
+        with self.timings.measure("query"):
+            distinct_to_person = get_person_projections_by_distinct_ids(self.team_id, distinct_ids)
+
+        with self.timings.measure("expand"):
+            rendered: Dict[str, Dict[str, Any]] = {}
+            for row in rows:
+                for column_index in person_indices:
+                    distinct_id: str = row[column_index]
+                    person_dict = rendered.get(distinct_id)
+                    if person_dict is None:
+                        person_dict = rendered[distinct_id] = self._render_person(
+                            distinct_id, distinct_to_person.get(distinct_id)
+                        )
+                    row[column_index] = person_dict
+
+    def _render_person(self, distinct_id: str, person: Optional[PersonProjection]) -> Dict[str, Any]:
+        if person is None:
+            return {"distinct_id": distinct_id}
+        return {
+            "uuid": person.uuid,
+            "created_at": person.created_at,
+            "properties": person.properties,
+            "distinct_id": distinct_id,
+        }
@@ -1,39 +1,27 @@
-import json
 from datetime import timedelta
-from typing import Dict, List, Optional
+from typing import List, Optional
 
 from dateutil.parser import isoparse
-from django.db.models import Prefetch
 from django.utils.timezone import now
 
-from posthog.api.element import ElementSerializer
 from posthog.api.utils import get_pk_or_uuid
 from posthog.clickhouse.client.connection import Workload
 from posthog.hogql import ast
 from posthog.hogql.parser import parse_expr, parse_order_expr
 from posthog.hogql.property import action_to_expr, has_aggregation, property_to_expr
 from posthog.hogql.timings import HogQLTimings
+from posthog.hogql_queries.events_query_post_processing import (
+    SELECT_STAR_FROM_EVENTS_FIELDS,
+    EventsQueryPostProcessor,
+    is_person_column,
+)
 from posthog.hogql_queries.insights.paginators import HogQLHasMorePaginator
 from posthog.hogql_queries.query_runner import QueryRunner
 from posthog.models import Action, Person
-from posthog.models.element import chain_to_elements
 from posthog.models.person.person import get_distinct_ids_for_subquery
-from posthog.models.person.util import get_persons_by_distinct_ids
 from posthog.schema import EventsQuery, EventsQueryResponse
 from posthog.utils import relative_date_parse
 
-# Allow-listed fields returned when you select "*" from events. Person and group fields will be nested later.
-SELECT_STAR_FROM_EVENTS_FIELDS = [
-    "uuid",
-    "event",
-    "properties",
-    "timestamp",
-    "team_id",
-    "distinct_id",
-    "elements_chain",
-    "created_at",
-]
-
 
 class EventsQueryRunner(QueryRunner):
     query: EventsQuery
@@ -42,7 +30,11 @@ class EventsQueryRunner(QueryRunner):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.paginator = HogQLHasMorePaginator.from_limit_context(
-            limit_context=self.limit_context, limit=self.query.limit, offset=self.query.offset
+            limit_context=self.limit_context,
+            limit=self.query.limit,
+            offset=self.query.offset,
+            cursor=self.query.cursor,
+            cursor_tiebreaker=ast.Field(chain=["uuid"]),
         )
 
     def to_query(self) -> ast.SelectQuery:
@@ -60,7 +52,7 @@ class EventsQueryRunner(QueryRunner):
                     # Instead, ask for a tuple with all the columns we want. Later transform this back into a dict.
                     if col == "*":
                         select_input.append(f"tuple({', '.join(SELECT_STAR_FROM_EVENTS_FIELDS)})")
-                    elif col.split("--")[0].strip() == "person":
+                    elif is_person_column(col):
                         # This will be expanded into a followup query
                         select_input.append("distinct_id")
                         person_indices.append(index)
@@ -195,59 +187,13 @@ class EventsQueryRunner(QueryRunner):
             limit_context=self.limit_context,
         )
 
-        # Convert star field from tuple to dict in each result
-        if "*" in self.select_input_raw():
-            with self.timings.measure("expand_asterisk"):
-                star_idx = self.select_input_raw().index("*")
-                for index, result in enumerate(self.paginator.results):
-                    self.paginator.results[index] = list(result)
-                    select = result[star_idx]
-                    new_result = dict(zip(SELECT_STAR_FROM_EVENTS_FIELDS, select))
-                    new_result["properties"] = json.loads(new_result["properties"])
-                    if new_result["elements_chain"]:
-                        new_result["elements"] = ElementSerializer(
-                            chain_to_elements(new_result["elements_chain"]), many=True
-                        ).data
-                    self.paginator.results[index][star_idx] = new_result
-
-        person_indices: List[int] = []
-        for index, col in enumerate(self.select_input_raw()):
-            if col.split("--")[0].strip() == "person":
-                person_indices.append(index)
-
-        if len(person_indices) > 0 and len(self.paginator.results) > 0:
-            with self.timings.measure("person_column_extra_query"):
-                # Make a query into postgres to fetch person
-                person_idx = person_indices[0]
-                distinct_ids = list(set(event[person_idx] for event in self.paginator.results))
-                persons = get_persons_by_distinct_ids(self.team.pk, distinct_ids)
-                persons = persons.prefetch_related(Prefetch("persondistinctid_set", to_attr="distinct_ids_cache"))
-                distinct_to_person: Dict[str, Person] = {}
-                for person in persons:
-                    if person:
-                        for person_distinct_id in person.distinct_ids:
-                            distinct_to_person[person_distinct_id] = person
-
-                # Loop over all columns in case there is more than one "person" column
-                for column_index in person_indices:
-                    for index, result in enumerate(self.paginator.results):
-                        distinct_id: str = result[column_index]
-                        self.paginator.results[index] = list(result)
-                        if distinct_to_person.get(distinct_id):
-                            person = distinct_to_person[distinct_id]
-                            self.paginator.results[index][column_index] = {
-                                "uuid": person.uuid,
-                                "created_at": person.created_at,
-                                "properties": person.properties or {},
-                                "distinct_id": distinct_id,
-                            }
-                        else:
-                            self.paginator.results[index][column_index] = {
-                                "distinct_id": distinct_id,
-                            }
+        with self.timings.measure("post_processing"):
+            results = EventsQueryPostProcessor(team_id=self.team.pk, timings=self.timings).process(
+                self.paginator.results, self.select_input_raw()
+            )
 
         return EventsQueryResponse(
-            results=self.paginator.results,
+            results=results,
             columns=self.select_input_raw(),
             types=[t for _, t in query_result.types] if query_result.types else None,
             timings=self.timings.to_list(),
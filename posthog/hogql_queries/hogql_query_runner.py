@@ -6,7 +6,7 @@ from posthog.hogql import ast
 from posthog.hogql.filters import replace_filters
 from posthog.hogql.parser import parse_select
 from posthog.hogql.placeholders import find_placeholders
-from posthog.hogql.query import execute_hogql_query
+from posthog.hogql.query import HogQLStreamingResponse, execute_hogql_query, stream_hogql_query
 from posthog.hogql.timings import HogQLTimings
 from posthog.hogql_queries.insights.paginators import HogQLHasMorePaginator
 from posthog.hogql_queries.query_runner import QueryRunner
@@ -66,6 +66,17 @@ class HogQLQueryRunner(QueryRunner):
             response = response.model_copy(update={**paginator.response_params(), "results": paginator.results})
         return response
 
+    def stream(self) -> HogQLStreamingResponse:
+        """Like calculate, but reads the results lazily in blocks. Pagination doesn't apply to streamed queries."""
+        return stream_hogql_query(
+            query_type="HogQLQuery",
+            query=self.to_query(),
+            modifiers=self.query.modifiers or self.modifiers,
+            team=self.team,
+            workload=Workload.ONLINE,
+            timings=self.timings,
+        )
+
     def _is_stale(self, cached_result_package):
         return True
 
@@ -1,4 +1,8 @@
-from typing import Any, Optional, cast
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, List, Optional, Tuple, cast
+from uuid import UUID
 
 from posthog.hogql import ast
 from posthog.hogql.constants import (
@@ -7,7 +11,10 @@ from posthog.hogql.constants import (
     LimitContext,
     DEFAULT_RETURNED_ROWS,
 )
+from posthog.hogql.errors import QueryException
+from posthog.hogql.property import has_aggregation
 from posthog.hogql.query import execute_hogql_query
+from posthog.hogql.visitor import clone_expr
 from posthog.schema import HogQLQueryResponse
 
 
@@ -15,28 +22,87 @@ class HogQLHasMorePaginator:
     """
     Paginator that fetches one more result than requested to determine if there are more results.
     Takes care of setting the limit and offset on the query.
+
+    When given a `cursor` (an empty one for the first page) and a `cursor_tiebreaker`, a unique column that makes the
+    sort order total, the paginator pages by cursor instead: the sort values of the last row are returned as
+    `nextCursor`, and the next page filters on being past them instead of skipping `offset` rows, so that ClickHouse
+    doesn't have to read and throw away all previous pages. Queries with aggregations are paginated by offset, as their
+    sort values only exist after grouping, and so are the pages after a row with sort values that can't be encoded.
     """
 
-    def __init__(self, *, limit: Optional[int] = None, offset: Optional[int] = None):
+    def __init__(
+        self,
+        *,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        cursor: Optional[str] = None,
+        cursor_tiebreaker: Optional[ast.Field] = None,
+    ):
         self.response: Optional[HogQLQueryResponse] = None
         self.results: list[Any] = []
         self.limit = limit if limit and limit > 0 else DEFAULT_RETURNED_ROWS
         self.offset = offset if offset and offset > 0 else 0
+        self.cursor = cursor
+        self.cursor_tiebreaker = cursor_tiebreaker
+        self.cursor_order_by: Optional[List[ast.OrderExpr]] = None
+        # The number of rows before the current page, for falling back to offset pagination
+        self.cursor_position = self.offset
+        self.next_cursor: Optional[str] = None
 
     @classmethod
     def from_limit_context(
-        cls, *, limit_context: LimitContext, limit: Optional[int] = None, offset: Optional[int] = None
+        cls,
+        *,
+        limit_context: LimitContext,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        cursor: Optional[str] = None,
+        cursor_tiebreaker: Optional[ast.Field] = None,
     ) -> "HogQLHasMorePaginator":
         max_rows = get_max_limit_for_context(limit_context)
         default_rows = get_default_limit_for_context(limit_context)
         limit = min(max_rows, default_rows if (limit is None or limit <= 0) else limit)
-        return cls(limit=limit, offset=offset)
+        return cls(limit=limit, offset=offset, cursor=cursor, cursor_tiebreaker=cursor_tiebreaker)
 
     def paginate(self, query: ast.SelectQuery) -> ast.SelectQuery:
         query.limit = ast.Constant(value=self.limit + 1)
         query.offset = ast.Constant(value=self.offset)
+        if self._can_paginate_by_cursor(query):
+            self._paginate_by_cursor(query)
         return query
 
+    def _can_paginate_by_cursor(self, query: ast.SelectQuery) -> bool:
+        if self.cursor is None or self.cursor_tiebreaker is None or query.group_by:
+            return False
+        return not any(has_aggregation(expr) for expr in [*query.select, *(o.expr for o in query.order_by or [])])
+
+    def _paginate_by_cursor(self, query: ast.SelectQuery) -> None:
+        assert self.cursor_tiebreaker is not None
+        order_by = list(query.order_by or [])
+        if not any(isinstance(o.expr, ast.Field) and o.expr.chain == self.cursor_tiebreaker.chain for o in order_by):
+            order_by.append(ast.OrderExpr(expr=self.cursor_tiebreaker, order=order_by[0].order if order_by else "ASC"))
+        query.order_by = order_by
+        self.cursor_order_by = order_by
+
+        # The sort values are selected as extra columns at the end, which are stripped off again in `trim_results`
+        query.select = [
+            *query.select,
+            *(ast.Alias(alias=f"__cursor_{index}", expr=clone_expr(o.expr)) for index, o in enumerate(order_by)),
+        ]
+
+        if not self.cursor:
+            return
+        values, self.cursor_position = decode_cursor(self.cursor)
+        if values is None:
+            query.offset = ast.Constant(value=self.cursor_position)
+            return
+        if len(values) != len(order_by):
+            raise QueryException("The cursor doesn't match the sort order of the query")
+        past_cursor = _past_cursor_expr(order_by, values)
+        query.where = past_cursor if query.where is None else ast.And(exprs=[query.where, past_cursor])
+        # The cursor takes the place of the offset
+        query.offset = None
+
     def has_more(self) -> bool:
         if not self.response or not self.response.results:
             return False
@@ -47,10 +113,14 @@ class HogQLHasMorePaginator:
         if not self.response or not self.response.results:
             return []
 
-        if self.has_more():
-            return self.response.results[:-1]
+        results = self.response.results[:-1] if self.has_more() else self.response.results
+        if self.cursor_order_by is None:
+            return results
 
-        return self.response.results
+        cursor_columns = len(self.cursor_order_by)
+        if self.has_more():
+            self.next_cursor = encode_cursor(results[-1][-cursor_columns:], self.cursor_position + len(results))
+        return [row[:-cursor_columns] for row in results]
 
     def execute_hogql_query(
         self,
@@ -67,11 +137,109 @@ class HogQLHasMorePaginator:
             ),
         )
         self.results = self.trim_results()
+        if self.cursor_order_by is not None:
+            cursor_columns = len(self.cursor_order_by)
+            if self.response.columns:
+                self.response.columns = self.response.columns[:-cursor_columns]
+            if self.response.types:
+                self.response.types = self.response.types[:-cursor_columns]
         return self.response
 
     def response_params(self):
-        return {
+        params = {
             "hasMore": self.has_more(),
             "limit": self.limit,
             "offset": self.offset,
         }
+        if self.cursor is not None and self.cursor_tiebreaker is not None:
+            params["nextCursor"] = self.next_cursor
+        return params
+
+
+def encode_cursor(values: List[Any], position: int) -> str:
+    """
+    Encodes the sort values of the last row of a page, and the number of rows up to and including it. When some value
+    can't be passed back into a query as a constant (e.g. a Decimal), only the position is kept, and the next page is
+    fetched by offset.
+    """
+
+    def encode_value(value: Any) -> Any:
+        if value is None or isinstance(value, (bool, int, float, str)):
+            return value
+        if isinstance(value, datetime):
+            return {"datetime": value.isoformat()}
+        if isinstance(value, date):
+            return {"date": value.isoformat()}
+        if isinstance(value, UUID):
+            return {"uuid": str(value)}
+        if isinstance(value, tuple):
+            return {"tuple": [encode_value(item) for item in value]}
+        if isinstance(value, list):
+            return {"array": [encode_value(item) for item in value]}
+        raise TypeError(f"Can't encode a {type(value).__name__} in a cursor")
+
+    cursor: dict[str, Any] = {"position": position}
+    try:
+        cursor["values"] = [encode_value(value) for value in values]
+    except TypeError:
+        pass
+    return base64.urlsafe_b64encode(json.dumps(cursor).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[List[Any]], int]:
+    def decode_value(value: Any) -> Any:
+        if isinstance(value, dict) and "datetime" in value:
+            return datetime.fromisoformat(value["datetime"])
+        if isinstance(value, dict) and "date" in value:
+            return date.fromisoformat(value["date"])
+        if isinstance(value, dict) and "uuid" in value:
+            return UUID(value["uuid"])
+        if isinstance(value, dict) and "tuple" in value:
+            return tuple(decode_value(item) for item in value["tuple"])
+        if isinstance(value, dict) and "array" in value:
+            return [decode_value(item) for item in value["array"]]
+        return value
+
+    try:
+        decoded = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        position = decoded["position"]
+        assert isinstance(position, int) and position >= 0
+        if "values" not in decoded:
+            return None, position
+        assert isinstance(decoded["values"], list)
+        return [decode_value(value) for value in decoded["values"]], position
+    except Exception:
+        raise QueryException("Invalid cursor")
+
+
+def _past_cursor_expr(order_by: List[ast.OrderExpr], values: List[Any]) -> ast.Expr:
+    """
+    Matches the rows sorted after the row with the given sort values, i.e. for `ORDER BY a DESC, b DESC`:
+    `a < a' OR (a = a' AND b < b')`. ClickHouse sorts NULLs last in either direction, so rows with a NULL sort
+    after any value, and nothing but another NULL sorts after a NULL.
+    """
+    exprs: List[ast.Expr] = []
+    for index, (order, value) in enumerate(zip(order_by, values)):
+        equal_before: List[ast.Expr] = [
+            _equals_expr(previous.expr, previous_value) for previous, previous_value in zip(order_by[:index], values)
+        ]
+        if value is None:
+            continue
+        past = ast.Or(
+            exprs=[
+                ast.CompareOperation(
+                    op=ast.CompareOperationOp.Lt if order.order == "DESC" else ast.CompareOperationOp.Gt,
+                    left=clone_expr(order.expr),
+                    right=ast.Constant(value=value),
+                ),
+                ast.Call(name="isNull", args=[clone_expr(order.expr)]),
+            ]
+        )
+        exprs.append(ast.And(exprs=[*equal_before, past]) if equal_before else past)
+    return ast.Or(exprs=exprs) if exprs else ast.Constant(value=False)
+
+
+def _equals_expr(expr: ast.Expr, value: Any) -> ast.Expr:
+    if value is None:
+        return ast.Call(name="isNull", args=[clone_expr(expr)])
+    return ast.CompareOperation(op=ast.CompareOperationOp.Eq, left=clone_expr(expr), right=ast.Constant(value=value))
@@ -1,11 +1,16 @@
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from uuid import UUID
+
 from posthog.hogql.constants import (
     LimitContext,
     get_default_limit_for_context,
     get_max_limit_for_context,
     MAX_SELECT_RETURNED_ROWS,
 )
+from posthog.hogql.errors import QueryException
 from posthog.hogql.parser import parse_select
-from posthog.hogql_queries.insights.paginators import HogQLHasMorePaginator
+from posthog.hogql_queries.insights.paginators import HogQLHasMorePaginator, decode_cursor, encode_cursor
 from posthog.hogql_queries.actors_query_runner import ActorsQueryRunner
 from posthog.models.utils import UUIDT
 from posthog.schema import (
@@ -145,6 +150,68 @@ class TestHogQLHasMorePaginator(ClickhouseTestMixin, APIBaseTest):
         self.assertEqual(params["offset"], 10)
         self.assertEqual(params["hasMore"], paginator.has_more())
 
+    def test_cursor_pagination(self):
+        emails = []
+        cursor = ""
+        for _ in range(5):
+            runner = self._create_runner(
+                ActorsQuery(select=["properties.email"], orderBy=["properties.email DESC"], limit=3, cursor=cursor)
+            )
+            response = runner.calculate()
+            emails.extend(row[0] for row in response.results)
+            self.assertEqual(response.columns, ["properties.email"])
+            cursor = response.nextCursor
+            if not response.hasMore:
+                break
+
+        self.assertIsNone(cursor)
+        self.assertEqual(emails, [f"jacob{index}@{self.random_uuid}.posthog.com" for index in reversed(range(10))])
+
+    def test_cursor_takes_precedence_over_offset(self):
+        response = self._create_runner(
+            ActorsQuery(select=["properties.email"], orderBy=["properties.email DESC"], limit=2, cursor="")
+        ).calculate()
+        runner = self._create_runner(
+            ActorsQuery(
+                select=["properties.email"],
+                orderBy=["properties.email DESC"],
+                limit=2,
+                offset=5,
+                cursor=response.nextCursor,
+            )
+        )
+        response = runner.calculate()
+        self.assertEqual(
+            response.results,
+            [[f"jacob7@{self.random_uuid}.posthog.com"], [f"jacob6@{self.random_uuid}.posthog.com"]],
+        )
+
+    def test_no_cursor_without_asking_for_one(self):
+        runner = self._create_runner(ActorsQuery(select=["properties.email"], limit=2))
+        response = runner.calculate()
+
+        self.assertTrue(response.hasMore)
+        self.assertIsNone(response.nextCursor)
+        self.assertNotIn("__cursor", response.hogql)
+
+    def test_cursor_round_trip(self):
+        values = [
+            datetime(2023, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+            date(2023, 1, 2),
+            UUID("018c0e0e-0000-0000-0000-000000000000"),
+            (1, "a", [None, 2.5]),
+            None,
+        ]
+        self.assertEqual(decode_cursor(encode_cursor(values, 10)), (values, 10))
+
+    def test_cursor_falls_back_to_offset_for_values_it_cant_encode(self):
+        self.assertEqual(decode_cursor(encode_cursor([Decimal("1.5"), "a"], 10)), (None, 10))
+
+    def test_invalid_cursor(self):
+        runner = self._create_runner(ActorsQuery(select=["properties.email"], cursor="not a cursor"))
+        with self.assertRaises(QueryException):
+            runner.calculate()
+
     def test_handle_none_response(self):
         """Test handling of None response."""
         paginator = HogQLHasMorePaginator(limit=5, offset=0)
@@ -1,7 +1,10 @@
 from abc import ABC, abstractmethod
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Any, Generic, List, Optional, Type, Dict, TypeVar, Union, Tuple, cast, TypeGuard
+from zoneinfo import ZoneInfo
 
+import structlog
+from dateutil.parser import isoparse
 from django.conf import settings
 from django.core.cache import cache
 from prometheus_client import Counter
@@ -52,6 +55,14 @@ QUERY_CACHE_HIT_COUNTER = Counter(
     labelnames=[LABEL_TEAM_ID, "cache_hit"],
 )
 
+QUERY_CACHE_REVALIDATE_COUNTER = Counter(
+    "posthog_query_cache_revalidate_total",
+    "When a stale query result was served and a background recalculation was enqueued.",
+    labelnames=[LABEL_TEAM_ID],
+)
+
+logger = structlog.get_logger(__name__)
+
 DataT = TypeVar("DataT")
 
 
@@ -75,6 +86,7 @@ class CachedQueryResponse(QueryResponse):
         extra="forbid",
     )
     is_cached: bool
+    is_stale: bool = False
     last_refresh: str
     next_allowed_client_refresh: str
     cache_key: str
@@ -286,7 +298,9 @@ class QueryRunner(ABC):
         # Due to the way schema.py is generated, we don't have a good inheritance story here.
         raise NotImplementedError()
 
-    def run(self, refresh_requested: Optional[bool] = None) -> CachedQueryResponse:
+    def run(
+        self, refresh_requested: Optional[bool] = None, stale_while_revalidate: Optional[bool] = None
+    ) -> CachedQueryResponse:
         cache_key = f"{self._cache_key()}_{self.limit_context or LimitContext.QUERY}"
         tag_queries(cache_key=cache_key)
 
@@ -296,6 +310,13 @@ class QueryRunner(ABC):
                 if not self._is_stale(cached_response):
                     QUERY_CACHE_HIT_COUNTER.labels(team_id=self.team.pk, cache_hit="hit").inc()
                     cached_response.is_cached = True
+                    cached_response.is_stale = False
+                    return cached_response
+                elif stale_while_revalidate and self._is_within_stale_grace_period(cached_response):
+                    QUERY_CACHE_HIT_COUNTER.labels(team_id=self.team.pk, cache_hit="stale_revalidate").inc()
+                    self._enqueue_revalidation(cache_key)
+                    cached_response.is_cached = True
+                    cached_response.is_stale = True
                     return cached_response
                 else:
                     QUERY_CACHE_HIT_COUNTER.labels(team_id=self.team.pk, cache_hit="stale").inc()
@@ -349,6 +370,41 @@ class QueryRunner(ABC):
     def _is_stale(self, cached_result_package):
         raise NotImplementedError()
 
+    def _is_within_stale_grace_period(self, cached_result_package) -> bool:
+        grace_period = timedelta(seconds=settings.QUERY_STALE_WHILE_REVALIDATE_GRACE_PERIOD_SECONDS)
+        if not grace_period:
+            return False
+        last_refresh = isoparse(cached_result_package.last_refresh)
+        return datetime.now(tz=ZoneInfo("UTC")) - last_refresh <= grace_period
+
+    def _enqueue_revalidation(self, cache_key: str) -> None:
+        """Recalculate the query in celery, so that the next request gets a fresh result.
+        The query id is derived from the cache key, so concurrent requests for the same stale
+        result don't enqueue the same recalculation twice while it is in flight."""
+        # local import to avoid circular reference
+        from posthog.clickhouse.client.execute_async import QueryStatusManager, enqueue_process_query_task
+
+        query_id = f"{cache_key}_revalidate"
+        try:
+            manager = QueryStatusManager(query_id, self.team.pk)
+            if manager.has_results():
+                query_status = manager.get_query_status()
+                if not query_status.complete and not query_status.error:
+                    # still being recalculated for an earlier request
+                    return
+            enqueue_process_query_task(
+                team_id=self.team.pk,
+                query_json=self.query.model_dump(mode="json"),
+                query_id=query_id,
+                # resubmit over the status of a recalculation that already finished
+                refresh_requested=True,
+                limit_context=self.limit_context,
+            )
+            QUERY_CACHE_REVALIDATE_COUNTER.labels(team_id=self.team.pk).inc()
+        except Exception as e:
+            # Serving the stale result is still better than failing the request
+            logger.error("query_cache_revalidation_enqueue_failed", cache_key=cache_key, error=str(e))
+
     @abstractmethod
     def _refresh_frequency(self):
         raise NotImplementedError()
@@ -5,7 +5,7 @@ from freezegun import freeze_time
 from posthog.hogql import ast
 from posthog.hogql.ast import CompareOperationOp
 from posthog.hogql_queries.events_query_runner import EventsQueryRunner
-from posthog.models import Person, Team
+from posthog.models import Element, Person, Team
 from posthog.models.organization import Organization
 from posthog.schema import (
     EventsQuery,
@@ -152,3 +152,98 @@ class TestEventsQueryRunner(ClickhouseTestMixin, APIBaseTest):
         right_expr = cast(ast.Constant, where_expr.right)
         self.assertEqual(right_expr.value, "%posthog.com%")
         self.assertEqual(where_expr.op, CompareOperationOp.NotILike)
+
+    def test_cursor_pagination(self):
+        self._create_boolean_field_test_events()
+        flush_persons_and_events()
+
+        with freeze_time("2020-01-11T12:01:00"):
+            pages = []
+            cursor = ""
+            for _ in range(4):
+                query = EventsQuery(
+                    after="-24h",
+                    kind="EventsQuery",
+                    select=["distinct_id", "timestamp"],
+                    limit=1,
+                    cursor=cursor,
+                )
+                response = EventsQueryRunner(query=query, team=self.team).calculate()
+                pages.append(response.results)
+                cursor = response.nextCursor
+                if not response.hasMore:
+                    break
+
+        self.assertIsNone(cursor)
+        self.assertEqual(len(pages), 4)
+        self.assertEqual([len(page[0]) for page in pages], [2, 2, 2, 2])
+        self.assertEqual(
+            sorted(page[0][0] for page in pages),
+            ["p_false", "p_notset", "p_null", "p_true"],
+        )
+        self.assertEqual([page[0][0] for page in pages][2:], ["p_false", "p_true"])
+
+    def test_star_and_person_columns_are_expanded(self):
+        with freeze_time("2020-01-11T12:00:00Z"):
+            _create_person(team_id=self.team.pk, distinct_ids=["p1"], properties={"name": "p1"})
+        for timestamp in ["2020-01-11T12:00:01Z", "2020-01-11T12:00:02Z"]:
+            _create_event(
+                team=self.team,
+                event="$autocapture",
+                distinct_id="p1",
+                timestamp=timestamp,
+                properties={"key": "value"},
+                elements=[Element(tag_name="button", text="Click me", order=0)],
+            )
+        _create_event(team=self.team, event="$pageview", distinct_id="unknown", timestamp="2020-01-11T12:00:03Z")
+        flush_persons_and_events()
+
+        with freeze_time("2020-01-11T12:01:00"):
+            query = EventsQuery(after="-24h", kind="EventsQuery", select=["*", "person"], orderBy=["timestamp ASC"])
+            response = EventsQueryRunner(query=query, team=self.team).calculate()
+
+        events = [row[0] for row in response.results]
+        self.assertEqual([event["event"] for event in events], ["$autocapture", "$autocapture", "$pageview"])
+        self.assertEqual(events[0]["properties"]["key"], "value")
+        self.assertEqual(events[0]["elements"][0]["tag_name"], "button")
+        self.assertEqual(events[0]["elements"], events[1]["elements"])
+        self.assertNotIn("elements", events[2])
+
+        persons = [row[1] for row in response.results]
+        self.assertEqual(persons[0]["properties"], {"name": "p1"})
+        self.assertEqual(persons[1]["distinct_id"], "p1")
+        self.assertEqual(persons[2], {"distinct_id": "unknown"})
+        self.assertIn("./post_processing/expand_asterisk/properties", [timing.k for timing in response.timings or []])
+
+        # Changing one response must not leak into the next
+        events[0]["elements"][0]["tag_name"] = "changed"
+        with freeze_time("2020-01-11T12:01:00"):
+            response = EventsQueryRunner(query=query, team=self.team).calculate()
+        self.assertEqual(response.results[0][0]["elements"][0]["tag_name"], "button")
+
+    def test_cursor_pagination_ordered_by_date(self):
+        self._create_boolean_field_test_events()
+        self._create_events(data=[("p_earlier", "2020-01-10T13:00:00Z", {})])
+        flush_persons_and_events()
+
+        with freeze_time("2020-01-11T12:01:00"):
+            distinct_ids = []
+            cursor = ""
+            for _ in range(5):
+                query = EventsQuery(
+                    after="-24h",
+                    kind="EventsQuery",
+                    select=["distinct_id", "toDate(timestamp)"],
+                    orderBy=["toDate(timestamp) ASC"],
+                    limit=2,
+                    cursor=cursor,
+                )
+                response = EventsQueryRunner(query=query, team=self.team).calculate()
+                distinct_ids.extend(row[0] for row in response.results)
+                cursor = response.nextCursor
+                if not response.hasMore:
+                    break
+
+        self.assertIsNone(cursor)
+        self.assertEqual(distinct_ids[0], "p_earlier")
+        self.assertEqual(sorted(distinct_ids[1:]), ["p_false", "p_notset", "p_null", "p_true"])
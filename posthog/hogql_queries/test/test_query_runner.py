@@ -1,17 +1,21 @@
 from datetime import datetime, timedelta
 from typing import Any, List, Literal, Optional
+from unittest import mock
 from zoneinfo import ZoneInfo
 
 from dateutil.parser import isoparse
+from django.test import override_settings
 from freezegun import freeze_time
 from pydantic import BaseModel
 
+from posthog.clickhouse.client.execute_async import QueryStatusManager
 from posthog.hogql_queries.query_runner import (
+    QUERY_CACHE_REVALIDATE_COUNTER,
     QueryResponse,
     QueryRunner,
 )
 from posthog.models.team.team import Team
-from posthog.schema import HogQLQueryModifiers, MaterializationMode, HogQLQuery
+from posthog.schema import HogQLQueryModifiers, MaterializationMode, HogQLQuery, QueryStatus
 from posthog.test.base import BaseTest
 
 
@@ -144,6 +148,56 @@ class TestQueryRunner(BaseTest):
             response = runner.run(refresh_requested=False)
             self.assertEqual(response.is_cached, False)
 
+    @override_settings(QUERY_STALE_WHILE_REVALIDATE_GRACE_PERIOD_SECONDS=60 * 60)
+    @mock.patch("posthog.clickhouse.client.execute_async.enqueue_process_query_task")
+    def test_cache_response_stale_while_revalidate(self, mock_enqueue):
+        TestQueryRunner = self.setup_test_query_runner_class()
+
+        runner = TestQueryRunner(query={"some_attr": "bla"}, team=self.team)
+
+        with freeze_time(datetime(2023, 2, 4, 13, 37, 42)):
+            response = runner.run(refresh_requested=False, stale_while_revalidate=True)
+            self.assertEqual(response.is_cached, False)
+            self.assertEqual(response.is_stale, False)
+
+        with freeze_time(datetime(2023, 2, 4, 13, 37 + 11, 42)):
+            # returns stale response and enqueues a recalculation if within the grace period
+            response = runner.run(refresh_requested=False, stale_while_revalidate=True)
+            self.assertEqual(response.is_cached, True)
+            self.assertEqual(response.is_stale, True)
+            self.assertEqual(response.last_refresh, "2023-02-04T13:37:42Z")
+            mock_enqueue.assert_called_once()
+            self.assertEqual(mock_enqueue.call_args.kwargs["query_id"], f"{response.cache_key}_revalidate")
+
+            # doesn't enqueue or count the recalculation again while it is in flight
+            QueryStatusManager(f"{response.cache_key}_revalidate", self.team.pk).store_query_status(
+                QueryStatus(id=f"{response.cache_key}_revalidate", team_id=self.team.pk)
+            )
+            revalidations = QUERY_CACHE_REVALIDATE_COUNTER.labels(team_id=self.team.pk)._value.get()
+            response = runner.run(refresh_requested=False, stale_while_revalidate=True)
+            self.assertEqual(response.is_stale, True)
+            mock_enqueue.assert_called_once()
+            self.assertEqual(QUERY_CACHE_REVALIDATE_COUNTER.labels(team_id=self.team.pk)._value.get(), revalidations)
+
+            # enqueues it again once the earlier recalculation has finished
+            QueryStatusManager(f"{response.cache_key}_revalidate", self.team.pk).store_query_status(
+                QueryStatus(id=f"{response.cache_key}_revalidate", team_id=self.team.pk, complete=True)
+            )
+            response = runner.run(refresh_requested=False, stale_while_revalidate=True)
+            self.assertEqual(response.is_stale, True)
+            self.assertEqual(mock_enqueue.call_count, 2)
+            self.assertEqual(mock_enqueue.call_args.kwargs["refresh_requested"], True)
+            self.assertEqual(
+                QUERY_CACHE_REVALIDATE_COUNTER.labels(team_id=self.team.pk)._value.get(), revalidations + 1
+            )
+
+        with freeze_time(datetime(2023, 2, 4, 15, 37, 42)):
+            # returns fresh response if stale beyond the grace period
+            response = runner.run(refresh_requested=False, stale_while_revalidate=True)
+            self.assertEqual(response.is_cached, False)
+            self.assertEqual(response.is_stale, False)
+            self.assertEqual(mock_enqueue.call_count, 2)
+
     def test_modifier_passthrough(self):
         try:
             from ee.clickhouse.materialized_columns.analyze import materialize
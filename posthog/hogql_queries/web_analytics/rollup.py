@@ -0,0 +1,179 @@
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+
+from posthog.hogql import ast
+from posthog.hogql.parser import parse_expr, parse_select
+from posthog.hogql.property import property_to_expr
+from posthog.hogql.visitor import CloningVisitor
+from posthog.models import Team
+from posthog.redis import get_client
+from posthog.schema import EventPropertyFilter, HogQLQueryModifiers, PersonsOnEventsMode
+
+"""
+Reading web analytics stats from the `web_analytics_hourly` rollup instead of from raw events.
+
+The rollup is filled hour by hour by the `rollup_web_analytics_hourly` task, which records the range of hours it has
+covered in redis. A query can use the rollup when its date range starts on an hour boundary within that range, and
+when it only filters on properties the rollup has a column for. Whatever part of the date range isn't covered yet
+(usually the last hour or so) is read from the raw events and merged in. The results match the raw events, except
+for events that arrived after their hour was rolled up.
+"""
+
+ROLLUP_COVERED_FROM_KEY = "web_analytics_rollup_covered_from"
+ROLLUP_COVERED_UNTIL_KEY = "web_analytics_rollup_covered_until"
+
+# Event properties that have a column in the rollup
+ROLLUP_PROPERTY_COLUMNS: Dict[str, str] = {
+    "$pathname": "pathname",
+    "$device_type": "device_type",
+    "$geoip_country_code": "country_code",
+}
+
+
+def get_rollup_coverage() -> Optional[Tuple[datetime, datetime]]:
+    covered_from, covered_until = get_client().mget([ROLLUP_COVERED_FROM_KEY, ROLLUP_COVERED_UNTIL_KEY])
+    if not covered_from or not covered_until:
+        return None
+    return _parse_hour(covered_from), _parse_hour(covered_until)
+
+
+def set_rollup_coverage(covered_from: datetime, covered_until: datetime) -> None:
+    get_client().mset(
+        {
+            ROLLUP_COVERED_FROM_KEY: covered_from.isoformat(),
+            ROLLUP_COVERED_UNTIL_KEY: covered_until.isoformat(),
+        }
+    )
+
+
+def start_of_hour(value: datetime) -> datetime:
+    return value.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def _parse_hour(value: bytes | str) -> datetime:
+    return datetime.fromisoformat(value.decode() if isinstance(value, bytes) else value)
+
+
+def _is_start_of_hour(value: datetime) -> bool:
+    # the boundary has to be an hour in UTC as well as in the team's timezone, so that events are bucketed by the
+    # raw events part of the query into the same hours as the rollup buckets them
+    utc_offset = value.utcoffset() or timedelta()
+    return value.minute == 0 and value.second == 0 and utc_offset.total_seconds() % 3600 == 0
+
+
+class _RollupColumnSwapper(CloningVisitor):
+    def visit_field(self, node: ast.Field):
+        if len(node.chain) == 2 and node.chain[0] == "properties" and node.chain[1] in ROLLUP_PROPERTY_COLUMNS:
+            return ast.Field(chain=[ROLLUP_PROPERTY_COLUMNS[str(node.chain[1])]])
+        return super().visit_field(node)
+
+
+class WebAnalyticsRollup:
+    """
+    Builds a subquery with the columns `hour_start`, `pathname`, `device_type`, `country_code`, `pageviews`, and the uniq
+    states `visitors` and `sessions`, for all $pageview events between `date_from` and `date_to`.
+    Aggregate it with `sum(pageviews)`, `uniqMerge(visitors)` and `uniqMerge(sessions)`.
+    """
+
+    def __init__(
+        self,
+        team: Team,
+        modifiers: HogQLQueryModifiers,
+        properties: List,
+        test_account_filters: List,
+        coverage: Optional[Tuple[datetime, datetime]] = None,
+    ):
+        self.team = team
+        self.modifiers = modifiers
+        self.properties = properties
+        self.test_account_filters = test_account_filters
+        self._coverage = coverage
+
+    @property
+    def coverage(self) -> Optional[Tuple[datetime, datetime]]:
+        if self._coverage is None:
+            self._coverage = get_rollup_coverage()
+        return self._coverage
+
+    def can_use(self, date_from: datetime, boundaries: Optional[List[datetime]] = None) -> bool:
+        if not settings.WEB_ANALYTICS_ROLLUP_ENABLED:
+            return False
+        # the rollup counts visitors by the person_id on the events
+        if self.modifiers.personsOnEventsMode != PersonsOnEventsMode.v1_enabled:
+            return False
+        if self.test_account_filters:
+            return False
+        if not all(isinstance(p, EventPropertyFilter) and p.key in ROLLUP_PROPERTY_COLUMNS for p in self.properties):
+            return False
+        if not all(_is_start_of_hour(boundary) for boundary in [date_from, *(boundaries or [])]):
+            return False
+
+        coverage = self.coverage
+        if coverage is None:
+            return False
+        covered_from, covered_until = coverage
+        return covered_from <= date_from < covered_until
+
+    def to_query(self, date_from: datetime, date_to: datetime) -> ast.SelectUnionQuery:
+        assert self.coverage is not None
+        _, covered_until = self.coverage
+        # the raw events take over from the last full hour that is covered by the rollup
+        split = max(date_from, min(covered_until, start_of_hour(date_to)))
+
+        rollup_query = parse_select(
+            """
+SELECT
+    hour AS hour_start,
+    pathname,
+    device_type,
+    country_code,
+    _toInt64(pageviews) AS pageviews,
+    visitors,
+    sessions
+FROM web_analytics_hourly FINAL
+WHERE hour >= {date_from} AND hour < {split} AND {properties}
+            """,
+            placeholders={
+                "date_from": self._to_hogql(date_from),
+                "split": self._to_hogql(split),
+                "properties": _RollupColumnSwapper().visit(property_to_expr(self.properties, self.team)),
+            },
+        )
+        events_query = parse_select(
+            """
+SELECT
+    toStartOfHour(timestamp) AS hour_start,
+    properties.$pathname AS pathname,
+    properties.$device_type AS device_type,
+    properties.$geoip_country_code AS country_code,
+    _toInt64(count()) AS pageviews,
+    uniqState(events.person_id) AS visitors,
+    uniqState(events.properties.$session_id) AS sessions
+FROM events
+WHERE
+    event = '$pageview' AND
+    timestamp >= {split} AND
+    timestamp < {date_to} AND
+    {properties}
+GROUP BY hour_start, pathname, device_type, country_code
+            """,
+            placeholders={
+                "split": self._to_hogql(split),
+                "date_to": self._to_hogql(date_to),
+                "properties": property_to_expr(self.properties, self.team),
+            },
+        )
+        assert isinstance(rollup_query, ast.SelectQuery)
+        assert isinstance(events_query, ast.SelectQuery)
+        return ast.SelectUnionQuery(select_queries=[rollup_query, events_query])
+
+    def _to_hogql(self, value: datetime) -> ast.Expr:
+        # same as the "assumeNotNull(toDateTime(...))" from QueryDateRange, which is parsed in the team's timezone
+        return parse_expr(
+            "assumeNotNull(toDateTime({value}))",
+            placeholders={
+                "value": ast.Constant(value=value.astimezone(self.team.timezone_info).strftime("%Y-%m-%d %H:%M:%S"))
+            },
+        )
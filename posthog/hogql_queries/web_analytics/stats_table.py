@@ -1,3 +1,5 @@
+from typing import Optional
+
 from posthog.hogql import ast
 from posthog.hogql.constants import LimitContext
 from posthog.hogql.parser import parse_select, parse_expr
@@ -11,6 +13,7 @@ from posthog.hogql_queries.web_analytics.web_analytics_query_runner import (
     WebAnalyticsQueryRunner,
     map_columns,
 )
+from posthog.models.filters.mixins.utils import cached_property
 from posthog.schema import (
     WebStatsTableQuery,
     WebStatsBreakdown,
@@ -43,6 +46,9 @@ class WebStatsTableQueryRunner(WebAnalyticsQueryRunner):
             )
 
     def _counts_subquery(self):
+        if self._counts_from_rollup:
+            return self._counts_rollup_subquery()
+
         with self.timings.measure("counts_query"):
             return parse_select(
                 COUNTS_CTE,
@@ -54,6 +60,29 @@ class WebStatsTableQueryRunner(WebAnalyticsQueryRunner):
                 },
             )
 
+    def _counts_rollup_subquery(self):
+        with self.timings.measure("counts_rollup_query"):
+            return parse_select(
+                """
+SELECT
+    {breakdown_by} AS breakdown_value,
+    sum(pageviews) as total_pageviews,
+    uniqMerge(visitors) as unique_visitors
+FROM
+    {rollup}
+GROUP BY breakdown_value
+                """,
+                timings=self.timings,
+                placeholders={
+                    "breakdown_by": self.rollup_breakdown(),
+                    "rollup": self._rollup.to_query(self.query_date_range.date_from(), self.query_date_range.date_to()),
+                },
+            )
+
+    @cached_property
+    def _counts_from_rollup(self) -> bool:
+        return self.rollup_breakdown() is not None and self._rollup.can_use(self.query_date_range.date_from())
+
     def _scroll_depth_subquery(self):
         with self.timings.measure("scroll_depth_query"):
             return parse_select(
@@ -170,12 +199,17 @@ ORDER BY
 
         assert results is not None
 
-        results_mapped = map_columns(
-            results,
-            {
-                1: self._unsample,  # views
-                2: self._unsample,  # visitors
-            },
+        results_mapped = (
+            results
+            # the rollup isn't sampled
+            if self._counts_from_rollup
+            else map_columns(
+                results,
+                {
+                    1: self._unsample,  # views
+                    2: self._unsample,  # visitors
+                },
+            )
         )
 
         return WebStatsTableQueryResponse(
@@ -224,6 +258,17 @@ ORDER BY
             case _:
                 raise NotImplementedError("Breakdown not implemented")
 
+    def rollup_breakdown(self) -> Optional[ast.Expr]:
+        match self.query.breakdownBy:
+            case WebStatsBreakdown.Page:
+                return self._apply_path_cleaning(ast.Field(chain=["pathname"]))
+            case WebStatsBreakdown.DeviceType:
+                return ast.Field(chain=["device_type"])
+            case WebStatsBreakdown.Country:
+                return ast.Field(chain=["country_code"])
+            case _:
+                return None
+
     def bounce_breakdown(self):
         match self.query.breakdownBy:
             case WebStatsBreakdown.Page:
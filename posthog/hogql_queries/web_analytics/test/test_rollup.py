@@ -0,0 +1,154 @@
+from datetime import datetime, timezone
+
+from django.test import override_settings
+from freezegun import freeze_time
+
+from posthog.hogql_queries.web_analytics.rollup import (
+    ROLLUP_COVERED_FROM_KEY,
+    ROLLUP_COVERED_UNTIL_KEY,
+    get_rollup_coverage,
+)
+from posthog.hogql_queries.web_analytics.stats_table import WebStatsTableQueryRunner
+from posthog.hogql_queries.web_analytics.web_overview import WebOverviewQueryRunner
+from posthog.redis import get_client
+from posthog.schema import (
+    DateRange,
+    EventPropertyFilter,
+    HogQLQueryModifiers,
+    PersonPropertyFilter,
+    PersonsOnEventsMode,
+    PropertyOperator,
+    WebOverviewQuery,
+    WebStatsBreakdown,
+    WebStatsTableQuery,
+)
+from posthog.tasks.web_analytics_rollup import rollup_web_analytics_hourly
+from posthog.test.base import (
+    APIBaseTest,
+    ClickhouseTestMixin,
+    _create_event,
+    _create_person,
+    flush_persons_and_events,
+)
+
+MODIFIERS = HogQLQueryModifiers(personsOnEventsMode=PersonsOnEventsMode.v1_enabled)
+
+
+@override_settings(
+    WEB_ANALYTICS_ROLLUP_LAG_MINUTES=0,
+    WEB_ANALYTICS_ROLLUP_BACKFILL_DAYS=30,
+    WEB_ANALYTICS_ROLLUP_MAX_HOURS_PER_RUN=24 * 30,
+)
+@freeze_time("2023-12-15T12:10:00Z")
+class TestWebAnalyticsRollup(ClickhouseTestMixin, APIBaseTest):
+    def setUp(self):
+        super().setUp()
+        get_client().delete(ROLLUP_COVERED_FROM_KEY, ROLLUP_COVERED_UNTIL_KEY)
+
+        for distinct_id, events in [
+            ("p1", [("2023-12-02T10:00:00Z", "s1a", "/"), ("2023-12-03T11:00:00Z", "s1a", "/login")]),
+            ("p2", [("2023-12-10T09:30:00Z", "s2", "/"), ("2023-12-12T14:00:00Z", "s2b", "/docs")]),
+            ("p3", [("2023-12-11T08:00:00Z", "s3", "/"), ("2023-12-15T12:05:00Z", "s3", "/docs")]),
+        ]:
+            person = _create_person(team_id=self.team.pk, distinct_ids=[distinct_id], properties={})
+            for timestamp, session_id, pathname in events:
+                _create_event(
+                    team=self.team,
+                    event="$pageview",
+                    distinct_id=distinct_id,
+                    person_id=person.uuid,
+                    timestamp=timestamp,
+                    properties={"$session_id": session_id, "$pathname": pathname, "$device_type": "Desktop"},
+                )
+        flush_persons_and_events()
+
+    def _run_overview(self, compare=True, properties=None):
+        query = WebOverviewQuery(
+            dateRange=DateRange(date_from="2023-12-08", date_to="2023-12-15"),
+            properties=properties or [],
+            compare=compare,
+        )
+        runner = WebOverviewQueryRunner(team=self.team, query=query, modifiers=MODIFIERS)
+        return runner, runner.calculate()
+
+    def _run_stats_table(self, breakdown_by=WebStatsBreakdown.Page):
+        query = WebStatsTableQuery(
+            dateRange=DateRange(date_from="2023-12-01", date_to="2023-12-15"),
+            properties=[],
+            breakdownBy=breakdown_by,
+        )
+        runner = WebStatsTableQueryRunner(team=self.team, query=query, modifiers=MODIFIERS)
+        return runner, runner.calculate()
+
+    def test_rollup_records_the_covered_hours(self):
+        hours = rollup_web_analytics_hourly()
+
+        assert hours == 30 * 24
+        assert get_rollup_coverage() == (
+            datetime(2023, 11, 15, 12, tzinfo=timezone.utc),
+            datetime(2023, 12, 15, 12, tzinfo=timezone.utc),
+        )
+        assert rollup_web_analytics_hourly() == 0
+
+    def test_rolling_up_the_same_hours_again_replaces_them(self):
+        _, expected = self._run_overview()
+        rollup_web_analytics_hourly()
+        get_client().delete(ROLLUP_COVERED_FROM_KEY, ROLLUP_COVERED_UNTIL_KEY)
+        rollup_web_analytics_hourly()
+
+        with override_settings(WEB_ANALYTICS_ROLLUP_ENABLED=True):
+            runner, results = self._run_overview()
+
+        assert runner._pages_from_rollup
+        assert [r.value for r in results.results[:3]] == [r.value for r in expected.results[:3]]
+        assert [r.previous for r in results.results[:3]] == [r.previous for r in expected.results[:3]]
+
+    def test_overview_from_rollup_matches_events(self):
+        _, expected = self._run_overview()
+        rollup_web_analytics_hourly()
+
+        with override_settings(WEB_ANALYTICS_ROLLUP_ENABLED=True):
+            runner, results = self._run_overview()
+
+        assert runner._pages_from_rollup
+        assert [r.value for r in results.results[:3]] == [r.value for r in expected.results[:3]]
+        assert [r.previous for r in results.results[:3]] == [r.previous for r in expected.results[:3]]
+
+    def test_overview_from_rollup_with_pathname_filter(self):
+        properties = [EventPropertyFilter(key="$pathname", value="/docs", operator=PropertyOperator.exact)]
+        _, expected = self._run_overview(compare=False, properties=properties)
+        rollup_web_analytics_hourly()
+
+        with override_settings(WEB_ANALYTICS_ROLLUP_ENABLED=True):
+            runner, results = self._run_overview(compare=False, properties=properties)
+
+        assert runner._pages_from_rollup
+        assert [r.value for r in results.results[:3]] == [2, 2, 2]
+        assert [r.value for r in results.results[:3]] == [r.value for r in expected.results[:3]]
+
+    def test_overview_falls_back_to_events_for_unsupported_filters(self):
+        rollup_web_analytics_hourly()
+
+        with override_settings(WEB_ANALYTICS_ROLLUP_ENABLED=True):
+            runner, _ = self._run_overview(
+                properties=[PersonPropertyFilter(key="name", value="p1", operator=PropertyOperator.exact)]
+            )
+
+        assert not runner._pages_from_rollup
+
+    def test_overview_falls_back_to_events_before_the_rollup_ran(self):
+        with override_settings(WEB_ANALYTICS_ROLLUP_ENABLED=True):
+            runner, _ = self._run_overview()
+
+        assert not runner._pages_from_rollup
+
+    def test_stats_table_from_rollup_matches_events(self):
+        for breakdown_by in (WebStatsBreakdown.Page, WebStatsBreakdown.DeviceType):
+            _, expected = self._run_stats_table(breakdown_by)
+            rollup_web_analytics_hourly()
+
+            with override_settings(WEB_ANALYTICS_ROLLUP_ENABLED=True):
+                runner, results = self._run_stats_table(breakdown_by)
+
+            assert runner._counts_from_rollup
+            assert results.results == expected.results
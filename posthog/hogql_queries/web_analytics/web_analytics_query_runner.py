@@ -16,6 +16,7 @@ from posthog.hogql.property import property_to_expr
 from posthog.hogql.query import execute_hogql_query
 from posthog.hogql_queries.query_runner import QueryRunner
 from posthog.hogql_queries.utils.query_date_range import QueryDateRange
+from posthog.hogql_queries.web_analytics.rollup import WebAnalyticsRollup
 from posthog.models.filters.mixins.utils import cached_property
 from posthog.schema import (
     EventPropertyFilter,
@@ -124,6 +125,15 @@ class WebAnalyticsQueryRunner(QueryRunner, ABC):
             self.team,
         )
 
+    @cached_property
+    def _rollup(self) -> WebAnalyticsRollup:
+        return WebAnalyticsRollup(
+            team=self.team,
+            modifiers=self.modifiers,
+            properties=self.query.properties,
+            test_account_filters=self._test_account_filters,
+        )
+
     @cached_property
     def _test_account_filters(self):
         if isinstance(self.team.test_account_filters, list) and len(self.team.test_account_filters) > 0:
@@ -19,60 +19,10 @@ class WebOverviewQueryRunner(WebAnalyticsQueryRunner):
     query_type = WebOverviewQuery
 
     def to_query(self) -> ast.SelectQuery | ast.SelectUnionQuery:
-        with self.timings.measure("date_expr"):
-            start = self.query_date_range.previous_period_date_from_as_hogql()
-            mid = self.query_date_range.date_from_as_hogql()
-            end = self.query_date_range.date_to_as_hogql()
         with self.timings.measure("overview_stats_query"):
             if self.query.compare:
                 return parse_select(
                     """
-WITH pages_query AS (
-        SELECT
-        uniq(if(timestamp >= {mid} AND timestamp < {end}, events.person_id, NULL)) AS unique_users,
-        uniq(if(timestamp >= {start} AND timestamp < {mid}, events.person_id, NULL)) AS previous_unique_users,
-        countIf(timestamp >= {mid} AND timestamp < {end}) AS current_pageviews,
-        countIf(timestamp >= {start} AND timestamp < {mid}) AS previous_pageviews,
-        uniq(if(timestamp >= {mid} AND timestamp < {end}, events.properties.$session_id, NULL)) AS unique_sessions,
-        uniq(if(timestamp >= {start} AND timestamp < {mid}, events.properties.$session_id, NULL)) AS previous_unique_sessions
-    FROM
-        events
-    SAMPLE {sample_rate}
-    WHERE
-        event = '$pageview' AND
-        timestamp >= {start} AND
-        timestamp < {end} AND
-        {event_properties}
-    ),
-sessions_query AS (
-    SELECT
-        avg(if(min_timestamp >= {mid}, duration_s, NULL)) AS avg_duration_s,
-        avg(if(min_timestamp < {mid}, duration_s, NULL)) AS prev_avg_duration_s,
-        avg(if(min_timestamp >= {mid}, is_bounce, NULL)) AS bounce_rate,
-        avg(if(min_timestamp < {mid}, is_bounce, NULL)) AS prev_bounce_rate
-    FROM (SELECT
-            events.properties.`$session_id` AS session_id,
-            min(events.timestamp) AS min_timestamp,
-            max(events.timestamp) AS max_timestamp,
-            dateDiff('second', min_timestamp, max_timestamp) AS duration_s,
-            countIf(events.event == '$pageview') AS num_pageviews,
-            countIf(events.event == '$autocapture') AS num_autocaptures,
-
-            -- definition of a GA4 bounce from here https://support.google.com/analytics/answer/12195621?hl=en
-            (num_autocaptures == 0 AND num_pageviews <= 1 AND duration_s < 10) AS is_bounce
-        FROM
-            events
-        SAMPLE {sample_rate}
-        WHERE
-            session_id IS NOT NULL
-            AND (events.event == '$pageview' OR events.event == '$autocapture' OR events.event == '$pageleave')
-            AND ({session_where})
-        GROUP BY
-            events.properties.`$session_id`
-        HAVING
-            ({session_having})
-        )
-    )
 SELECT
     unique_users,
     previous_unique_users,
@@ -84,64 +34,18 @@ SELECT
     prev_avg_duration_s,
     bounce_rate,
     prev_bounce_rate
-FROM pages_query
-CROSS JOIN sessions_query
+FROM {pages_query} AS pages_query
+CROSS JOIN {sessions_query} AS sessions_query
                 """,
                     timings=self.timings,
                     placeholders={
-                        "start": start,
-                        "mid": mid,
-                        "end": end,
-                        "event_properties": self.event_properties(),
-                        "session_where": self.session_where(include_previous_period=True),
-                        "session_having": self.session_having(include_previous_period=True),
-                        "sample_rate": self._sample_ratio,
+                        "pages_query": self.pages_query(),
+                        "sessions_query": self.sessions_query(),
                     },
                 )
             else:
                 return parse_select(
                     """
-WITH pages_query AS (
-        SELECT
-        uniq(events.person_id) AS unique_users,
-        count() AS current_pageviews,
-        uniq(events.properties.$session_id) AS unique_sessions
-    FROM
-        events
-    SAMPLE {sample_rate}
-    WHERE
-        event = '$pageview' AND
-        timestamp >= {mid} AND
-        timestamp < {end} AND
-        {event_properties}
-    ),
-sessions_query AS (
-    SELECT
-        avg(duration_s) AS avg_duration_s,
-        avg(is_bounce) AS bounce_rate
-    FROM (SELECT
-            events.properties.`$session_id` AS session_id,
-            min(events.timestamp) AS min_timestamp,
-            max(events.timestamp) AS max_timestamp,
-            dateDiff('second', min_timestamp, max_timestamp) AS duration_s,
-            countIf(events.event == '$pageview') AS num_pageviews,
-            countIf(events.event == '$autocapture') AS num_autocaptures,
-
-            -- definition of a GA4 bounce from here https://support.google.com/analytics/answer/12195621?hl=en
-            (num_autocaptures == 0 AND num_pageviews <= 1 AND duration_s < 10) AS is_bounce
-        FROM
-            events
-        SAMPLE {sample_rate}
-        WHERE
-            session_id IS NOT NULL
-            AND (events.event == '$pageview' OR events.event == '$autocapture' OR events.event == '$pageleave')
-            AND ({session_where})
-        GROUP BY
-            events.properties.`$session_id`
-        HAVING
-            ({session_having})
-        )
-    )
 SELECT
     unique_users,
     NULL as previous_unique_users,
@@ -153,20 +57,209 @@ SELECT
     NULL as prev_avg_duration_s,
     bounce_rate,
     NULL as prev_bounce_rate
-FROM pages_query
-CROSS JOIN sessions_query
+FROM {pages_query} AS pages_query
+CROSS JOIN {sessions_query} AS sessions_query
                 """,
+                    timings=self.timings,
+                    placeholders={
+                        "pages_query": self.pages_query(),
+                        "sessions_query": self.sessions_query(),
+                    },
+                )
+
+    def pages_query(self) -> ast.SelectQuery:
+        if self._pages_from_rollup:
+            return self._pages_rollup_query()
+
+        with self.timings.measure("date_expr"):
+            start = self.query_date_range.previous_period_date_from_as_hogql()
+            mid = self.query_date_range.date_from_as_hogql()
+            end = self.query_date_range.date_to_as_hogql()
+
+        with self.timings.measure("pages_query"):
+            if self.query.compare:
+                query = parse_select(
+                    """
+SELECT
+    uniq(if(timestamp >= {mid} AND timestamp < {end}, events.person_id, NULL)) AS unique_users,
+    uniq(if(timestamp >= {start} AND timestamp < {mid}, events.person_id, NULL)) AS previous_unique_users,
+    countIf(timestamp >= {mid} AND timestamp < {end}) AS current_pageviews,
+    countIf(timestamp >= {start} AND timestamp < {mid}) AS previous_pageviews,
+    uniq(if(timestamp >= {mid} AND timestamp < {end}, events.properties.$session_id, NULL)) AS unique_sessions,
+    uniq(if(timestamp >= {start} AND timestamp < {mid}, events.properties.$session_id, NULL)) AS previous_unique_sessions
+FROM
+    events
+SAMPLE {sample_rate}
+WHERE
+    event = '$pageview' AND
+    timestamp >= {start} AND
+    timestamp < {end} AND
+    {event_properties}
+                    """,
                     timings=self.timings,
                     placeholders={
                         "start": start,
                         "mid": mid,
                         "end": end,
                         "event_properties": self.event_properties(),
+                        "sample_rate": self._sample_ratio,
+                    },
+                )
+            else:
+                query = parse_select(
+                    """
+SELECT
+    uniq(events.person_id) AS unique_users,
+    count() AS current_pageviews,
+    uniq(events.properties.$session_id) AS unique_sessions
+FROM
+    events
+SAMPLE {sample_rate}
+WHERE
+    event = '$pageview' AND
+    timestamp >= {mid} AND
+    timestamp < {end} AND
+    {event_properties}
+                    """,
+                    timings=self.timings,
+                    placeholders={
+                        "mid": mid,
+                        "end": end,
+                        "event_properties": self.event_properties(),
+                        "sample_rate": self._sample_ratio,
+                    },
+                )
+        assert isinstance(query, ast.SelectQuery)
+        return query
+
+    def _pages_rollup_query(self) -> ast.SelectQuery:
+        with self.timings.measure("pages_rollup_query"):
+            if self.query.compare:
+                query = parse_select(
+                    """
+SELECT
+    uniqMergeIf(visitors, hour_start >= {mid}) AS unique_users,
+    uniqMergeIf(visitors, hour_start < {mid}) AS previous_unique_users,
+    sumIf(pageviews, hour_start >= {mid}) AS current_pageviews,
+    sumIf(pageviews, hour_start < {mid}) AS previous_pageviews,
+    uniqMergeIf(sessions, hour_start >= {mid}) AS unique_sessions,
+    uniqMergeIf(sessions, hour_start < {mid}) AS previous_unique_sessions
+FROM {rollup}
+                    """,
+                    timings=self.timings,
+                    placeholders={
+                        "mid": self.query_date_range.date_from_as_hogql(),
+                        "rollup": self._rollup.to_query(
+                            self.query_date_range.previous_period_date_from, self.query_date_range.date_to()
+                        ),
+                    },
+                )
+            else:
+                query = parse_select(
+                    """
+SELECT
+    uniqMerge(visitors) AS unique_users,
+    sum(pageviews) AS current_pageviews,
+    uniqMerge(sessions) AS unique_sessions
+FROM {rollup}
+                    """,
+                    timings=self.timings,
+                    placeholders={
+                        "rollup": self._rollup.to_query(
+                            self.query_date_range.date_from(), self.query_date_range.date_to()
+                        ),
+                    },
+                )
+        assert isinstance(query, ast.SelectQuery)
+        return query
+
+    def sessions_query(self) -> ast.SelectQuery:
+        with self.timings.measure("sessions_query"):
+            if self.query.compare:
+                query = parse_select(
+                    """
+SELECT
+    avg(if(min_timestamp >= {mid}, duration_s, NULL)) AS avg_duration_s,
+    avg(if(min_timestamp < {mid}, duration_s, NULL)) AS prev_avg_duration_s,
+    avg(if(min_timestamp >= {mid}, is_bounce, NULL)) AS bounce_rate,
+    avg(if(min_timestamp < {mid}, is_bounce, NULL)) AS prev_bounce_rate
+FROM (SELECT
+        events.properties.`$session_id` AS session_id,
+        min(events.timestamp) AS min_timestamp,
+        max(events.timestamp) AS max_timestamp,
+        dateDiff('second', min_timestamp, max_timestamp) AS duration_s,
+        countIf(events.event == '$pageview') AS num_pageviews,
+        countIf(events.event == '$autocapture') AS num_autocaptures,
+
+        -- definition of a GA4 bounce from here https://support.google.com/analytics/answer/12195621?hl=en
+        (num_autocaptures == 0 AND num_pageviews <= 1 AND duration_s < 10) AS is_bounce
+    FROM
+        events
+    SAMPLE {sample_rate}
+    WHERE
+        session_id IS NOT NULL
+        AND (events.event == '$pageview' OR events.event == '$autocapture' OR events.event == '$pageleave')
+        AND ({session_where})
+    GROUP BY
+        events.properties.`$session_id`
+    HAVING
+        ({session_having})
+    )
+                    """,
+                    timings=self.timings,
+                    placeholders={
+                        "mid": self.query_date_range.date_from_as_hogql(),
+                        "session_where": self.session_where(include_previous_period=True),
+                        "session_having": self.session_having(include_previous_period=True),
+                        "sample_rate": self._sample_ratio,
+                    },
+                )
+            else:
+                query = parse_select(
+                    """
+SELECT
+    avg(duration_s) AS avg_duration_s,
+    avg(is_bounce) AS bounce_rate
+FROM (SELECT
+        events.properties.`$session_id` AS session_id,
+        min(events.timestamp) AS min_timestamp,
+        max(events.timestamp) AS max_timestamp,
+        dateDiff('second', min_timestamp, max_timestamp) AS duration_s,
+        countIf(events.event == '$pageview') AS num_pageviews,
+        countIf(events.event == '$autocapture') AS num_autocaptures,
+
+        -- definition of a GA4 bounce from here https://support.google.com/analytics/answer/12195621?hl=en
+        (num_autocaptures == 0 AND num_pageviews <= 1 AND duration_s < 10) AS is_bounce
+    FROM
+        events
+    SAMPLE {sample_rate}
+    WHERE
+        session_id IS NOT NULL
+        AND (events.event == '$pageview' OR events.event == '$autocapture' OR events.event == '$pageleave')
+        AND ({session_where})
+    GROUP BY
+        events.properties.`$session_id`
+    HAVING
+        ({session_having})
+    )
+                    """,
+                    timings=self.timings,
+                    placeholders={
                         "session_where": self.session_where(include_previous_period=False),
                         "session_having": self.session_having(include_previous_period=False),
                         "sample_rate": self._sample_ratio,
                     },
                 )
+        assert isinstance(query, ast.SelectQuery)
+        return query
+
+    @cached_property
+    def _pages_from_rollup(self) -> bool:
+        if self.query.compare:
+            return self._rollup.can_use(
+                self.query_date_range.previous_period_date_from, boundaries=[self.query_date_range.date_from()]
+            )
+        return self._rollup.can_use(self.query_date_range.date_from())
 
     def calculate(self):
         response = execute_hogql_query(
@@ -179,12 +272,14 @@ CROSS JOIN sessions_query
         assert response.results
 
         row = response.results[0]
+        # the rollup isn't sampled, so only the sessions part of the query needs to be unsampled
+        unsample_pages = (lambda n: n) if self._pages_from_rollup else self._unsample
 
         return WebOverviewQueryResponse(
             results=[
-                to_data("visitors", "unit", self._unsample(row[0]), self._unsample(row[1])),
-                to_data("views", "unit", self._unsample(row[2]), self._unsample(row[3])),
-                to_data("sessions", "unit", self._unsample(row[4]), self._unsample(row[5])),
+                to_data("visitors", "unit", unsample_pages(row[0]), unsample_pages(row[1])),
+                to_data("views", "unit", unsample_pages(row[2]), unsample_pages(row[3])),
+                to_data("sessions", "unit", unsample_pages(row[4]), unsample_pages(row[5])),
                 to_data("session duration", "duration_s", row[6], row[7]),
                 to_data("bounce rate", "percentage", row[8], row[9], is_increase_bad=True),
             ],
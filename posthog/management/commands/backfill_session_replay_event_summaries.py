@@ -0,0 +1,46 @@
+import logging
+from datetime import timedelta
+
+import structlog
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from posthog.clickhouse.client.execute import sync_execute
+from posthog.models.team.team import Team
+from posthog.session_recordings.sql.session_replay_event_summaries_sql import (
+    BACKFILL_SESSION_REPLAY_EVENT_SUMMARIES_SQL,
+)
+
+logger = structlog.get_logger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Backfill session_replay_event_summaries from events ingested before its materialized view existed."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--team-id", required=True, type=int, help="team to backfill for")
+        parser.add_argument("--days", default=30, type=int, help="how many days of events to summarise")
+        parser.add_argument(
+            "--live-run", action="store_true", help="actually execute INSERT queries (default is dry-run)"
+        )
+
+    def handle(self, *, live_run: bool, team_id: int, days: int, **options):
+        logger.setLevel(logging.INFO)
+
+        if not Team.objects.filter(id=team_id).exists():
+            raise CommandError(f"Team with id={team_id!r} does not exist")
+
+        # one day at a time, so that each insert only has to hold a day of sessions in memory
+        # summarising is idempotent, so it is fine to overlap with what the materialized view has already written
+        date_to = timezone.now()
+        for _ in range(days):
+            date_from = date_to - timedelta(days=1)
+            if live_run:
+                sync_execute(
+                    BACKFILL_SESSION_REPLAY_EVENT_SUMMARIES_SQL(),
+                    {"team_id": team_id, "date_from": date_from, "date_to": date_to},
+                )
+                logger.info("Summarised events", team_id=team_id, date_from=date_from, date_to=date_to)
+            else:
+                logger.info("Would have summarised events", team_id=team_id, date_from=date_from, date_to=date_to)
+            date_to = date_from
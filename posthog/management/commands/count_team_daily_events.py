@@ -0,0 +1,35 @@
+import logging
+from datetime import timedelta
+
+import structlog
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from posthog.tasks.team_daily_event_counts import count_team_daily_events
+
+logger = structlog.get_logger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Count the events of past days into team_daily_event_counts, e.g. before reading usage reports from it."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", default=30, type=int, help="how many days of events to count, up to today")
+        parser.add_argument(
+            "--live-run", action="store_true", help="actually execute INSERT queries (default is dry-run)"
+        )
+
+    def handle(self, *, live_run: bool, days: int, **options):
+        logger.setLevel(logging.INFO)
+
+        last_day = timezone.now().date()
+        first_day = last_day - timedelta(days=days - 1)
+        if live_run:
+            # newest first, so that the days the usage report reads most are counted early on
+            day = last_day
+            while day >= first_day:
+                count_team_daily_events(day, day)
+                logger.info("Counted events", day=day)
+                day -= timedelta(days=1)
+        else:
+            logger.info("Would have counted events", first_day=first_day, last_day=last_day)
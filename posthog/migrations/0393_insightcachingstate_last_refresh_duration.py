@@ -0,0 +1,17 @@
+# Generated by Django 4.1.13 on 2024-02-28 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("posthog", "0392_alter_exportedasset_export_format"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="insightcachingstate",
+            name="last_refresh_duration",
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
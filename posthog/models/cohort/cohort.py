@@ -194,8 +194,15 @@ class Cohort(models.Model):
             "deleted": self.deleted,
         }
 
-    def calculate_people_ch(self, pending_version):
-        from posthog.models.cohort.util import recalculate_cohortpeople
+    def calculate_people_ch(self, pending_version, incremental: bool = False):
+        """
+        Calculates the people of the cohort as `pending_version`. With `incremental`, only the persons that changed
+        since the last calculation are re-evaluated if possible, and applied to the current version instead.
+        """
+        from posthog.models.cohort.util import (
+            recalculate_cohortpeople,
+            recalculate_cohortpeople_incrementally,
+        )
         from posthog.tasks.calculate_cohort import clear_stale_cohort
 
         logger.warn(
@@ -203,11 +210,15 @@ class Cohort(models.Model):
             id=self.pk,
             current_version=self.version,
             new_version=pending_version,
+            incremental=incremental,
         )
         start_time = time.monotonic()
 
         try:
-            count = recalculate_cohortpeople(self, pending_version)
+            count = recalculate_cohortpeople_incrementally(self) if incremental else None
+            recalculated_incrementally = count is not None
+            if not recalculated_incrementally:
+                count = recalculate_cohortpeople(self, pending_version)
             self.count = count
 
             self.last_calculation = timezone.now()
@@ -226,20 +237,23 @@ class Cohort(models.Model):
             self.is_calculating = False
             self.save()
 
-        # Update filter to match pending version if still valid
-        Cohort.objects.filter(pk=self.pk).filter(Q(version__lt=pending_version) | Q(version__isnull=True)).update(
-            version=pending_version, count=count
-        )
-        self.refresh_from_db()
+        # Incremental changes are written to the current version, which stays
+        if not recalculated_incrementally:
+            # Update filter to match pending version if still valid
+            Cohort.objects.filter(pk=self.pk).filter(Q(version__lt=pending_version) | Q(version__isnull=True)).update(
+                version=pending_version, count=count
+            )
+            self.refresh_from_db()
 
         logger.warn(
             "cohort_calculation_completed",
             id=self.pk,
-            version=pending_version,
+            version=self.version if recalculated_incrementally else pending_version,
             duration=(time.monotonic() - start_time),
         )
 
-        clear_stale_cohort.delay(self.pk, before_version=pending_version)
+        if not recalculated_incrementally:
+            clear_stale_cohort.delay(self.pk, before_version=pending_version)
 
     def insert_users_by_list(self, items: List[str]) -> None:
         """
@@ -29,12 +29,18 @@ Order By (team_id, cohort_id, person_id, version)
 TRUNCATE_COHORTPEOPLE_TABLE_SQL = f"TRUNCATE TABLE IF EXISTS cohortpeople ON CLUSTER '{CLICKHOUSE_CLUSTER}'"
 
 GET_COHORT_SIZE_SQL = """
-SELECT count(DISTINCT person_id)
-FROM cohortpeople
-WHERE team_id = %(team_id)s AND cohort_id = %(cohort_id)s AND version = %(version)s
+SELECT count()
+FROM (
+    SELECT person_id
+    FROM cohortpeople
+    WHERE team_id = %(team_id)s AND cohort_id = %(cohort_id)s AND version = %(version)s
+    GROUP BY person_id
+    HAVING sum(sign) > 0
+)
 """
 
-# Continually ensure that all previous version rows are deleted and insert persons that match the criteria
+# Continually ensure that all previous version rows are deleted and insert persons that match the criteria.
+# Persons are cancelled by their summed sign, as incremental recalculations may have added or removed them already.
 RECALCULATE_COHORT_BY_ID = """
 INSERT INTO cohortpeople
 SELECT id, %(cohort_id)s as cohort_id, %(team_id)s as team_id, 1 AS sign, %(new_version)s AS version
@@ -44,14 +50,16 @@ FROM (
 UNION ALL
 SELECT person_id, cohort_id, team_id, -1, version
 FROM cohortpeople
-WHERE team_id = %(team_id)s AND cohort_id = %(cohort_id)s AND version < %(new_version)s AND sign = 1
+WHERE team_id = %(team_id)s AND cohort_id = %(cohort_id)s AND version < %(new_version)s
+GROUP BY person_id, cohort_id, team_id, version
+HAVING sum(sign) > 0
 """
 
 # NOTE: Group by version id to ensure that signs are summed between corresponding rows.
 # Version filtering is not necessary as only positive rows of the latest version will be selected by sum(sign) > 0
 
 GET_PERSON_ID_BY_PRECALCULATED_COHORT_ID = """
-SELECT DISTINCT person_id FROM cohortpeople WHERE team_id = %(team_id)s AND cohort_id = %({prepend}_cohort_id_{index})s AND version = %({prepend}_version_{index})s
+SELECT person_id FROM cohortpeople WHERE team_id = %(team_id)s AND cohort_id = %({prepend}_cohort_id_{index})s AND version = %({prepend}_version_{index})s GROUP BY person_id HAVING sum(sign) > 0
 """
 
 GET_COHORTS_BY_PERSON_UUID = """
@@ -69,9 +77,11 @@ WHERE team_id = %(team_id)s AND person_id = %(person_id)s
 """
 
 GET_COHORTPEOPLE_BY_COHORT_ID = """
-SELECT DISTINCT person_id
+SELECT person_id
 FROM cohortpeople
 WHERE team_id = %(team_id)s AND cohort_id = %(cohort_id)s AND version = %(version)s
+GROUP BY person_id
+HAVING sum(sign) > 0
 ORDER BY person_id
 """
 
@@ -92,3 +102,51 @@ STALE_COHORTPEOPLE = f"""
 SELECT count() FROM cohortpeople
 WHERE team_id = %(team_id)s AND cohort_id = %(cohort_id)s AND version < %(version)s
 """
+
+# Persons whose cohort membership may have changed since a cohort was last calculated: their properties or distinct ids
+# changed, or they have events the cohort filters on that were ingested since, or that are leaving a time window.
+GET_CHANGED_COHORT_PERSON_IDS_SQL = """
+SELECT DISTINCT person_id FROM (
+    SELECT id AS person_id FROM person WHERE team_id = %(team_id)s AND _timestamp >= %(since)s
+    UNION ALL
+    SELECT person_id FROM person_distinct_id2 WHERE team_id = %(team_id)s AND _timestamp >= %(since)s
+    {events_query}
+)
+LIMIT %(limit)s
+"""
+
+GET_CHANGED_COHORT_PERSON_IDS_FROM_EVENTS_SQL = """
+    UNION ALL
+    SELECT person_id FROM person_distinct_id2
+    WHERE team_id = %(team_id)s AND distinct_id IN (
+        SELECT distinct_id FROM events
+        WHERE team_id = %(team_id)s
+        AND event IN %(event_names)s
+        AND timestamp >= %(earliest_timestamp)s
+        AND (_timestamp >= %(since)s {leaving_window_conditions})
+    )
+"""
+
+GET_COHORTPEOPLE_BY_PERSON_IDS = """
+SELECT person_id
+FROM cohortpeople
+WHERE team_id = %(team_id)s AND cohort_id = %(cohort_id)s AND version = %(version)s AND person_id IN %(person_ids)s
+GROUP BY person_id
+HAVING sum(sign) > 0
+"""
+
+# Incremental recalculations apply the persons that changed to the current version of a cohort, rather than writing a
+# new one: added persons get a sign 1 row, and removed ones are cancelled with a sign -1 row
+INSERT_COHORTPEOPLE_ADDED = """
+INSERT INTO cohortpeople
+SELECT toUUID(arrayJoin(%(person_ids)s)), %(cohort_id)s, %(team_id)s, 1, %(version)s
+"""
+
+INSERT_COHORTPEOPLE_REMOVED = """
+INSERT INTO cohortpeople
+SELECT person_id, cohort_id, team_id, -1, version
+FROM cohortpeople
+WHERE team_id = %(team_id)s AND cohort_id = %(cohort_id)s AND version = %(version)s AND person_id IN %(person_ids)s
+GROUP BY person_id, cohort_id, team_id, version
+HAVING sum(sign) > 0
+"""
@@ -19,11 +19,16 @@ from posthog.models.async_deletion import AsyncDeletion, DeletionType
 from posthog.models.cohort.cohort import Cohort, CohortOrEmpty
 from posthog.models.cohort.sql import (
     CALCULATE_COHORT_PEOPLE_SQL,
+    GET_CHANGED_COHORT_PERSON_IDS_FROM_EVENTS_SQL,
+    GET_CHANGED_COHORT_PERSON_IDS_SQL,
     GET_COHORT_SIZE_SQL,
+    GET_COHORTPEOPLE_BY_PERSON_IDS,
     GET_COHORTS_BY_PERSON_UUID,
     GET_PERSON_ID_BY_PRECALCULATED_COHORT_ID,
     GET_STATIC_COHORT_SIZE_SQL,
     GET_STATIC_COHORTPEOPLE_BY_PERSON_UUID,
+    INSERT_COHORTPEOPLE_ADDED,
+    INSERT_COHORTPEOPLE_REMOVED,
     RECALCULATE_COHORT_BY_ID,
     STALE_COHORTPEOPLE,
 )
@@ -43,7 +48,9 @@ TEMP_PRECALCULATED_MARKER = parser.parse("2021-06-07T15:00:00+00:00")
 logger = structlog.get_logger(__name__)
 
 
-def format_person_query(cohort: Cohort, index: int, hogql_context: HogQLContext) -> Tuple[str, Dict[str, Any]]:
+def format_person_query(
+    cohort: Cohort, index: int, hogql_context: HogQLContext, restrict_to_person_ids: Optional[List[str]] = None
+) -> Tuple[str, Dict[str, Any]]:
     if cohort.is_static:
         return format_static_cohort_query(cohort, index, prepend="")
 
@@ -61,6 +68,7 @@ def format_person_query(cohort: Cohort, index: int, hogql_context: HogQLContext)
         ),
         cohort.team,
         cohort_pk=cohort.pk,
+        restrict_to_person_ids=restrict_to_person_ids,
     )
 
     query, params = query_builder.get_query()
@@ -329,6 +337,156 @@ def recalculate_cohortpeople(cohort: Cohort, pending_version: int) -> Optional[i
     return count
 
 
+# Behavioral filters whose result for a person only changes when they have new events, or when events leave the window
+INCREMENTAL_BEHAVIORAL_VALUES = ("performed_event", "performed_event_multiple")
+# Person property operators that compare against a date relative to now, so can change without the person changing
+RELATIVE_DATE_OPERATORS = ("is_date_exact", "is_date_before", "is_date_after")
+
+
+def supports_incremental_recalculation(cohort: Cohort) -> bool:
+    """
+    Whether the cohort can be recalculated for only the persons that changed since its last calculation.
+    That needs a current version to diff against, and filters that can't change for a person who didn't change.
+    """
+    if cohort.is_static or cohort.query is not None or cohort.version is None or cohort.last_calculation is None:
+        return False
+
+    properties = cohort.properties.flat
+    if not properties:
+        return False
+
+    for prop in properties:
+        if prop.type == "person":
+            if prop.operator in RELATIVE_DATE_OPERATORS:
+                return False
+        elif prop.type == "behavioral":
+            if prop.value not in INCREMENTAL_BEHAVIORAL_VALUES or _behavioral_event_names(prop) is None:
+                return False
+        else:
+            # e.g. other cohorts, which change when they are recalculated
+            return False
+
+    return True
+
+
+def _behavioral_event_names(prop: Property) -> Optional[List[str]]:
+    if prop.event_type == "actions":
+        action = Action.objects.filter(pk=prop.key).first()
+        if action is None:
+            return None
+        event_names = action.get_step_events()
+        # a step without an event matches any event
+        return None if any(event_name is None for event_name in event_names) else event_names
+    return [str(prop.key)]
+
+
+def get_changed_person_ids(cohort: Cohort, since: datetime) -> Optional[List[str]]:
+    """
+    Returns the persons whose membership of the cohort may have changed since `since`,
+    or None if there are more than are worth recalculating incrementally.
+    """
+    from posthog.queries.foss_cohort_query import (
+        parse_and_validate_positive_integer,
+        relative_date_to_seconds,
+        validate_interval,
+    )
+
+    events_query = ""
+    params: Dict[str, Any] = {"team_id": cohort.team_id, "since": since}
+
+    behavioral_properties = [prop for prop in cohort.properties.flat if prop.type == "behavioral"]
+    if behavioral_properties:
+        event_names: List[str] = []
+        leaving_window_conditions = ""
+        longest_window = 0
+        for index, prop in enumerate(behavioral_properties):
+            event_names.extend(_behavioral_event_names(prop) or [])
+            interval = validate_interval(prop.time_interval)
+            time_value = parse_and_validate_positive_integer(prop.time_value, "time_value")
+            longest_window = max(longest_window, relative_date_to_seconds((time_value, interval)))
+            # events that were inside the window at the last calculation but aren't now
+            leaving_window_conditions += (
+                f" OR (timestamp >= toDateTime(%(since)s, 'UTC') - INTERVAL %(window_{index})s {interval}"
+                f" AND timestamp <= now() - INTERVAL %(window_{index})s {interval})"
+            )
+            params[f"window_{index}"] = time_value
+
+        events_query = GET_CHANGED_COHORT_PERSON_IDS_FROM_EVENTS_SQL.format(
+            leaving_window_conditions=leaving_window_conditions
+        )
+        params["event_names"] = list(set(event_names))
+        # months and years are approximated in seconds, so leave some room
+        params["earliest_timestamp"] = since - timedelta(seconds=longest_window, days=7)
+
+    max_changed_persons = settings.COHORT_INCREMENTAL_MAX_CHANGED_PERSONS
+    rows = sync_execute(
+        GET_CHANGED_COHORT_PERSON_IDS_SQL.format(events_query=events_query),
+        {**params, "limit": max_changed_persons + 1},
+    )
+    if len(rows) > max_changed_persons:
+        return None
+    return [str(row[0]) for row in rows]
+
+
+def recalculate_cohortpeople_incrementally(cohort: Cohort) -> Optional[int]:
+    """
+    Re-evaluates the cohort for the persons that changed since its last calculation, and applies the difference to its
+    current version. Returns the new size, or None if a full recalculation is needed.
+    """
+    if not supports_incremental_recalculation(cohort):
+        return None
+
+    # Changes that arrive while this runs are picked up next time, thanks to the lookback
+    since = cohort.last_calculation - timedelta(minutes=settings.COHORT_INCREMENTAL_LOOKBACK_MINUTES)
+    changed_person_ids = get_changed_person_ids(cohort, since)
+    if changed_person_ids is None:
+        return None
+
+    base_params = {"team_id": cohort.team_id, "cohort_id": cohort.pk, "version": cohort.version}
+    added: Set[str] = set()
+    removed: Set[str] = set()
+    if changed_person_ids:
+        hogql_context = HogQLContext(within_non_hogql_query=True, team_id=cohort.team_id)
+        cohort_query, cohort_params = format_person_query(
+            cohort, 0, hogql_context, restrict_to_person_ids=changed_person_ids
+        )
+
+        matching = sync_execute(
+            f"SELECT DISTINCT id FROM ({cohort_query}) WHERE id IN %(person_ids)s",
+            {**cohort_params, **hogql_context.values, **base_params, "person_ids": changed_person_ids},
+        )
+        current = sync_execute(GET_COHORTPEOPLE_BY_PERSON_IDS, {**base_params, "person_ids": changed_person_ids})
+
+        matching_ids = {str(row[0]) for row in matching}
+        current_ids = {str(row[0]) for row in current}
+        added = matching_ids - current_ids
+        removed = current_ids - matching_ids
+
+    # Only the difference is written, as sign rows of the current version that readers sum
+    if added:
+        sync_execute(INSERT_COHORTPEOPLE_ADDED, {**base_params, "person_ids": sorted(added)})
+    if removed:
+        sync_execute(
+            INSERT_COHORTPEOPLE_REMOVED,
+            {**base_params, "person_ids": sorted(removed)},
+            settings={"optimize_on_insert": 0},
+        )
+
+    count = get_cohort_size(cohort)
+
+    logger.warn(
+        "Recalculating cohortpeople incrementally done",
+        team_id=cohort.team_id,
+        cohort_id=cohort.pk,
+        changed=len(changed_person_ids),
+        added=len(added),
+        removed=len(removed),
+        size=count,
+    )
+
+    return count
+
+
 def clear_stale_cohortpeople(cohort: Cohort, before_version: int) -> None:
     if cohort.version and cohort.version > 0:
         stale_count_result = sync_execute(
@@ -554,3 +712,30 @@ def sort_cohorts_topologically(cohort_ids: Set[int], seen_cohorts_cache: Dict[in
             dfs(cohort_id, seen, sorted_cohort_ids)
 
     return sorted_cohort_ids
+
+
+def group_cohorts_by_dependency_depth(
+    cohort_ids: Set[int], seen_cohorts_cache: Dict[int, CohortOrEmpty]
+) -> List[List[int]]:
+    """
+    Groups the given cohorts, and the cohorts they depend on, into stages where each cohort only depends on cohorts
+    in earlier stages. Cohorts in the same stage don't depend on each other, so can be calculated at the same time.
+    Expects `seen_cohorts_cache` to hold the dependencies, as filled in by `get_dependent_cohorts`.
+    """
+    depths: Dict[int, int] = {}
+    for cohort_id in sort_cohorts_topologically(cohort_ids, seen_cohorts_cache):
+        cohort = seen_cohorts_cache.get(cohort_id)
+        if not cohort:
+            continue
+
+        dependency_depths = [
+            depths[int(prop.value)]
+            for prop in cohort.properties.flat
+            if prop.type == "cohort" and not isinstance(prop.value, list) and int(prop.value) in depths
+        ]
+        depths[cohort_id] = max(dependency_depths, default=-1) + 1
+
+    stages: List[List[int]] = [[] for _ in range(max(depths.values(), default=-1) + 1)]
+    for cohort_id, depth in depths.items():
+        stages[depth].append(cohort_id)
+    return stages
@@ -1,6 +1,6 @@
 import secrets
 from datetime import timedelta
-from typing import List, Optional
+from typing import IO, List, Optional, Union
 
 import structlog
 from django.conf import settings
@@ -155,7 +155,11 @@ def get_content_response(asset: ExportedAsset, download: bool = False):
     return res
 
 
-def save_content(exported_asset: ExportedAsset, content: bytes) -> None:
+def save_content(exported_asset: ExportedAsset, content: Union[bytes, IO[bytes]]) -> None:
+    """
+    `content` can also be a file, e.g. an export rendered to a temporary file,
+    which is uploaded to object storage without reading it into memory.
+    """
     try:
         if settings.OBJECT_STORAGE_ENABLED:
             save_content_to_object_storage(exported_asset, content)
@@ -169,15 +173,17 @@ def save_content(exported_asset: ExportedAsset, content: bytes) -> None:
             exception=ose,
             exc_info=True,
         )
+        if not isinstance(content, bytes):
+            content.seek(0)
         save_content_to_exported_asset(exported_asset, content)
 
 
-def save_content_to_exported_asset(exported_asset: ExportedAsset, content: bytes) -> None:
-    exported_asset.content = content
+def save_content_to_exported_asset(exported_asset: ExportedAsset, content: Union[bytes, IO[bytes]]) -> None:
+    exported_asset.content = content if isinstance(content, bytes) else content.read()
     exported_asset.save(update_fields=["content"])
 
 
-def save_content_to_object_storage(exported_asset: ExportedAsset, content: bytes) -> None:
+def save_content_to_object_storage(exported_asset: ExportedAsset, content: Union[bytes, IO[bytes]]) -> None:
     path_parts: List[str] = [
         settings.OBJECT_STORAGE_EXPORTS_FOLDER,
         exported_asset.export_format.split("/")[1],
@@ -42,6 +42,8 @@ class InsightCachingState(UUIDModel):
     last_refresh: models.DateTimeField = models.DateTimeField(blank=True, null=True)
     last_refresh_queued_at: models.DateTimeField = models.DateTimeField(blank=True, null=True)
     refresh_attempt: models.IntegerField = models.IntegerField(null=False, default=0)
+    # How long the last successful refresh took, used to predict the cost of the next one
+    last_refresh_duration: models.FloatField = models.FloatField(blank=True, null=True)
 
     created_at: models.DateTimeField = models.DateTimeField(auto_now_add=True)
     updated_at: models.DateTimeField = models.DateTimeField(auto_now=True)
@@ -1,8 +1,11 @@
 from typing import Any, List, Optional
 
+from django.conf import settings
 from django.db import models, transaction
 from django.db.models import F, Q
+from django.db.models.signals import post_delete, post_save
 
+from posthog.models.signals import mutable_receiver
 from posthog.models.utils import UUIDT
 
 from ..team import Team
@@ -309,3 +312,27 @@ def get_distinct_ids_for_subquery(person: Person | None, team: Team) -> List[str
     else:
         distinct_ids = []
     return list(map(str, distinct_ids))
+
+
+@mutable_receiver([post_save, post_delete], sender=Person)
+def invalidate_person_projection_for_person(sender, instance: Person, **kwargs):
+    if not settings.PERSON_PROJECTION_CACHE_TTL_SECONDS:
+        return
+
+    from posthog.caching.person_projection import invalidate_person_projection
+
+    team_id, uuid = instance.team_id, instance.uuid
+    transaction.on_commit(lambda: invalidate_person_projection(team_id, uuid))
+
+
+@mutable_receiver([post_save, post_delete], sender=PersonDistinctId)
+def invalidate_person_projection_for_distinct_id(sender, instance: PersonDistinctId, **kwargs):
+    if not settings.PERSON_PROJECTION_CACHE_TTL_SECONDS:
+        return
+
+    from posthog.caching.person_projection import person_projection_distinct_id_key
+    from posthog.redis import get_client
+
+    # The person itself may be going away as well, so only forget which person the distinct id points to
+    key = person_projection_distinct_id_key(instance.team_id, instance.distinct_id)
+    transaction.on_commit(lambda: get_client().delete(key))
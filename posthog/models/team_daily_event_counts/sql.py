@@ -0,0 +1,87 @@
+from django.conf import settings
+
+from posthog.clickhouse.table_engines import (
+    Distributed,
+    ReplacingMergeTree,
+    ReplicationScheme,
+)
+
+"""
+Per team, per day event counts, which the usage report sums up instead of scanning `events` for every period.
+
+Whole days are counted at a time by the `count_team_daily_events` task, which recounts the most recent days every hour
+so that late arriving events are picked up. A recount replaces the previous count of the day once merged, so reads
+have to use FINAL. Rows are sharded by team, so that all counts of a team's day end up on the same shard.
+"""
+
+TEAM_DAILY_EVENT_COUNTS_DATA_TABLE = lambda: "sharded_team_daily_event_counts"
+
+TEAM_DAILY_EVENT_COUNTS_TABLE_BASE_SQL = """
+CREATE TABLE IF NOT EXISTS {table_name} ON CLUSTER '{cluster}'
+(
+    team_id Int64,
+    day Date,
+    event_count UInt64,
+    -- events that are billed for, see `get_teams_with_billable_event_count_in_period`
+    billable_event_count UInt64,
+    -- the same, counting events that are duplicates of each other once
+    unique_billable_event_count UInt64,
+    event_count_with_groups UInt64,
+    -- the most recent count of a day replaces the others
+    counted_at DateTime64(6, 'UTC')
+) ENGINE = {engine}
+"""
+
+TEAM_DAILY_EVENT_COUNTS_DATA_TABLE_ENGINE = lambda: ReplacingMergeTree(
+    "team_daily_event_counts", ver="counted_at", replication_scheme=ReplicationScheme.SHARDED
+)
+
+TEAM_DAILY_EVENT_COUNTS_TABLE_SQL = lambda: (
+    TEAM_DAILY_EVENT_COUNTS_TABLE_BASE_SQL
+    + """
+    PARTITION BY toYYYYMM(day)
+    ORDER BY (team_id, day)
+"""
+).format(
+    table_name=TEAM_DAILY_EVENT_COUNTS_DATA_TABLE(),
+    cluster=settings.CLICKHOUSE_CLUSTER,
+    engine=TEAM_DAILY_EVENT_COUNTS_DATA_TABLE_ENGINE(),
+)
+
+# This table is responsible for reading from and writing to sharded_team_daily_event_counts on a cluster setting
+DISTRIBUTED_TEAM_DAILY_EVENT_COUNTS_TABLE_SQL = lambda: TEAM_DAILY_EVENT_COUNTS_TABLE_BASE_SQL.format(
+    table_name="team_daily_event_counts",
+    cluster=settings.CLICKHOUSE_CLUSTER,
+    engine=Distributed(
+        data_table=TEAM_DAILY_EVENT_COUNTS_DATA_TABLE(),
+        sharding_key="sipHash64(team_id)",
+    ),
+)
+
+# Uses the same conditions as the usage report queries on `events` that these counts replace
+INSERT_TEAM_DAILY_EVENT_COUNTS_SQL = """
+INSERT INTO team_daily_event_counts
+(team_id, day, event_count, billable_event_count, unique_billable_event_count, event_count_with_groups, counted_at)
+WITH event != '$feature_flag_called' AND event NOT IN ('survey sent', 'survey shown', 'survey dismissed') AS is_billable
+SELECT
+    team_id,
+    toDate(timestamp) AS day,
+    count() AS event_count,
+    countIf(is_billable) AS billable_event_count,
+    -- the day is part of what makes events duplicates, so the unique counts of days add up
+    uniqExactIf(event, cityHash64(distinct_id), cityHash64(uuid), is_billable) AS unique_billable_event_count,
+    countIf($group_0 != '' OR $group_1 != '' OR $group_2 != '' OR $group_3 != '' OR $group_4 != '')
+        AS event_count_with_groups,
+    now64(6, 'UTC') AS counted_at
+FROM events
+WHERE timestamp >= toDateTime(%(date_from)s, 'UTC') AND timestamp < toDateTime(%(date_to)s, 'UTC')
+GROUP BY team_id, day
+"""
+
+DROP_TEAM_DAILY_EVENT_COUNTS_TABLE_SQL = (
+    lambda: f"DROP TABLE IF EXISTS {TEAM_DAILY_EVENT_COUNTS_DATA_TABLE()} ON CLUSTER '{settings.CLICKHOUSE_CLUSTER}'"
+)
+
+TRUNCATE_TEAM_DAILY_EVENT_COUNTS_TABLE_SQL = lambda: (
+    f"TRUNCATE TABLE IF EXISTS {TEAM_DAILY_EVENT_COUNTS_DATA_TABLE()} ON CLUSTER '{settings.CLICKHOUSE_CLUSTER}'"
+)
@@ -0,0 +1,101 @@
+from django.conf import settings
+
+from posthog.clickhouse.table_engines import (
+    Distributed,
+    ReplacingMergeTree,
+    ReplicationScheme,
+)
+
+"""
+Hourly rollup of $pageview events, broken down by the dimensions the web analytics dashboard filters and groups on.
+
+The web analytics query runners read this table instead of `events` when their filters can be answered from it,
+for a fraction of the cost of scanning (or sampling) the raw events. Events that arrive after their hour was rolled
+up (see WEB_ANALYTICS_ROLLUP_LAG_MINUTES) are left out, so the numbers can be slightly lower than from the raw events.
+
+Rows are written once per hour for all teams by the `rollup_web_analytics_hourly` task. Unique visitors and sessions
+are stored as `uniq` states, so that hours can be merged into totals for any date range with `uniqMerge`.
+Rolling up an hour again replaces its previous rows once merged, rather than adding to them, so reads have to use FINAL.
+Property values are extracted the same way HogQL extracts them, so that the rollup agrees with the raw events.
+"""
+
+WEB_ANALYTICS_HOURLY_DATA_TABLE = lambda: "sharded_web_analytics_hourly"
+
+WEB_ANALYTICS_HOURLY_TABLE_BASE_SQL = """
+CREATE TABLE IF NOT EXISTS {table_name} ON CLUSTER '{cluster}'
+(
+    team_id Int64,
+    -- start of the hour (UTC) the pageviews happened in
+    hour DateTime('UTC'),
+    pathname Nullable(String),
+    device_type Nullable(String),
+    country_code Nullable(String),
+    pageviews UInt64,
+    visitors AggregateFunction(uniq, UUID),
+    sessions AggregateFunction(uniq, Nullable(String)),
+    -- the most recent roll up of an hour replaces the others
+    rolled_up_at DateTime64(6, 'UTC')
+) ENGINE = {engine}
+"""
+
+WEB_ANALYTICS_HOURLY_DATA_TABLE_ENGINE = lambda: ReplacingMergeTree(
+    "web_analytics_hourly", ver="rolled_up_at", replication_scheme=ReplicationScheme.SHARDED
+)
+
+WEB_ANALYTICS_HOURLY_TABLE_SQL = lambda: (
+    WEB_ANALYTICS_HOURLY_TABLE_BASE_SQL
+    + """
+    PARTITION BY toYYYYMM(hour)
+    -- every dimension has to be part of the order by, so that merges only replace rows with the same dimensions
+    ORDER BY (team_id, hour, pathname, device_type, country_code)
+SETTINGS allow_nullable_key=1
+"""
+).format(
+    table_name=WEB_ANALYTICS_HOURLY_DATA_TABLE(),
+    cluster=settings.CLICKHOUSE_CLUSTER,
+    engine=WEB_ANALYTICS_HOURLY_DATA_TABLE_ENGINE(),
+)
+
+# This table is responsible for reading from and writing to sharded_web_analytics_hourly on a cluster setting
+DISTRIBUTED_WEB_ANALYTICS_HOURLY_TABLE_SQL = lambda: WEB_ANALYTICS_HOURLY_TABLE_BASE_SQL.format(
+    table_name="web_analytics_hourly",
+    cluster=settings.CLICKHOUSE_CLUSTER,
+    engine=Distributed(
+        data_table=WEB_ANALYTICS_HOURLY_DATA_TABLE(),
+        sharding_key="sipHash64(team_id)",
+    ),
+)
+
+
+def _extract_property(key: str) -> str:
+    return f"replaceRegexpAll(nullIf(nullIf(JSONExtractRaw(properties, '{key}'), ''), 'null'), '^\"|\"$', '')"
+
+
+INSERT_WEB_ANALYTICS_HOURLY_SQL = f"""
+INSERT INTO web_analytics_hourly
+(team_id, hour, pathname, device_type, country_code, pageviews, visitors, sessions, rolled_up_at)
+SELECT
+    team_id,
+    toStartOfHour(timestamp) AS hour,
+    {_extract_property("$pathname")} AS pathname,
+    {_extract_property("$device_type")} AS device_type,
+    {_extract_property("$geoip_country_code")} AS country_code,
+    count() AS pageviews,
+    uniqState(person_id) AS visitors,
+    uniqState({_extract_property("$session_id")}) AS sessions,
+    now64(6, 'UTC') AS rolled_up_at
+FROM events
+WHERE
+    event = '$pageview'
+    AND timestamp >= toDateTime(%(hour_from)s, 'UTC')
+    AND timestamp < toDateTime(%(hour_to)s, 'UTC')
+GROUP BY team_id, hour, pathname, device_type, country_code
+"""
+
+DROP_WEB_ANALYTICS_HOURLY_TABLE_SQL = (
+    lambda: f"DROP TABLE IF EXISTS {WEB_ANALYTICS_HOURLY_DATA_TABLE()} ON CLUSTER '{settings.CLICKHOUSE_CLUSTER}'"
+)
+
+TRUNCATE_WEB_ANALYTICS_HOURLY_TABLE_SQL = (
+    lambda: f"TRUNCATE TABLE IF EXISTS {WEB_ANALYTICS_HOURLY_DATA_TABLE()} ON CLUSTER '{settings.CLICKHOUSE_CLUSTER}'"
+)
@@ -1,14 +1,18 @@
 from typing import Any, Dict, List, Optional, Tuple, Union, cast
 
+from django.conf import settings
+
 from posthog.clickhouse.materialized_columns import ColumnName
 from posthog.constants import PropertyOperatorType
 from posthog.models import Filter, Team
 from posthog.models.action import Action
 from posthog.models.cohort import Cohort
 from posthog.models.cohort.util import (
+    format_precalculated_cohort_query,
     format_static_cohort_query,
     get_count_operator,
     get_entity_query,
+    is_precalculated_query,
 )
 from posthog.models.filters.mixins.utils import cached_property
 from posthog.models.property import (
@@ -140,6 +144,8 @@ class FOSSCohortQuery(EventQuery):
         extra_event_properties: List[PropertyName] = [],
         extra_person_fields: List[ColumnName] = [],
         override_aggregate_users_by_distinct_id: Optional[bool] = None,
+        # Only scan the events of these persons, when recalculating just the persons that changed
+        restrict_to_person_ids: Optional[List[str]] = None,
         **kwargs,
     ) -> None:
         self._fields = []
@@ -147,6 +153,7 @@ class FOSSCohortQuery(EventQuery):
         self._earliest_time_for_event_query = None
         self._restrict_event_query_by_time = True
         self._cohort_pk = cohort_pk
+        self._restrict_to_person_ids = restrict_to_person_ids
 
         super().__init__(
             filter=FOSSCohortQuery.unwrap_cohort(filter, team.pk),
@@ -215,6 +222,26 @@ class FOSSCohortQuery(EventQuery):
                                             ],
                                         )
                                     )
+                                elif (
+                                    settings.CALCULATE_COHORTS_IN_DEPENDENCY_ORDER
+                                    and is_precalculated_query(prop_cohort)
+                                    and prop_cohort.version is not None
+                                ):
+                                    # calculated before the cohorts that depend on it,
+                                    # so read its people rather than evaluating its filters again
+                                    new_property_group_list.append(
+                                        PropertyGroup(
+                                            type=PropertyOperatorType.AND,
+                                            values=[
+                                                Property(
+                                                    type="precalculated-cohort",
+                                                    key="id",
+                                                    value=prop_cohort.pk,
+                                                    negation=negation_value,
+                                                )
+                                            ],
+                                        )
+                                    )
                                 else:
                                     new_property_group_list.append(_unwrap(prop_cohort.properties, negation_value))
                             except Cohort.DoesNotExist:
@@ -340,12 +367,13 @@ class FOSSCohortQuery(EventQuery):
                 )
 
             date_condition, date_params = self._get_date_condition()
+            restrict_to_persons_condition, restrict_to_persons_params = self._get_restrict_to_persons_condition()
             query = f"""
             SELECT {", ".join(_fields)} FROM events {self.EVENT_TABLE_ALIAS}
             {self._get_person_ids_query()}
             WHERE team_id = %(team_id)s
             AND event IN %({event_param_name})s
-            {date_condition}
+            {date_condition}{restrict_to_persons_condition}
             {person_prop_query}
             GROUP BY person_id
             """
@@ -356,6 +384,7 @@ class FOSSCohortQuery(EventQuery):
                     "team_id": self._team_id,
                     event_param_name: self._events,
                     **date_params,
+                    **restrict_to_persons_params,
                     **person_prop_params,
                 },
             )
@@ -389,6 +418,19 @@ class FOSSCohortQuery(EventQuery):
 
         return date_query, date_params
 
+    def _get_restrict_to_persons_condition(self) -> Tuple[str, Dict[str, Any]]:
+        if self._restrict_to_person_ids is None:
+            return "", {}
+
+        param = f"restrict_to_person_ids_{self._cohort_pk}"
+        return (
+            # leading space, so that queries without the condition print exactly as before
+            f""" AND {self.EVENT_TABLE_ALIAS}.distinct_id IN (
+                SELECT distinct_id FROM person_distinct_id2 WHERE team_id = %(team_id)s AND person_id IN %({param})s
+            )""",
+            {param: self._restrict_to_person_ids},
+        )
+
     def _check_earliest_date(self, relative_date: Relative_Date) -> None:
         if self._earliest_time_for_event_query is None:
             self._earliest_time_for_event_query = relative_date
@@ -432,6 +474,8 @@ class FOSSCohortQuery(EventQuery):
             prop.type == "static-cohort"
         ):  # "cohort" and "precalculated-cohort" are handled by flattening during initialization
             res, params = self.get_static_cohort_condition(prop, prepend, idx)
+        elif prop.type == "precalculated-cohort":  # unless the cohort was already calculated, see `unwrap_cohort`
+            res, params = self.get_precalculated_cohort_condition(prop, prepend, idx)
         else:
             raise ValueError(f"Invalid property type for Cohort queries: {prop.type}")
 
@@ -458,6 +502,11 @@ class FOSSCohortQuery(EventQuery):
         query, params = format_static_cohort_query(cohort, idx, prepend)
         return f"id {'NOT' if prop.negation else ''} IN ({query})", params
 
+    def get_precalculated_cohort_condition(self, prop: Property, prepend: str, idx: int) -> Tuple[str, Dict[str, Any]]:
+        cohort = Cohort.objects.get(pk=cast(int, prop.value))
+        query, params = format_precalculated_cohort_query(cohort, idx, prepend)
+        return f"id {'NOT' if prop.negation else ''} IN ({query})", params
+
     def get_performed_event_condition(self, prop: Property, prepend: str, idx: int) -> Tuple[str, Dict[str, Any]]:
         event = (prop.event_type, prop.key)
         column_name = f"performed_event_condition_{prepend}_{idx}"
@@ -514,6 +563,7 @@ class FOSSCohortQuery(EventQuery):
         self._should_join_persons = (
             self._column_optimizer.is_using_person_properties
             or len(self._column_optimizer.used_properties_with_type("static-cohort")) > 0
+            or len(self._column_optimizer.used_properties_with_type("precalculated-cohort")) > 0
         )
 
     @cached_property
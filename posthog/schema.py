@@ -1019,6 +1019,9 @@ class ActorsQueryResponse(BaseModel):
     hogql: str
     limit: int
     missing_actors_count: Optional[int] = None
+    nextCursor: Optional[str] = Field(
+        default=None, description="Opaque cursor to pass as `cursor` to fetch the next page, if there are more results"
+    )
     offset: int
     results: List[List]
     timings: Optional[List[QueryTiming]] = None
@@ -1114,6 +1117,9 @@ class EventsQueryResponse(BaseModel):
     hasMore: Optional[bool] = None
     hogql: str
     limit: Optional[int] = None
+    nextCursor: Optional[str] = Field(
+        default=None, description="Opaque cursor to pass as `cursor` to fetch the next page, if there are more results"
+    )
     offset: Optional[int] = None
     results: List[List]
     timings: Optional[List[QueryTiming]] = None
@@ -1321,6 +1327,9 @@ class QueryResponseAlternative3(BaseModel):
     hasMore: Optional[bool] = None
     hogql: str
     limit: Optional[int] = None
+    nextCursor: Optional[str] = Field(
+        default=None, description="Opaque cursor to pass as `cursor` to fetch the next page, if there are more results"
+    )
     offset: Optional[int] = None
     results: List[List]
     timings: Optional[List[QueryTiming]] = None
@@ -1336,6 +1345,9 @@ class QueryResponseAlternative4(BaseModel):
     hogql: str
     limit: int
     missing_actors_count: Optional[int] = None
+    nextCursor: Optional[str] = Field(
+        default=None, description="Opaque cursor to pass as `cursor` to fetch the next page, if there are more results"
+    )
     offset: int
     results: List[List]
     timings: Optional[List[QueryTiming]] = None
@@ -1843,6 +1855,10 @@ class EventsQuery(BaseModel):
     actionId: Optional[int] = Field(default=None, description="Show events matching a given action")
     after: Optional[str] = Field(default=None, description="Only fetch events that happened after this timestamp")
     before: Optional[str] = Field(default=None, description="Only fetch events that happened before this timestamp")
+    cursor: Optional[str] = Field(
+        default=None,
+        description="Cursor returned as `nextCursor` by the previous page, or an empty string to start paginating by cursor. Takes precedence over `offset`",
+    )
     event: Optional[str] = Field(default=None, description="Limit to events matching this string")
     filterTestAccounts: Optional[bool] = Field(default=None, description="Filter test accounts")
     fixedProperties: Optional[
@@ -2728,6 +2744,10 @@ class ActorsQuery(BaseModel):
     model_config = ConfigDict(
         extra="forbid",
     )
+    cursor: Optional[str] = Field(
+        default=None,
+        description="Cursor returned as `nextCursor` by the previous page, or an empty string to start paginating by cursor. Takes precedence over `offset`",
+    )
     fixedProperties: Optional[
         List[
             Union[
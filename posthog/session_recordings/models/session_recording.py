@@ -1,4 +1,4 @@
-from typing import Any, List, Literal, Optional
+from typing import Any, Dict, List, Literal, Optional
 
 from django.conf import settings
 from django.db import models
@@ -64,41 +64,47 @@ class SessionRecording(UUIDModel):
     _metadata: Optional[RecordingMetadata] = None
 
     def load_metadata(self) -> bool:
-        if self._metadata:
-            return True
+        # Recordings persisted to S3 have all the metadata in the model, others are loaded from Clickhouse
+        return len(SessionRecording.load_metadata_for_recordings(self.team, [self])) > 0
+
+    def set_metadata(self, metadata: RecordingMetadata) -> None:
+        self._metadata = metadata
+
+        # Some fields of the metadata are persisted fully in the model
+        self.distinct_id = metadata["distinct_id"]
+        self.start_time = metadata["start_time"]
+        self.end_time = metadata["end_time"]
+        self.duration = metadata["duration"]
+        self.click_count = metadata["click_count"]
+        self.keypress_count = metadata["keypress_count"]
+        self.set_start_url_from_urls(first_url=metadata["first_url"])
+        self.mouse_activity_count = metadata["mouse_activity_count"]
+        self.active_seconds = metadata["active_seconds"]
+        self.inactive_seconds = metadata["duration"] - metadata["active_seconds"]
+        self.console_log_count = metadata["console_log_count"]
+        self.console_warn_count = metadata["console_warn_count"]
+        self.console_error_count = metadata["console_error_count"]
 
-        if self.object_storage_path:
-            # Nothing todo as we have all the metadata in the model
-            pass
-        else:
-            # Try to load from Clickhouse
-            metadata = SessionReplayEvents().get_metadata(
-                team=self.team,
-                session_id=self.session_id,
-                recording_start_time=self.start_time,
+    @staticmethod
+    def load_metadata_for_recordings(team: Team, recordings: List["SessionRecording"]) -> List["SessionRecording"]:
+        """
+        Like `load_metadata`, but with one query for all the recordings.
+        Returns the recordings that could be loaded.
+        """
+        to_load = [r for r in recordings if not r._metadata and not r.object_storage_path]
+        if to_load:
+            start_times = [r.start_time for r in to_load]
+            # The earliest start time still lets ClickHouse skip the older parts for all of them
+            recording_start_time = min(start_times) if all(start_times) else None
+            metadata_by_session = SessionReplayEvents().get_metadata_for_sessions(
+                [r.session_id for r in to_load], team, recording_start_time
             )
+            for recording in to_load:
+                metadata = metadata_by_session.get(recording.session_id)
+                if metadata:
+                    recording.set_metadata(metadata)
 
-            if not metadata:
-                return False
-
-            self._metadata = metadata
-
-            # Some fields of the metadata are persisted fully in the model
-            self.distinct_id = metadata["distinct_id"]
-            self.start_time = metadata["start_time"]
-            self.end_time = metadata["end_time"]
-            self.duration = metadata["duration"]
-            self.click_count = metadata["click_count"]
-            self.keypress_count = metadata["keypress_count"]
-            self.set_start_url_from_urls(first_url=metadata["first_url"])
-            self.mouse_activity_count = metadata["mouse_activity_count"]
-            self.active_seconds = metadata["active_seconds"]
-            self.inactive_seconds = metadata["duration"] - metadata["active_seconds"]
-            self.console_log_count = metadata["console_log_count"]
-            self.console_warn_count = metadata["console_warn_count"]
-            self.console_error_count = metadata["console_error_count"]
-
-        return True
+        return [r for r in recordings if r._metadata or r.object_storage_path]
 
     @property
     def storage(self):
@@ -157,13 +163,21 @@ class SessionRecording(UUIDModel):
             return SessionRecording(session_id=session_id, team=team)
 
     @staticmethod
-    def get_or_build_from_clickhouse(team: Team, ch_recordings: List[dict]) -> "List[SessionRecording]":
-        session_ids = sorted([recording["session_id"] for recording in ch_recordings])
-
-        recordings_by_id = {
-            recording.session_id: recording
-            for recording in SessionRecording.objects.filter(session_id__in=session_ids, team=team).all()
-        }
+    def get_or_build_from_clickhouse(
+        team: Team,
+        ch_recordings: List[dict],
+        recordings_by_id: Optional[Dict[str, "SessionRecording"]] = None,
+    ) -> "List[SessionRecording]":
+        """
+        Pass `recordings_by_id` if the saved recordings of these sessions have already been loaded,
+        so that they aren't queried again.
+        """
+        if recordings_by_id is None:
+            session_ids = sorted([recording["session_id"] for recording in ch_recordings])
+            recordings_by_id = {
+                recording.session_id: recording
+                for recording in SessionRecording.objects.filter(session_id__in=session_ids, team=team).all()
+            }
 
         recordings = []
 
@@ -185,6 +199,21 @@ class SessionRecording(UUIDModel):
             recording.console_warn_count = ch_recording.get("console_warn_count", None)
             recording.console_error_count = ch_recording.get("console_error_count", None)
             recording.set_start_url_from_urls(ch_recording.get("urls", None), ch_recording.get("first_url", None))
+            # The summary already has all of the metadata, so `load_metadata` doesn't have to query it again
+            recording._metadata = RecordingMetadata(
+                distinct_id=ch_recording["distinct_id"],
+                start_time=ch_recording["start_time"],
+                end_time=ch_recording["end_time"],
+                click_count=ch_recording["click_count"],
+                keypress_count=ch_recording["keypress_count"],
+                mouse_activity_count=ch_recording.get("mouse_activity_count", 0),
+                console_log_count=ch_recording.get("console_log_count", None),
+                console_warn_count=ch_recording.get("console_warn_count", None),
+                console_error_count=ch_recording.get("console_error_count", None),
+                first_url=ch_recording.get("first_url", None),
+                duration=ch_recording["duration"],
+                active_seconds=ch_recording.get("active_seconds", 0),
+            )
             recordings.append(recording)
 
         return recordings
@@ -7,7 +7,7 @@ from django.conf import settings
 from sentry_sdk import capture_exception
 
 from posthog.client import sync_execute
-from posthog.constants import TREND_FILTER_TYPE_ACTIONS, PropertyOperatorType
+from posthog.constants import TREND_FILTER_TYPE_ACTIONS, TREND_FILTER_TYPE_EVENTS, PropertyOperatorType
 from posthog.models import Entity, Team
 from posthog.models.action.util import format_entity_filter
 from posthog.models.filters.mixins.utils import cached_property
@@ -546,6 +546,146 @@ class SessionIdEventsQuery(EventQuery):
         return [item for sublist in results for item in sublist]
 
 
+class SessionSummaryEventsQuery:
+    """
+    Answers the events part of the recordings list filters from session_replay_event_summaries instead of events.
+
+    It only covers filters that don't need the properties of a matching event:
+    sessions with all of a list of events, or sessions that visited a url.
+    """
+
+    _filter: SessionRecordingsFilter
+    _team_id: int
+    _team: Team
+
+    # the event properties that are summarised, and their column
+    SUMMARISED_PROPERTY_COLUMNS = {"$current_url": "current_urls"}
+    SUPPORTED_OPERATORS = (None, "exact", "icontains", "is_set")
+
+    def __init__(
+        self,
+        team: Team,
+        filter: SessionRecordingsFilter,
+    ):
+        self._filter = filter
+        self._team = team
+        self._team_id = team.pk
+
+    _rawQuery = """
+    SELECT
+        -- named like the events query so that either can be used as the sub query
+        session_id AS `$session_id`
+    FROM session_replay_event_summaries
+    PREWHERE team_id = %(team_id)s
+        -- regardless of what other filters are applied
+        -- limit by storage TTL
+        AND max_timestamp >= %(clamped_to_storage_ttl)s
+        -- and then any time filter for the events query
+        {events_timestamp_clause}
+    WHERE 1=1 {provided_session_ids_clause}
+    GROUP BY session_id
+    HAVING 1=1 {event_names_condition} {property_condition}
+    """
+
+    @property
+    def ttl_days(self):
+        return ttl_days(self._team)
+
+    @cached_property
+    def covers_filters(self) -> bool:
+        if not settings.REPLAY_LISTING_FROM_EVENT_SUMMARIES or self._filter.person_uuid:
+            return False
+
+        entities = self._filter.entities
+        if any(entity.type != TREND_FILTER_TYPE_EVENTS or entity.property_groups.flat for entity in entities):
+            return False
+
+        properties = self._filter.property_groups.flat
+        if not properties:
+            return len(entities) > 0
+
+        # the summary doesn't know which event a url was on, so it can't match a url together with an event
+        # or with another url
+        if entities or len(properties) > 1:
+            return False
+        prop = properties[0]
+        return (
+            prop.type == "event"
+            and prop.key in self.SUMMARISED_PROPERTY_COLUMNS
+            and prop.operator in self.SUPPORTED_OPERATORS
+        )
+
+    # matches rows that overlap the events query's time range
+    # so sessions are matched at the granularity of summary rows rather than of events
+    @cached_property
+    def _get_events_timestamp_clause(self) -> Tuple[str, Dict[str, Any]]:
+        timestamp_clause = ""
+        timestamp_params = {}
+        if self._filter.date_from:
+            timestamp_clause += "\nAND max_timestamp >= %(event_start_time)s"
+            timestamp_params["event_start_time"] = self._filter.date_from - timedelta(hours=12)
+        if self._filter.date_to:
+            timestamp_clause += "\nAND min_timestamp <= %(event_end_time)s"
+            timestamp_params["event_end_time"] = self._filter.date_to + timedelta(hours=12)
+        return timestamp_clause, timestamp_params
+
+    def _get_event_names_condition(self) -> Tuple[str, Dict[str, Any]]:
+        event_names = list(dict.fromkeys(entity.id for entity in self._filter.entities if entity.id))
+        if not event_names:
+            # using "All events"
+            return "", {}
+        return "AND hasAll(groupUniqArrayArray(event_names), %(event_names)s)", {"event_names": event_names}
+
+    def _get_property_condition(self) -> Tuple[str, Dict[str, Any]]:
+        properties = self._filter.property_groups.flat
+        if not properties:
+            return "", {}
+
+        prop = properties[0]
+        values = f"groupUniqArrayArray({self.SUMMARISED_PROPERTY_COLUMNS[prop.key]})"
+        if prop.operator == "is_set":
+            return f"AND notEmpty({values})", {}
+        if prop.operator == "icontains":
+            # one ILIKE per value, like the events query matches icontains
+            patterns = prop.value if isinstance(prop.value, list) else [prop.value]
+            conditions = " OR ".join(f"value ILIKE %(summary_property_pattern_{i})s" for i in range(len(patterns)))
+            return (
+                f"AND arrayExists(value -> {conditions or '0'}, {values})",
+                {f"summary_property_pattern_{i}": f"%{value}%" for i, value in enumerate(patterns)},
+            )
+        exact_values = prop.value if isinstance(prop.value, list) else [prop.value]
+        return (
+            f"AND hasAny({values}, %(summary_property_values)s)",
+            {"summary_property_values": [str(value) for value in exact_values]},
+        )
+
+    def get_query(self) -> Tuple[str, Dict[str, Any]]:
+        (
+            events_timestamp_clause,
+            events_timestamp_params,
+        ) = self._get_events_timestamp_clause
+        (
+            provided_session_ids_clause,
+            provided_session_ids_params,
+        ) = _get_filter_by_provided_session_ids_clause(recording_filters=self._filter)
+        event_names_condition, event_names_params = self._get_event_names_condition()
+        property_condition, property_params = self._get_property_condition()
+
+        return self._rawQuery.format(
+            events_timestamp_clause=events_timestamp_clause,
+            provided_session_ids_clause=provided_session_ids_clause,
+            event_names_condition=event_names_condition,
+            property_condition=property_condition,
+        ), {
+            "team_id": self._team_id,
+            "clamped_to_storage_ttl": (datetime.now() - timedelta(days=self.ttl_days)),
+            **events_timestamp_params,
+            **provided_session_ids_params,
+            **event_names_params,
+            **property_params,
+        }
+
+
 class SessionRecordingListFromReplaySummary(EventQuery):
     # we have to implement this from EventQuery but don't need it
     def _determine_should_join_distinct_ids(self) -> None:
@@ -680,10 +820,7 @@ class SessionRecordingListFromReplaySummary(EventQuery):
         duration_clause, duration_params = self.duration_clause(self._filter.duration_type_filter)
         console_log_clause = self._get_console_log_clause(self._filter.console_logs_filter)
 
-        events_select, events_join_params = SessionIdEventsQuery(
-            team=self._team,
-            filter=self._filter,
-        ).get_query()
+        events_select, events_join_params = self._events_query().get_query()
         if events_select:
             events_select = f"AND s.session_id in (select `$session_id` as session_id from ({events_select}) as session_events_sub_query)"
 
@@ -714,6 +851,13 @@ class SessionRecordingListFromReplaySummary(EventQuery):
             },
         )
 
+    def _events_query(self) -> Union[SessionSummaryEventsQuery, SessionIdEventsQuery]:
+        # the summary table is much smaller than events, so use it whenever it can answer the filters
+        summary_query = SessionSummaryEventsQuery(team=self._team, filter=self._filter)
+        if summary_query.covers_filters:
+            return summary_query
+        return SessionIdEventsQuery(team=self._team, filter=self._filter)
+
     def duration_clause(
         self,
         duration_filter_type: Literal["duration", "active_seconds", "inactive_seconds"],
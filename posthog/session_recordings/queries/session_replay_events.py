@@ -1,7 +1,8 @@
-from datetime import datetime, timedelta
-from typing import Optional, Tuple, List
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Optional, Tuple, List
 
 from django.conf import settings
+from django.core.cache import cache
 
 from posthog.clickhouse.client import sync_execute
 from posthog.cloud_utils import is_cloud
@@ -15,13 +16,32 @@ from posthog.session_recordings.models.metadata import (
 )
 
 
+# Recordings are looked up within this many days, see `exists`
+RECORDING_LOOKBACK_DAYS = 370
+# Even if a recording is still within the lookback, its TTL might run out, so check again after a while
+EXISTS_CACHE_MAX_SECONDS = 60 * 60 * 24
+
+
+def _exists_cache_key(team: Team, session_id: str) -> str:
+    return f"session_replay_events_exists_{team.pk}_{session_id}"
+
+
+def _cache_exists(team: Team, session_id: str, start_time: datetime) -> None:
+    # Only positive results are cached, a recording that doesn't exist yet might still be ingested
+    expires_at = start_time.astimezone(timezone.utc) + timedelta(days=RECORDING_LOOKBACK_DAYS)
+    timeout = min(EXISTS_CACHE_MAX_SECONDS, int((expires_at - datetime.now(timezone.utc)).total_seconds()))
+    if timeout > 0:
+        cache.set(_exists_cache_key(team, session_id), True, timeout=timeout)
+
+
 class SessionReplayEvents:
     def exists(self, session_id: str, team: Team) -> bool:
-        # TODO we could cache this result when its result is True.
-        # Once we know that session exists we don't need to check again (until the end of the day since TTL might apply)
+        if cache.get(_exists_cache_key(team, session_id)):
+            return True
+
         result = sync_execute(
             """
-            SELECT count(1)
+            SELECT count(1), min(min_first_timestamp)
             FROM session_replay_events
             WHERE team_id = %(team_id)s
             AND session_id = %(session_id)s
@@ -29,15 +49,21 @@ class SessionReplayEvents:
             -- but for a shared/pinned recording
             -- the TTL effectively becomes 1 year
             -- and we don't know which we're dealing with
-            AND min_first_timestamp >= now() - INTERVAL 370 DAY
+            AND min_first_timestamp >= now() - INTERVAL %(lookback_days)s DAY
             """,
             {
                 "team_id": team.pk,
                 "session_id": session_id,
                 "recording_ttl_days": ttl_days(team),
+                "lookback_days": RECORDING_LOOKBACK_DAYS,
             },
         )
-        return result[0][0] > 0
+        count, start_time = result[0]
+        if count == 0:
+            return False
+
+        _cache_exists(team, session_id, start_time)
+        return True
 
     def get_metadata(
         self,
@@ -45,8 +71,25 @@ class SessionReplayEvents:
         team: Team,
         recording_start_time: Optional[datetime] = None,
     ) -> Optional[RecordingMetadata]:
+        return self.get_metadata_for_sessions([session_id], team, recording_start_time).get(session_id)
+
+    def get_metadata_for_sessions(
+        self,
+        session_ids: Iterable[str],
+        team: Team,
+        recording_start_time: Optional[datetime] = None,
+    ) -> Dict[str, RecordingMetadata]:
+        """
+        Loads the metadata of a whole page of recordings in one query.
+        Sessions that can't be found are left out.
+        """
+        session_ids = list(set(session_ids))
+        if not session_ids:
+            return {}
+
         query = """
             SELECT
+                session_id,
                 any(distinct_id),
                 min(min_first_timestamp) as start_time,
                 max(max_last_timestamp) as end_time,
@@ -63,7 +106,7 @@ class SessionReplayEvents:
                 session_replay_events
             PREWHERE
                 team_id = %(team_id)s
-                AND session_id = %(session_id)s
+                AND session_id IN %(session_ids)s
                 {optional_timestamp_clause}
             GROUP BY
                 session_id
@@ -78,31 +121,31 @@ class SessionReplayEvents:
             query,
             {
                 "team_id": team.pk,
-                "session_id": session_id,
+                "session_ids": session_ids,
                 "recording_start_time": recording_start_time,
             },
         )
 
-        if len(replay_response) == 0:
-            return None
-        if len(replay_response) > 1:
-            raise ValueError("Multiple sessions found for session_id: {}".format(session_id))
-
-        replay = replay_response[0]
-        return RecordingMetadata(
-            distinct_id=replay[0],
-            start_time=replay[1],
-            end_time=replay[2],
-            duration=replay[3],
-            first_url=replay[4],
-            click_count=replay[5],
-            keypress_count=replay[6],
-            mouse_activity_count=replay[7],
-            active_seconds=replay[8],
-            console_log_count=replay[9],
-            console_warn_count=replay[10],
-            console_error_count=replay[11],
-        )
+        metadata: Dict[str, RecordingMetadata] = {}
+        for replay in replay_response:
+            metadata[replay[0]] = RecordingMetadata(
+                distinct_id=replay[1],
+                start_time=replay[2],
+                end_time=replay[3],
+                duration=replay[4],
+                first_url=replay[5],
+                click_count=replay[6],
+                keypress_count=replay[7],
+                mouse_activity_count=replay[8],
+                active_seconds=replay[9],
+                console_log_count=replay[10],
+                console_warn_count=replay[11],
+                console_error_count=replay[12],
+            )
+            # Whoever loads the metadata usually asks for the snapshots next
+            _cache_exists(team, replay[0], replay[2])
+
+        return metadata
 
     def get_events(
         self, session_id: str, team: Team, metadata: RecordingMetadata, events_to_ignore: List[str] | None
@@ -140,6 +183,91 @@ class SessionReplayEvents:
 
         return result.columns, result.results
 
+    def get_events_for_sessions(
+        self,
+        metadata_by_session: Dict[str, RecordingMetadata],
+        team: Team,
+        events_to_ignore: List[str] | None,
+        events_per_session: int = 100,
+    ) -> Tuple[List | None, Dict[str, List]]:
+        """
+        Like `get_events`, but with few queries for all the sessions, returning the first `events_per_session` events
+        of each session. Returns the columns, and the events of each session that has any.
+        """
+        from posthog.hogql.constants import LimitContext, get_max_limit_for_context
+
+        # Each query returns at most `events_per_session` rows per session, so batch the sessions to stay under the
+        # row limit, which would otherwise silently cut off the events of the last sessions
+        max_rows = get_max_limit_for_context(LimitContext.EXPORT)
+        if events_per_session > max_rows:
+            raise ValueError(f"Can't load more than {max_rows} events per session")
+        sessions_per_query = max_rows // events_per_session
+
+        columns: List | None = None
+        events_by_session: Dict[str, List] = {}
+        session_ids = list(metadata_by_session.keys())
+        for index in range(0, len(session_ids), sessions_per_query):
+            batch = {
+                session_id: metadata_by_session[session_id]
+                for session_id in session_ids[index : index + sessions_per_query]
+            }
+            columns, batch_events = self._get_events_for_session_batch(
+                batch, team, events_to_ignore, events_per_session
+            )
+            events_by_session.update(batch_events)
+        return columns, events_by_session
+
+    def _get_events_for_session_batch(
+        self,
+        metadata_by_session: Dict[str, RecordingMetadata],
+        team: Team,
+        events_to_ignore: List[str] | None,
+        events_per_session: int,
+    ) -> Tuple[List, Dict[str, List]]:
+        from posthog.hogql import ast
+        from posthog.hogql.constants import LimitContext
+        from posthog.hogql.parser import parse_select
+        from posthog.hogql.query import execute_hogql_query
+
+        q = """
+            select $session_id, event, timestamp, elements_chain, properties.$window_id, properties.$current_url, properties.$event_type
+            from events
+            where timestamp >= {start_time} and timestamp <= {end_time}
+            and $session_id in {session_ids}
+            """
+        if events_to_ignore:
+            q += " and event not in {events_to_ignore}"
+
+        q += " order by $session_id, timestamp asc limit {events_per_session} by $session_id"
+
+        query = parse_select(
+            q,
+            placeholders={
+                # the same wiggle room as `get_events`, around all the sessions at once
+                "start_time": ast.Constant(
+                    value=min(m["start_time"] for m in metadata_by_session.values()) - timedelta(seconds=100)
+                ),
+                "end_time": ast.Constant(
+                    value=max(m["end_time"] for m in metadata_by_session.values()) + timedelta(seconds=100)
+                ),
+                "session_ids": ast.Constant(value=list(metadata_by_session.keys())),
+                "events_to_ignore": ast.Constant(value=events_to_ignore),
+                "events_per_session": ast.Constant(value=events_per_session),
+            },
+        )
+
+        result = execute_hogql_query(
+            query=query,
+            team=team,
+            query_type="session_replay_events_for_sessions",
+            limit_context=LimitContext.EXPORT,
+        )
+
+        events_by_session: Dict[str, List] = {}
+        for row in result.results or []:
+            events_by_session.setdefault(row[0], []).append(row[1:])
+        return (result.columns or [])[1:], events_by_session
+
 
 def ttl_days(team: Team) -> int:
     ttl_days = (get_instance_setting("RECORDINGS_TTL_WEEKS") or 3) * 7
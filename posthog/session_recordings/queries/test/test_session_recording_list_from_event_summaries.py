@@ -0,0 +1,151 @@
+from uuid import uuid4
+
+from dateutil.relativedelta import relativedelta
+from django.test import override_settings
+from django.utils.timezone import now
+from freezegun.api import freeze_time
+
+from posthog.clickhouse.client import sync_execute
+from posthog.models import Person
+from posthog.models.filters.session_recordings_filter import SessionRecordingsFilter
+from posthog.session_recordings.queries.session_recording_list_from_replay_summary import (
+    SessionRecordingListFromReplaySummary,
+)
+from posthog.session_recordings.queries.test.session_replay_sql import (
+    produce_replay_summary,
+)
+from posthog.session_recordings.sql.session_replay_event_sql import (
+    TRUNCATE_SESSION_REPLAY_EVENTS_TABLE_SQL,
+)
+from posthog.session_recordings.sql.session_replay_event_summaries_sql import (
+    BACKFILL_SESSION_REPLAY_EVENT_SUMMARIES_SQL,
+    TRUNCATE_SESSION_REPLAY_EVENT_SUMMARIES_TABLE_SQL,
+)
+from posthog.test.base import (
+    APIBaseTest,
+    ClickhouseTestMixin,
+    _create_event,
+    flush_persons_and_events,
+)
+
+
+@freeze_time("2021-01-01T13:46:23")
+@override_settings(REPLAY_LISTING_FROM_EVENT_SUMMARIES=True)
+class TestSessionRecordingListFromEventSummaries(ClickhouseTestMixin, APIBaseTest):
+    # the materialized view that writes summaries isn't created in tests,
+    # so events are summarised with the backfill query instead
+
+    @classmethod
+    def teardown_class(cls):
+        sync_execute(TRUNCATE_SESSION_REPLAY_EVENTS_TABLE_SQL())
+        sync_execute(TRUNCATE_SESSION_REPLAY_EVENT_SUMMARIES_TABLE_SQL())
+
+    @property
+    def base_time(self):
+        return (now() - relativedelta(hours=1)).replace(microsecond=0, second=0)
+
+    def _create_session(self, session_id: str, user: str, event: str, current_url: str) -> None:
+        produce_replay_summary(
+            distinct_id=user,
+            session_id=session_id,
+            first_timestamp=self.base_time,
+            last_timestamp=self.base_time + relativedelta(seconds=30),
+            team_id=self.team.id,
+        )
+        _create_event(
+            team=self.team,
+            event=event,
+            timestamp=self.base_time,
+            distinct_id=user,
+            properties={"$session_id": session_id, "$current_url": current_url},
+        )
+
+    def _summarise_events(self) -> None:
+        flush_persons_and_events()
+        sync_execute(
+            BACKFILL_SESSION_REPLAY_EVENT_SUMMARIES_SQL(),
+            {"team_id": self.team.pk, "date_from": now() - relativedelta(days=1), "date_to": now()},
+        )
+
+    def _list_session_ids(self, data: dict) -> list:
+        filter = SessionRecordingsFilter(team=self.team, data=data)
+        (session_recordings, _) = SessionRecordingListFromReplaySummary(filter=filter, team=self.team).run()
+        return sorted(recording["session_id"] for recording in session_recordings)
+
+    def _query(self, data: dict) -> str:
+        filter = SessionRecordingsFilter(team=self.team, data=data)
+        query, _ = SessionRecordingListFromReplaySummary(filter=filter, team=self.team).get_query()
+        return query
+
+    def test_event_filters_are_read_from_summaries(self):
+        user = "test_event_filters_are_read_from_summaries-user"
+        Person.objects.create(team=self.team, distinct_ids=[user])
+        pageview_session = f"pageview-{uuid4()}"
+        autocapture_session = f"autocapture-{uuid4()}"
+        self._create_session(pageview_session, user, "$pageview", "https://example.io/home")
+        self._create_session(autocapture_session, user, "$autocapture", "https://example.io/home")
+        _create_event(
+            team=self.team,
+            event="$pageleave",
+            timestamp=self.base_time,
+            distinct_id=user,
+            properties={"$session_id": pageview_session},
+        )
+        self._summarise_events()
+
+        pageview = {"id": "$pageview", "type": "events", "order": 0, "name": "$pageview"}
+        pageleave = {"id": "$pageleave", "type": "events", "order": 1, "name": "$pageleave"}
+
+        assert "FROM session_replay_event_summaries" in self._query({"events": [pageview]})
+        assert self._list_session_ids({"events": [pageview]}) == [pageview_session]
+        assert self._list_session_ids({"events": [pageview, pageleave]}) == [pageview_session]
+        assert self._list_session_ids({"events": [{**pageleave, "order": 0}]}) == [pageview_session]
+        assert self._list_session_ids({"events": [{**pageview, "id": "$rageclick"}]}) == []
+
+    def test_url_filter_is_read_from_summaries(self):
+        user = "test_url_filter_is_read_from_summaries-user"
+        Person.objects.create(team=self.team, distinct_ids=[user])
+        home_session = f"home-{uuid4()}"
+        pricing_session = f"pricing-{uuid4()}"
+        self._create_session(home_session, user, "$pageview", "https://example.io/home")
+        self._create_session(pricing_session, user, "$pageview", "https://example.io/pricing")
+        self._summarise_events()
+
+        def url_filter(operator: str, value) -> dict:
+            return {"properties": [{"key": "$current_url", "value": value, "operator": operator, "type": "event"}]}
+
+        assert "FROM session_replay_event_summaries" in self._query(url_filter("icontains", "pricing"))
+        assert self._list_session_ids(url_filter("icontains", "PRICING")) == [pricing_session]
+        assert self._list_session_ids(url_filter("icontains", ["pricing", "HOME"])) == sorted(
+            [home_session, pricing_session]
+        )
+        assert self._list_session_ids(url_filter("icontains", ["pricing", "checkout"])) == [pricing_session]
+        assert self._list_session_ids(url_filter("exact", ["https://example.io/home"])) == [home_session]
+        assert self._list_session_ids(url_filter("is_set", "is_set")) == sorted([home_session, pricing_session])
+
+    def test_filters_the_summaries_cannot_answer_read_events(self):
+        pageview_with_browser = {
+            "id": "$pageview",
+            "type": "events",
+            "order": 0,
+            "name": "$pageview",
+            "properties": [{"key": "$browser", "value": ["Chrome"], "operator": "exact", "type": "event"}],
+        }
+        url_and_event = {
+            "events": [{"id": "$pageview", "type": "events", "order": 0, "name": "$pageview"}],
+            "properties": [{"key": "$current_url", "value": "pricing", "operator": "icontains", "type": "event"}],
+        }
+        url_not_containing = {
+            "properties": [{"key": "$current_url", "value": "pricing", "operator": "not_icontains", "type": "event"}],
+        }
+
+        for data in ({"events": [pageview_with_browser]}, url_and_event, url_not_containing):
+            query = self._query(data)
+            assert "session_replay_event_summaries" not in query
+            assert "FROM events e" in query
+
+    @override_settings(REPLAY_LISTING_FROM_EVENT_SUMMARIES=False)
+    def test_summaries_are_not_read_when_disabled(self):
+        query = self._query({"events": [{"id": "$pageview", "type": "events", "order": 0, "name": "$pageview"}]})
+        assert "session_replay_event_summaries" not in query
+        assert "FROM events e" in query
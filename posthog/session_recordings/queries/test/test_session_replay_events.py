@@ -1,9 +1,11 @@
+from unittest.mock import patch
+
 from posthog.models import Team
 from posthog.session_recordings.queries.session_replay_events import SessionReplayEvents
 from posthog.session_recordings.queries.test.session_replay_sql import (
     produce_replay_summary,
 )
-from posthog.test.base import ClickhouseTestMixin, APIBaseTest
+from posthog.test.base import ClickhouseTestMixin, APIBaseTest, _create_event, flush_persons_and_events
 from dateutil.relativedelta import relativedelta
 from django.utils.timezone import now
 
@@ -70,3 +72,55 @@ class SessionReplayEventsQueries(ClickhouseTestMixin, APIBaseTest):
             recording_start_time=self.base_time + relativedelta(days=2),
         )
         assert metadata is None
+
+    def test_get_metadata_for_sessions(self) -> None:
+        metadata = SessionReplayEvents().get_metadata_for_sessions(["1", "2", "not a session"], team=self.team)
+        assert sorted(metadata.keys()) == ["1", "2"]
+        assert metadata["2"]["start_time"] == self.base_time
+        assert metadata["2"]["click_count"] == 2
+
+    def test_exists(self) -> None:
+        assert SessionReplayEvents().exists(session_id="1", team=self.team)
+        assert not SessionReplayEvents().exists(session_id="not a session", team=self.team)
+
+    def test_exists_caches_positive_results(self) -> None:
+        with patch("posthog.session_recordings.queries.session_replay_events.sync_execute") as sync_execute:
+            sync_execute.return_value = [(0, self.base_time)]
+            assert not SessionReplayEvents().exists(session_id="1", team=self.team)
+            assert sync_execute.call_count == 1
+
+        assert SessionReplayEvents().exists(session_id="1", team=self.team)
+
+        with patch("posthog.session_recordings.queries.session_replay_events.sync_execute") as sync_execute:
+            assert SessionReplayEvents().exists(session_id="1", team=self.team)
+            assert sync_execute.call_count == 0
+
+    def test_loading_metadata_caches_existence(self) -> None:
+        SessionReplayEvents().get_metadata_for_sessions(["2"], team=self.team)
+
+        with patch("posthog.session_recordings.queries.session_replay_events.sync_execute") as sync_execute:
+            assert SessionReplayEvents().exists(session_id="2", team=self.team)
+            assert sync_execute.call_count == 0
+
+    @patch("posthog.hogql.constants.get_max_limit_for_context", return_value=2)
+    def test_get_events_for_sessions_stays_under_the_row_limit(self, _mock_max_limit) -> None:
+        for session_id in ["1", "2"]:
+            for seconds in range(3):
+                _create_event(
+                    team=self.team,
+                    event="$pageview",
+                    distinct_id="u1",
+                    timestamp=self.base_time + relativedelta(seconds=seconds),
+                    properties={"$session_id": session_id},
+                )
+        flush_persons_and_events()
+        metadata_by_session = SessionReplayEvents().get_metadata_for_sessions(["1", "2"], self.team)
+
+        with self.capture_select_queries() as queries:
+            columns, events_by_session = SessionReplayEvents().get_events_for_sessions(
+                metadata_by_session, self.team, events_to_ignore=None, events_per_session=2
+            )
+
+        assert len(queries) == 2
+        assert columns is not None and columns[0] == "event"
+        assert {session_id: len(events) for session_id, events in events_by_session.items()} == {"1": 2, "2": 2}
@@ -1,9 +1,10 @@
 import os
+import re
 import time
 from datetime import datetime, timedelta, timezone
 
 import json
-from typing import Any, List, Type, cast, Dict, Tuple
+from typing import Any, Iterator, List, Optional, Type, cast, Dict, Tuple
 
 from django.conf import settings
 
@@ -11,7 +12,7 @@ import posthoganalytics
 import requests
 from django.contrib.auth.models import AnonymousUser
 from django.core.cache import cache
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse, HttpResponse, StreamingHttpResponse
 from drf_spectacular.utils import extend_schema
 from loginas.utils import is_impersonated_session
 from rest_framework import exceptions, request, serializers, viewsets
@@ -53,6 +54,7 @@ from posthog.session_recordings.snapshots.convert_legacy_snapshots import (
     convert_original_version_lts_recording,
 )
 from posthog.storage import object_storage
+from posthog.storage.object_storage import ObjectStorageInvalidRange
 from prometheus_client import Counter
 
 
@@ -62,6 +64,10 @@ SNAPSHOT_SOURCE_REQUESTED = Counter(
     labelnames=["source"],
 )
 
+MAX_BLOB_KEYS_PER_REQUEST = 100
+# single byte ranges only, as S3 doesn't support multiple ranges
+BYTE_RANGE_REGEX = re.compile(r"^bytes=(\d+-\d*|-\d+)$")
+
 
 class SurrogatePairSafeJSONEncoder(JSONEncoder):
     def encode(self, o):
@@ -438,40 +444,33 @@ class SessionRecordingViewSet(TeamAndOrgViewSetMixin, viewsets.GenericViewSet):
             response_data["snapshots"] = snapshots
 
         elif source == "blob":
-            blob_key = request.GET.get("blob_key", "")
-            if not blob_key:
+            blob_keys = [key for key in request.GET.get("blob_keys", "").split(",") if key]
+            if not blob_keys and request.GET.get("blob_key"):
+                blob_keys = [request.GET["blob_key"]]
+            if not blob_keys:
                 raise exceptions.ValidationError("Must provide a snapshot file blob key")
-
-            # very short-lived pre-signed URL
-            if recording.object_storage_path:
-                if recording.storage_version == "2023-08-01":
-                    file_key = f"{recording.object_storage_path}/{blob_key}"
-                else:
-                    # this is a legacy recording, we need to load the file from the old path
-                    file_key = convert_original_version_lts_recording(recording)
-            else:
-                blob_prefix = settings.OBJECT_STORAGE_SESSION_RECORDING_BLOB_INGESTION_FOLDER
-                if use_v3_storage and settings.OBJECT_STORAGE_SESSION_RECORDING_BLOB_INGESTION_V3_FOLDER:
-                    blob_prefix = settings.OBJECT_STORAGE_SESSION_RECORDING_BLOB_INGESTION_V3_FOLDER
-
-                file_key = f"{blob_prefix}/team_id/{self.team.pk}/session_id/{recording.session_id}/data/{blob_key}"
-            url = object_storage.get_presigned_url(file_key, expiration=60)
-            if not url:
-                raise exceptions.NotFound("Snapshot file not found")
+            if len(blob_keys) > MAX_BLOB_KEYS_PER_REQUEST:
+                raise exceptions.ValidationError(f"Can load at most {MAX_BLOB_KEYS_PER_REQUEST} blob keys at once")
+            if len(blob_keys) > 1 and recording.object_storage_path and recording.storage_version != "2023-08-01":
+                # Legacy recordings are stored as a single file, whichever blob key is asked for
+                raise exceptions.ValidationError("Can load only one blob key at once for this recording")
 
             event_properties["source"] = "blob"
-            event_properties["blob_key"] = blob_key
+            event_properties["blob_key"] = blob_keys[0]
+            event_properties["blob_keys_count"] = len(blob_keys)
             posthoganalytics.capture(
                 self._distinct_id_from_request(request),
                 "session recording snapshots v2 loaded",
                 event_properties,
             )
 
-            with requests.get(url=url, stream=True) as r:
-                r.raise_for_status()
-                response = HttpResponse(content=r.raw, content_type="application/json")
-                response["Content-Disposition"] = "inline"
-                return response
+            if len(blob_keys) > 1:
+                # Several blobs in one response, each preceded by a marker line of the source it came from
+                return StreamingHttpResponse(
+                    self._stream_blobs(recording, blob_keys, use_v3_storage), content_type="application/json"
+                )
+
+            return self._stream_blob(request, self._blob_file_key(recording, blob_keys[0], use_v3_storage))
 
         else:
             raise exceptions.ValidationError("Invalid source must be one of [realtime, blob]")
@@ -480,6 +479,60 @@ class SessionRecordingViewSet(TeamAndOrgViewSetMixin, viewsets.GenericViewSet):
 
         return Response(serializer.data)
 
+    def _blob_file_key(self, recording: SessionRecording, blob_key: str, use_v3_storage: bool) -> str:
+        if recording.object_storage_path:
+            if recording.storage_version == "2023-08-01":
+                return f"{recording.object_storage_path}/{blob_key}"
+            # this is a legacy recording, we need to load the file from the old path
+            return convert_original_version_lts_recording(recording)
+
+        blob_prefix = settings.OBJECT_STORAGE_SESSION_RECORDING_BLOB_INGESTION_FOLDER
+        if use_v3_storage and settings.OBJECT_STORAGE_SESSION_RECORDING_BLOB_INGESTION_V3_FOLDER:
+            blob_prefix = settings.OBJECT_STORAGE_SESSION_RECORDING_BLOB_INGESTION_V3_FOLDER
+
+        return f"{blob_prefix}/team_id/{self.team.pk}/session_id/{recording.session_id}/data/{blob_key}"
+
+    def _stream_blob(self, request: request.Request, file_key: str) -> StreamingHttpResponse:
+        byte_range = request.headers.get("Range")
+        if byte_range and not BYTE_RANGE_REGEX.match(byte_range):
+            # like S3, ignore ranges we don't support and return the whole file
+            byte_range = None
+
+        try:
+            chunks = object_storage.read_chunks(file_key, byte_range=byte_range)
+        except ObjectStorageInvalidRange:
+            return HttpResponse(status=416)
+        if chunks is None:
+            raise exceptions.NotFound("Snapshot file not found")
+
+        body, content_range = chunks
+        response = StreamingHttpResponse(body, content_type="application/json")
+        if byte_range and content_range:
+            response.status_code = 206
+            response["Content-Range"] = content_range
+        response["Accept-Ranges"] = "bytes"
+        response["Content-Disposition"] = "inline"
+        return response
+
+    def _stream_blobs(self, recording: SessionRecording, blob_keys: List[str], use_v3_storage: bool) -> Iterator[bytes]:
+        for blob_key in blob_keys:
+            # a marker line with no snapshots, so the player knows which blob the following lines came from
+            yield json.dumps({"source": "blob", "blob_key": blob_key, "data": []}).encode() + b"\n"
+
+            chunks = object_storage.read_chunks(self._blob_file_key(recording, blob_key, use_v3_storage))
+            if chunks is None:
+                # the response has already started, so a missing blob can only be skipped
+                continue
+
+            last_chunk = b""
+            # blobs are usually gzipped, and gzipped content can't be split up by the marker lines
+            for chunk in object_storage.decompressed_chunks(chunks[0]):
+                if chunk:
+                    last_chunk = chunk
+                    yield chunk
+            if last_chunk and not last_chunk.endswith(b"\n"):
+                yield b"\n"
+
     @staticmethod
     def _distinct_id_from_request(request):
         if isinstance(request.user, AnonymousUser):
@@ -606,17 +659,19 @@ def list_recordings(
     timer = ServerTimingsGathered()
 
     with timer("load_recordings_from_clickhouse"):
+        saved_recordings_by_id: Optional[Dict[str, SessionRecording]] = None
         if all_session_ids:
             # If we specify the session ids (like from pinned recordings) we can optimise by only going to Postgres
             sorted_session_ids = sorted(all_session_ids)
 
-            persisted_recordings_queryset = SessionRecording.objects.filter(
-                team=team, session_id__in=sorted_session_ids
-            ).exclude(object_storage_path=None)
-
-            persisted_recordings = persisted_recordings_queryset.all()
+            # All of the saved recordings of the page at once, the ones only in ClickHouse reuse them below
+            saved_recordings_by_id = {
+                recording.session_id: recording
+                for recording in SessionRecording.objects.filter(team=team, session_id__in=sorted_session_ids)
+            }
+            persisted_recordings = [x for x in saved_recordings_by_id.values() if x.object_storage_path is not None]
 
-            recordings = recordings + list(persisted_recordings)
+            recordings = recordings + persisted_recordings
 
             remaining_session_ids = list(set(all_session_ids) - {x.session_id for x in persisted_recordings})
             filter = filter.shallow_clone({SESSION_RECORDINGS_FILTER_IDS: remaining_session_ids})
@@ -628,7 +683,9 @@ def list_recordings(
                 more_recordings_available,
             ) = SessionRecordingListFromReplaySummary(filter=filter, team=team).run()
 
-            recordings_from_clickhouse = SessionRecording.get_or_build_from_clickhouse(team, ch_session_recordings)
+            recordings_from_clickhouse = SessionRecording.get_or_build_from_clickhouse(
+                team, ch_session_recordings, saved_recordings_by_id
+            )
             recordings = recordings + recordings_from_clickhouse
 
         recordings = [x for x in recordings if not x.deleted]
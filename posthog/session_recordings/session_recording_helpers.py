@@ -3,7 +3,8 @@ import gzip
 import json
 from collections import defaultdict
 from datetime import datetime, timezone
-from typing import Any, Callable, Dict, Generator, List, Tuple
+from typing import Any, Callable, Dict, Generator, Iterable, List, Tuple
+from uuid import uuid4
 
 from dateutil.parser import parse
 from prometheus_client import Counter
@@ -92,6 +93,42 @@ EVENT_SUMMARY_DATA_INCLUSIONS = [
 Event = Dict[str, Any]
 
 
+class SerializedSnapshotItems(List[Event]):
+    """
+    Snapshot items along with their JSON, which is serialized once to size the events they're sent in
+    and then reused for the Kafka payload. Compares equal to the plain list of items.
+    """
+
+    def __init__(self, items: Iterable[Event] = (), serialized: Iterable[str] = ()):
+        super().__init__(items)
+        self.serialized = list(serialized)
+
+    def json(self) -> str:
+        if len(self.serialized) != len(self):
+            # the items were changed after they were serialized
+            return json.dumps(list(self))
+        # the same separator as json.dumps
+        return "[" + ", ".join(self.serialized) + "]"
+
+
+# Stands in for already serialized snapshot items when serializing the rest of an event, unguessable so it can't
+# appear anywhere else in the event
+_SERIALIZED_SNAPSHOT_ITEMS_PLACEHOLDER = f"$snapshot_items-{uuid4()}"
+
+
+def json_dumps_event(event: Event) -> str:
+    """`json.dumps` of an event, which reuses the JSON of its snapshot items if they were already serialized"""
+    properties = event.get("properties")
+    snapshot_items = properties.get("$snapshot_items") if isinstance(properties, dict) else None
+    if not isinstance(snapshot_items, SerializedSnapshotItems):
+        return json.dumps(event)
+
+    event_json = json.dumps(
+        {**event, "properties": {**properties, "$snapshot_items": _SERIALIZED_SNAPSHOT_ITEMS_PLACEHOLDER}}
+    )
+    return event_json.replace(json.dumps(_SERIALIZED_SNAPSHOT_ITEMS_PLACEHOLDER), snapshot_items.json(), 1)
+
+
 def split_replay_events(events: List[Event]) -> Tuple[List[Event], List[Event]]:
     replay, other = [], []
 
@@ -175,36 +212,62 @@ def preprocess_replay_events(
         EVENTS_RECEIVED_WITHOUT_BYTES_COUNTER.labels(resource_type="recordings").inc()
 
         snapshot_data_list = list(flatten([event["properties"]["$snapshot_data"] for event in events], max_depth=1))
+        # Each item is serialized only once, to size the events and for the Kafka payload
+        serialized_list = [json.dumps(snapshot_data) for snapshot_data in snapshot_data_list]
 
         # 2. Otherwise, try and group all the events if they are small enough
-        if byte_size_dict(snapshot_data_list) < size_with_headroom:
-            event = new_event(snapshot_data_list)
-            yield event
+        if _serialized_list_size(serialized_list) < size_with_headroom:
+            yield new_event(SerializedSnapshotItems(snapshot_data_list, serialized_list))
         else:
             # 3. If not, split out the full snapshots from the rest
             full_snapshots = []
             other_snapshots = []
 
-            for snapshot_data in snapshot_data_list:
+            for snapshot_data, serialized in zip(snapshot_data_list, serialized_list):
                 if snapshot_data["type"] == RRWEB_MAP_EVENT_TYPE.FullSnapshot:
-                    full_snapshots.append(snapshot_data)
+                    full_snapshots.append((snapshot_data, serialized))
                 else:
-                    other_snapshots.append(snapshot_data)
+                    other_snapshots.append((snapshot_data, serialized))
 
             # Send the full snapshots individually
-            for snapshot_data in full_snapshots:
-                event = new_event([snapshot_data])
-                yield event
+            for snapshot_data, serialized in full_snapshots:
+                yield new_event(SerializedSnapshotItems([snapshot_data], [serialized]))
 
-            # Try and group the rest
-            if byte_size_dict(other_snapshots) < size_with_headroom:
-                event = new_event(other_snapshots)
-                yield event
-            else:
-                # If not, send them individually
-                for snapshot_data in other_snapshots:
-                    event = new_event([snapshot_data])
-                    yield event
+            # Group the rest into as few events as they fit in
+            for items in _chunk_serialized_items(other_snapshots, size_with_headroom):
+                yield new_event(items)
+
+
+def _serialized_list_size(serialized_list: List[str]) -> int:
+    # the brackets of the list, and the separators between its items
+    return 2 + sum(len(serialized) for serialized in serialized_list) + 2 * max(len(serialized_list) - 1, 0)
+
+
+def _chunk_serialized_items(
+    items: List[Tuple[Event, str]], max_size_bytes: float
+) -> Generator[SerializedSnapshotItems, None, None]:
+    """
+    Splits the items where their offset in the serialized list would pass the max size, without serializing again.
+    Items that are too big on their own get an event to themselves.
+    """
+    chunk = SerializedSnapshotItems()
+    chunk_start = 0
+    offset = 0
+
+    for snapshot_data, serialized in items:
+        item_start = offset
+        # each item adds a separator, or the brackets of the list for the first one
+        offset += len(serialized) + 2
+        if chunk and offset - chunk_start >= max_size_bytes:
+            yield chunk
+            chunk = SerializedSnapshotItems()
+            chunk_start = item_start
+
+        chunk.append(snapshot_data)
+        chunk.serialized.append(serialized)
+
+    if chunk:
+        yield chunk
 
 
 def _process_windowed_events(
@@ -272,7 +335,3 @@ def parse_snapshot_timestamp(timestamp: int):
 
 def convert_to_timestamp(source: str) -> int:
     return int(parse(source).timestamp() * 1000)
-
-
-def byte_size_dict(x: Dict | List) -> int:
-    return len(json.dumps(x))
@@ -26,6 +26,9 @@ CREATE TABLE IF NOT EXISTS {table_name} ON CLUSTER '{cluster}'
     -- part of order by so will aggregate correctly
     team_id Int64,
     embeddings Array(Float32),
+    -- which side of a fixed set of random hyperplanes the embeddings are on, one bit per hyperplane
+    -- similar embeddings have few different bits, so candidates for similarity can be found without reading embeddings
+    embeddings_signature UInt64,
     generation_timestamp DateTime64(6, 'UTC') DEFAULT NOW('UTC'),
     -- we will insert directly for the first test of this
     -- so no _timestamp or _offset column
@@ -85,3 +88,29 @@ DROP_SESSION_REPLAY_EMBEDDINGS_TABLE_SQL = lambda: (
 TRUNCATE_SESSION_REPLAY_EMBEDDINGS_TABLE_SQL = lambda: (
     f"TRUNCATE TABLE IF EXISTS {SESSION_REPLAY_EMBEDDINGS_DATA_TABLE()} ON CLUSTER '{settings.CLICKHOUSE_CLUSTER}'"
 )
+
+# this alter command exists because existing installations need to have the column added,
+# the SESSION_REPLAY_EMBEDDINGS_TABLE_BASE_SQL string already adds it
+ALTER_SESSION_REPLAY_EMBEDDINGS_ADD_SIGNATURE_COLUMN = """
+    ALTER TABLE {table_name} on CLUSTER '{cluster}'
+        ADD COLUMN IF NOT EXISTS embeddings_signature UInt64
+"""
+
+ADD_SIGNATURE_WRITABLE_SESSION_REPLAY_EMBEDDINGS_TABLE_SQL = (
+    lambda: ALTER_SESSION_REPLAY_EMBEDDINGS_ADD_SIGNATURE_COLUMN.format(
+        table_name="writable_session_replay_embeddings",
+        cluster=settings.CLICKHOUSE_CLUSTER,
+    )
+)
+
+ADD_SIGNATURE_DISTRIBUTED_SESSION_REPLAY_EMBEDDINGS_TABLE_SQL = (
+    lambda: ALTER_SESSION_REPLAY_EMBEDDINGS_ADD_SIGNATURE_COLUMN.format(
+        table_name="session_replay_embeddings",
+        cluster=settings.CLICKHOUSE_CLUSTER,
+    )
+)
+
+ADD_SIGNATURE_SESSION_REPLAY_EMBEDDINGS_TABLE_SQL = lambda: ALTER_SESSION_REPLAY_EMBEDDINGS_ADD_SIGNATURE_COLUMN.format(
+    table_name=SESSION_REPLAY_EMBEDDINGS_DATA_TABLE(),
+    cluster=settings.CLICKHOUSE_CLUSTER,
+)
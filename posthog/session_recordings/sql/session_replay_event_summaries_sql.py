@@ -0,0 +1,123 @@
+from django.conf import settings
+
+from posthog.clickhouse.table_engines import (
+    AggregatingMergeTree,
+    Distributed,
+    ReplicationScheme,
+)
+
+"""
+A per-session summary of the events captured alongside recordings: which events happened and which urls were visited.
+
+The recordings list filters sessions by the events that happened in them. Without this table that means scanning
+`events` for every list request. When the filters can be answered from the summary the list reads this table instead,
+see `SessionSummaryEventsQuery`.
+
+Rows are written on ingestion by a materialized view on `sharded_events`, so they land on the same shard as the events
+they summarise. Each insert adds a partial row per session which merges collapse, so reads have to group by session.
+"""
+
+SESSION_REPLAY_EVENT_SUMMARIES_DATA_TABLE = lambda: "sharded_session_replay_event_summaries"
+
+# if updating these column definitions
+# you'll need to update the select used by the materialized view and the backfill below
+SESSION_REPLAY_EVENT_SUMMARIES_TABLE_BASE_SQL = """
+CREATE TABLE IF NOT EXISTS {table_name} ON CLUSTER '{cluster}'
+(
+    -- part of order by so will aggregate correctly
+    team_id Int64,
+    -- part of order by so will aggregate correctly
+    session_id VARCHAR,
+    -- ClickHouse will pick any value of distinct_id for the session
+    distinct_id VARCHAR,
+    min_timestamp SimpleAggregateFunction(min, DateTime64(6, 'UTC')),
+    max_timestamp SimpleAggregateFunction(max, DateTime64(6, 'UTC')),
+    event_names SimpleAggregateFunction(groupUniqArrayArray, Array(String)),
+    current_urls SimpleAggregateFunction(groupUniqArrayArray, Array(String))
+) ENGINE = {engine}
+"""
+
+SESSION_REPLAY_EVENT_SUMMARIES_DATA_TABLE_ENGINE = lambda: AggregatingMergeTree(
+    "session_replay_event_summaries", replication_scheme=ReplicationScheme.SHARDED
+)
+
+SESSION_REPLAY_EVENT_SUMMARIES_TABLE_SQL = lambda: (
+    SESSION_REPLAY_EVENT_SUMMARIES_TABLE_BASE_SQL
+    + """
+    PARTITION BY toYYYYMM(min_timestamp)
+    -- same trade off as session_replay_events, at most one row per day per session once merged
+    ORDER BY (toDate(min_timestamp), team_id, session_id)
+SETTINGS index_granularity=512
+"""
+).format(
+    table_name=SESSION_REPLAY_EVENT_SUMMARIES_DATA_TABLE(),
+    cluster=settings.CLICKHOUSE_CLUSTER,
+    engine=SESSION_REPLAY_EVENT_SUMMARIES_DATA_TABLE_ENGINE(),
+)
+
+# This table is responsible for reading from session_replay_event_summaries on a cluster setting
+DISTRIBUTED_SESSION_REPLAY_EVENT_SUMMARIES_TABLE_SQL = lambda: SESSION_REPLAY_EVENT_SUMMARIES_TABLE_BASE_SQL.format(
+    table_name="session_replay_event_summaries",
+    cluster=settings.CLICKHOUSE_CLUSTER,
+    engine=Distributed(
+        data_table=SESSION_REPLAY_EVENT_SUMMARIES_DATA_TABLE(),
+        sharding_key="sipHash64(distinct_id)",
+    ),
+)
+
+SUMMARISE_EVENTS_SELECT_SQL = """
+SELECT
+    team_id,
+    JSONExtractString(properties, '$session_id') AS session_id,
+    any(distinct_id) AS distinct_id,
+    min(timestamp) AS min_timestamp,
+    max(timestamp) AS max_timestamp,
+    groupUniqArray(event) AS event_names,
+    groupUniqArrayIf(
+        JSONExtractString(properties, '$current_url'), JSONHas(properties, '$current_url')
+    ) AS current_urls
+FROM {database}.{source_table}
+WHERE notEmpty(JSONExtractString(properties, '$session_id')) {conditions}
+GROUP BY team_id, session_id
+"""
+
+SESSION_REPLAY_EVENT_SUMMARIES_TABLE_MV_SQL = (
+    lambda: """
+CREATE MATERIALIZED VIEW IF NOT EXISTS session_replay_event_summaries_mv ON CLUSTER '{cluster}'
+TO {database}.{target_table}
+AS {select}
+""".format(
+        cluster=settings.CLICKHOUSE_CLUSTER,
+        database=settings.CLICKHOUSE_DATABASE,
+        target_table=SESSION_REPLAY_EVENT_SUMMARIES_DATA_TABLE(),
+        select=SUMMARISE_EVENTS_SELECT_SQL.format(
+            database=settings.CLICKHOUSE_DATABASE, source_table="sharded_events", conditions=""
+        ),
+    )
+)
+
+# Summarises events that were ingested before the materialized view existed.
+# Rows are written through the distributed table, so backfilled sessions may land on a different shard than their
+# events, which only matters for how well they merge.
+BACKFILL_SESSION_REPLAY_EVENT_SUMMARIES_SQL = (
+    lambda: """
+INSERT INTO {database}.session_replay_event_summaries
+(team_id, session_id, distinct_id, min_timestamp, max_timestamp, event_names, current_urls)
+{select}
+""".format(
+        database=settings.CLICKHOUSE_DATABASE,
+        select=SUMMARISE_EVENTS_SELECT_SQL.format(
+            database=settings.CLICKHOUSE_DATABASE,
+            source_table="events",
+            conditions="AND team_id = %(team_id)s AND timestamp >= %(date_from)s AND timestamp < %(date_to)s",
+        ),
+    )
+)
+
+DROP_SESSION_REPLAY_EVENT_SUMMARIES_TABLE_SQL = lambda: (
+    f"DROP TABLE IF EXISTS {SESSION_REPLAY_EVENT_SUMMARIES_DATA_TABLE()} ON CLUSTER '{settings.CLICKHOUSE_CLUSTER}'"
+)
+
+TRUNCATE_SESSION_REPLAY_EVENT_SUMMARIES_TABLE_SQL = lambda: (
+    f"TRUNCATE TABLE IF EXISTS {SESSION_REPLAY_EVENT_SUMMARIES_DATA_TABLE()} ON CLUSTER '{settings.CLICKHOUSE_CLUSTER}'"
+)
@@ -1,6 +1,6 @@
 import uuid
 from typing import List
-from unittest.mock import patch, MagicMock, call, Mock
+from unittest.mock import patch, MagicMock, call
 
 from posthog.models import Team
 from posthog.models.signals import mute_selected_signals
@@ -122,14 +122,12 @@ class TestSessionRecordings(APIBaseTest, ClickhouseTestMixin, QueryMatchingTest)
         "posthog.session_recordings.queries.session_replay_events.SessionReplayEvents.exists",
         return_value=True,
     )
-    @patch("posthog.session_recordings.session_recording_api.requests.get")
-    @patch("posthog.session_recordings.session_recording_api.object_storage.get_presigned_url")
+    @patch("posthog.session_recordings.session_recording_api.object_storage.read_chunks")
     @patch("posthog.session_recordings.session_recording_api.object_storage.list_objects")
     def test_2023_08_01_version_stored_snapshots_can_be_loaded(
         self,
         mock_list_objects: MagicMock,
-        mock_get_presigned_url: MagicMock,
-        mock_requests: MagicMock,
+        mock_read_chunks: MagicMock,
         _mock_exists: MagicMock,
     ) -> None:
         session_id = str(uuid.uuid4())
@@ -147,15 +145,7 @@ class TestSessionRecordings(APIBaseTest, ClickhouseTestMixin, QueryMatchingTest)
                 return []
 
         mock_list_objects.side_effect = list_objects_func
-        mock_get_presigned_url.return_value = "https://example.com"
-
-        mock_response = Mock()
-        mock_response.raise_for_status.return_value = None
-        mock_response.raw = "the file contents"
-
-        # Set up the mock to work as a context manager
-        mock_requests.return_value.__enter__.return_value = mock_response
-        mock_requests.return_value.__exit__.return_value = None
+        mock_read_chunks.return_value = (iter([b"the file ", b"contents"]), None)
 
         SessionRecording.objects.create(
             team=self.team,
@@ -172,12 +162,12 @@ class TestSessionRecordings(APIBaseTest, ClickhouseTestMixin, QueryMatchingTest)
         response = self.client.get(
             f"/api/projects/{self.team.id}/session_recordings/{session_id}/snapshots?{'&'.join(query_parameters)}"
         )
-        response_data = response.content.decode("utf-8")
+        response_data = b"".join(response.streaming_content).decode("utf-8")
 
         assert mock_list_objects.call_args_list == []
 
-        assert mock_get_presigned_url.call_args_list == [
-            call(f"{lts_storage_path}/1-2", expiration=60),
+        assert mock_read_chunks.call_args_list == [
+            call(f"{lts_storage_path}/1-2", byte_range=None),
         ]
 
         assert response_data == "the file contents"
@@ -186,20 +176,18 @@ class TestSessionRecordings(APIBaseTest, ClickhouseTestMixin, QueryMatchingTest)
         "posthog.session_recordings.queries.session_replay_events.SessionReplayEvents.exists",
         return_value=True,
     )
-    @patch("posthog.session_recordings.session_recording_api.requests.get")
     @patch("posthog.session_recordings.session_recording_api.object_storage.tag")
     @patch("posthog.session_recordings.session_recording_api.object_storage.write")
     @patch("posthog.session_recordings.session_recording_api.object_storage.read")
-    @patch("posthog.session_recordings.session_recording_api.object_storage.get_presigned_url")
+    @patch("posthog.session_recordings.session_recording_api.object_storage.read_chunks")
     @patch("posthog.session_recordings.session_recording_api.object_storage.list_objects")
     def test_original_version_stored_snapshots_can_be_loaded_without_upversion(
         self,
         mock_list_objects: MagicMock,
-        mock_get_presigned_url: MagicMock,
+        mock_read_chunks: MagicMock,
         mock_read: MagicMock,
         mock_write: MagicMock,
         mock_tag: MagicMock,
-        mock_requests: MagicMock,
         _mock_exists: MagicMock,
     ) -> None:
         session_id = str(uuid.uuid4())
@@ -209,17 +197,9 @@ class TestSessionRecordings(APIBaseTest, ClickhouseTestMixin, QueryMatchingTest)
             return []
 
         mock_list_objects.side_effect = list_objects_func
-        mock_get_presigned_url.return_value = "https://example.com"
+        mock_read_chunks.return_value = (iter([b"the file ", b"contents"]), None)
         mock_read.return_value = legacy_compressed_original
 
-        mock_response = Mock()
-        mock_response.raise_for_status.return_value = None
-        mock_response.raw = "the file contents"
-
-        # Set up the mock to work as a context manager
-        mock_requests.return_value.__enter__.return_value = mock_response
-        mock_requests.return_value.__exit__.return_value = None
-
         with mute_selected_signals():
             SessionRecording.objects.create(
                 team=self.team,
@@ -252,10 +232,10 @@ class TestSessionRecordings(APIBaseTest, ClickhouseTestMixin, QueryMatchingTest)
         assert mock_tag.call_args_list == [call(lts_storage_path, {"converted": "true"})]
 
         # the original saved path isn't loaded for reading the content
-        assert mock_get_presigned_url.call_args_list == [
-            call(expected_path, expiration=60),
+        assert mock_read_chunks.call_args_list == [
+            call(expected_path, byte_range=None),
         ]
 
         # and the mock content is returned
-        response_data = response.content.decode("utf-8")
+        response_data = b"".join(response.streaming_content).decode("utf-8")
         assert response_data == "the file contents"
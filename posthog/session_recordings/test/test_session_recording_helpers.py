@@ -12,6 +12,7 @@ from posthog.session_recordings.session_recording_helpers import (
     RRWEB_MAP_EVENT_TYPE,
     SessionRecordingEventSummary,
     is_active_event,
+    json_dumps_event,
     preprocess_replay_events_for_blob_ingestion,
     split_replay_events,
 )
@@ -489,3 +490,25 @@ def test_new_ingestion_groups_using_snapshot_bytes_if_possible(raw_snapshot_even
             },
         },
     ]
+
+
+def test_new_ingestion_groups_large_non_full_snapshots_into_as_few_events_as_fit():
+    snapshots = [
+        {"type": 3, "timestamp": timestamp, "something": "".join(random.choices(string.ascii_uppercase, k=500))}
+        for timestamp in range(5)
+    ]
+    events = [
+        {
+            "event": "$snapshot",
+            "properties": {"$session_id": "1234", "$window_id": "1", "$snapshot_data": snapshot, "distinct_id": "abc"},
+        }
+        for snapshot in snapshots
+    ]
+
+    replay_events = mock_capture_flow(events, max_size_bytes=2000)[1]
+
+    assert [event["properties"]["$snapshot_items"] for event in replay_events] == [snapshots[:3], snapshots[3:]]
+    for event in replay_events:
+        # the items were serialized once, and that is reused for the Kafka payload
+        assert json_dumps_event(event) == json.dumps(event)
+        assert len(json.dumps(event["properties"]["$snapshot_items"])) < 2000 * 0.95
@@ -1,3 +1,5 @@
+import gzip
+import json
 import time
 import uuid
 from datetime import datetime, timedelta, timezone
@@ -8,6 +10,8 @@ from urllib.parse import urlencode
 from parameterized import parameterized
 from dateutil.parser import parse
 from dateutil.relativedelta import relativedelta
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.utils.timezone import now
 from freezegun import freeze_time
 from rest_framework import status
@@ -154,6 +158,50 @@ class TestSessionRecordings(APIBaseTest, ClickhouseTestMixin, QueryMatchingTest)
                 with self.assertNumQueries(num_queries):
                     self.client.get(f"/api/projects/{self.team.id}/session_recordings")
 
+    def test_listing_pinned_recordings_does_not_query_per_recording(self):
+        base_time = (now() - relativedelta(days=1)).replace(microsecond=0)
+
+        def pin_recording(i: int) -> None:
+            # every other recording has been persisted to LTS and only exists in Postgres
+            if i % 2:
+                Person.objects.create(team=self.team, distinct_ids=[f"user{i}"])
+                SessionRecording.objects.create(
+                    team=self.team,
+                    session_id=f"{i}",
+                    distinct_id=f"user{i}",
+                    start_time=base_time,
+                    end_time=base_time + relativedelta(seconds=10),
+                    duration=10,
+                    storage_version="2023-08-01",
+                    object_storage_path=f"an lts stored object path {i}",
+                )
+            else:
+                self._person_with_snapshots(base_time=base_time, distinct_id=f"user{i}", session_id=f"{i}")
+
+        def list_pinned_recordings(count: int):
+            session_ids = json.dumps([f"{i}" for i in range(count)])
+            return self.client.get(
+                f"/api/projects/{self.team.id}/session_recordings?{urlencode({'session_ids': session_ids})}"
+            )
+
+        # request once without counting queries to cache lookups that would make the counts vary otherwise
+        list_pinned_recordings(1)
+
+        for i in range(2):
+            pin_recording(i)
+        with CaptureQueriesContext(connection) as queries_for_two:
+            list_pinned_recordings(2)
+
+        for i in range(2, 10):
+            pin_recording(i)
+        with self.assertNumQueries(len(queries_for_two)):
+            response = list_pinned_recordings(10)
+
+        assert response.status_code == status.HTTP_200_OK
+        results = response.json()["results"]
+        assert [result["id"] for result in results] == [f"{i}" for i in range(10)]
+        assert [result["person"]["distinct_ids"] for result in results] == [[f"user{i}"] for i in range(10)]
+
     def _person_with_snapshots(self, base_time: datetime, distinct_id: str = "user", session_id: str = "1") -> None:
         Person.objects.create(
             team=self.team,
@@ -610,12 +658,10 @@ class TestSessionRecordings(APIBaseTest, ClickhouseTestMixin, QueryMatchingTest)
         return_value=True,
     )
     @patch("posthog.session_recordings.session_recording_api.SessionRecording.get_or_build")
-    @patch("posthog.session_recordings.session_recording_api.object_storage.get_presigned_url")
-    @patch("posthog.session_recordings.session_recording_api.requests")
+    @patch("posthog.session_recordings.session_recording_api.object_storage.read_chunks")
     def test_can_get_session_recording_blob(
         self,
-        _mock_requests,
-        mock_presigned_url,
+        mock_read_chunks,
         mock_get_session_recording,
         _mock_exists,
     ) -> None:
@@ -627,16 +673,112 @@ class TestSessionRecordings(APIBaseTest, ClickhouseTestMixin, QueryMatchingTest)
         # by default a session recording is deleted, so we have to explicitly mark the mock as not deleted
         mock_get_session_recording.return_value = SessionRecording(session_id=session_id, team=self.team, deleted=False)
 
-        def presigned_url_sideeffect(key: str, **kwargs):
+        def read_chunks_sideeffect(key: str, **kwargs):
             if key == f"session_recordings/team_id/{self.team.pk}/session_id/{session_id}/data/{blob_key}":
-                return f"https://test.com/"
+                return iter([b'{"some": "data"}\n']), None
             else:
                 return None
 
-        mock_presigned_url.side_effect = presigned_url_sideeffect
+        mock_read_chunks.side_effect = read_chunks_sideeffect
 
         response = self.client.get(url)
         assert response.status_code == status.HTTP_200_OK
+        assert response["Accept-Ranges"] == "bytes"
+        assert b"".join(response.streaming_content) == b'{"some": "data"}\n'
+
+    @patch(
+        "posthog.session_recordings.queries.session_replay_events.SessionReplayEvents.exists",
+        return_value=True,
+    )
+    @patch("posthog.session_recordings.session_recording_api.SessionRecording.get_or_build")
+    @patch("posthog.session_recordings.session_recording_api.object_storage.read_chunks")
+    def test_can_get_a_range_of_a_session_recording_blob(
+        self,
+        mock_read_chunks,
+        mock_get_session_recording,
+        _mock_exists,
+    ) -> None:
+        session_id = str(uuid.uuid4())
+        url = f"/api/projects/{self.team.pk}/session_recordings/{session_id}/snapshots/?version=2&source=blob&blob_key=1682608337071"
+        mock_get_session_recording.return_value = SessionRecording(session_id=session_id, team=self.team, deleted=False)
+        mock_read_chunks.return_value = (iter([b"some"]), "bytes 2-5/100")
+
+        response = self.client.get(url, HTTP_RANGE="bytes=2-5")
+        assert response.status_code == status.HTTP_206_PARTIAL_CONTENT
+        assert response["Content-Range"] == "bytes 2-5/100"
+        assert mock_read_chunks.call_args[1] == {"byte_range": "bytes=2-5"}
+
+        # unsupported ranges are ignored, and the whole file is returned
+        mock_read_chunks.return_value = (iter([b"everything"]), None)
+        response = self.client.get(url, HTTP_RANGE="bytes=0-1,4-5")
+        assert response.status_code == status.HTTP_200_OK
+        assert mock_read_chunks.call_args[1] == {"byte_range": None}
+
+    @patch(
+        "posthog.session_recordings.queries.session_replay_events.SessionReplayEvents.exists",
+        return_value=True,
+    )
+    @patch("posthog.session_recordings.session_recording_api.SessionRecording.get_or_build")
+    @patch("posthog.session_recordings.session_recording_api.object_storage.read_chunks")
+    def test_can_get_several_session_recording_blobs_at_once(
+        self,
+        mock_read_chunks,
+        mock_get_session_recording,
+        _mock_exists,
+    ) -> None:
+        session_id = str(uuid.uuid4())
+        url = f"/api/projects/{self.team.pk}/session_recordings/{session_id}/snapshots/?version=2&source=blob&blob_keys=1-2,3-4,5-6"
+        mock_get_session_recording.return_value = SessionRecording(session_id=session_id, team=self.team, deleted=False)
+
+        blobs = {
+            # the second chunk doesn't end with a newline
+            "1-2": [
+                b'{"window_id": "a", "data": [{"timestamp": 1}]}\n{"window_id": "a", ',
+                b'"data": [{"timestamp": 2}]}',
+            ],
+            "3-4": [gzip.compress(b'{"window_id": "a", "data": [{"timestamp": 3}]}\n')],
+        }
+
+        def read_chunks_sideeffect(key: str, **kwargs):
+            blob_key = key.split("/")[-1]
+            return (iter(blobs[blob_key]), None) if blob_key in blobs else None
+
+        mock_read_chunks.side_effect = read_chunks_sideeffect
+
+        response = self.client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        assert [json.loads(line) for line in lines] == [
+            {"source": "blob", "blob_key": "1-2", "data": []},
+            {"window_id": "a", "data": [{"timestamp": 1}]},
+            {"window_id": "a", "data": [{"timestamp": 2}]},
+            {"source": "blob", "blob_key": "3-4", "data": []},
+            {"window_id": "a", "data": [{"timestamp": 3}]},
+            {"source": "blob", "blob_key": "5-6", "data": []},
+        ]
+
+    @patch(
+        "posthog.session_recordings.queries.session_replay_events.SessionReplayEvents.exists",
+        return_value=True,
+    )
+    @patch("posthog.session_recordings.session_recording_api.SessionRecording.get_or_build")
+    @patch("posthog.session_recordings.session_recording_api.object_storage.read_chunks")
+    def test_cannot_get_several_blobs_of_a_legacy_lts_recording(
+        self,
+        mock_read_chunks,
+        mock_get_session_recording,
+        _mock_exists,
+    ) -> None:
+        session_id = str(uuid.uuid4())
+        url = f"/api/projects/{self.team.pk}/session_recordings/{session_id}/snapshots/?version=2&source=blob&blob_keys=1-2,3-4"
+        mock_get_session_recording.return_value = SessionRecording(
+            session_id=session_id, team=self.team, deleted=False, object_storage_path="a legacy lts path"
+        )
+
+        response = self.client.get(url)
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        mock_read_chunks.assert_not_called()
 
     @patch(
         "posthog.session_recordings.queries.session_replay_events.SessionReplayEvents.exists",
@@ -708,10 +850,9 @@ class TestSessionRecordings(APIBaseTest, ClickhouseTestMixin, QueryMatchingTest)
         assert response.json() == {"snapshots": [{"some": "𐐷 probably from console logs"}]}
 
     @patch("posthog.session_recordings.session_recording_api.SessionRecording.get_or_build")
-    @patch("posthog.session_recordings.session_recording_api.object_storage.get_presigned_url")
-    @patch("posthog.session_recordings.session_recording_api.requests")
+    @patch("posthog.session_recordings.session_recording_api.object_storage.read_chunks")
     def test_cannot_get_session_recording_blob_for_made_up_sessions(
-        self, _mock_requests, mock_presigned_url, mock_get_session_recording
+        self, mock_read_chunks, mock_get_session_recording
     ) -> None:
         session_id = str(uuid.uuid4())
         blob_key = f"1682608337071"
@@ -723,15 +864,15 @@ class TestSessionRecordings(APIBaseTest, ClickhouseTestMixin, QueryMatchingTest)
 
         response = self.client.get(url)
         assert response.status_code == status.HTTP_404_NOT_FOUND
-        assert mock_presigned_url.call_count == 0
+        assert mock_read_chunks.call_count == 0
 
-    @patch("posthog.session_recordings.session_recording_api.object_storage.get_presigned_url")
-    def test_can_not_get_session_recording_blob_that_does_not_exist(self, mock_presigned_url) -> None:
+    @patch("posthog.session_recordings.session_recording_api.object_storage.read_chunks")
+    def test_can_not_get_session_recording_blob_that_does_not_exist(self, mock_read_chunks) -> None:
         session_id = str(uuid.uuid4())
         blob_key = f"session_recordings/team_id/{self.team.pk}/session_id/{session_id}/data/1682608337071"
         url = f"/api/projects/{self.team.pk}/session_recordings/{session_id}/snapshots/?version=2&source=blob&blob_key={blob_key}"
 
-        mock_presigned_url.return_value = None
+        mock_read_chunks.return_value = None
 
         response = self.client.get(url)
         assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -97,6 +97,11 @@ PERSON_ON_EVENTS_V2_OVERRIDE = get_from_env("PERSON_ON_EVENTS_V2_OVERRIDE", opti
 # Wether to use insight queries converted to HogQL.
 HOGQL_INSIGHTS_OVERRIDE = get_from_env("HOGQL_INSIGHTS_OVERRIDE", optional=True, type_cast=str_to_bool)
 
+# How long the persons rendered in events and persons lists are cached for, 0 disables the cache
+PERSON_PROJECTION_CACHE_TTL_SECONDS = get_from_env(
+    "PERSON_PROJECTION_CACHE_TTL_SECONDS", 0 if TEST else 60, type_cast=int
+)
+
 HOOK_EVENTS: Dict[str, str] = {}
 
 # Support creating multiple organizations in a single instance. Requires a premium license.
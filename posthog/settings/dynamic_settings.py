@@ -158,6 +158,11 @@ CONSTANCE_CONFIG = {
         "user to determine how many insight cache updates to run at a time",
         int,
     ),
+    "PARALLEL_DASHBOARD_ITEM_CACHE_PER_TEAM": (
+        get_from_env("PARALLEL_DASHBOARD_ITEM_CACHE_PER_TEAM", default=3),
+        "used to determine how many insight cache updates can be in flight for a single team at a time",
+        int,
+    ),
     "ALLOW_EXPERIMENTAL_ASYNC_MIGRATIONS": (
         get_from_env("ALLOW_EXPERIMENTAL_ASYNC_MIGRATIONS", default=False),
         "Used to enable the running of experimental async migrations",
@@ -224,6 +229,7 @@ SETTINGS_ALLOWING_API_OVERRIDE = (
     "SLACK_APP_CLIENT_SECRET",
     "SLACK_APP_SIGNING_SECRET",
     "PARALLEL_DASHBOARD_ITEM_CACHE",
+    "PARALLEL_DASHBOARD_ITEM_CACHE_PER_TEAM",
     "ALLOW_EXPERIMENTAL_ASYNC_MIGRATIONS",
     "RATE_LIMIT_ENABLED",
     "RATE_LIMITING_ALLOW_LIST_TEAMS",
@@ -22,6 +22,10 @@ else:
 OBJECT_STORAGE_ENABLED = get_from_env("OBJECT_STORAGE_ENABLED", True if DEBUG else False, type_cast=str_to_bool)
 OBJECT_STORAGE_REGION = os.getenv("OBJECT_STORAGE_REGION", "us-east-1")
 OBJECT_STORAGE_BUCKET = os.getenv("OBJECT_STORAGE_BUCKET", "posthog")
+# Connections kept open to object storage per process, shared by all threads streaming from it
+OBJECT_STORAGE_MAX_POOL_CONNECTIONS = get_from_env("OBJECT_STORAGE_MAX_POOL_CONNECTIONS", 50, type_cast=int)
+# Requests a single copy or read of many objects makes at the same time, must not be more than the pool size
+OBJECT_STORAGE_MAX_CONCURRENT_REQUESTS = get_from_env("OBJECT_STORAGE_MAX_CONCURRENT_REQUESTS", 10, type_cast=int)
 OBJECT_STORAGE_SESSION_RECORDING_BLOB_INGESTION_FOLDER = os.getenv(
     "OBJECT_STORAGE_SESSION_RECORDING_BLOB_INGESTION_FOLDER", "session_recordings"
 )
@@ -1,8 +1,29 @@
 from posthog.settings.base_variables import TEST
-from posthog.settings.utils import get_from_env
+from posthog.settings.utils import get_from_env, str_to_bool
 
 USE_PRECALCULATED_CH_COHORT_PEOPLE = not TEST
 CALCULATE_X_COHORTS_PARALLEL = get_from_env("CALCULATE_X_COHORTS_PARALLEL", 5, type_cast=int)
+# Calculate each team's due cohorts in one task, in dependency order, reading the cohorts other cohorts depend on
+# from their calculated people rather than evaluating their filters again for every dependent cohort
+CALCULATE_COHORTS_IN_DEPENDENCY_ORDER = get_from_env(
+    "CALCULATE_COHORTS_IN_DEPENDENCY_ORDER", False, type_cast=str_to_bool
+)
+# How many of a team's cohorts to calculate at the same time, when calculating in dependency order
+CALCULATE_COHORTS_PER_TEAM_PARALLEL = get_from_env(
+    "CALCULATE_COHORTS_PER_TEAM_PARALLEL", 1 if TEST else 2, type_cast=int
+)
+# Recalculate cohorts for only the persons that changed since their last calculation, when their filters allow it
+COHORT_INCREMENTAL_RECALCULATION = get_from_env("COHORT_INCREMENTAL_RECALCULATION", False, type_cast=str_to_bool)
+# How far before the last calculation to look for changes, to cover calculations that took a while and ingestion lag
+COHORT_INCREMENTAL_LOOKBACK_MINUTES = get_from_env("COHORT_INCREMENTAL_LOOKBACK_MINUTES", 60, type_cast=int)
+# Above this many changed persons a full recalculation is cheaper
+COHORT_INCREMENTAL_MAX_CHANGED_PERSONS = get_from_env("COHORT_INCREMENTAL_MAX_CHANGED_PERSONS", 100_000, type_cast=int)
+# How many dashboard tiles to calculate at the same time when a dashboard is refreshed. Use 1 to disable.
+DASHBOARD_REFRESH_PARALLELISM = get_from_env("DASHBOARD_REFRESH_PARALLELISM", 1 if TEST else 4, type_cast=int)
+# How many of the usage report's metric queries to run at the same time. Use 1 to disable.
+USAGE_REPORT_QUERIES_PARALLELISM = get_from_env("USAGE_REPORT_QUERIES_PARALLELISM", 1 if TEST else 4, type_cast=int)
+# Keep the metrics of usage reports that fail part way through, so that retrying only runs the queries that failed
+USAGE_REPORT_RESUME_FAILED_REPORTS = get_from_env("USAGE_REPORT_RESUME_FAILED_REPORTS", not TEST, type_cast=str_to_bool)
 
 ACTION_EVENT_MAPPING_INTERVAL_SECONDS = get_from_env("ACTION_EVENT_MAPPING_INTERVAL_SECONDS", 300, type_cast=int)
 
@@ -25,6 +46,33 @@ COUNT_TILES_WITH_NO_FILTERS_HASH_INTERVAL_SECONDS = get_from_env(
 
 CACHED_RESULTS_TTL = 7 * 24 * 60 * 60  # how long to keep cached results for
 
+# Up to how long after its last refresh a stale cached query result may still be served while it is recalculated
+# in the background.
+# Use 0 to disable stale-while-revalidate and always recalculate stale results synchronously.
+QUERY_STALE_WHILE_REVALIDATE_GRACE_PERIOD_SECONDS = get_from_env(
+    "QUERY_STALE_WHILE_REVALIDATE_GRACE_PERIOD_SECONDS", 0, type_cast=int
+)
+
+# Read web analytics stats from the hourly rollup table when the query filters allow it,
+# and keep the rollup up to date with an hourly task
+WEB_ANALYTICS_ROLLUP_ENABLED = get_from_env("WEB_ANALYTICS_ROLLUP_ENABLED", False, type_cast=str_to_bool)
+# How long to wait after an hour has passed before rolling it up, so that late arriving events are included
+WEB_ANALYTICS_ROLLUP_LAG_MINUTES = get_from_env("WEB_ANALYTICS_ROLLUP_LAG_MINUTES", 30, type_cast=int)
+# How many hours to roll up at most in one run, when catching up
+WEB_ANALYTICS_ROLLUP_MAX_HOURS_PER_RUN = get_from_env("WEB_ANALYTICS_ROLLUP_MAX_HOURS_PER_RUN", 24, type_cast=int)
+# How many days of existing events to roll up when the rollup runs for the first time
+WEB_ANALYTICS_ROLLUP_BACKFILL_DAYS = get_from_env("WEB_ANALYTICS_ROLLUP_BACKFILL_DAYS", 0, type_cast=int)
+
+# Keep per team daily event counts up to date with an hourly task
+TEAM_DAILY_EVENT_COUNTS_ENABLED = get_from_env("TEAM_DAILY_EVENT_COUNTS_ENABLED", False, type_cast=str_to_bool)
+# How many of the most recent days to count again on every run, so that late arriving events are included
+TEAM_DAILY_EVENT_COUNTS_RECOUNT_DAYS = get_from_env("TEAM_DAILY_EVENT_COUNTS_RECOUNT_DAYS", 2, type_cast=int)
+# Read the event counts of usage reports from the daily counts, rather than counting all events again. Only turn this
+# on once every day has been counted, e.g. with the `count_team_daily_events` command.
+USAGE_REPORT_FROM_DAILY_EVENT_COUNTS = get_from_env(
+    "USAGE_REPORT_FROM_DAILY_EVENT_COUNTS", False, type_cast=str_to_bool
+)
+
 # Schedule to run asynchronous data deletion on. Follows crontab syntax.
 # Use empty string to prevent this
 CLEAR_CLICKHOUSE_REMOVED_DATA_SCHEDULE_CRON = get_from_env(
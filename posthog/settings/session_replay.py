@@ -8,6 +8,10 @@ from posthog.utils import str_to_bool
 # it is likely this can be returned to the default of True in future but would need careful monitoring
 ALLOW_DENORMALIZED_PROPS_IN_LISTING = get_from_env("ALLOW_DENORMALIZED_PROPS_IN_LISTING", False, type_cast=str_to_bool)
 
+# list recordings from session_replay_event_summaries, instead of events, when it can answer the event filters
+# only turn on once the summaries have been backfilled for the recordings' retention period
+REPLAY_LISTING_FROM_EVENT_SUMMARIES = get_from_env("REPLAY_LISTING_FROM_EVENT_SUMMARIES", False, type_cast=str_to_bool)
+
 # realtime snapshot loader tries REALTIME_SNAPSHOTS_FROM_REDIS_ATTEMPT_MAX times
 # it waits for REALTIME_SNAPSHOTS_FROM_REDIS_ATTEMPT_TIMEOUT_SECONDS between the first 3 attempts
 # and REALTIME_SNAPSHOTS_FROM_REDIS_ATTEMPT_TIMEOUT_SECONDS * 2 between the remainder
@@ -27,3 +31,13 @@ REPLAY_EMBEDDINGS_MIN_DURATION_SECONDS = get_from_env("REPLAY_EMBEDDINGS_MIN_DUR
 REPLAY_EMBEDDINGS_CALCULATION_CELERY_INTERVAL_SECONDS = get_from_env(
     "REPLAY_EMBEDDINGS_CALCULATION_CELERY_INTERVAL_SECONDS", 150, type_cast=int
 )
+# the model allows more tokens per request than per input, so several sessions are embedded in each request
+REPLAY_EMBEDDINGS_REQUEST_TOKEN_BUDGET = get_from_env("REPLAY_EMBEDDINGS_REQUEST_TOKEN_BUDGET", 100_000, type_cast=int)
+REPLAY_EMBEDDINGS_CONCURRENCY = get_from_env("REPLAY_EMBEDDINGS_CONCURRENCY", 4, type_cast=int)
+REPLAY_EMBEDDINGS_REQUESTS_PER_MINUTE = get_from_env("REPLAY_EMBEDDINGS_REQUESTS_PER_MINUTE", 500, type_cast=int)
+# how many sessions with the closest embedding signatures to compare exactly when looking for similar recordings
+REPLAY_EMBEDDINGS_SIMILARITY_CANDIDATES = get_from_env("REPLAY_EMBEDDINGS_SIMILARITY_CANDIDATES", 200, type_cast=int)
+
+# when persisting recordings, merge the many small blob files from ingestion into a few of around this size
+REPLAY_COMPACT_PERSISTED_RECORDINGS = get_from_env("REPLAY_COMPACT_PERSISTED_RECORDINGS", False, type_cast=str_to_bool)
+REPLAY_COMPACTED_FILE_TARGET_BYTES = get_from_env("REPLAY_COMPACTED_FILE_TARGET_BYTES", 20 * 1024 * 1024, type_cast=int)
@@ -332,6 +332,14 @@ GZIP_RESPONSE_ALLOW_LIST = get_list(
     )
 )
 
+# Load the data for exports of API paths, e.g. legacy insights, by calling the API views in the exporting worker
+# rather than making HTTP requests to the API
+EXPORTS_CALL_API_IN_PROCESS = get_from_env("EXPORTS_CALL_API_IN_PROCESS", False, type_cast=str_to_bool)
+# How many browsers each worker process keeps running for image exports, which is also how many it renders at once
+IMAGE_EXPORT_BROWSER_POOL_SIZE = get_from_env("IMAGE_EXPORT_BROWSER_POOL_SIZE", 1, type_cast=int)
+# After how many renders a browser is replaced with a fresh one. Use 1 to start a new browser for every export
+IMAGE_EXPORT_BROWSER_MAX_RENDERS = get_from_env("IMAGE_EXPORT_BROWSER_MAX_RENDERS", 50, type_cast=int)
+
 KAFKA_PRODUCE_ACK_TIMEOUT_SECONDS = int(os.getenv("KAFKA_PRODUCE_ACK_TIMEOUT_SECONDS", None) or 10)
 
 # Prometheus Django metrics settings, see
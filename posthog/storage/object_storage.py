@@ -1,9 +1,12 @@
 import abc
-from typing import Optional, Union, List, Dict
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO, Iterator, Optional, Tuple, Union, List, Dict
 
 import structlog
 from boto3 import client
 from botocore.client import Config
+from botocore.exceptions import ClientError
 from django.conf import settings
 from sentry_sdk import capture_exception
 
@@ -14,6 +17,29 @@ class ObjectStorageError(Exception):
     pass
 
 
+class ObjectStorageInvalidRange(ObjectStorageError):
+    pass
+
+
+# Chunks of an object, and the `Content-Range` of the chunks if only a range of the object was requested
+ObjectChunks = Tuple[Iterator[bytes], Optional[str]]
+
+READ_CHUNK_SIZE = 64 * 1024
+
+GZIP_MAGIC_NUMBER = b"\x1f\x8b"
+
+
+def decompressed_chunks(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    """Decompresses the chunks of a gzipped object as they're read, and passes through anything else unchanged"""
+    decompressor = None
+    for index, chunk in enumerate(chunks):
+        if index == 0 and chunk.startswith(GZIP_MAGIC_NUMBER):
+            decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+        yield decompressor.decompress(chunk) if decompressor else chunk
+    if decompressor:
+        yield decompressor.flush()
+
+
 class ObjectStorageClient(metaclass=abc.ABCMeta):
     """Just because the full S3 API is available doesn't mean we should use it all"""
 
@@ -37,12 +63,20 @@ class ObjectStorageClient(metaclass=abc.ABCMeta):
     def read_bytes(self, bucket: str, key: str) -> Optional[bytes]:
         pass
 
+    @abc.abstractmethod
+    def read_chunks(self, bucket: str, key: str, byte_range: Optional[str] = None) -> Optional[ObjectChunks]:
+        """
+        Streams the object, or the given HTTP `Range` of it, without loading it into memory.
+        Returns None if the object doesn't exist.
+        """
+        pass
+
     @abc.abstractmethod
     def tag(self, bucket: str, key: str, tags: Dict[str, str]) -> None:
         pass
 
     @abc.abstractmethod
-    def write(self, bucket: str, key: str, content: Union[str, bytes], extras: Dict | None) -> None:
+    def write(self, bucket: str, key: str, content: Union[str, bytes, IO[bytes]], extras: Dict | None) -> None:
         pass
 
     @abc.abstractmethod
@@ -69,10 +103,13 @@ class UnavailableStorage(ObjectStorageClient):
     def read_bytes(self, bucket: str, key: str) -> Optional[bytes]:
         pass
 
+    def read_chunks(self, bucket: str, key: str, byte_range: Optional[str] = None) -> Optional[ObjectChunks]:
+        pass
+
     def tag(self, bucket: str, key: str, tags: Dict[str, str]) -> None:
         pass
 
-    def write(self, bucket: str, key: str, content: Union[str, bytes], extras: Dict | None) -> None:
+    def write(self, bucket: str, key: str, content: Union[str, bytes, IO[bytes]], extras: Dict | None) -> None:
         pass
 
     def copy_objects(self, bucket: str, source_prefix: str, target_prefix: str) -> int | None:
@@ -105,11 +142,10 @@ class ObjectStorage(ObjectStorageClient):
 
     def list_objects(self, bucket: str, prefix: str) -> Optional[List[str]]:
         try:
-            s3_response = self.aws_client.list_objects_v2(Bucket=bucket, Prefix=prefix)
-            if s3_response.get("Contents"):
-                return [obj["Key"] for obj in s3_response["Contents"]]
-            else:
-                return None
+            # a single listing returns at most 1000 objects, long recordings can have more blob files than that
+            pages = self.aws_client.get_paginator("list_objects_v2").paginate(Bucket=bucket, Prefix=prefix)
+            keys = [obj["Key"] for page in pages for obj in page.get("Contents", [])]
+            return keys or None
         except Exception as e:
             logger.error(
                 "object_storage.list_objects_failed",
@@ -143,6 +179,30 @@ class ObjectStorage(ObjectStorageClient):
             capture_exception(e)
             raise ObjectStorageError("read failed") from e
 
+    def read_chunks(self, bucket: str, key: str, byte_range: Optional[str] = None) -> Optional[ObjectChunks]:
+        try:
+            s3_response = self.aws_client.get_object(
+                Bucket=bucket, Key=key, **({"Range": byte_range} if byte_range else {})
+            )
+        except ClientError as e:
+            error_code = e.response.get("Error", {}).get("Code")
+            if error_code in ("NoSuchKey", "404"):
+                return None
+            if error_code == "InvalidRange":
+                raise ObjectStorageInvalidRange("invalid range") from e
+            logger.error("object_storage.read_chunks_failed", bucket=bucket, file_name=key, error=e)
+            capture_exception(e)
+            raise ObjectStorageError("read failed") from e
+
+        def chunks() -> Iterator[bytes]:
+            body = s3_response["Body"]
+            try:
+                yield from body.iter_chunks(chunk_size=READ_CHUNK_SIZE)
+            finally:
+                body.close()
+
+        return chunks(), s3_response.get("ContentRange")
+
     def tag(self, bucket: str, key: str, tags: Dict[str, str]) -> None:
         try:
             self.aws_client.put_object_tagging(
@@ -155,10 +215,14 @@ class ObjectStorage(ObjectStorageClient):
             capture_exception(e)
             raise ObjectStorageError("tag failed") from e
 
-    def write(self, bucket: str, key: str, content: Union[str, bytes], extras: Dict | None) -> None:
+    def write(self, bucket: str, key: str, content: Union[str, bytes, IO[bytes]], extras: Dict | None) -> None:
         s3_response = {}
         try:
-            s3_response = self.aws_client.put_object(Bucket=bucket, Body=content, Key=key, **(extras or {}))
+            if isinstance(content, (str, bytes)):
+                s3_response = self.aws_client.put_object(Bucket=bucket, Body=content, Key=key, **(extras or {}))
+            else:
+                # uploaded in parts, without reading the whole file into memory
+                self.aws_client.upload_fileobj(content, bucket, key, ExtraArgs=extras)
         except Exception as e:
             logger.error(
                 "object_storage.write_failed",
@@ -174,10 +238,17 @@ class ObjectStorage(ObjectStorageClient):
         try:
             source_objects = self.list_objects(bucket, source_prefix) or []
 
-            for object_key in source_objects:
-                copy_source = {"Bucket": bucket, "Key": object_key}
-                target = object_key.replace(source_prefix.rstrip("/"), target_prefix)
-                self.aws_client.copy(copy_source, bucket, target)
+            def copy_object(object_key: str) -> None:
+                # copied within S3, without the content passing through here
+                self.aws_client.copy_object(
+                    CopySource={"Bucket": bucket, "Key": object_key},
+                    Bucket=bucket,
+                    Key=object_key.replace(source_prefix.rstrip("/"), target_prefix),
+                )
+
+            with ThreadPoolExecutor(max_workers=settings.OBJECT_STORAGE_MAX_CONCURRENT_REQUESTS) as executor:
+                # consuming the results raises the first failure, if any
+                list(executor.map(copy_object, source_objects))
 
             return len(source_objects)
         except Exception as e:
@@ -210,6 +281,7 @@ def object_storage_client() -> ObjectStorageClient:
                     signature_version="s3v4",
                     connect_timeout=1,
                     retries={"max_attempts": 1},
+                    max_pool_connections=settings.OBJECT_STORAGE_MAX_POOL_CONNECTIONS,
                 ),
                 region_name=settings.OBJECT_STORAGE_REGION,
             )
@@ -218,7 +290,7 @@ def object_storage_client() -> ObjectStorageClient:
     return _client
 
 
-def write(file_name: str, content: Union[str, bytes], extras: Dict | None = None) -> None:
+def write(file_name: str, content: Union[str, bytes, IO[bytes]], extras: Dict | None = None) -> None:
     return object_storage_client().write(
         bucket=settings.OBJECT_STORAGE_BUCKET,
         key=file_name,
@@ -239,6 +311,23 @@ def read_bytes(file_name: str) -> Optional[bytes]:
     return object_storage_client().read_bytes(bucket=settings.OBJECT_STORAGE_BUCKET, key=file_name)
 
 
+def read_chunks(file_name: str, byte_range: Optional[str] = None) -> Optional[ObjectChunks]:
+    return object_storage_client().read_chunks(
+        bucket=settings.OBJECT_STORAGE_BUCKET, key=file_name, byte_range=byte_range
+    )
+
+
+def read_bytes_concurrently(file_names: List[str]) -> Iterator[Optional[bytes]]:
+    """
+    Yields the content of the objects in order, reading `OBJECT_STORAGE_MAX_CONCURRENT_REQUESTS` of them at a time,
+    so that no more than that many are held in memory at once.
+    """
+    window = settings.OBJECT_STORAGE_MAX_CONCURRENT_REQUESTS
+    with ThreadPoolExecutor(max_workers=window) as executor:
+        for start in range(0, len(file_names), window):
+            yield from executor.map(read_bytes, file_names[start : start + window])
+
+
 def list_objects(prefix: str) -> Optional[List[str]]:
     return object_storage_client().list_objects(bucket=settings.OBJECT_STORAGE_BUCKET, prefix=prefix)
 
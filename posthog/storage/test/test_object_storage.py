@@ -1,3 +1,4 @@
+import tempfile
 import uuid
 from unittest.mock import patch
 
@@ -60,6 +61,15 @@ class TestStorage(APIBaseTest):
             write(file_name, "my content".encode("utf-8"))
             self.assertEqual(read(file_name), "my content")
 
+    def test_write_and_read_works_with_file_content(self) -> None:
+        with self.settings(OBJECT_STORAGE_ENABLED=True):
+            file_name = f"{TEST_BUCKET}/test_write_and_read_works_with_file_content/{uuid.uuid4()}"
+            with tempfile.TemporaryFile() as content:
+                content.write("my content".encode("utf-8"))
+                content.seek(0)
+                write(file_name, content)
+            self.assertEqual(read(file_name), "my content")
+
     def test_can_generate_presigned_url_for_existing_file(self) -> None:
         with self.settings(OBJECT_STORAGE_ENABLED=True):
             session_id = str(uuid.uuid4())
@@ -1,42 +1,73 @@
 import time
-from typing import Any, Dict, List
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, cast
 
 import structlog
 from celery import shared_task
 from dateutil.relativedelta import relativedelta
 from django.conf import settings
+from django.db import connection
 from django.db.models import F
 from django.utils import timezone
+from sentry_sdk import capture_exception
 
 from posthog.models import Cohort
-from posthog.models.cohort import get_and_update_pending_version
-from posthog.models.cohort.util import clear_stale_cohortpeople
+from posthog.models.cohort import CohortOrEmpty, get_and_update_pending_version
+from posthog.models.cohort.util import (
+    clear_stale_cohortpeople,
+    get_dependent_cohorts,
+    group_cohorts_by_dependency_depth,
+    supports_incremental_recalculation,
+)
+from posthog.redis import get_client
 
 logger = structlog.get_logger(__name__)
 
 MAX_AGE_MINUTES = 15
+MAX_ERRORS_CALCULATING = 20
+
+TEAM_COHORTS_LOCK_KEY = "calculate_team_cohorts_lock"
+TEAM_COHORTS_LOCK_TIMEOUT_SECONDS = 60 * 60
 
 
 def calculate_cohorts() -> None:
     # This task will be run every minute
     # Every minute, grab a few cohorts off the list and execute them
-    for cohort in (
+    cohorts = (
         Cohort.objects.filter(
             deleted=False,
             is_calculating=False,
             last_calculation__lte=timezone.now() - relativedelta(minutes=MAX_AGE_MINUTES),
-            errors_calculating__lte=20,
+            errors_calculating__lte=MAX_ERRORS_CALCULATING,
         )
         .exclude(is_static=True)
         .order_by(F("last_calculation").asc(nulls_first=True))[0 : settings.CALCULATE_X_COHORTS_PARALLEL]
-    ):
+    )
+
+    if settings.CALCULATE_COHORTS_IN_DEPENDENCY_ORDER:
+        cohort_ids_by_team: Dict[int, List[int]] = defaultdict(list)
+        for cohort in cohorts:
+            cohort_ids_by_team[cohort.team_id].append(cohort.pk)
+        redis_client = get_client()
+        for team_id, cohort_ids in cohort_ids_by_team.items():
+            if redis_client.exists(_team_cohorts_lock_key(team_id)):
+                # the team's cohorts are being calculated, any that are still due are picked up again afterwards
+                continue
+            calculate_team_cohorts.delay(team_id, cohort_ids)
+        return
+
+    for cohort in cohorts:
         cohort = Cohort.objects.filter(pk=cohort.pk).get()
-        update_cohort(cohort)
+        update_cohort(cohort, incremental=settings.COHORT_INCREMENTAL_RECALCULATION)
 
 
-def update_cohort(cohort: Cohort) -> None:
+def update_cohort(cohort: Cohort, incremental: bool = False) -> None:
     pending_version = get_and_update_pending_version(cohort)
-    calculate_cohort_ch.delay(cohort.id, pending_version)
+    if incremental and supports_incremental_recalculation(cohort):
+        calculate_cohort_incrementally.delay(cohort.id, pending_version)
+    else:
+        calculate_cohort_ch.delay(cohort.id, pending_version)
 
 
 @shared_task(ignore_result=True)
@@ -51,6 +82,96 @@ def calculate_cohort_ch(cohort_id: int, pending_version: int) -> None:
     cohort.calculate_people_ch(pending_version)
 
 
+@shared_task(ignore_result=True, max_retries=1)
+def calculate_cohort_incrementally(cohort_id: int, pending_version: int) -> None:
+    cohort: Cohort = Cohort.objects.get(pk=cohort_id)
+    cohort.calculate_people_ch(pending_version, incremental=True)
+
+
+def plan_team_cohorts_calculation(team_id: int, cohort_ids: List[int]) -> List[List[Cohort]]:
+    """
+    Returns the given cohorts, and the cohorts they depend on, that are stale in stages to calculate one after the
+    other. Cohorts that are up to date are left out, their calculated people are read instead.
+    """
+    seen_cohorts_cache: Dict[int, CohortOrEmpty] = {}
+    for cohort in Cohort.objects.filter(pk__in=cohort_ids, team_id=team_id, deleted=False):
+        seen_cohorts_cache[cohort.pk] = cohort
+        get_dependent_cohorts(cohort, seen_cohorts_cache=seen_cohorts_cache)
+
+    due_cohort_ids = {cohort_id for cohort_id in cohort_ids if seen_cohorts_cache.get(cohort_id)}
+    stale_before = timezone.now() - relativedelta(minutes=MAX_AGE_MINUTES)
+
+    def needs_calculation(cohort: Cohort) -> bool:
+        # Due cohorts are checked again too, an earlier task for the same team may have calculated them since
+        return (
+            not cohort.is_static
+            and (cohort.last_calculation is None or cohort.last_calculation <= stale_before)
+            and cohort.errors_calculating <= MAX_ERRORS_CALCULATING
+        )
+
+    stages = []
+    for stage in group_cohorts_by_dependency_depth(due_cohort_ids, seen_cohorts_cache):
+        cohorts = [cast(Cohort, seen_cohorts_cache[cohort_id]) for cohort_id in stage]
+        cohorts = [cohort for cohort in cohorts if needs_calculation(cohort)]
+        if cohorts:
+            stages.append(cohorts)
+    return stages
+
+
+@shared_task(ignore_result=True, max_retries=1)
+def calculate_team_cohorts(team_id: int, cohort_ids: List[int]) -> None:
+    # Cohorts are picked up again every minute until they are calculated, so don't calculate a team's cohorts twice
+    lock = get_client().lock(_team_cohorts_lock_key(team_id), timeout=TEAM_COHORTS_LOCK_TIMEOUT_SECONDS)
+    if not lock.acquire(blocking=False):
+        logger.info("team_cohorts_already_calculating", team_id=team_id)
+        return
+
+    try:
+        start_time = time.monotonic()
+        stages = plan_team_cohorts_calculation(team_id, cohort_ids)
+        for stage in stages:
+            # each stage only depends on the ones before, so can be calculated concurrently
+            parallelism = min(settings.CALCULATE_COHORTS_PER_TEAM_PARALLEL, len(stage))
+            if parallelism <= 1:
+                for cohort in stage:
+                    _calculate_cohort(cohort)
+            else:
+                with ThreadPoolExecutor(max_workers=parallelism) as executor:
+                    list(executor.map(_calculate_cohort_in_thread, stage))
+
+        logger.info(
+            "team_cohorts_calculated",
+            team_id=team_id,
+            stages=len(stages),
+            cohorts=sum(len(stage) for stage in stages),
+            duration=time.monotonic() - start_time,
+        )
+    finally:
+        lock.release()
+
+
+def _team_cohorts_lock_key(team_id: int) -> str:
+    return f"{TEAM_COHORTS_LOCK_KEY}:{team_id}"
+
+
+def _calculate_cohort(cohort: Cohort) -> None:
+    try:
+        cohort.calculate_people_ch(
+            get_and_update_pending_version(cohort), incremental=settings.COHORT_INCREMENTAL_RECALCULATION
+        )
+    except Exception as err:
+        # the failure is counted on the cohort, carry on with the others
+        capture_exception(err, {"cohort_id": cohort.pk, "team_id": cohort.team_id})
+
+
+def _calculate_cohort_in_thread(cohort: Cohort) -> None:
+    # :TRICKY: Each thread gets its own database connection, make sure it doesn't outlive the thread
+    try:
+        _calculate_cohort(cohort)
+    finally:
+        connection.close()
+
+
 @shared_task(ignore_result=True, max_retries=1)
 def calculate_cohort_from_list(cohort_id: int, items: List[str]) -> None:
     start_time = time.time()
@@ -35,6 +35,12 @@ EXPORT_TIMER = Histogram(
     labelnames=["type"],
     buckets=(1, 5, 10, 30, 60, 120, 240, 300, 360, 420, 480, 540, 600, float("inf")),
 )
+EXPORT_IMAGE_PHASE_TIMER = Histogram(
+    "exporter_image_phase_duration_seconds",
+    "Time spent starting browsers, rendering and capturing screenshots for image exports",
+    labelnames=["phase"],
+    buckets=(0.1, 0.5, 1, 2, 5, 10, 20, 30, 60, float("inf")),
+)
 
 
 # export_asset is used in chords/groups and so must not ignore its results
@@ -0,0 +1,131 @@
+import atexit
+import threading
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Deque, Iterator, Optional
+
+import structlog
+from celery.signals import worker_process_shutdown
+from django.conf import settings
+from selenium import webdriver
+
+from posthog.tasks.exporter import EXPORT_IMAGE_PHASE_TIMER
+
+logger = structlog.get_logger(__name__)
+
+"""
+Keeps browsers running between image exports, as starting Chrome takes longer than most renders.
+
+Each worker process has its own pool. Browsers are checked before they are handed out and replaced if they stopped
+responding, and are quit after a number of renders so that whatever a page leaves behind doesn't pile up.
+"""
+
+
+@dataclass
+class PooledBrowser:
+    driver: webdriver.Chrome
+    renders: int = 0
+
+
+class BrowserPool:
+    def __init__(self, start_browser: Callable[[], webdriver.Chrome], max_size: int, max_renders: int):
+        self._start_browser = start_browser
+        self._max_renders = max_renders
+        # at most this many renders at once, each with its own browser
+        self._semaphore = threading.BoundedSemaphore(max_size)
+        self._idle: Deque[PooledBrowser] = deque()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def browser(self) -> Iterator[webdriver.Chrome]:
+        """
+        Lends out a browser for one render, waiting while all browsers are in use.
+        Browsers are discarded rather than returned to the pool if the render fails.
+        """
+        with self._semaphore:
+            pooled = self._checkout()
+            succeeded = False
+            try:
+                yield pooled.driver
+                succeeded = True
+            finally:
+                pooled.renders += 1
+                if succeeded and pooled.renders < self._max_renders:
+                    self._checkin(pooled)
+                else:
+                    _quit(pooled)
+
+    def close(self) -> None:
+        with self._lock:
+            while self._idle:
+                _quit(self._idle.popleft())
+
+    def _checkout(self) -> PooledBrowser:
+        while True:
+            with self._lock:
+                pooled = self._idle.popleft() if self._idle else None
+            if pooled is None:
+                with EXPORT_IMAGE_PHASE_TIMER.labels(phase="startup").time():
+                    return PooledBrowser(driver=self._start_browser())
+            if _is_healthy(pooled):
+                return pooled
+            logger.warning("image_exporter.browser_unhealthy", renders=pooled.renders)
+            _quit(pooled)
+
+    def _checkin(self, pooled: PooledBrowser) -> None:
+        try:
+            # storage is cleared while still on the rendered page, as about:blank has no access to it
+            pooled.driver.delete_all_cookies()
+            pooled.driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+            # let go of the rendered page, rather than keeping it in memory until the next render
+            pooled.driver.get("about:blank")
+        except Exception:
+            # quit rather than hand the next render a browser that still has this one's session
+            _quit(pooled)
+            return
+        with self._lock:
+            self._idle.append(pooled)
+
+
+def _is_healthy(pooled: PooledBrowser) -> bool:
+    try:
+        return pooled.driver.execute_script("return 1") == 1
+    except Exception:
+        return False
+
+
+def _quit(pooled: PooledBrowser) -> None:
+    try:
+        pooled.driver.quit()
+    except Exception as e:
+        logger.warning("image_exporter.browser_quit_failed", exception=e)
+
+
+_pool: Optional[BrowserPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_browser_pool(start_browser: Callable[[], webdriver.Chrome]) -> BrowserPool:
+    global _pool
+
+    with _pool_lock:
+        if _pool is None:
+            _pool = BrowserPool(
+                start_browser,
+                max_size=settings.IMAGE_EXPORT_BROWSER_POOL_SIZE,
+                max_renders=settings.IMAGE_EXPORT_BROWSER_MAX_RENDERS,
+            )
+            atexit.register(close_browser_pool)
+        return _pool
+
+
+# Celery worker processes exit without running atexit handlers, so their browsers would outlive them
+@worker_process_shutdown.connect
+def close_browser_pool(**kwargs) -> None:
+    global _pool
+
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.close()
@@ -1,18 +1,35 @@
+import csv
 import datetime
 import io
-from typing import Any, Dict, List, Optional, Tuple, Generator
-from urllib.parse import parse_qsl, quote, urlencode, urlparse, urlunparse
-
+import itertools
+import json
+import re
+import tempfile
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple, Generator, Iterator
+from urllib.parse import ParseResult, parse_qsl, quote, urlencode, urlparse, urlunparse
+
+import orjson
 import requests
 import structlog
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler, WSGIRequest
 from openpyxl import Workbook
 from django.http import QueryDict
 from sentry_sdk import capture_exception, push_scope
 from requests.exceptions import HTTPError
+from rest_framework.exceptions import APIException
+from rest_framework.utils.encoders import JSONEncoder
 
 from posthog.api.services.query import process_query
+from posthog.caching.calculate_results import calculate_result_by_cache_type, get_cache_type
+from posthog.constants import BREAKDOWN_VALUES_LIMIT, INSIGHT_FUNNELS, INSIGHT_RETENTION, INSIGHT_TRENDS
+from posthog.decorators import CacheType
 from posthog.jwt import PosthogJwtAudience, encode_jwt
 from posthog.models.exported_asset import ExportedAsset, save_content
+from posthog.models.filters.utils import get_filter
+from posthog.models.team import Team
+from posthog.queries.trends.trends import Trends
 from posthog.utils import absolute_uri
 from .ordered_csv_renderer import OrderedCsvRenderer
 from ..exporter import (
@@ -27,6 +44,12 @@ from ...hogql.query import LimitContext
 CSV_EXPORT_BREAKDOWN_LIMIT_INITIAL = 512
 CSV_EXPORT_BREAKDOWN_LIMIT_LOW = 64  # The lowest limit we want to go to
 
+# Insight endpoints whose results are calculated directly when calling the API in process
+INSIGHT_ENDPOINT_REGEX = re.compile(
+    r"^/?api/projects/(?P<team_id>\d+)/insights/(?P<endpoint>trend|funnel|retention)/?$"
+)
+INSIGHT_ENDPOINT_TO_INSIGHT = {"trend": INSIGHT_TRENDS, "funnel": INSIGHT_FUNNELS, "retention": INSIGHT_RETENTION}
+
 logger = structlog.get_logger(__name__)
 
 
@@ -185,11 +208,19 @@ class UnexpectedEmptyJsonResponse(Exception):
     pass
 
 
+class InProcessAPIError(Exception):
+    def __init__(self, status_code: int, text: str):
+        super().__init__(f"API responded with status {status_code}: {text}")
+        self.status_code = status_code
+        self.text = text
+
+
 def get_from_insights_api(exported_asset: ExportedAsset, limit: int, resource: dict) -> Generator[Any, None, None]:
     path: str = resource["path"]
     method: str = resource.get("method", "GET")
     body = resource.get("body", None)
     next_url = None
+    in_process = settings.EXPORTS_CALL_API_IN_PROCESS
     access_token = encode_jwt(
         {"id": exported_asset.created_by_id},
         datetime.timedelta(minutes=15),
@@ -198,9 +229,17 @@ def get_from_insights_api(exported_asset: ExportedAsset, limit: int, resource: d
     total = 0
     while total < CSV_EXPORT_LIMIT:
         try:
-            response = make_api_call(access_token, body, limit, method, next_url, path)
-        except HTTPError as e:
-            if "Query size exceeded" not in e.response.text:
+            if in_process:
+                data = call_api_in_process(access_token, body, limit, method, next_url, path, exported_asset.team)
+                response_text = None
+            else:
+                response = make_api_call(access_token, body, limit, method, next_url, path)
+                # Figure out how to handle funnel polling....
+                data = response.json()
+                response_text = response.text
+        except (HTTPError, InProcessAPIError) as e:
+            error_text = e.text if isinstance(e, InProcessAPIError) else e.response.text
+            if "Query size exceeded" not in error_text:
                 raise e
 
             if limit <= CSV_EXPORT_BREAKDOWN_LIMIT_LOW:
@@ -212,21 +251,18 @@ def get_from_insights_api(exported_asset: ExportedAsset, limit: int, resource: d
                 "csv_exporter.query_size_exceeded",
                 exc=e,
                 exc_info=True,
-                response_text=e.response.text,
+                response_text=error_text,
                 limit=limit,
             )
             continue
 
-        # Figure out how to handle funnel polling....
-        data = response.json()
-
         if data is None:
             unexpected_empty_json_response = UnexpectedEmptyJsonResponse("JSON is None when calling API for data")
             logger.error(
                 "csv_exporter.json_was_none",
                 exc=unexpected_empty_json_response,
                 exc_info=True,
-                response_text=response.text,
+                response_text=response_text,
             )
 
             raise unexpected_empty_json_response
@@ -245,7 +281,7 @@ def _export_to_dict(exported_asset: ExportedAsset, limit: int) -> Any:
     resource = exported_asset.export_context
 
     columns: List[str] = resource.get("columns", [])
-    returned_rows: Generator[Any, None, None]
+    returned_rows: Iterator[Any]
 
     if resource.get("source"):
         query = resource.get("source")
@@ -254,47 +290,59 @@ def _export_to_dict(exported_asset: ExportedAsset, limit: int) -> Any:
     else:
         returned_rows = get_from_insights_api(exported_asset, limit, resource)
 
-    all_csv_rows = list(returned_rows)
     renderer = OrderedCsvRenderer()
     render_context = {}
     if columns:
         render_context["header"] = columns
 
-    if len(all_csv_rows):
-        # NOTE: This is not ideal as some rows _could_ have different keys
-        # Ideally we would extend the csvrenderer to supported keeping the order in place
-        is_any_col_list_or_dict = [x for x in all_csv_rows[0].values() if isinstance(x, dict) or isinstance(x, list)]
-        if not is_any_col_list_or_dict:
-            # If values are serialised then keep the order of the keys, else allow it to be unordered
-            renderer.header = all_csv_rows[0].keys()
+    # Rows are passed on as they are loaded, so that exports don't have to fit in memory
+    first_row = next(returned_rows, None)
+    if first_row is None:
+        return renderer, iter([]), render_context
+
+    # NOTE: This is not ideal as some rows _could_ have different keys
+    # Ideally we would extend the csvrenderer to supported keeping the order in place
+    is_any_col_list_or_dict = [x for x in first_row.values() if isinstance(x, dict) or isinstance(x, list)]
+    if not is_any_col_list_or_dict:
+        # If values are serialised then keep the order of the keys, else allow it to be unordered
+        renderer.header = first_row.keys()
 
-    return renderer, all_csv_rows, render_context
+    return renderer, itertools.chain([first_row], returned_rows), render_context
 
 
 def _export_to_csv(exported_asset: ExportedAsset, limit: int) -> None:
-    renderer, all_csv_rows, render_context = _export_to_dict(exported_asset, limit)
+    renderer, returned_rows, render_context = _export_to_dict(exported_asset, limit)
 
-    rendered_csv_content = renderer.render(all_csv_rows, renderer_context=render_context)
-    save_content(exported_asset, rendered_csv_content)
+    with tempfile.TemporaryFile() as output:
+        text_output = io.TextIOWrapper(output, encoding="utf-8", newline="")
+        csv_writer = csv.writer(text_output)
+        for row in renderer.tablize_spooled(returned_rows, header=render_context.get("header", renderer.header)):
+            csv_writer.writerow(row)
+        text_output.detach()
 
+        output.seek(0)
+        save_content(exported_asset, output)
 
-def _export_to_excel(exported_asset: ExportedAsset, limit: int) -> None:
-    output = io.BytesIO()
 
-    workbook = Workbook()
-    worksheet = workbook.active
+def _export_to_excel(exported_asset: ExportedAsset, limit: int) -> None:
+    # In write-only mode rows are written to disk as they are appended, rather than kept in memory as cells
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet()
 
-    renderer, all_csv_rows, render_context = _export_to_dict(exported_asset, limit)
+    renderer, returned_rows, render_context = _export_to_dict(exported_asset, limit)
 
-    for row_num, row_data in enumerate(renderer.tablize(all_csv_rows, header=render_context.get("header"))):
-        for col_num, value in enumerate(row_data):
-            if value is not None and not isinstance(value, (str, int, float, bool)):
-                value = str(value)
-            worksheet.cell(row=row_num + 1, column=col_num + 1, value=value)
+    for row_data in renderer.tablize_spooled(returned_rows, header=render_context.get("header")):
+        worksheet.append(
+            [
+                str(value) if value is not None and not isinstance(value, (str, int, float, bool)) else value
+                for value in row_data
+            ]
+        )
 
-    workbook.save(output)
-    output.seek(0)
-    save_content(exported_asset, output.getvalue())
+    with tempfile.TemporaryFile() as output:
+        workbook.save(output)
+        output.seek(0)
+        save_content(exported_asset, output)
 
 
 def get_limit_param_key(path: str) -> str:
@@ -327,6 +375,95 @@ def make_api_call(
     return response
 
 
+@lru_cache(maxsize=1)
+def _api_handler() -> WSGIHandler:
+    # The handler the web server runs, so requests go through the same middleware, routing and authentication
+    return WSGIHandler()
+
+
+def call_api_in_process(
+    access_token: str,
+    body: Any,
+    limit: int,
+    method: str,
+    next_url: Optional[str],
+    path: str,
+    team: Optional[Team] = None,
+) -> Any:
+    """
+    Like `make_api_call`, but handles the request in this process rather than sending it to the API and waiting on a
+    web worker. It's authenticated with the same token, so the API sees the same request either way. The results of
+    the team's trends, funnel and retention insights are calculated directly, skipping the request altogether.
+    """
+    request_url: str = absolute_uri(next_url or path)
+    url = urlparse(
+        add_query_params(
+            request_url,
+            {get_limit_param_key(request_url): str(limit), "is_csv_export": "1"},
+        )
+    )
+    if team is not None:
+        match = INSIGHT_ENDPOINT_REGEX.match(url.path)
+        if match and int(match.group("team_id")) == team.pk:
+            return calculate_insight_in_process(team, match.group("endpoint"), url, body)
+
+    content = json.dumps(body).encode("utf-8") if body is not None else b""
+    request = WSGIRequest(
+        {
+            "REQUEST_METHOD": method.upper(),
+            "PATH_INFO": url.path,
+            "QUERY_STRING": url.query,
+            "SERVER_NAME": url.hostname or "localhost",
+            "SERVER_PORT": str(url.port or (443 if url.scheme == "https" else 80)),
+            "HTTP_HOST": url.netloc,
+            "HTTP_AUTHORIZATION": f"Bearer {access_token}",
+            "CONTENT_TYPE": "application/json",
+            "CONTENT_LENGTH": str(len(content)),
+            "wsgi.input": io.BytesIO(content),
+            "wsgi.url_scheme": url.scheme or "http",
+        }
+    )
+
+    response = _api_handler().get_response(request)
+    if response.status_code >= 400:
+        raise InProcessAPIError(response.status_code, response.content.decode("utf-8"))
+    return orjson.loads(response.content) if response.content else None
+
+
+def calculate_insight_in_process(team: Team, endpoint: str, url: ParseResult, body: Any) -> Any:
+    """
+    Calculates the result of an insight endpoint like the API does, and returns it as the API would respond.
+    """
+    data: Dict[str, Any] = {**dict(parse_qsl(url.query, keep_blank_values=True)), **(body or {})}
+    if endpoint == "retention" and not data.get("date_from"):
+        data["date_from"] = "-11d"
+    data["insight"] = (
+        (data.get("insight") or INSIGHT_TRENDS) if endpoint == "trend" else INSIGHT_ENDPOINT_TO_INSIGHT[endpoint]
+    )
+
+    try:
+        filter = get_filter(team=team, data=data)
+        cache_type = get_cache_type(filter)
+        if cache_type == CacheType.TRENDS:
+            result = Trends().run(filter, team, is_csv_export=True)
+        else:
+            result = calculate_result_by_cache_type(cache_type, filter, team)
+    except APIException as e:
+        # e.g. "Query size exceeded", which is retried with a lower limit
+        raise InProcessAPIError(e.status_code, str(e.detail))
+
+    response: Dict[str, Any] = {"result": result, "timezone": team.timezone}
+    if endpoint == "trend":
+        breakdown_values_limit = int(data["breakdown_limit"]) if data.get("breakdown_limit") else BREAKDOWN_VALUES_LIMIT
+        if len(result) >= breakdown_values_limit:
+            response["next"] = add_query_params(
+                urlunparse(url), {"offset": str(filter.offset + breakdown_values_limit)}
+            )
+
+    # Rows are built from the response like it was returned by the API, e.g. with dates as ISO strings
+    return json.loads(json.dumps(response, cls=JSONEncoder))
+
+
 def export_tabular(exported_asset: ExportedAsset, limit: Optional[int] = None) -> None:
     if not limit:
         limit = CSV_EXPORT_BREAKDOWN_LIMIT_INITIAL
@@ -2,7 +2,7 @@ import json
 import os
 import uuid
 from datetime import timedelta
-from typing import Literal, Optional
+from typing import Literal
 
 import structlog
 from django.conf import settings
@@ -24,8 +24,10 @@ from posthog.models.exported_asset import (
 from posthog.tasks.exporter import (
     EXPORT_SUCCEEDED_COUNTER,
     EXPORT_FAILED_COUNTER,
+    EXPORT_IMAGE_PHASE_TIMER,
     EXPORT_TIMER,
 )
+from posthog.tasks.exports.browser_pool import get_browser_pool
 from posthog.tasks.exports.exporter_utils import log_error_if_site_url_not_reachable
 from posthog.utils import absolute_uri
 
@@ -37,8 +39,7 @@ ScreenWidth = Literal[800, 1920]
 CSSSelector = Literal[".InsightCard", ".ExportedInsight"]
 
 
-# NOTE: We purposefully DON'T re-use the driver. It would be slightly faster but would keep an in-memory browser
-# window permanently around which is unnecessary
+# NOTE: Drivers are re-used through the browser pool, see `IMAGE_EXPORT_BROWSER_MAX_RENDERS` to start one per export
 def get_driver() -> webdriver.Chrome:
     options = Options()
     options.headless = True
@@ -124,9 +125,42 @@ def _screenshot_asset(
     screenshot_width: ScreenWidth,
     wait_for_css_selector: CSSSelector,
 ) -> None:
-    driver: Optional[webdriver.Chrome] = None
     try:
-        driver = get_driver()
+        # looked up when a browser is started, rather than once when the pool is created
+        with get_browser_pool(lambda: get_driver()).browser() as driver:
+            try:
+                _render_screenshot(driver, image_path, url_to_render, screenshot_width, wait_for_css_selector)
+            except Exception:
+                # To help with debugging, add a screenshot and any chrome logs, while the browser is still around
+                with configure_scope() as scope:
+                    # If we encounter issues getting extra info we should silently fail rather than raising anew
+                    try:
+                        all_logs = [x for x in driver.get_log("browser")]
+                        scope.add_attachment(json.dumps(all_logs).encode("utf-8"), "logs.txt")
+                    except Exception:
+                        pass
+                    try:
+                        driver.save_screenshot(image_path)
+                        scope.add_attachment(None, None, image_path)
+                    except Exception:
+                        pass
+                raise
+    except Exception as e:
+        with configure_scope() as scope:
+            scope.set_extra("url_to_render", url_to_render)
+        capture_exception(e)
+
+        raise e
+
+
+def _render_screenshot(
+    driver: webdriver.Chrome,
+    image_path: str,
+    url_to_render: str,
+    screenshot_width: ScreenWidth,
+    wait_for_css_selector: CSSSelector,
+) -> None:
+    with EXPORT_IMAGE_PHASE_TIMER.labels(phase="render").time():
         driver.set_window_size(screenshot_width, screenshot_width * 0.5)
         driver.get(url_to_render)
         WebDriverWait(driver, 20).until(lambda x: x.find_element_by_css_selector(wait_for_css_selector))
@@ -148,31 +182,11 @@ def _screenshot_asset(
                 except Exception:
                     pass
                 capture_exception()
+
+    with EXPORT_IMAGE_PHASE_TIMER.labels(phase="capture").time():
         height = driver.execute_script("return document.body.scrollHeight")
         driver.set_window_size(screenshot_width, height)
         driver.save_screenshot(image_path)
-    except Exception as e:
-        # To help with debugging, add a screenshot and any chrome logs
-        with configure_scope() as scope:
-            scope.set_extra("url_to_render", url_to_render)
-            if driver:
-                # If we encounter issues getting extra info we should silently fail rather than creating a new exception
-                try:
-                    all_logs = [x for x in driver.get_log("browser")]
-                    scope.add_attachment(json.dumps(all_logs).encode("utf-8"), "logs.txt")
-                except Exception:
-                    pass
-                try:
-                    driver.save_screenshot(image_path)
-                    scope.add_attachment(None, None, image_path)
-                except Exception:
-                    pass
-        capture_exception(e)
-
-        raise e
-    finally:
-        if driver:
-            driver.quit()
 
 
 def export_image(exported_asset: ExportedAsset) -> None:
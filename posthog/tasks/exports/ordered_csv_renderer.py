@@ -1,6 +1,8 @@
 import itertools
+import pickle
+import tempfile
 from collections import OrderedDict
-from typing import Any, Dict, Generator
+from typing import Any, Dict, Generator, Iterable, List
 
 from more_itertools import unique_everseen
 from rest_framework_csv.renderers import CSVRenderer
@@ -27,7 +29,48 @@ class OrderedCsvRenderer(
 
         # Get the set of all unique headers, and sort them.
         unique_fields = list(unique_everseen(itertools.chain(*(item.keys() for item in data))))
+        field_headers = self.get_field_headers(unique_fields, header)
 
+        # Return your "table", with the headers as the first row.
+        if labels:
+            yield [labels.get(x, x) for x in field_headers]
+        else:
+            yield field_headers
+
+        # Create a row for each dictionary, filling in columns for which the
+        # item has no data with None values.
+        for item in data:
+            yield [item.get(key, None) for key in field_headers]
+
+    def tablize_spooled(self, data: Iterable[Any], header: Any = None) -> Generator:
+        """
+        Like `tablize`, but without holding the data in memory: the flattened items are spooled to a temporary file
+        while collecting their fields, then read back one at a time.
+        """
+        with tempfile.TemporaryFile() as spool:
+            item_count = 0
+            unique_fields: Dict[str, None] = {}
+            for item in self.flatten_data(data):
+                unique_fields.update(dict.fromkeys(item.keys()))
+                pickle.dump(item, spool, protocol=pickle.HIGHEST_PROTOCOL)
+                item_count += 1
+
+            if not item_count:
+                return
+
+            field_headers = self.get_field_headers(list(unique_fields), header)
+            yield field_headers
+
+            spool.seek(0)
+            for _ in range(item_count):
+                item = pickle.load(spool)
+                yield [item.get(key, None) for key in field_headers]
+
+    def get_field_headers(self, unique_fields: List[str], header: Any = None) -> List[str]:
+        """
+        Orders the flattened fields so that the fields of a nested item stay together,
+        expanding any nested item named in `header` into its fields.
+        """
         ordered_fields: Dict[str, Any] = OrderedDict()
         for item in unique_fields:
             field = item.split(".")
@@ -50,13 +93,4 @@ class OrderedCsvRenderer(
                 field_headers.remove(single_header)
                 field_headers[pos_single_header:pos_single_header] = ordered_fields[single_header]
 
-        # Return your "table", with the headers as the first row.
-        if labels:
-            yield [labels.get(x, x) for x in field_headers]
-        else:
-            yield field_headers
-
-        # Create a row for each dictionary, filling in columns for which the
-        # item has no data with None values.
-        for item in data:
-            yield [item.get(key, None) for key in field_headers]
+        return field_headers
@@ -0,0 +1,114 @@
+from unittest import TestCase
+from unittest.mock import MagicMock
+
+import pytest
+from celery.signals import worker_process_shutdown
+
+from posthog.tasks.exports.browser_pool import BrowserPool, close_browser_pool, get_browser_pool
+
+
+def _start_browser() -> MagicMock:
+    driver = MagicMock()
+    driver.execute_script.return_value = 1
+    return driver
+
+
+class TestBrowserPool(TestCase):
+    def setUp(self) -> None:
+        self.start_browser = MagicMock(side_effect=_start_browser)
+
+    def test_reuses_browsers_between_renders(self) -> None:
+        pool = BrowserPool(self.start_browser, max_size=1, max_renders=10)
+
+        with pool.browser() as first:
+            pass
+        with pool.browser() as second:
+            pass
+
+        assert first is second
+        assert self.start_browser.call_count == 1
+        first.get.assert_called_with("about:blank")
+        first.quit.assert_not_called()
+
+    def test_clears_cookies_and_storage_between_renders(self) -> None:
+        pool = BrowserPool(self.start_browser, max_size=1, max_renders=10)
+
+        with pool.browser() as driver:
+            pass
+
+        driver.delete_all_cookies.assert_called_once()
+        driver.execute_script.assert_called_with("window.localStorage.clear(); window.sessionStorage.clear();")
+
+    def test_quits_browsers_that_cant_be_cleared(self) -> None:
+        pool = BrowserPool(self.start_browser, max_size=1, max_renders=10)
+
+        with pool.browser() as first:
+            first.delete_all_cookies.side_effect = Exception("chrome not reachable")
+
+        with pool.browser() as second:
+            pass
+
+        assert second is not first
+        first.quit.assert_called_once()
+        assert self.start_browser.call_count == 2
+
+    def test_recycles_browsers_after_max_renders(self) -> None:
+        pool = BrowserPool(self.start_browser, max_size=1, max_renders=2)
+
+        drivers = []
+        for _ in range(3):
+            with pool.browser() as driver:
+                drivers.append(driver)
+
+        assert drivers[0] is drivers[1]
+        assert drivers[2] is not drivers[0]
+        drivers[0].quit.assert_called_once()
+        assert self.start_browser.call_count == 2
+
+    def test_replaces_unhealthy_browsers(self) -> None:
+        pool = BrowserPool(self.start_browser, max_size=1, max_renders=10)
+
+        with pool.browser() as first:
+            pass
+        first.execute_script.side_effect = Exception("chrome not reachable")
+
+        with pool.browser() as second:
+            pass
+
+        assert second is not first
+        first.quit.assert_called_once()
+
+    def test_discards_browsers_when_rendering_fails(self) -> None:
+        pool = BrowserPool(self.start_browser, max_size=1, max_renders=10)
+
+        with pytest.raises(ValueError):
+            with pool.browser() as first:
+                raise ValueError("render failed")
+
+        with pool.browser() as second:
+            pass
+
+        assert second is not first
+        first.quit.assert_called_once()
+
+    def test_close_quits_idle_browsers(self) -> None:
+        pool = BrowserPool(self.start_browser, max_size=2, max_renders=10)
+
+        with pool.browser() as first:
+            with pool.browser() as second:
+                pass
+        pool.close()
+
+        first.quit.assert_called_once()
+        second.quit.assert_called_once()
+
+    def test_worker_process_shutdown_closes_the_pool(self) -> None:
+        pool = get_browser_pool(self.start_browser)
+        with pool.browser() as driver:
+            pass
+
+        worker_process_shutdown.send(sender=None)
+
+        driver.quit.assert_called_once()
+        assert get_browser_pool(self.start_browser) is not pool
+        close_browser_pool()
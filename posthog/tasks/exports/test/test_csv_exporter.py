@@ -1,9 +1,11 @@
+import json
 from typing import Any, Dict, Optional
 from unittest import mock
 from unittest.mock import MagicMock, Mock, patch, ANY
 
 from openpyxl import load_workbook
 from io import BytesIO
+from urllib.parse import quote
 import pytest
 from boto3 import resource
 from botocore.client import Config
@@ -28,6 +30,7 @@ from posthog.tasks.exports.csv_exporter import (
     add_query_params,
     CSV_EXPORT_BREAKDOWN_LIMIT_INITIAL,
 )
+from posthog.tasks.exports.ordered_csv_renderer import OrderedCsvRenderer
 from posthog.test.base import APIBaseTest, _create_event, flush_persons_and_events
 from posthog.utils import absolute_uri
 
@@ -331,6 +334,20 @@ class TestCSVExporter(APIBaseTest):
             assert patched_make_api_call.call_count == 4
             patched_make_api_call.assert_called_with(mock.ANY, mock.ANY, 64, mock.ANY, mock.ANY, mock.ANY)
 
+    def test_spooled_table_matches_table(self) -> None:
+        rows = [
+            {"distinct_id": "1", "properties": {"$browser": "Safari"}},
+            {"distinct_id": "2", "properties": {"$os": "Mac OS X", "tags": ["a", "b"]}, "event": "$pageview"},
+            {"distinct_id": "3"},
+        ]
+        renderer = OrderedCsvRenderer()
+
+        for header in (None, ["event", "properties", "tomato"]):
+            assert list(renderer.tablize_spooled(iter(rows), header=list(header) if header else None)) == list(
+                renderer.tablize(rows, header=list(header) if header else None)
+            )
+        assert list(renderer.tablize_spooled(iter([]))) == []
+
     def test_limiting_query_as_expected(self) -> None:
         with self.settings(SITE_URL="https://app.posthog.com"):
             modified_url = add_query_params(absolute_uri(regression_11204), {"limit": "3500"})
@@ -363,6 +380,70 @@ class TestCSVExporter(APIBaseTest):
         with pytest.raises(UnexpectedEmptyJsonResponse, match="JSON is None when calling API for data"):
             csv_exporter.export_tabular(self._create_asset())
 
+    @override_settings(EXPORTS_CALL_API_IN_PROCESS=True)
+    @patch("posthog.tasks.exports.csv_exporter.make_api_call")
+    def test_csv_exporter_calls_api_in_process(self, patched_api_call) -> None:
+        random_uuid = f"RANDOM_TEST_ID::{UUIDT()}"
+        for i in range(3):
+            _create_event(
+                event="$pageview",
+                distinct_id=random_uuid,
+                team=self.team,
+                timestamp=now() - relativedelta(hours=1),
+                properties={"prop": i},
+            )
+        flush_persons_and_events()
+
+        exported_asset = ExportedAsset(
+            team=self.team,
+            created_by=self.user,
+            export_format=ExportedAsset.ExportFormat.CSV,
+            export_context={"path": f"/api/projects/{self.team.id}/events/?distinct_id={random_uuid}"},
+        )
+        exported_asset.save()
+
+        with self.settings(OBJECT_STORAGE_ENABLED=False):
+            csv_exporter.export_tabular(exported_asset)
+
+        patched_api_call.assert_not_called()
+        lines = exported_asset.content.decode("utf-8").strip().split("\r\n")
+        assert len(lines) == 4
+        assert "properties.prop" in lines[0].split(",")
+        assert all(random_uuid in line for line in lines[1:])
+
+    @override_settings(EXPORTS_CALL_API_IN_PROCESS=True)
+    @patch("posthog.tasks.exports.csv_exporter._api_handler")
+    def test_csv_exporter_calculates_insights_in_process(self, patched_api_handler) -> None:
+        for _ in range(3):
+            _create_event(
+                event="$pageview",
+                distinct_id="1",
+                team=self.team,
+                timestamp=now() - relativedelta(hours=1),
+            )
+        flush_persons_and_events()
+
+        events = quote(json.dumps([{"id": "$pageview", "type": "events"}]))
+        exported_asset = ExportedAsset(
+            team=self.team,
+            created_by=self.user,
+            export_format=ExportedAsset.ExportFormat.CSV,
+            export_context={
+                "path": f"/api/projects/{self.team.id}/insights/trend/?insight=TRENDS&events={events}&date_from=-7d"
+            },
+        )
+        exported_asset.save()
+
+        with self.settings(OBJECT_STORAGE_ENABLED=False):
+            csv_exporter.export_tabular(exported_asset)
+
+        patched_api_handler.assert_not_called()
+        lines = exported_asset.content.decode("utf-8").strip().split("\r\n")
+        assert len(lines) == 2
+        assert lines[0].split(",")[0] == "series"
+        assert lines[1].split(",")[0] == "$pageview"
+        assert sum(float(value) for value in lines[1].split(",")[1:]) == 3
+
     @patch("posthog.hogql.constants.MAX_SELECT_RETURNED_ROWS", 10)
     @patch("posthog.hogql.constants.DEFAULT_RETURNED_ROWS", 5)
     @patch("posthog.models.exported_asset.UUIDT")
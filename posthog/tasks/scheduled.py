@@ -15,6 +15,7 @@ from posthog.tasks.tasks import (
     check_flags_to_rollback,
     clean_stale_partials,
     clear_clickhouse_deleted_person,
+    clickhouse_backfill_materialized_columns,
     clickhouse_clear_removed_data,
     clickhouse_errors_count,
     clickhouse_lag,
@@ -24,6 +25,7 @@ from posthog.tasks.tasks import (
     clickhouse_part_count,
     clickhouse_row_count,
     clickhouse_send_license_usage,
+    count_team_daily_events_task,
     delete_expired_exported_assets,
     demo_reset_master_team,
     ee_persist_finished_recordings,
@@ -37,6 +39,7 @@ from posthog.tasks.tasks import (
     process_scheduled_changes,
     redis_celery_queue_depth,
     redis_heartbeat,
+    rollup_web_analytics_hourly_task,
     schedule_all_subscriptions,
     schedule_cache_updates_task,
     send_org_usage_reports,
@@ -149,6 +152,20 @@ def setup_periodic_tasks(sender: Celery, **kwargs: Any) -> None:
         "check dashboard items",
     )
 
+    if settings.WEB_ANALYTICS_ROLLUP_ENABLED:
+        sender.add_periodic_task(
+            crontab(minute="5", hour="*"),
+            rollup_web_analytics_hourly_task.s(),
+            name="rollup web analytics hourly",
+        )
+
+    if settings.TEAM_DAILY_EVENT_COUNTS_ENABLED:
+        sender.add_periodic_task(
+            crontab(minute="25", hour="*"),
+            count_team_daily_events_task.s(),
+            name="count team daily events",
+        )
+
     sender.add_periodic_task(crontab(minute="*/15"), check_async_migration_health.s())
 
     if settings.INGESTION_LAG_METRIC_TEAM_IDS:
@@ -273,6 +290,12 @@ def setup_periodic_tasks(sender: Celery, **kwargs: Any) -> None:
                 name="clickhouse mark all columns as materialized",
             )
 
+            sender.add_periodic_task(
+                crontab(minute="*/10"),
+                clickhouse_backfill_materialized_columns.s(),
+                name="clickhouse backfill materialized columns by partition",
+            )
+
         sender.add_periodic_task(crontab(hour="*", minute="55"), schedule_all_subscriptions.s())
         sender.add_periodic_task(
             crontab(hour="2", minute=str(randrange(0, 40))),
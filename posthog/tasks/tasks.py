@@ -527,6 +527,20 @@ def schedule_cache_updates_task() -> None:
     schedule_cache_updates()
 
 
+@shared_task(ignore_result=True)
+def rollup_web_analytics_hourly_task() -> None:
+    from posthog.tasks.web_analytics_rollup import rollup_web_analytics_hourly
+
+    rollup_web_analytics_hourly()
+
+
+@shared_task(ignore_result=True)
+def count_team_daily_events_task() -> None:
+    from posthog.tasks.team_daily_event_counts import count_recent_team_daily_events
+
+    count_recent_team_daily_events()
+
+
 @shared_task(ignore_result=True)
 def update_cache_task(caching_state_id: UUID) -> None:
     from posthog.caching.insight_cache import update_cache
@@ -631,6 +645,19 @@ def clickhouse_materialize_columns() -> None:
             materialize_properties_task()
 
 
+@shared_task(ignore_result=True)
+def clickhouse_backfill_materialized_columns() -> None:
+    if recompute_materialized_columns_enabled():
+        try:
+            from ee.clickhouse.materialized_columns.backfill import (
+                run_partition_backfills,
+            )
+        except ImportError:
+            pass
+        else:
+            run_partition_backfills()
+
+
 @shared_task(ignore_result=True)
 def clickhouse_mark_all_materialized() -> None:
     if recompute_materialized_columns_enabled():
@@ -0,0 +1,61 @@
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+import structlog
+from django.conf import settings
+from django.utils import timezone
+
+from posthog.clickhouse.client import sync_execute
+from posthog.clickhouse.client.connection import Workload
+from posthog.clickhouse.query_tagging import tag_queries
+from posthog.models.team_daily_event_counts.sql import INSERT_TEAM_DAILY_EVENT_COUNTS_SQL
+from posthog.redis import get_client
+
+logger = structlog.get_logger(__name__)
+
+COUNTS_LOCK_KEY = "team_daily_event_counts_lock"
+COUNTS_LOCK_TIMEOUT_SECONDS = 60 * 60
+
+
+def count_recent_team_daily_events(now: Optional[datetime] = None) -> int:
+    """
+    Counts the events of the last TEAM_DAILY_EVENT_COUNTS_RECOUNT_DAYS days, including today so far, into
+    `team_daily_event_counts`. Returns the number of days counted.
+    """
+    # Counting a day twice is harmless, as the newest count replaces the other, but there's no point in doing it
+    lock = get_client().lock(COUNTS_LOCK_KEY, timeout=COUNTS_LOCK_TIMEOUT_SECONDS)
+    if not lock.acquire(blocking=False):
+        logger.info("team_daily_event_counts_already_running")
+        return 0
+
+    try:
+        today = (now or timezone.now()).date()
+        return count_team_daily_events(today - timedelta(days=settings.TEAM_DAILY_EVENT_COUNTS_RECOUNT_DAYS - 1), today)
+    finally:
+        lock.release()
+
+
+def count_team_daily_events(first_day: date, last_day: date) -> int:
+    """
+    Counts the events of every day from first_day to last_day, both included, replacing any previous counts of them.
+    Returns the number of days counted.
+    """
+    tag_queries(kind="team_daily_event_counts")
+    days = 0
+    day = first_day
+    while day <= last_day:
+        # one day at a time, so that the unique count of a day is all that has to fit in memory
+        sync_execute(
+            INSERT_TEAM_DAILY_EVENT_COUNTS_SQL,
+            {
+                "date_from": day.strftime("%Y-%m-%d 00:00:00"),
+                "date_to": (day + timedelta(days=1)).strftime("%Y-%m-%d 00:00:00"),
+            },
+            settings={"max_execution_time": 3600},
+            workload=Workload.OFFLINE,
+        )
+        day += timedelta(days=1)
+        days += 1
+
+    logger.info("team_daily_event_counts_finished", first_day=first_day.isoformat(), days=days)
+    return days
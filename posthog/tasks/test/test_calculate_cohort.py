@@ -1,12 +1,23 @@
+from datetime import timedelta
 from typing import Callable
 from unittest.mock import MagicMock, patch
 
+from django.test import override_settings
+from django.utils import timezone
 from freezegun import freeze_time
 
 from posthog.models.cohort import Cohort
 from posthog.models.feature_flag import FeatureFlag
 from posthog.models.person import Person
-from posthog.tasks.calculate_cohort import calculate_cohort_from_list, calculate_cohorts
+from posthog.redis import get_client
+from posthog.tasks.calculate_cohort import (
+    calculate_cohort_from_list,
+    calculate_cohorts,
+    calculate_team_cohorts,
+    plan_team_cohorts_calculation,
+    TEAM_COHORTS_LOCK_KEY,
+    update_cohort,
+)
 from posthog.test.base import APIBaseTest
 
 
@@ -100,4 +111,88 @@ def calculate_cohort_test_factory(event_factory: Callable, person_factory: Calla
 
             calculate_cohorts()
 
+        def _create_dependent_cohorts(self):
+            base = Cohort.objects.create(
+                team=self.team,
+                groups=[{"properties": [{"key": "$some_prop", "value": "something", "type": "person"}]}],
+                name="base",
+            )
+            dependent = Cohort.objects.create(
+                team=self.team,
+                groups=[{"properties": [{"key": "id", "value": base.pk, "type": "cohort"}]}],
+                name="dependent",
+            )
+            other = Cohort.objects.create(
+                team=self.team,
+                groups=[{"properties": [{"key": "$other_prop", "value": "something", "type": "person"}]}],
+                name="other",
+            )
+            return base, dependent, other
+
+        def test_plan_team_cohorts_calculation(self) -> None:
+            base, dependent, other = self._create_dependent_cohorts()
+
+            stages = plan_team_cohorts_calculation(self.team.pk, [dependent.pk, other.pk])
+            self.assertEqual(
+                [sorted(cohort.pk for cohort in stage) for stage in stages],
+                [sorted([base.pk, other.pk]), [dependent.pk]],
+            )
+
+            # up to date dependencies are read rather than calculated again
+            base.last_calculation = timezone.now()
+            base.save()
+
+            stages = plan_team_cohorts_calculation(self.team.pk, [dependent.pk, other.pk])
+            self.assertEqual([[cohort.pk for cohort in stage] for stage in stages], [[other.pk], [dependent.pk]])
+
+            # as are the given cohorts, when they were calculated since they were queued
+            other.last_calculation = timezone.now()
+            other.save()
+
+            stages = plan_team_cohorts_calculation(self.team.pk, [dependent.pk, other.pk])
+            self.assertEqual([[cohort.pk for cohort in stage] for stage in stages], [[dependent.pk]])
+
+        @override_settings(CALCULATE_COHORTS_IN_DEPENDENCY_ORDER=True)
+        @patch("posthog.tasks.calculate_cohort.calculate_team_cohorts.delay")
+        def test_calculate_cohorts_skips_teams_being_calculated(self, calculate_team_cohorts_delay: MagicMock) -> None:
+            self._create_dependent_cohorts()
+            Cohort.objects.filter(team=self.team).update(last_calculation=timezone.now() - timedelta(days=1))
+
+            lock = get_client().lock(f"{TEAM_COHORTS_LOCK_KEY}:{self.team.pk}", timeout=60)
+            lock.acquire(blocking=False)
+            try:
+                calculate_cohorts()
+            finally:
+                lock.release()
+            calculate_team_cohorts_delay.assert_not_called()
+
+            calculate_cohorts()
+            calculate_team_cohorts_delay.assert_called_once()
+
+        @patch.object(Cohort, "calculate_people_ch", autospec=True)
+        def test_calculate_team_cohorts_in_dependency_order(self, calculate_people_ch: MagicMock) -> None:
+            base, dependent, other = self._create_dependent_cohorts()
+
+            calculate_team_cohorts(self.team.pk, [dependent.pk, other.pk])
+
+            calculated_cohort_ids = [call.args[0].pk for call in calculate_people_ch.call_args_list]
+            self.assertCountEqual(calculated_cohort_ids, [base.pk, dependent.pk, other.pk])
+            self.assertLess(calculated_cohort_ids.index(base.pk), calculated_cohort_ids.index(dependent.pk))
+
+        @patch("posthog.tasks.calculate_cohort.calculate_cohort_incrementally.delay")
+        def test_incremental_update_claims_a_pending_version(self, calculate_cohort_incrementally: MagicMock) -> None:
+            cohort = Cohort.objects.create(
+                team=self.team,
+                groups=[{"properties": [{"key": "$some_prop", "value": "something", "type": "person"}]}],
+                name="cohort",
+                version=0,
+                last_calculation=timezone.now(),
+            )
+
+            update_cohort(cohort, incremental=True)
+
+            cohort.refresh_from_db()
+            self.assertEqual(cohort.pending_version, 1)
+            calculate_cohort_incrementally.assert_called_once_with(cohort.pk, 1)
+
     return TestCalculateCohort
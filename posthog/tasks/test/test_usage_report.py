@@ -7,7 +7,7 @@ import pytest
 import structlog
 from dateutil.relativedelta import relativedelta
 from dateutil.tz import tzutc
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.utils.timezone import now
 from freezegun import freeze_time
 
@@ -31,8 +31,11 @@ from posthog.schema import EventsQuery
 from posthog.session_recordings.queries.test.session_replay_sql import (
     produce_replay_summary,
 )
+from posthog.tasks.team_daily_event_counts import count_team_daily_events
 from posthog.tasks.usage_report import (
+    _clear_stored_usage_data,
     _get_all_org_reports,
+    _get_all_usage_data,
     _get_all_usage_data_as_team_rows,
     _get_full_org_usage_report,
     _get_full_org_usage_report_as_dict,
@@ -1415,3 +1418,87 @@ class SendUsageNoLicenseTest(APIBaseTest):
         # This field is not included in the original team query, so should require an additional query
         with self.assertNumQueries(1):
             _ = team.organization.for_internal_metrics
+
+
+class UsageReportQueriesTest(ClickhouseTestMixin, APIBaseTest):
+    @override_settings(USAGE_REPORT_RESUME_FAILED_REPORTS=True)
+    def test_failed_report_resumes_from_the_queries_that_finished(self) -> None:
+        period_start, period_end = get_previous_day()
+
+        with patch(
+            "posthog.tasks.usage_report.get_teams_with_event_count_lifetime", return_value=[(self.team.pk, 5)]
+        ), patch(
+            "posthog.tasks.usage_report.get_teams_with_rows_synced_in_period", side_effect=Exception("query failed")
+        ):
+            with pytest.raises(Exception, match="query failed"):
+                _get_all_usage_data(period_start, period_end)
+
+        with patch("posthog.tasks.usage_report.get_teams_with_event_count_lifetime") as mock_lifetime, patch(
+            "posthog.tasks.usage_report.get_teams_with_rows_synced_in_period", return_value=[(self.team.pk, 3)]
+        ):
+            all_data = _get_all_usage_data(period_start, period_end)
+
+        mock_lifetime.assert_not_called()
+        assert all_data["teams_with_event_count_lifetime"] == [(self.team.pk, 5)]
+        assert all_data["teams_with_rows_synced_in_period"] == [(self.team.pk, 3)]
+
+        _clear_stored_usage_data(period_start, period_end)
+        with patch("posthog.tasks.usage_report.get_teams_with_event_count_lifetime", return_value=[]) as mock_lifetime:
+            _get_all_usage_data(period_start, period_end)
+        mock_lifetime.assert_called_once()
+
+    @freeze_time("2022-01-10T12:00:00Z")
+    def test_event_counts_from_daily_counts_match_counting_events(self) -> None:
+        period_start, period_end = get_previous_day()
+        for timestamp in [
+            "2021-12-31T12:00:00Z",
+            "2022-01-03T12:00:00Z",
+            "2022-01-09T01:00:00Z",
+            "2022-01-09T23:00:00Z",
+        ]:
+            _create_event(distinct_id="user", event="$pageview", timestamp=timestamp, team=self.team)
+        # a duplicate event, which is only billed for once
+        duplicated_uuid = uuid4()
+        create_event(
+            event_uuid=duplicated_uuid,
+            distinct_id="user",
+            event="$pageview",
+            timestamp="2022-01-09T12:00:00Z",
+            team=self.team,
+        )
+        _create_event(
+            event_uuid=duplicated_uuid,
+            distinct_id="user",
+            event="$pageview",
+            timestamp="2022-01-09T12:00:00Z",
+            team=self.team,
+        )
+        _create_event(
+            distinct_id="user", event="$feature_flag_called", timestamp="2022-01-09T12:00:00Z", team=self.team
+        )
+        _create_event(distinct_id="user", event="survey sent", timestamp="2022-01-03T12:00:00Z", team=self.team)
+        _create_event(
+            distinct_id="user",
+            event="$pageview",
+            properties={"$group_0": "org:5"},
+            timestamp="2022-01-09T12:00:00Z",
+            team=self.team,
+        )
+        flush_persons_and_events()
+
+        event_count_keys = [
+            "teams_with_event_count_lifetime",
+            "teams_with_event_count_in_period",
+            "teams_with_event_count_in_month",
+            "teams_with_event_count_with_groups_in_period",
+        ]
+        counted_events = _get_all_usage_data(period_start, period_end)
+
+        count_team_daily_events(datetime(2021, 12, 31).date(), datetime(2022, 1, 10).date())
+        with override_settings(USAGE_REPORT_FROM_DAILY_EVENT_COUNTS=True):
+            from_daily_counts = _get_all_usage_data(period_start, period_end)
+
+        assert {key: from_daily_counts[key] for key in event_count_keys} == {
+            key: counted_events[key] for key in event_count_keys
+        }
+        assert from_daily_counts["teams_with_event_count_in_period"] == [(self.team.pk, 4)]
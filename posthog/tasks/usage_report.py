@@ -1,9 +1,13 @@
 import dataclasses
 import os
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+from functools import partial
+from time import perf_counter
 from typing import (
     Any,
+    Callable,
     Dict,
     List,
     Literal,
@@ -20,8 +24,9 @@ import structlog
 from celery import shared_task
 from dateutil import parser
 from django.conf import settings
+from django.core.cache import cache
 from django.db import connection
-from django.db.models import Count, Q
+from django.db.models import Count, Q, QuerySet
 from posthoganalytics.client import Client
 from psycopg2 import sql
 from retry import retry
@@ -41,6 +46,7 @@ from posthog.models.plugin import PluginConfig
 from posthog.models.team.team import Team
 from posthog.models.utils import namedtuplefetchall
 from posthog.settings import CLICKHOUSE_CLUSTER, INSTANCE_TAG
+from posthog.tasks.team_daily_event_counts import count_team_daily_events
 from posthog.tasks.utils import CeleryQueue
 from posthog.utils import (
     get_helm_info_env,
@@ -64,6 +70,9 @@ QUERY_RETRIES = 3
 QUERY_RETRY_DELAY = 1
 QUERY_RETRY_BACKOFF = 2
 
+# How long the rows of a usage report's queries are kept for, if the report fails before being sent
+USAGE_DATA_CACHE_TIMEOUT_SECONDS = 24 * 60 * 60
+
 USAGE_REPORT_TASK_KWARGS = dict(
     queue=CeleryQueue.USAGE_REPORTS.value,
     ignore_result=True,
@@ -411,6 +420,33 @@ def get_teams_with_billable_event_count_in_period(
     return result
 
 
+@timed_log()
+@retry(tries=QUERY_RETRIES, delay=QUERY_RETRY_DELAY, backoff=QUERY_RETRY_BACKOFF)
+def get_teams_with_daily_event_counts(
+    count: Literal["event_count", "billable_event_count", "unique_billable_event_count", "event_count_with_groups"],
+    begin: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> List[Tuple[int, int]]:
+    """
+    Sums up the per team daily counts of the days from begin to end, or of all days, in place of counting the events
+    themselves. The days have to have been counted already, see `count_team_daily_events`.
+    """
+    days_filter = "WHERE day BETWEEN toDate(%(begin)s) AND toDate(%(end)s)" if begin and end else ""
+    result = sync_execute(
+        f"""
+        SELECT team_id, sum({count}) as count
+        FROM team_daily_event_counts FINAL
+        {days_filter}
+        GROUP BY team_id
+        HAVING count > 0
+    """,
+        {"begin": begin, "end": end},
+        workload=Workload.OFFLINE,
+        settings=CH_BILLING_SETTINGS,
+    )
+    return result
+
+
 @timed_log()
 @retry(tries=QUERY_RETRIES, delay=QUERY_RETRY_DELAY, backoff=QUERY_RETRY_BACKOFF)
 def get_teams_with_event_count_with_groups_in_period(begin: datetime, end: datetime) -> List[Tuple[int, int]]:
@@ -672,157 +708,201 @@ def convert_team_usage_rows_to_dict(rows: List[Union[dict, Tuple[int, int]]]) ->
     return team_id_map
 
 
-def _get_all_usage_data(period_start: datetime, period_end: datetime) -> Dict[str, Any]:
+@retry(tries=QUERY_RETRIES, delay=QUERY_RETRY_DELAY, backoff=QUERY_RETRY_BACKOFF)
+def _get_teams_with_count(queryset: QuerySet) -> List[dict]:
+    return list(queryset.values("team_id").annotate(total=Count("id")).order_by("team_id"))
+
+
+def _get_usage_queries(period_start: datetime, period_end: datetime) -> Dict[str, Callable[[], List[Any]]]:
     """
-    Gets all usage data for the specified period. Clickhouse is good at counting things so
-    we count across all teams rather than doing it one by one
+    The queries making up the usage report, by the key of their rows in all_data. None of them depend on each other.
     """
-    return dict(
-        teams_with_event_count_lifetime=get_teams_with_event_count_lifetime(),
-        teams_with_event_count_in_period=get_teams_with_billable_event_count_in_period(
-            period_start, period_end, count_distinct=True
-        ),
-        teams_with_event_count_in_month=get_teams_with_billable_event_count_in_period(
-            period_start.replace(day=1), period_end
-        ),
-        teams_with_event_count_with_groups_in_period=get_teams_with_event_count_with_groups_in_period(
-            period_start, period_end
-        ),
-        # teams_with_event_count_by_lib=get_teams_with_event_count_by_lib(period_start, period_end),
-        # teams_with_event_count_by_name=get_teams_with_event_count_by_name(period_start, period_end),
-        teams_with_recording_count_in_period=get_teams_with_recording_count_in_period(period_start, period_end),
-        teams_with_recording_count_total=get_teams_with_recording_count_total(),
-        teams_with_decide_requests_count_in_period=get_teams_with_feature_flag_requests_count_in_period(
-            period_start, period_end, FlagRequestType.DECIDE
-        ),
-        teams_with_decide_requests_count_in_month=get_teams_with_feature_flag_requests_count_in_period(
-            period_start.replace(day=1), period_end, FlagRequestType.DECIDE
-        ),
-        teams_with_local_evaluation_requests_count_in_period=get_teams_with_feature_flag_requests_count_in_period(
-            period_start, period_end, FlagRequestType.LOCAL_EVALUATION
-        ),
-        teams_with_local_evaluation_requests_count_in_month=get_teams_with_feature_flag_requests_count_in_period(
-            period_start.replace(day=1), period_end, FlagRequestType.LOCAL_EVALUATION
-        ),
-        teams_with_group_types_total=list(
-            GroupTypeMapping.objects.values("team_id").annotate(total=Count("id")).order_by("team_id")
-        ),
-        teams_with_dashboard_count=list(
-            Dashboard.objects.values("team_id").annotate(total=Count("id")).order_by("team_id")
-        ),
-        teams_with_dashboard_template_count=list(
-            Dashboard.objects.filter(creation_mode="template")
-            .values("team_id")
-            .annotate(total=Count("id"))
-            .order_by("team_id")
-        ),
-        teams_with_dashboard_shared_count=list(
-            Dashboard.objects.filter(sharingconfiguration__enabled=True)
-            .values("team_id")
-            .annotate(total=Count("id"))
-            .order_by("team_id")
-        ),
-        teams_with_dashboard_tagged_count=list(
-            Dashboard.objects.filter(tagged_items__isnull=False)
-            .values("team_id")
-            .annotate(total=Count("id"))
-            .order_by("team_id")
-        ),
-        teams_with_ff_count=list(FeatureFlag.objects.values("team_id").annotate(total=Count("id")).order_by("team_id")),
-        teams_with_ff_active_count=list(
-            FeatureFlag.objects.filter(active=True).values("team_id").annotate(total=Count("id")).order_by("team_id")
-        ),
-        teams_with_hogql_app_bytes_read=get_teams_with_hogql_metric(
-            period_start,
-            period_end,
-            metric="read_bytes",
-            query_types=["hogql_query", "HogQLQuery"],
-            access_method="",
-        ),
-        teams_with_hogql_app_rows_read=get_teams_with_hogql_metric(
-            period_start,
-            period_end,
-            metric="read_rows",
-            query_types=["hogql_query", "HogQLQuery"],
-            access_method="",
-        ),
-        teams_with_hogql_app_duration_ms=get_teams_with_hogql_metric(
+    month_start = period_start.replace(day=1)
+
+    def hogql_metric(metric: str, query_types: List[str], access_method: str) -> Callable[[], List[Any]]:
+        return partial(
+            get_teams_with_hogql_metric,
             period_start,
             period_end,
-            metric="query_duration_ms",
-            query_types=["hogql_query", "HogQLQuery"],
-            access_method="",
+            metric=metric,
+            query_types=query_types,
+            access_method=access_method,
+        )
+
+    if settings.USAGE_REPORT_FROM_DAILY_EVENT_COUNTS:
+        event_count_queries: Dict[str, Callable[[], List[Any]]] = dict(
+            teams_with_event_count_lifetime=partial(get_teams_with_daily_event_counts, "event_count"),
+            teams_with_event_count_in_period=partial(
+                get_teams_with_daily_event_counts, "unique_billable_event_count", period_start, period_end
+            ),
+            teams_with_event_count_in_month=partial(
+                get_teams_with_daily_event_counts, "billable_event_count", month_start, period_end
+            ),
+            teams_with_event_count_with_groups_in_period=partial(
+                get_teams_with_daily_event_counts, "event_count_with_groups", period_start, period_end
+            ),
+        )
+    else:
+        event_count_queries = dict(
+            teams_with_event_count_lifetime=get_teams_with_event_count_lifetime,
+            teams_with_event_count_in_period=partial(
+                get_teams_with_billable_event_count_in_period, period_start, period_end, count_distinct=True
+            ),
+            teams_with_event_count_in_month=partial(
+                get_teams_with_billable_event_count_in_period, month_start, period_end
+            ),
+            teams_with_event_count_with_groups_in_period=partial(
+                get_teams_with_event_count_with_groups_in_period, period_start, period_end
+            ),
+        )
+
+    return dict(
+        **event_count_queries,
+        # teams_with_event_count_by_lib=partial(get_teams_with_event_count_by_lib, period_start, period_end),
+        # teams_with_event_count_by_name=partial(get_teams_with_event_count_by_name, period_start, period_end),
+        teams_with_recording_count_in_period=partial(
+            get_teams_with_recording_count_in_period, period_start, period_end
         ),
-        teams_with_hogql_api_bytes_read=get_teams_with_hogql_metric(
-            period_start,
-            period_end,
-            metric="read_bytes",
-            query_types=["hogql_query", "HogQLQuery"],
-            access_method="personal_api_key",
+        teams_with_recording_count_total=get_teams_with_recording_count_total,
+        teams_with_decide_requests_count_in_period=partial(
+            get_teams_with_feature_flag_requests_count_in_period, period_start, period_end, FlagRequestType.DECIDE
         ),
-        teams_with_hogql_api_rows_read=get_teams_with_hogql_metric(
-            period_start,
-            period_end,
-            metric="read_rows",
-            query_types=["hogql_query", "HogQLQuery"],
-            access_method="personal_api_key",
+        teams_with_decide_requests_count_in_month=partial(
+            get_teams_with_feature_flag_requests_count_in_period, month_start, period_end, FlagRequestType.DECIDE
         ),
-        teams_with_hogql_api_duration_ms=get_teams_with_hogql_metric(
+        teams_with_local_evaluation_requests_count_in_period=partial(
+            get_teams_with_feature_flag_requests_count_in_period,
             period_start,
             period_end,
-            metric="query_duration_ms",
-            query_types=["hogql_query", "HogQLQuery"],
-            access_method="personal_api_key",
+            FlagRequestType.LOCAL_EVALUATION,
         ),
-        teams_with_event_explorer_app_bytes_read=get_teams_with_hogql_metric(
-            period_start,
+        teams_with_local_evaluation_requests_count_in_month=partial(
+            get_teams_with_feature_flag_requests_count_in_period,
+            month_start,
             period_end,
-            metric="read_bytes",
-            query_types=["EventsQuery"],
-            access_method="",
+            FlagRequestType.LOCAL_EVALUATION,
         ),
-        teams_with_event_explorer_app_rows_read=get_teams_with_hogql_metric(
-            period_start,
-            period_end,
-            metric="read_rows",
-            query_types=["EventsQuery"],
-            access_method="",
+        teams_with_group_types_total=partial(_get_teams_with_count, GroupTypeMapping.objects.all()),
+        teams_with_dashboard_count=partial(_get_teams_with_count, Dashboard.objects.all()),
+        teams_with_dashboard_template_count=partial(
+            _get_teams_with_count, Dashboard.objects.filter(creation_mode="template")
         ),
-        teams_with_event_explorer_app_duration_ms=get_teams_with_hogql_metric(
-            period_start,
-            period_end,
-            metric="query_duration_ms",
-            query_types=["EventsQuery"],
-            access_method="",
+        teams_with_dashboard_shared_count=partial(
+            _get_teams_with_count, Dashboard.objects.filter(sharingconfiguration__enabled=True)
         ),
-        teams_with_event_explorer_api_bytes_read=get_teams_with_hogql_metric(
-            period_start,
-            period_end,
-            metric="read_bytes",
-            query_types=["EventsQuery"],
-            access_method="personal_api_key",
+        teams_with_dashboard_tagged_count=partial(
+            _get_teams_with_count, Dashboard.objects.filter(tagged_items__isnull=False)
         ),
-        teams_with_event_explorer_api_rows_read=get_teams_with_hogql_metric(
-            period_start,
-            period_end,
-            metric="read_rows",
-            query_types=["EventsQuery"],
-            access_method="personal_api_key",
+        teams_with_ff_count=partial(_get_teams_with_count, FeatureFlag.objects.all()),
+        teams_with_ff_active_count=partial(_get_teams_with_count, FeatureFlag.objects.filter(active=True)),
+        teams_with_hogql_app_bytes_read=hogql_metric("read_bytes", ["hogql_query", "HogQLQuery"], ""),
+        teams_with_hogql_app_rows_read=hogql_metric("read_rows", ["hogql_query", "HogQLQuery"], ""),
+        teams_with_hogql_app_duration_ms=hogql_metric("query_duration_ms", ["hogql_query", "HogQLQuery"], ""),
+        teams_with_hogql_api_bytes_read=hogql_metric("read_bytes", ["hogql_query", "HogQLQuery"], "personal_api_key"),
+        teams_with_hogql_api_rows_read=hogql_metric("read_rows", ["hogql_query", "HogQLQuery"], "personal_api_key"),
+        teams_with_hogql_api_duration_ms=hogql_metric(
+            "query_duration_ms", ["hogql_query", "HogQLQuery"], "personal_api_key"
         ),
-        teams_with_event_explorer_api_duration_ms=get_teams_with_hogql_metric(
-            period_start,
-            period_end,
-            metric="query_duration_ms",
-            query_types=["EventsQuery"],
-            access_method="personal_api_key",
+        teams_with_event_explorer_app_bytes_read=hogql_metric("read_bytes", ["EventsQuery"], ""),
+        teams_with_event_explorer_app_rows_read=hogql_metric("read_rows", ["EventsQuery"], ""),
+        teams_with_event_explorer_app_duration_ms=hogql_metric("query_duration_ms", ["EventsQuery"], ""),
+        teams_with_event_explorer_api_bytes_read=hogql_metric("read_bytes", ["EventsQuery"], "personal_api_key"),
+        teams_with_event_explorer_api_rows_read=hogql_metric("read_rows", ["EventsQuery"], "personal_api_key"),
+        teams_with_event_explorer_api_duration_ms=hogql_metric(
+            "query_duration_ms", ["EventsQuery"], "personal_api_key"
         ),
-        teams_with_survey_responses_count_in_period=get_teams_with_survey_responses_count_in_period(
-            period_start, period_end
+        teams_with_survey_responses_count_in_period=partial(
+            get_teams_with_survey_responses_count_in_period, period_start, period_end
         ),
-        teams_with_survey_responses_count_in_month=get_teams_with_survey_responses_count_in_period(
-            period_start.replace(day=1), period_end
+        teams_with_survey_responses_count_in_month=partial(
+            get_teams_with_survey_responses_count_in_period, month_start, period_end
         ),
-        teams_with_rows_synced_in_period=get_teams_with_rows_synced_in_period(period_start, period_end),
+        teams_with_rows_synced_in_period=partial(get_teams_with_rows_synced_in_period, period_start, period_end),
+    )
+
+
+def _get_all_usage_data(period_start: datetime, period_end: datetime) -> Dict[str, Any]:
+    """
+    Gets all usage data for the specified period. Clickhouse is good at counting things so
+    we count across all teams rather than doing it one by one
+
+    The queries run USAGE_REPORT_QUERIES_PARALLELISM at a time, and no more are started once one fails. When
+    USAGE_REPORT_RESUME_FAILED_REPORTS is on, the rows of every query are kept until the report is sent, so that
+    retrying a failed report only runs the queries that didn't finish.
+    """
+    if settings.USAGE_REPORT_FROM_DAILY_EVENT_COUNTS:
+        # the hourly counts may have missed events that arrived since, so count the reported days once more
+        count_team_daily_events(period_start.date(), period_end.date())
+
+    queries = _get_usage_queries(period_start, period_end)
+    all_data: Dict[str, Any] = {}
+
+    if settings.USAGE_REPORT_RESUME_FAILED_REPORTS:
+        stored = cache.get_many([_usage_data_cache_key(period_start, period_end, key) for key in queries])
+        for key in queries:
+            cache_key = _usage_data_cache_key(period_start, period_end, key)
+            if cache_key in stored:
+                all_data[key] = stored[cache_key]
+        if all_data:
+            logger.info("usage_report_resumed", period_start=period_start, finished_queries=len(all_data))
+
+    pending = {key: query for key, query in queries.items() if key not in all_data}
+    parallelism = min(settings.USAGE_REPORT_QUERIES_PARALLELISM, len(pending))
+    if parallelism <= 1:
+        for key, query in pending.items():
+            all_data[key] = _run_usage_query(key, query, period_start, period_end)
+    else:
+        with ThreadPoolExecutor(max_workers=parallelism) as executor:
+            futures = {
+                executor.submit(_run_usage_query_in_thread, key, query, period_start, period_end): key
+                for key, query in pending.items()
+            }
+            try:
+                for future in as_completed(futures):
+                    all_data[futures[future]] = future.result()
+            except Exception:
+                # queries that already started still finish, and are stored to be resumed from
+                for future in futures:
+                    future.cancel()
+                raise
+
+    # keep the order of the queries, rather than the order they finished in
+    return {key: all_data[key] for key in queries}
+
+
+def _run_usage_query(
+    key: str, query: Callable[[], List[Any]], period_start: datetime, period_end: datetime
+) -> List[Any]:
+    start_time = perf_counter()
+    try:
+        rows = query()
+    except Exception as err:
+        logger.error("usage_report_query_failed", query=key, duration=perf_counter() - start_time, error=err)
+        raise
+
+    logger.info("usage_report_query_finished", query=key, duration=perf_counter() - start_time, rows=len(rows))
+    if settings.USAGE_REPORT_RESUME_FAILED_REPORTS:
+        cache.set(_usage_data_cache_key(period_start, period_end, key), rows, USAGE_DATA_CACHE_TIMEOUT_SECONDS)
+    return rows
+
+
+def _run_usage_query_in_thread(
+    key: str, query: Callable[[], List[Any]], period_start: datetime, period_end: datetime
+) -> List[Any]:
+    # :TRICKY: Each thread gets its own database connection, make sure it doesn't outlive the thread
+    try:
+        return _run_usage_query(key, query, period_start, period_end)
+    finally:
+        connection.close()
+
+
+def _usage_data_cache_key(period_start: datetime, period_end: datetime, key: str) -> str:
+    return f"usage_report_data:{period_start.isoformat()}:{period_end.isoformat()}:{key}"
+
+
+def _clear_stored_usage_data(period_start: datetime, period_end: datetime) -> None:
+    cache.delete_many(
+        [_usage_data_cache_key(period_start, period_end, key) for key in _get_usage_queries(period_start, period_end)]
     )
 
 
@@ -1003,6 +1083,9 @@ def send_all_org_usage_reports(
                 send_report_to_billing_service.delay(org_id, full_report_dict)
         time_since = datetime.now() - time_now
         print(f"Sending usage reports to PostHog and Billing took {time_since.total_seconds()} seconds.")  # noqa T201
+
+        if settings.USAGE_REPORT_RESUME_FAILED_REPORTS:
+            _clear_stored_usage_data(period_start, period_end)
     except Exception as err:
         capture_exception(err)
         raise err
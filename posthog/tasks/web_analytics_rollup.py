@@ -0,0 +1,75 @@
+from datetime import datetime, timedelta
+from typing import Optional
+
+import structlog
+from django.conf import settings
+from django.utils import timezone
+from redis.lock import Lock
+from statshog.defaults.django import statsd
+
+from posthog.clickhouse.client import sync_execute
+from posthog.clickhouse.client.connection import Workload
+from posthog.clickhouse.query_tagging import tag_queries
+from posthog.hogql_queries.web_analytics.rollup import get_rollup_coverage, set_rollup_coverage, start_of_hour
+from posthog.models.web_analytics.sql import INSERT_WEB_ANALYTICS_HOURLY_SQL
+from posthog.redis import get_client
+
+logger = structlog.get_logger(__name__)
+
+ROLLUP_LOCK_KEY = "web_analytics_rollup_lock"
+# Renewed before every hour, so it has to outlast the roll up of one hour, which may take up to max_execution_time
+ROLLUP_MAX_EXECUTION_TIME_SECONDS = 60 * 60
+ROLLUP_LOCK_TIMEOUT_SECONDS = 2 * ROLLUP_MAX_EXECUTION_TIME_SECONDS
+
+
+def rollup_web_analytics_hourly(now: Optional[datetime] = None) -> int:
+    """
+    Rolls up the hours that have passed since the last run into `web_analytics_hourly`, oldest first, and moves
+    the covered range along after each hour. Returns the number of hours rolled up.
+    """
+    # Rolling up an hour again only replaces its rows, but there's no point in doing the same work twice
+    lock = get_client().lock(ROLLUP_LOCK_KEY, timeout=ROLLUP_LOCK_TIMEOUT_SECONDS)
+    if not lock.acquire(blocking=False):
+        logger.info("web_analytics_rollup_already_running")
+        return 0
+
+    try:
+        return _rollup_hours(now or timezone.now(), lock)
+    finally:
+        lock.release()
+
+
+def _rollup_hours(now: datetime, lock: Lock) -> int:
+    rollup_until = start_of_hour(now - timedelta(minutes=settings.WEB_ANALYTICS_ROLLUP_LAG_MINUTES))
+
+    coverage = get_rollup_coverage()
+    if coverage is None:
+        covered_from = covered_until = rollup_until - timedelta(days=settings.WEB_ANALYTICS_ROLLUP_BACKFILL_DAYS)
+    else:
+        covered_from, covered_until = coverage
+
+    tag_queries(kind="web_analytics_rollup")
+    hours = 0
+    while covered_until < rollup_until and hours < settings.WEB_ANALYTICS_ROLLUP_MAX_HOURS_PER_RUN:
+        hour_to = covered_until + timedelta(hours=1)
+        lock.reacquire()
+        sync_execute(
+            INSERT_WEB_ANALYTICS_HOURLY_SQL,
+            {
+                "hour_from": covered_until.strftime("%Y-%m-%d %H:%M:%S"),
+                "hour_to": hour_to.strftime("%Y-%m-%d %H:%M:%S"),
+            },
+            settings={"max_execution_time": ROLLUP_MAX_EXECUTION_TIME_SECONDS},
+            workload=Workload.OFFLINE,
+        )
+        covered_until = hour_to
+        set_rollup_coverage(covered_from, covered_until)
+        hours += 1
+
+    if coverage is None and hours == 0:
+        # nothing to roll up yet, but start covering from here on
+        set_rollup_coverage(covered_from, covered_until)
+
+    statsd.gauge("web_analytics_rollup_lag_hours", (rollup_until - covered_until) / timedelta(hours=1))
+    logger.info("web_analytics_rollup_finished", hours=hours, covered_until=covered_until.isoformat())
+    return hours